@@ -0,0 +1,172 @@
+# analytics.py - Couche analytique colonnaire pour les graphiques du directeur
+import threading
+from collections import OrderedDict
+from itertools import islice
+from typing import Dict, Iterable, List, Optional, Tuple
+import numpy as np
+import pandas as pd
+from fragment_cache import VERSION_COLUMNS
+
+# Colonnes utilisées par les graphiques et leur type (DataFrame mis en cache par version métier :
+# aucune colonne réécrite par les chronomètres, voir LIVE_COLUMNS)
+ORDER_DTYPES = {
+    'of': 'string',
+    'modele': 'string',
+    'matricule_coupeur': 'string',
+    'statut_coupe': 'category',
+    'coupe_en_pause': 'bool',
+    'quantite': 'int64',
+    'quantite_controlee': 'int64',
+    'quantite_rejetee': 'int64',
+    'quantite_retravailler': 'int64',
+    'temps_controle': 'int64',
+}
+
+# Cumul de chronomètre lu sur les lignes courantes à chaque rendu, pour les seuls OF affichés
+LIVE_COLUMNS = ('temps_coupe',)
+
+STATUS_ORDER = ['En attente', 'En cours', 'En pause', 'Terminée']
+
+
+# Dernière modification métier de l'OF, de la coupe et du contrôle (migrations 6 et 7) :
+# ignorent les passages des chronomètres, contrairement à derniere_mise_a_jour (VERSION_COLUMNS)
+BUSINESS_VERSION_COLUMNS = ('maj_of', 'maj_donnees_coupe', 'maj_donnees_controle')
+
+
+def _version(orders: List[Dict], columns: Tuple[str, ...]) -> Optional[Tuple]:
+    version = [len(orders)]
+    for column in columns:
+        values = [o[column] for o in orders if o.get(column) is not None]
+        version.append(max(values) if values else None)
+    if all(value is None for value in version[1:]):
+        return None
+    return tuple(version)
+
+
+def orders_data_version(orders: List[Dict]) -> Optional[Tuple]:
+    """Version métier d'une liste d'OF : nombre de lignes et dernière modification hors chronomètres
+    (None si les lignes n'ont pas de colonnes de version)"""
+    return _version(orders, BUSINESS_VERSION_COLUMNS)
+
+
+def orders_live_version(orders: List[Dict]) -> Optional[Tuple]:
+    """Comme orders_data_version, changée aussi par chaque passage des chronomètres (temps cumulés)"""
+    return _version(orders, VERSION_COLUMNS)
+
+
+def _raw_frame(orders: List[Dict]) -> pd.DataFrame:
+    # Colonne par colonne : mêmes accès pour les dicts et les OrderRecord (pas de conversion en dict)
+    return pd.DataFrame({column: [o.get(column) for o in orders] for column in ORDER_DTYPES})
+
+
+def build_orders_frame(orders: Iterable[Dict], chunk_size: int = 10_000) -> pd.DataFrame:
+    """Convertit les lignes (dict ou OrderRecord) en DataFrame typé, une seule fois par version.
+
+    orders peut être un générateur (DatabaseManager.iter_all_orders) : les lignes sont
+    consommées par blocs et seules les colonnes de ORDER_DTYPES sont conservées.
+    """
+    if isinstance(orders, list):
+        df = _raw_frame(orders)
+    else:
+        iterator = iter(orders)
+        chunks = []
+        while True:
+            chunk = list(islice(iterator, chunk_size))
+            if not chunk:
+                break
+            chunks.append(_raw_frame(chunk))
+        df = pd.concat(chunks, ignore_index=True) if chunks else _raw_frame([])
+    for column, dtype in ORDER_DTYPES.items():
+        if dtype == 'int64':
+            df[column] = pd.to_numeric(df[column], errors='coerce').fillna(0).astype('int64')
+        elif dtype == 'bool':
+            df[column] = df[column].fillna(False).astype(bool)
+        elif dtype == 'string':
+            df[column] = df[column].astype('string').str.strip()
+        else:
+            df[column] = df[column].astype(dtype)
+    return df
+
+
+class OrdersAnalytics:
+    """Agrégations vectorisées des graphiques (un DataFrame par version des données)"""
+
+    def __init__(self, df: pd.DataFrame):
+        self.df = df
+
+    def status_counts(self) -> pd.Series:
+        """Répartition des statuts de coupe (une pause en cours compte comme 'En pause')"""
+        statut = self.df['statut_coupe'].astype(object)
+        statut = np.where(self.df['coupe_en_pause'].to_numpy(), 'En pause', statut)
+        return pd.Series(statut).value_counts().reindex(STATUS_ORDER, fill_value=0)
+
+    def control_progress(self, limit: int = 8) -> pd.DataFrame:
+        """Quantité totale et contrôlée des premiers OF"""
+        return self.df.head(limit)[['of', 'quantite', 'quantite_controlee']]
+
+    def rejection_rate(self, limit: int = 10) -> pd.DataFrame:
+        """Taux de rejet des premiers OF déjà contrôlés"""
+        head = self.df.head(limit)
+        head = head[head['quantite_controlee'] > 0]
+        return pd.DataFrame({
+            'OF': head['of'].to_numpy(),
+            'Taux Rejet': (head['quantite_rejetee'] / head['quantite_controlee'] * 100).to_numpy(),
+            'Quantité': head['quantite_controlee'].to_numpy(),
+        })
+
+    def problem_rate_by_model(self, limit: int = 8) -> pd.Series:
+        """% de paires rejetées ou à retravailler par modèle (ordre d'apparition)"""
+        grouped = self.df.assign(
+            problems=self.df['quantite_rejetee'] + self.df['quantite_retravailler']
+        ).groupby('modele', sort=False)[['quantite_controlee', 'problems']].sum()
+        total = grouped['quantite_controlee'].to_numpy()
+        problems = grouped['problems'].to_numpy()
+        rates = np.divide(problems * 100.0, total, out=np.zeros(len(total)), where=total > 0)
+        return pd.Series(rates, index=grouped.index).head(limit)
+
+    def times(self, orders: List[Dict], limit: int = 10) -> pd.DataFrame:
+        """Temps de coupe et de contrôle (heures) des premiers OF ayant un temps de coupe.
+        orders : lignes courantes, mêmes OF dans le même ordre que le DataFrame (temps de coupe en direct)"""
+        head = self.df.head(limit)
+        temps_coupe = pd.to_numeric(pd.Series([o.get('temps_coupe') for o in orders[:len(head)]], index=head.index,
+                                              dtype=object), errors='coerce').fillna(0)
+        keep = temps_coupe > 0
+        head, temps_coupe = head[keep], temps_coupe[keep]
+        return pd.DataFrame({
+            'OF': head['of'].to_numpy(),
+            'Matricule': head['matricule_coupeur'].fillna('N/A').to_numpy(),
+            'Temps Coupe (h)': (temps_coupe / 3600).to_numpy(),
+            'Temps Contrôle (h)': (head['temps_controle'] / 3600).to_numpy(),
+        })
+
+
+class AnalyticsCache:
+    """DataFrames typés partagés par les sessions, indexés par version métier des données
+    (orders_data_version : un passage des chronomètres ne les reconstruit pas)"""
+
+    MAX_VERSIONS = 4
+
+    _frames: "OrderedDict[Tuple, OrdersAnalytics]" = OrderedDict()
+    _lock = threading.Lock()
+
+    @classmethod
+    def get(cls, orders: List[Dict], version: Optional[Tuple] = None) -> OrdersAnalytics:
+        """Retourne l'analyse des OF (reconstruite seulement si les données ont changé)"""
+        version = orders_data_version(orders) if version is None else version
+        if version is None:
+            # Sans colonnes de version, impossible de savoir si les données ont changé
+            return OrdersAnalytics(build_orders_frame(orders))
+
+        with cls._lock:
+            analytics = cls._frames.get(version)
+            if analytics is not None:
+                cls._frames.move_to_end(version)
+                return analytics
+
+        analytics = OrdersAnalytics(build_orders_frame(orders))
+
+        with cls._lock:
+            cls._frames[version] = analytics
+            while len(cls._frames) > cls.MAX_VERSIONS:
+                cls._frames.popitem(last=False)
+        return analytics
@@ -0,0 +1,191 @@
+# app_logging.py - Journalisation structurée et asynchrone (file d'attente non bloquante)
+#
+# Les threads du script ne font que déposer les enregistrements dans une file bornée ;
+# un thread d'écoute les formate et les écrit sur stdout. File pleine : l'enregistrement
+# est abandonné et compté plutôt que de bloquer le rendu.
+#
+# Niveau et format : Config.LOG_LEVEL / Config.LOG_FORMAT, ou variables d'environnement
+# REPETTO_LOG_LEVEL (DEBUG, INFO...) et REPETTO_LOG_FORMAT (text ou json).
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+import threading
+import time
+from datetime import datetime
+from typing import Dict, Optional
+
+ROOT_LOGGER = 'repetto'
+QUEUE_SIZE = 10_000
+
+
+class JsonFormatter(logging.Formatter):
+    """Une ligne JSON par enregistrement (expédition vers un collecteur de journaux)"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            'date': datetime.fromtimestamp(record.created).isoformat(timespec='milliseconds'),
+            'niveau': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+            'thread': record.threadName,
+        }
+        entry.update(getattr(record, 'champs', None) or {})
+        if record.exc_text:
+            entry['exception'] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class TextFormatter(logging.Formatter):
+    """Format lisible : date niveau logger: message clé=valeur..."""
+
+    def __init__(self):
+        super().__init__('%(asctime)s %(levelname)-7s %(name)s: %(message)s')
+
+    def format(self, record: logging.LogRecord) -> str:
+        line = super().format(record)
+        champs = getattr(record, 'champs', None)
+        if champs:
+            line += ' ' + ' '.join(f"{key}={value}" for key, value in champs.items())
+        return line
+
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler qui abandonne (et compte) les enregistrements quand la file est pleine"""
+
+    dropped = 0
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            DroppingQueueHandler.dropped += 1
+
+
+class AppLogging:
+    """Configuration unique par processus (file, thread d'écoute, format)"""
+
+    _lock = threading.Lock()
+    _listener: Optional[logging.handlers.QueueListener] = None
+    _queue: Optional[queue.Queue] = None
+    _output: Optional[logging.Handler] = None
+
+    # Renseignés depuis Config par DatabaseManager (l'environnement est prioritaire)
+    level = 'INFO'
+    fmt = 'text'
+
+    @classmethod
+    def _formatter(cls) -> logging.Formatter:
+        return JsonFormatter() if cls.fmt == 'json' else TextFormatter()
+
+    @classmethod
+    def configure(cls, level: str, fmt: str):
+        cls.level = os.environ.get('REPETTO_LOG_LEVEL', level).upper()
+        cls.fmt = os.environ.get('REPETTO_LOG_FORMAT', fmt).lower()
+        with cls._lock:
+            if cls._listener is not None:
+                logging.getLogger(ROOT_LOGGER).setLevel(cls.level)
+                cls._output.setFormatter(cls._formatter())
+
+    @classmethod
+    def setup(cls):
+        """Installe la file et démarre le thread d'écoute (une seule fois)"""
+        if cls._listener is not None:
+            return
+        with cls._lock:
+            if cls._listener is not None:
+                return
+            cls.level = os.environ.get('REPETTO_LOG_LEVEL', cls.level).upper()
+            cls.fmt = os.environ.get('REPETTO_LOG_FORMAT', cls.fmt).lower()
+
+            cls._queue = queue.Queue(maxsize=QUEUE_SIZE)
+            cls._output = logging.StreamHandler(sys.stdout)
+            cls._output.setFormatter(cls._formatter())
+
+            root = logging.getLogger(ROOT_LOGGER)
+            root.setLevel(cls.level)
+            root.propagate = False
+            root.addHandler(DroppingQueueHandler(cls._queue))
+
+            listener = logging.handlers.QueueListener(cls._queue, cls._output, respect_handler_level=False)
+            listener.start()
+            atexit.register(listener.stop)
+            cls._listener = listener
+
+    @classmethod
+    def stats(cls) -> Dict:
+        """Enregistrements en attente et abandonnés (file pleine)"""
+        return {
+            'en_attente': cls._queue.qsize() if cls._queue is not None else 0,
+            'abandonnes': DroppingQueueHandler.dropped,
+        }
+
+
+def get_logger(name: str) -> logging.Logger:
+    """Logger 'repetto.<name>' branché sur la file asynchrone"""
+    AppLogging.setup()
+    return logging.getLogger(f"{ROOT_LOGGER}.{name}")
+
+
+def log_event(logger: logging.Logger, level: int, message: str, **champs):
+    """Enregistrement structuré (les champs deviennent des clés JSON)"""
+    if logger.isEnabledFor(level):
+        logger.log(level, message, extra={'champs': champs})
+
+
+class TickSummary:
+    """Mises à jour d'un passage des chronomètres, agrégées au lieu d'une ligne par OF.
+
+    Le détail par OF n'est journalisé qu'en DEBUG et seulement pour les premiers OF ;
+    la synthèse d'un passage est en DEBUG et une synthèse cumulée part en INFO au plus
+    une fois par SUMMARY_INTERVAL_S pour tout le processus.
+    """
+
+    DEBUG_SAMPLE = 5
+    SUMMARY_INTERVAL_S = 60
+
+    # Cumul partagé par toutes les sessions
+    _lock = threading.Lock()
+    _totals: Dict[str, int] = {}
+    _ticks = 0
+    _last_flush = time.monotonic()
+
+    def __init__(self, logger: logging.Logger):
+        self.logger = logger
+        self.counts: Dict[str, int] = {}
+        self.seconds = 0
+        self.sampled = 0
+        self.started = time.perf_counter()
+
+    def add(self, stage: str, chrono: str, of_id: str, elapsed: int, total: int):
+        key = f"{stage}_{chrono}"
+        self.counts[key] = self.counts.get(key, 0) + 1
+        self.seconds += elapsed
+        if self.sampled < self.DEBUG_SAMPLE and self.logger.isEnabledFor(logging.DEBUG):
+            self.sampled += 1
+            log_event(self.logger, logging.DEBUG, "Chrono mis à jour", of=of_id, etape=stage, chrono=chrono,
+                      ecoule_s=elapsed, total_s=total)
+
+    def emit(self):
+        """Synthèse du passage (DEBUG) et, périodiquement, synthèse cumulée (INFO)"""
+        duration_ms = round((time.perf_counter() - self.started) * 1000, 1)
+        log_event(self.logger, logging.DEBUG, "Passage des chronomètres",
+                  mises_a_jour=sum(self.counts.values()), secondes=self.seconds, duree_ms=duration_ms, **self.counts)
+
+        cls = TickSummary
+        with cls._lock:
+            cls._ticks += 1
+            for key, count in self.counts.items():
+                cls._totals[key] = cls._totals.get(key, 0) + count
+            cls._totals['secondes'] = cls._totals.get('secondes', 0) + self.seconds
+            now = time.monotonic()
+            if now - cls._last_flush < cls.SUMMARY_INTERVAL_S:
+                return
+            totals, ticks = cls._totals, cls._ticks
+            cls._totals, cls._ticks, cls._last_flush = {}, 0, now
+
+        log_event(self.logger, logging.INFO, "Synthèse des chronomètres", passages=ticks,
+                  periode_s=self.SUMMARY_INTERVAL_S, **totals)
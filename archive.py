@@ -0,0 +1,96 @@
+# archive.py - Archivage des OF terminés : données froides hors des tables vivantes
+#
+# Les OF dont la piqûre est terminée depuis plus de Config.ARCHIVE_AFTER_DAYS jours sont
+# déplacés, avec leur historique, vers des tables <table>_archive de même structure (créées
+# par la migration 4, sans clés étrangères). Les lectures courantes (get_all_orders,
+# chronomètres, filtres des pages) ne parcourent plus que les OF récents ; les vues
+# d'historique (sur-consommation avec l'option historique, exports, iter_order_history)
+# passent par history_query(), qui interroge tables vivantes et archives dans une même
+# requête (UNION ALL).
+#
+# L'archivage est réversible (DatabaseManager.restore_archived_orders). Toute migration
+# qui modifie une table archivée doit modifier aussi sa table d'archive.
+#
+# Ligne de commande (tâche planifiée) :
+#   python archive.py                        # OF terminés depuis Config.ARCHIVE_AFTER_DAYS jours
+#   python archive.py --jours 30
+#   python archive.py --restaurer OF123 OF124
+import argparse
+import re
+import sys
+from typing import List, Sequence, Tuple
+
+# Tables archivées et colonne portant le numéro d'OF, parents d'abord
+ARCHIVED_TABLES = [
+    ('ordres_fabrication', 'of'),
+    ('details_coupe', 'of_id'),
+    ('details_controle', 'of_id'),
+    ('details_piqure', 'of_id'),
+    ('historique_changements', 'of_id'),
+    ('sessions_pause', 'of_id'),
+    ('qualite_sessions', 'of_id'),
+]
+
+_LIVE_TABLE = re.compile(r"\b(" + "|".join(table for table, _ in ARCHIVED_TABLES) + r")\b")
+
+
+def archive_name(table: str) -> str:
+    return f"{table}_archive"
+
+
+def archive_query(query: str) -> str:
+    """SELECT écrit sur les tables vivantes -> même SELECT sur les archives"""
+    return _LIVE_TABLE.sub(lambda m: archive_name(m.group(1)), query)
+
+
+def history_query(query: str, params: Sequence = ()) -> Tuple[str, List]:
+    """SELECT écrit sur les tables vivantes -> même SELECT sur vivantes UNION ALL archives.
+
+    query ne doit contenir ni ORDER BY ni LIMIT : l'appelant les ajoute au résultat, en
+    nommant les colonnes par leur alias de sortie (ex. ORDER BY sur_consommation DESC).
+    Le résultat est une table dérivée sans index : pour un tri limité ou un agrégat, le
+    pousser plutôt dans chaque branche (voir archive_query).
+    """
+    return f"{query}\nUNION ALL\n{archive_query(query)}", list(params) * 2
+
+
+def move_orders(backend, cursor, ofs: List[str], restore: bool = False):
+    """Déplace les OF et leurs lignes liées vers les archives (ou l'inverse avec restore),
+    dans la transaction en cours du curseur"""
+    placeholders = ", ".join(["%s"] * len(ofs))
+    moves = [(archive_name(table), table, column) if restore else (table, archive_name(table), column)
+             for table, column in ARCHIVED_TABLES]
+
+    # Insertion parents d'abord (clés étrangères des tables vivantes), suppression enfants d'abord
+    for source, target, column in moves:
+        columns = ", ".join(backend.stored_columns(cursor, source))
+        cursor.execute(f"INSERT INTO {target} ({columns}) "
+                       f"SELECT {columns} FROM {source} WHERE {column} IN ({placeholders})", ofs)
+    for source, _, column in reversed(moves):
+        cursor.execute(f"DELETE FROM {source} WHERE {column} IN ({placeholders})", ofs)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Archivage des OF terminés")
+    parser.add_argument('--jours', type=int, default=None,
+                        help="ancienneté minimale de la fin de piqûre (défaut : Config.ARCHIVE_AFTER_DAYS)")
+    parser.add_argument('--restaurer', nargs='+', metavar='OF', help="remet ces OF dans les tables vivantes")
+    args = parser.parse_args()
+
+    # Import différé : database importe ce module (via migrations)
+    from database import DatabaseManager
+    db_manager = DatabaseManager()
+    if not db_manager.ensure_schema():
+        return 1
+
+    if args.restaurer:
+        count = db_manager.restore_archived_orders(args.restaurer)
+        print(f"{count} OF restauré(s) sur {len(args.restaurer)}")
+    else:
+        count = db_manager.archive_completed_orders(args.jours)
+        print(f"{count} OF archivé(s)")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
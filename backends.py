@@ -0,0 +1,541 @@
+# backends.py - Moteurs de stockage : serveur MySQL ou SQLite embarqué (mode WAL)
+#
+# DatabaseManager écrit son SQL en dialecte MySQL (paramètres %s, NOW(), TIMESTAMPDIFF) ;
+# chaque moteur fournit la même API : connect(), create_database(), ddl(), verrou de
+# migration et introspection du schéma. Le moteur SQLite traduit les requêtes à la volée
+# et renvoie des connexions/curseurs compatibles avec ceux de pymysql (lignes en dict).
+# stream_cursor() ouvre un curseur non bufferisé : les lignes sont lues au fil de
+# fetchmany() au lieu d'être chargées en mémoire par execute() (historiques, exports).
+#
+# Choix du moteur : Config.STORAGE_BACKEND ('mysql' ou 'sqlite') et Config.SQLITE_PATH,
+# ou variables d'environnement REPETTO_BACKEND et REPETTO_SQLITE_PATH (prioritaires).
+import os
+import re
+import sqlite3
+from contextlib import contextmanager
+from datetime import date, datetime
+from decimal import Decimal
+from functools import lru_cache
+from typing import Dict, List, Optional
+
+import pymysql
+
+from query_stats import (InstrumentedCursor, InstrumentedSSCursor, InstrumentedSSDictCursor,
+                         MeasuredCursorMixin)
+
+BACKENDS = ('mysql', 'sqlite')
+
+
+# Codes client MySQL d'une connexion impossible ou perdue
+_MYSQL_CONNECTION_ERRORS = (2002, 2003, 2006, 2013, 2055)
+
+
+class MySQLBackend:
+    """Serveur MySQL/MariaDB (pymysql, curseur instrumenté de Config.DB_CONFIG)"""
+
+    name = 'mysql'
+    label = 'MySQL'
+    IntegrityError = pymysql.err.IntegrityError
+
+    def __init__(self, config: Dict, database_name: str, replica: bool = False):
+        self.config = config
+        self.database_name = database_name
+        # Réplique en lecture : jamais de création de base ni de DDL
+        self.replica = replica
+
+    def create_database(self):
+        conn = pymysql.connect(
+            host=self.config['host'],
+            user=self.config['user'],
+            password=self.config['password'],
+            port=self.config['port'],
+            charset=self.config['charset']
+        )
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute(f"CREATE DATABASE IF NOT EXISTS {self.database_name}")
+            conn.commit()
+        finally:
+            conn.close()
+
+    def connect(self):
+        config_with_db = self.config.copy()
+        config_with_db['database'] = self.database_name
+        try:
+            return pymysql.connect(**config_with_db)
+        except pymysql.err.OperationalError as e:
+            if self.replica or "Unknown database" not in str(e):
+                raise
+            self.create_database()
+            return pymysql.connect(**config_with_db)
+
+    def ddl(self, sql: str) -> List[str]:
+        """Requêtes à exécuter pour un DDL écrit en dialecte MySQL"""
+        return [sql]
+
+    def stream_cursor(self, conn, tuples: bool = False):
+        """Curseur côté serveur (SSDictCursor, SSCursor avec tuples) : la connexion reste occupée
+        jusqu'à la dernière ligne"""
+        return conn.cursor(InstrumentedSSCursor if tuples else InstrumentedSSDictCursor)
+
+    def tuple_cursor(self, conn):
+        """Curseur à lignes tuple (OrderRecord, voir order_record.py)"""
+        return conn.cursor(InstrumentedCursor)
+
+    @contextmanager
+    def migration_lock(self, cursor, timeout: int):
+        """Verrou consultatif GET_LOCK : un seul processus migre à la fois"""
+        lock_name = f"{self.database_name}.schema_migrations"
+        cursor.execute("SELECT GET_LOCK(%s, %s) AS verrou", (lock_name, timeout))
+        if cursor.fetchone()['verrou'] != 1:
+            yield False
+            return
+        try:
+            yield True
+        finally:
+            cursor.execute("SELECT RELEASE_LOCK(%s)", (lock_name,))
+
+    def column_exists(self, cursor, table: str, column: str) -> bool:
+        cursor.execute(
+            "SELECT COUNT(*) AS n FROM information_schema.COLUMNS "
+            "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND COLUMN_NAME = %s",
+            (table, column)
+        )
+        return cursor.fetchone()['n'] > 0
+
+    def index_exists(self, cursor, table: str, index: str) -> bool:
+        cursor.execute(
+            "SELECT COUNT(*) AS n FROM information_schema.STATISTICS "
+            "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND INDEX_NAME = %s",
+            (table, index)
+        )
+        return cursor.fetchone()['n'] > 0
+
+    def stored_columns(self, cursor, table: str) -> List[str]:
+        """Colonnes à recopier d'une table à l'autre (hors colonnes générées)"""
+        cursor.execute(
+            "SELECT COLUMN_NAME AS name FROM information_schema.COLUMNS "
+            "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND EXTRA NOT LIKE '%%GENERATED%%' "
+            "ORDER BY ORDINAL_POSITION",
+            (table,)
+        )
+        return [row['name'] for row in cursor.fetchall()]
+
+    def create_table_like(self, cursor, table: str, source: str):
+        """Table de même structure que source (colonnes, index), sans clés étrangères"""
+        cursor.execute(f"CREATE TABLE IF NOT EXISTS {table} LIKE {source}")
+
+    def replication_lag(self) -> Optional[float]:
+        """Retard (s) de la réplique sur le primaire ; None si la réplication est arrêtée"""
+        conn = self.connect()
+        try:
+            with conn.cursor() as cursor:
+                try:
+                    cursor.execute("SHOW REPLICA STATUS")
+                except pymysql.err.ProgrammingError:
+                    # MariaDB et MySQL < 8.0.22
+                    cursor.execute("SHOW SLAVE STATUS")
+                status = cursor.fetchone()
+        finally:
+            conn.close()
+        if not status:
+            return None
+        lag = status.get('Seconds_Behind_Source', status.get('Seconds_Behind_Master'))
+        return float(lag) if lag is not None else None
+
+    @staticmethod
+    def is_connection_error(error: Exception) -> bool:
+        """Serveur injoignable ou connexion perdue (et non une erreur de la requête elle-même)"""
+        if isinstance(error, pymysql.err.InterfaceError):
+            return True
+        return isinstance(error, pymysql.err.OperationalError) and bool(error.args) \
+            and error.args[0] in _MYSQL_CONNECTION_ERRORS
+
+    def describe(self) -> str:
+        role = "réplique " if self.replica else ""
+        return f"MySQL {role}{self.config['host']}:{self.config['port']}/{self.database_name}"
+
+
+# ===== SQLITE : TYPES ET FONCTIONS MYSQL =====
+
+def _adapt_datetime(value: datetime) -> str:
+    return value.isoformat(sep=' ')
+
+
+def _convert_datetime(value: bytes):
+    text = value.decode()
+    try:
+        return datetime.fromisoformat(text)
+    except ValueError:
+        return text
+
+
+sqlite3.register_adapter(datetime, _adapt_datetime)
+sqlite3.register_adapter(date, date.isoformat)
+sqlite3.register_adapter(Decimal, float)
+sqlite3.register_converter('DATETIME', _convert_datetime)
+sqlite3.register_converter('TIMESTAMP', _convert_datetime)
+
+# Expression SQLite équivalente à CURRENT_TIMESTAMP de MySQL (heure locale, pas UTC)
+_SQLITE_NOW = "datetime('now', 'localtime')"
+
+_TIMESTAMPDIFF_UNITS = {'MICROSECOND': 1e-6, 'SECOND': 1, 'MINUTE': 60, 'HOUR': 3600, 'DAY': 86400, 'WEEK': 604800}
+
+
+def _sql_now(fsp: int = 0) -> str:
+    """NOW() / NOW(fsp) : à la seconde, ou avec fsp décimales comme MySQL"""
+    now = datetime.now()
+    if not fsp:
+        return now.strftime('%Y-%m-%d %H:%M:%S')
+    return now.isoformat(sep=' ', timespec='milliseconds' if fsp <= 3 else 'microseconds')
+
+
+def _sql_timestampdiff(unit: str, start, end) -> Optional[int]:
+    if start is None or end is None:
+        return None
+    start, end = datetime.fromisoformat(str(start)), datetime.fromisoformat(str(end))
+    # Troncature vers zéro, comme MySQL
+    return int((end - start).total_seconds() / _TIMESTAMPDIFF_UNITS[unit.upper()])
+
+
+# ===== SQLITE : TRADUCTION DU DIALECTE MYSQL =====
+
+_PARAM = re.compile(r"%([s%])")
+_TIMESTAMPDIFF_UNIT = re.compile(r"TIMESTAMPDIFF\(\s*(\w+)\s*,", re.IGNORECASE)
+_COMMENT = re.compile(r"#[^\n]*")
+# Commentaire MySQL '#' hors chaîne littérale (les chaînes sont capturées pour être conservées)
+_QUERY_COMMENT = re.compile(r"('(?:[^'\\]|\\.|'')*')|#[^\n]*")
+_CREATE_TABLE = re.compile(r"^\s*CREATE TABLE (IF NOT EXISTS )?(\w+)\s*\((.*)\)\s*$", re.IGNORECASE | re.DOTALL)
+_ADD_COLUMN = re.compile(r"^\s*ALTER TABLE (\w+) ADD COLUMN (\w+) (.*)$", re.IGNORECASE | re.DOTALL)
+_MODIFY_COLUMN = re.compile(r"^\s*ALTER TABLE \w+ MODIFY COLUMN ", re.IGNORECASE)
+_INDEX_ITEM = re.compile(r"^(?:INDEX|KEY) (\w+) \((.*)\)$", re.IGNORECASE | re.DOTALL)
+_UNIQUE_KEY_ITEM = re.compile(r"^UNIQUE KEY (\w+) \((.*)\)$", re.IGNORECASE | re.DOTALL)
+_CONSTRAINT_ITEM = re.compile(r"^(FOREIGN KEY|PRIMARY KEY \(|UNIQUE \(|CONSTRAINT|CHECK)", re.IGNORECASE)
+_ON_UPDATE = re.compile(r"\s+ON UPDATE CURRENT_TIMESTAMP", re.IGNORECASE)
+
+
+@lru_cache(maxsize=1024)
+def translate_query(query: str, with_args: bool) -> str:
+    """Requête MySQL -> SQLite (commentaires #, paramètres %s -> ?, unité de TIMESTAMPDIFF en chaîne)"""
+    if '#' in query:
+        query = _QUERY_COMMENT.sub(lambda m: m.group(1) or '', query)
+    if with_args:
+        # Comme pymysql : %% n'est un % littéral que si la requête reçoit des paramètres
+        query = _PARAM.sub(lambda m: '?' if m.group(1) == 's' else '%', query)
+    return _TIMESTAMPDIFF_UNIT.sub(lambda m: f"TIMESTAMPDIFF('{m.group(1).upper()}',", query)
+
+
+def _split_items(body: str) -> List[str]:
+    """Éléments d'un CREATE TABLE séparés par les virgules de premier niveau"""
+    items, depth, current = [], 0, []
+    for char in body:
+        if char == ',' and depth == 0:
+            items.append(''.join(current))
+            current = []
+            continue
+        depth += (char == '(') - (char == ')')
+        current.append(char)
+    items.append(''.join(current))
+    return [' '.join(item.split()) for item in items if item.strip()]
+
+
+def _sqlite_column(definition: str) -> str:
+    """Définition de colonne MySQL -> SQLite"""
+    definition = re.sub(r"\bINT PRIMARY KEY AUTO_INCREMENT\b", "INTEGER PRIMARY KEY AUTOINCREMENT",
+                        definition, flags=re.IGNORECASE)
+    # REAL : la division de deux DECIMAL ne doit pas devenir une division entière
+    definition = re.sub(r"\bDECIMAL\(\d+\s*,\s*\d+\)", "REAL", definition, flags=re.IGNORECASE)
+    definition = re.sub(r"\bDEFAULT CURRENT_TIMESTAMP\b", f"DEFAULT ({_SQLITE_NOW})", definition, flags=re.IGNORECASE)
+    return _ON_UPDATE.sub('', definition)
+
+
+def _on_update_trigger(table: str, column: str) -> str:
+    """Équivalent de ON UPDATE CURRENT_TIMESTAMP (sauf si la requête fixe la colonne elle-même)"""
+    return (f"CREATE TRIGGER IF NOT EXISTS {table}_{column}_maj AFTER UPDATE ON {table} "
+            f"FOR EACH ROW WHEN NEW.{column} IS OLD.{column} "
+            f"BEGIN UPDATE {table} SET {column} = {_SQLITE_NOW} WHERE rowid = NEW.rowid; END")
+
+
+def translate_ddl(sql: str) -> List[str]:
+    """DDL MySQL -> requêtes SQLite (index et déclencheurs séparés de CREATE TABLE)"""
+    sql = _COMMENT.sub('', sql)
+
+    # Types déclaratifs en SQLite : une colonne DATETIME garde déjà la précision écrite
+    if _MODIFY_COLUMN.match(sql):
+        return []
+
+    match = _ADD_COLUMN.match(sql)
+    if match:
+        table, column, definition = match.groups()
+        definition = ' '.join(definition.split())
+        # SQLite n'ajoute que des colonnes générées VIRTUAL (indexables) à une table existante
+        definition = re.sub(r"\bSTORED$", "VIRTUAL", definition, flags=re.IGNORECASE)
+        statements = [f"ALTER TABLE {table} ADD COLUMN {column} {_sqlite_column(definition)}"]
+        if _ON_UPDATE.search(definition):
+            statements.append(_on_update_trigger(table, column))
+        return statements
+
+    match = _CREATE_TABLE.match(sql)
+    if not match:
+        return [sql]
+
+    if_not_exists, table, body = match.groups()
+    columns, constraints, extra = [], [], []
+    for item in _split_items(body):
+        index = _INDEX_ITEM.match(item)
+        unique = _UNIQUE_KEY_ITEM.match(item)
+        if index:
+            extra.append(f"CREATE INDEX IF NOT EXISTS {index.group(1)} ON {table} ({index.group(2)})")
+        elif unique:
+            constraints.append(f"CONSTRAINT {unique.group(1)} UNIQUE ({unique.group(2)})")
+        elif _CONSTRAINT_ITEM.match(item):
+            constraints.append(item)
+        else:
+            if _ON_UPDATE.search(item):
+                extra.append(_on_update_trigger(table, item.split()[0]))
+            columns.append(_sqlite_column(item))
+
+    # SQLite exige les colonnes avant les contraintes de table
+    create = (f"CREATE TABLE {if_not_exists or ''}{table} (\n    "
+              + ",\n    ".join(columns + constraints) + "\n)")
+    return [create] + extra
+
+
+# ===== SQLITE : CONNEXION ET CURSEUR COMPATIBLES PYMYSQL =====
+
+class SQLiteCursor(MeasuredCursorMixin):
+    """Curseur à lignes dict (tuple avec tuples=True), paramètres %s et résultat chargé en
+    mémoire (comme DictCursor)"""
+
+    def __init__(self, connection: 'SQLiteConnection', tuples: bool = False):
+        self.connection = connection
+        self.tuples = tuples
+        self.description = None
+        self._cursor = connection.raw.cursor()
+        self._rows: Optional[List[Dict]] = None
+        self._position = 0
+        self.rowcount = -1
+        self.lastrowid = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _store_result(self):
+        description = self.description = self._cursor.description
+        if description:
+            if self.tuples:
+                self._rows = self._cursor.fetchall()
+            else:
+                names = [column[0] for column in description]
+                self._rows = [dict(zip(names, row)) for row in self._cursor.fetchall()]
+            self.rowcount = len(self._rows)
+        else:
+            self._rows = None
+            self.rowcount = self._cursor.rowcount
+        self._position = 0
+        self.lastrowid = self._cursor.lastrowid
+
+    def _execute(self, query, args):
+        self._cursor.execute(translate_query(query, args is not None), tuple(args) if args is not None else ())
+        self._store_result()
+        return self.rowcount
+
+    def _executemany(self, query, args):
+        self._cursor.executemany(translate_query(query, True), [tuple(row) for row in args])
+        self._store_result()
+        return self.rowcount
+
+    def execute(self, query, args=None):
+        return self._measure(self._execute, query, args)
+
+    def executemany(self, query, args):
+        return self._measure(self._executemany, query, args)
+
+    def fetchone(self) -> Optional[Dict]:
+        if not self._rows or self._position >= len(self._rows):
+            return None
+        self._position += 1
+        return self._rows[self._position - 1]
+
+    def fetchmany(self, size: int = 1) -> List[Dict]:
+        rows = (self._rows or [])[self._position:self._position + size]
+        self._position += len(rows)
+        return rows
+
+    def fetchall(self) -> List[Dict]:
+        rows = (self._rows or [])[self._position:]
+        self._position += len(rows)
+        return rows
+
+    def close(self):
+        self._cursor.close()
+
+
+class SQLiteStreamCursor(SQLiteCursor):
+    """Curseur SQLite non bufferisé : les lignes sont converties en dict au fil de la lecture"""
+
+    streaming = True
+
+    def _store_result(self):
+        description = self.description = self._cursor.description
+        self._names = [column[0] for column in description] if description else None
+        self._rows = None
+        self.rowcount = -1 if description else self._cursor.rowcount
+        self.lastrowid = self._cursor.lastrowid
+
+    def _convert(self, rows: List) -> List:
+        if self.tuples:
+            return rows
+        return [dict(zip(self._names, row)) for row in rows]
+
+    def fetchone(self) -> Optional[Dict]:
+        row = self._cursor.fetchone() if self._names else None
+        return self._convert([row])[0] if row is not None else None
+
+    def fetchmany(self, size: int = 1) -> List[Dict]:
+        return self._convert(self._cursor.fetchmany(size)) if self._names else []
+
+    def fetchall(self) -> List[Dict]:
+        return self._convert(self._cursor.fetchall()) if self._names else []
+
+
+class SQLiteConnection:
+    """Connexion SQLite exposant l'API utilisée de pymysql (cursor, commit, rollback, close)"""
+
+    def __init__(self, raw: sqlite3.Connection):
+        self.raw = raw
+        self.connect_wait_ms = 0.0
+
+    def cursor(self, cursor_class=SQLiteCursor, tuples: bool = False) -> SQLiteCursor:
+        return cursor_class(self, tuples)
+
+    def commit(self):
+        self.raw.commit()
+
+    def rollback(self):
+        self.raw.rollback()
+
+    def close(self):
+        self.raw.close()
+
+
+class SQLiteBackend:
+    """Base SQLite locale en mode WAL : lecteurs concurrents, un rédacteur, aucun aller-retour réseau"""
+
+    name = 'sqlite'
+    label = 'SQLite'
+    IntegrityError = sqlite3.IntegrityError
+
+    def __init__(self, path: str, busy_timeout: float = 10.0):
+        self.path = os.path.abspath(path)
+        self.busy_timeout = busy_timeout
+        self._wal_ready = False
+
+    def create_database(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=self.busy_timeout)
+        try:
+            # Persistant dans le fichier : une fois suffit
+            conn.execute("PRAGMA journal_mode=WAL")
+        finally:
+            conn.close()
+        self._wal_ready = True
+
+    def connect(self) -> SQLiteConnection:
+        if not self._wal_ready:
+            self.create_database()
+        raw = sqlite3.connect(self.path, timeout=self.busy_timeout, detect_types=sqlite3.PARSE_DECLTYPES)
+        raw.execute("PRAGMA foreign_keys=ON")
+        # Suffisant en WAL : seul un arrêt brutal de la machine peut perdre la dernière transaction
+        raw.execute("PRAGMA synchronous=NORMAL")
+        raw.create_function('NOW', -1, _sql_now)
+        raw.create_function('TIMESTAMPDIFF', 3, _sql_timestampdiff, deterministic=True)
+        return SQLiteConnection(raw)
+
+    def ddl(self, sql: str) -> List[str]:
+        return translate_ddl(sql)
+
+    def stream_cursor(self, conn: SQLiteConnection, tuples: bool = False) -> SQLiteStreamCursor:
+        return conn.cursor(SQLiteStreamCursor, tuples)
+
+    def tuple_cursor(self, conn: SQLiteConnection) -> SQLiteCursor:
+        return conn.cursor(SQLiteCursor, tuples=True)
+
+    @contextmanager
+    def migration_lock(self, cursor, timeout: int):
+        """Verrou d'écriture sur un fichier voisin, libéré même si le processus meurt"""
+        lock = sqlite3.connect(self.path + '.migrations', timeout=timeout, isolation_level=None)
+        try:
+            try:
+                lock.execute("BEGIN IMMEDIATE")
+            except sqlite3.OperationalError:
+                yield False
+                return
+            try:
+                yield True
+            finally:
+                lock.execute("ROLLBACK")
+        finally:
+            lock.close()
+
+    def column_exists(self, cursor, table: str, column: str) -> bool:
+        # table_xinfo : inclut les colonnes générées
+        cursor.execute("SELECT COUNT(*) AS n FROM pragma_table_xinfo(%s) WHERE name = %s", (table, column))
+        return cursor.fetchone()['n'] > 0
+
+    def index_exists(self, cursor, table: str, index: str) -> bool:
+        cursor.execute("SELECT COUNT(*) AS n FROM sqlite_master WHERE type = 'index' AND tbl_name = %s AND name = %s",
+                       (table, index))
+        return cursor.fetchone()['n'] > 0
+
+    def stored_columns(self, cursor, table: str) -> List[str]:
+        # hidden = 2 ou 3 : colonnes générées
+        cursor.execute("SELECT name FROM pragma_table_xinfo(%s) WHERE hidden = 0 ORDER BY cid", (table,))
+        return [row['name'] for row in cursor.fetchall()]
+
+    def create_table_like(self, cursor, table: str, source: str):
+        """Équivalent de CREATE TABLE ... LIKE : DDL de source renommé, sans clés étrangères ;
+        les index sont recréés sous le nom <table>_<index> (noms d'index globaux en SQLite)"""
+        cursor.execute("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = %s", (source,))
+        body = _CREATE_TABLE.match(cursor.fetchone()['sql']).group(3)
+        items = [item for item in _split_items(body) if not item.upper().startswith('FOREIGN KEY')]
+        cursor.execute(f"CREATE TABLE IF NOT EXISTS {table} (\n    " + ",\n    ".join(items) + "\n)")
+
+        cursor.execute("SELECT name, sql FROM sqlite_master WHERE type = 'index' AND tbl_name = %s "
+                       "AND sql IS NOT NULL", (source,))
+        for index in cursor.fetchall():
+            columns = index['sql'][index['sql'].index('('):]
+            unique = 'UNIQUE ' if index['sql'].upper().startswith('CREATE UNIQUE') else ''
+            cursor.execute(f"CREATE {unique}INDEX IF NOT EXISTS {table}_{index['name']} ON {table} {columns}")
+
+    @staticmethod
+    def is_connection_error(error: Exception) -> bool:
+        # Fichier local : pas de réseau à attendre
+        return False
+
+    def describe(self) -> str:
+        return f"SQLite {self.path}"
+
+
+def create_replica(primary, replica_config: Optional[Dict]):
+    """Réplique en lecture du primaire MySQL (REPETTO_REPLICA_HOST prioritaire) ; None sinon"""
+    host = os.environ.get('REPETTO_REPLICA_HOST')
+    if host:
+        replica_config = {**(replica_config or {}), 'host': host}
+    if not replica_config or not isinstance(primary, MySQLBackend):
+        return None
+    return MySQLBackend({**primary.config, **replica_config}, primary.database_name, replica=True)
+
+
+def create_backend(name: str, config: Dict, database_name: str, sqlite_path: str,
+                   sqlite_busy_timeout: float = 10.0):
+    """Moteur désigné par name (REPETTO_BACKEND / REPETTO_SQLITE_PATH prioritaires)"""
+    name = os.environ.get('REPETTO_BACKEND', name).lower()
+    if name == 'mysql':
+        return MySQLBackend(config, database_name)
+    if name == 'sqlite':
+        return SQLiteBackend(os.environ.get('REPETTO_SQLITE_PATH', sqlite_path), sqlite_busy_timeout)
+    raise ValueError(f"Moteur de stockage inconnu : {name} (choix : {', '.join(BACKENDS)})")
@@ -0,0 +1 @@
+# benchmarks/ - Mesures de performance hors application (python -m benchmarks.<module>)
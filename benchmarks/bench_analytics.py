@@ -0,0 +1,114 @@
+# benchmarks/bench_analytics.py - Boucles Python vs agrégations vectorisées (graphiques directeur)
+#
+# Usage : python -m benchmarks.bench_analytics [--sizes 10000 100000] [--repeat 5]
+import argparse
+import random
+import time
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List
+
+from analytics import OrdersAnalytics, build_orders_frame
+
+STATUTS = ['En attente', 'En cours', 'Terminée']
+MODELES = [f"MODELE-{i:02d}" for i in range(40)]
+
+
+def generate_orders(count: int, seed: int = 42) -> List[Dict]:
+    """OF synthétiques avec les colonnes renvoyées par get_all_orders()"""
+    rng = random.Random(seed)
+    base = datetime(2025, 1, 1)
+    orders = []
+    for i in range(count):
+        quantite = rng.randint(50, 2000)
+        controlee = rng.randint(0, quantite)
+        rejetee = rng.randint(0, controlee // 10) if controlee else 0
+        statut = rng.choice(STATUTS)
+        orders.append({
+            'of': f"OF{i:07d}",
+            'modele': rng.choice(MODELES),
+            'matricule_coupeur': str(rng.randint(1000, 1200)),
+            'statut_coupe': statut,
+            'coupe_en_pause': statut == 'En cours' and rng.random() < 0.2,
+            'quantite': quantite,
+            'quantite_controlee': controlee,
+            'quantite_rejetee': rejetee,
+            'quantite_retravailler': rng.randint(0, controlee // 10) if controlee else 0,
+            'temps_coupe': rng.randint(0, 36000),
+            'temps_controle': rng.randint(0, 18000),
+            'maj_of': base + timedelta(seconds=i),
+        })
+    return orders
+
+
+def legacy_aggregations(orders: List[Dict]):
+    """Anciennes boucles de _render_visualizations"""
+    status_counts = {
+        'En attente': len([o for o in orders if o['statut_coupe'] == 'En attente']),
+        'En cours': len([o for o in orders if o['statut_coupe'] == 'En cours' and not o.get('coupe_en_pause')]),
+        'En pause': len([o for o in orders if o.get('coupe_en_pause')]),
+        'Terminée': len([o for o in orders if o['statut_coupe'] == 'Terminée'])
+    }
+
+    model_data = {}
+    for order in orders:
+        model = order['modele']
+        if model not in model_data:
+            model_data[model] = {'total': 0, 'problems': 0}
+        model_data[model]['total'] += order.get('quantite_controlee', 0) or 0
+        model_data[model]['problems'] += ((order.get('quantite_rejetee', 0) or 0) +
+                                          (order.get('quantite_retravailler', 0) or 0))
+    problem_rates = {model: (data['problems'] / data['total'] * 100) if data['total'] > 0 else 0
+                     for model, data in model_data.items()}
+
+    taux_by_coupeur = {}
+    for order in orders:
+        coupeur = str(order.get('matricule_coupeur', 'Inconnu')).strip()
+        if order.get('quantite_controlee'):
+            taux = order['quantite_rejetee'] / order['quantite_controlee'] * 100
+            taux_by_coupeur.setdefault(coupeur, []).append(taux)
+    avg_by_coupeur = {c: sum(t) / len(t) for c, t in taux_by_coupeur.items()}
+
+    return status_counts, problem_rates, avg_by_coupeur
+
+
+def vectorized_aggregations(analytics: OrdersAnalytics):
+    """Mêmes agrégations via le DataFrame typé"""
+    df = analytics.df
+    controlled = df[df['quantite_controlee'] > 0]
+    avg_by_coupeur = (controlled['quantite_rejetee'] / controlled['quantite_controlee'] * 100) \
+        .groupby(controlled['matricule_coupeur']).mean()
+    return analytics.status_counts(), analytics.problem_rate_by_model(len(MODELES)), avg_by_coupeur
+
+
+def best_of(func: Callable, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark des agrégations du directeur")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10_000, 100_000])
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'OF':>8} | {'boucles (ms)':>12} | {'construction df (ms)':>20} | "
+          f"{'vectorisé (ms)':>14} | {'gain':>6}")
+    for size in args.sizes:
+        orders = generate_orders(size)
+        analytics = OrdersAnalytics(build_orders_frame(orders))
+
+        legacy = best_of(lambda: legacy_aggregations(orders), args.repeat)
+        build = best_of(lambda: build_orders_frame(orders), args.repeat)
+        vectorized = best_of(lambda: vectorized_aggregations(analytics), args.repeat)
+
+        # Le DataFrame est construit une fois par version des données puis réutilisé
+        print(f"{size:>8} | {legacy * 1000:>12.1f} | {build * 1000:>20.1f} | "
+              f"{vectorized * 1000:>14.1f} | {legacy / vectorized:>5.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,360 @@
+# benchmarks/bench_db.py - Bases de benchmark : MySQL/MariaDB local, SQLite ou substitut en mémoire
+#
+# mysql   : base dédiée (REPETTO_BENCH_DB, jamais la base de production) remplie par lots
+# sqlite  : fichier SQLite en mode WAL (REPETTO_BENCH_SQLITE), sans serveur ; même SQL que mysql
+# memory  : DatabaseManager qui sert le jeu de données depuis la mémoire (coût Python seul,
+#           sans aller-retour réseau ni moteur SQL ; utile pour les rendus et les agrégations)
+import os
+from datetime import datetime, timedelta
+from typing import Dict, Iterator, List, Optional
+
+from benchmarks.datagen import CATALOG_DDL, FactoryDataset, generate, joined_orders, joined_row
+from backends import MySQLBackend, SQLiteBackend
+from clock import split_elapsed
+from database import Config, DatabaseManager
+from migrations import LATEST_SCHEMA_VERSION
+from order_record import OrderRecord, records_from_dicts
+
+BACKENDS = ('memory', 'mysql', 'sqlite')
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Ordre d'insertion (parents d'abord) ; les tables sont vidées dans l'ordre inverse
+_LOAD_ORDER = ['employes', 'modeles', 'code_couleur', 'ordres_fabrication',
+               'details_coupe', 'details_controle', 'details_piqure']
+
+# Chronos en cours : (table, statut, colonne de dernière mise à jour)
+_TIMER_TABLES = [
+    ('details_coupe', 'statut_coupe', 'date_derniere_maj_coupe'),
+    ('details_controle', 'statut_controle', 'date_derniere_maj'),
+    ('details_piqure', 'statut_piqure', 'date_derniere_maj_piqure'),
+]
+
+
+class MemoryDatabaseManager(DatabaseManager):
+    """Substitut en mémoire des méthodes de lecture et des chronomètres.
+
+    Les autres méthodes voient get_connection() renvoyer None et se comportent
+    comme si MySQL était injoignable.
+    """
+
+    def __init__(self, dataset: FactoryDataset):
+        super().__init__()
+        self.dataset = dataset
+        # Copies : update_all_timers() modifie les lignes
+        self.coupes = {c['of_id']: dict(c) for c in dataset.coupes}
+        self.controles = {c['of_id']: dict(c) for c in dataset.controles}
+        self.piqures = {p['of_id']: dict(p) for p in dataset.piqures}
+        self.ordres = {o['of']: o for o in dataset.ordres}
+        self.employes = {e['matricule']: e for e in dataset.employes}
+        for coupe in self.coupes.values():
+            self._compute_surcons(coupe)
+
+    @staticmethod
+    def _compute_surcons(coupe: Dict):
+        """Colonnes calculées de la migration 2"""
+        consommation = coupe['consommation'] or 0
+        sur_consommation = coupe['sur_consommation'] or 0
+        coupe['total_consommation'] = round(consommation + sur_consommation, 2)
+        coupe['taux_surcons'] = round(sur_consommation / consommation * 100, 2) if consommation > 0 else 0
+
+    def get_connection(self):
+        return None
+
+    def _write(self, action: str, **params) -> bool:
+        # Pas de serveur à attendre : les actions échouent au lieu d'aller dans la file hors ligne
+        return False
+
+    def ensure_schema(self) -> bool:
+        return True
+
+    def get_schema_version(self) -> int:
+        return LATEST_SCHEMA_VERSION
+
+    def get_surconsommation_version(self) -> str:
+        def latest(rows, column):
+            return max((r[column] for r in rows if r[column] is not None), default=None)
+        # Pas de tables d'archive en mémoire
+        return '|'.join(str(value) for value in (
+            latest(self.ordres.values(), 'derniere_mise_a_jour'), len(self.ordres),
+            latest(self.coupes.values(), 'maj_donnees'), len(self.coupes), None, 0))
+
+    def get_all_orders(self) -> List[OrderRecord]:
+        return records_from_dicts(joined_orders(self.dataset, self.coupes, self.controles, self.piqures))
+
+    def iter_all_orders(self) -> Iterator[OrderRecord]:
+        return iter(self.get_all_orders())
+
+    def get_order_by_of(self, of: str) -> Optional[Dict]:
+        if of not in self.ordres:
+            return None
+        return joined_row(self.ordres[of], self.coupes.get(of), self.controles.get(of), self.piqures.get(of))
+
+    def update_all_timers(self, now: datetime = None):
+        """Même algorithme que DatabaseManager.update_all_timers (ligne par ligne, sans journal)"""
+        now = now or datetime.now()
+        stages = [
+            (self.coupes, 'statut_coupe', 'coupe_en_pause', 'date_derniere_maj_coupe',
+             'temps_coupe', 'duree_totale_pause'),
+            (self.controles, 'statut_controle', 'controle_en_pause', 'date_derniere_maj',
+             'temps_actif_total', 'temps_pause_total'),
+            (self.piqures, 'statut_piqure', 'piqure_en_pause', 'date_derniere_maj_piqure',
+             'temps_piqure', 'duree_totale_pause_piqure'),
+        ]
+        for rows, statut, en_pause, last_update, actif, pause in stages:
+            running = [r for r in rows.values() if r[statut] == 'En cours' and r[last_update] is not None]
+            for row in running:
+                elapsed, reference = split_elapsed(row[last_update], now)
+                if elapsed > 0:
+                    column = pause if row[en_pause] else actif
+                    row[column] = (row[column] or 0) + elapsed
+                    row[last_update] = reference
+                    row['derniere_mise_a_jour'] = now
+
+    def age_timers(self, seconds: int):
+        """Recule les chronos en cours pour que le prochain update_all_timers ait du travail"""
+        for rows, (_, statut, last_update) in zip((self.coupes, self.controles, self.piqures), _TIMER_TABLES):
+            for row in rows.values():
+                if row[statut] == 'En cours' and row[last_update] is not None:
+                    row[last_update] -= timedelta(seconds=seconds)
+
+    # ===== CATALOGUES =====
+
+    def get_all_employees(self) -> List[Dict]:
+        return sorted(self.dataset.employes, key=lambda e: (e['nom'], e['prenom']))
+
+    def get_employee_by_matricule(self, matricule: str) -> Optional[Dict]:
+        return self.employes.get(matricule)
+
+    def get_all_modeles(self) -> List[Dict]:
+        return sorted(self.dataset.modeles, key=lambda m: (m['nom_modele'], m['code_modele']))
+
+    def get_modele_by_code(self, code_modele: str) -> Optional[Dict]:
+        return next((m for m in self.dataset.modeles if m['code_modele'] == code_modele), None)
+
+    def get_modeles_by_nom(self, nom_modele: str) -> List[Dict]:
+        return sorted((m for m in self.dataset.modeles if m['nom_modele'] == nom_modele),
+                      key=lambda m: m['code_modele'])
+
+    def get_modele_by_nom(self, nom_modele: str) -> Optional[Dict]:
+        return next((m for m in self.dataset.modeles if m['nom_modele'] == nom_modele), None)
+
+    def get_couleur_by_code(self, code_couleur: str) -> Optional[Dict]:
+        return next((c for c in self.dataset.couleurs if c['code_couleur'] == code_couleur), None)
+
+    def get_all_coloris(self) -> List[Dict]:
+        return sorted(self.dataset.couleurs, key=lambda c: c['code_couleur'])
+
+    # ===== SUR-CONSOMMATION =====
+    # Pas d'archives en mémoire : l'option historique ne change rien
+
+    def _surcons_rows(self, matiere=None, modele=None, coupeur=None, taux_min=None):
+        for coupe in self.coupes.values():
+            ordre = self.ordres[coupe['of_id']]
+            if not (coupe['sur_consommation'] or 0) > 0:
+                continue
+            if (matiere and coupe['matiere'] != matiere) or (modele and ordre['modele'] != modele) or \
+                    (coupeur and coupe['matricule_coupeur'] != coupeur) or \
+                    (taux_min and coupe['taux_surcons'] < taux_min):
+                continue
+            yield coupe, ordre
+
+    def get_surconsommation_data(self, matiere: str = None, modele: str = None, coupeur: str = None,
+                                 taux_min: float = None, limit: int = None,
+                                 historique: bool = False) -> List[Dict]:
+        data = []
+        for coupe, ordre in self._surcons_rows(matiere, modele, coupeur, taux_min):
+            employe = self.employes.get(coupe['matricule_coupeur']) or {}
+            data.append({
+                'of': ordre['of'], 'modele': ordre['modele'],
+                **{column: coupe[column] for column in (
+                    'coloris', 'matiere', 'matricule_coupeur', 'consommation', 'sur_consommation',
+                    'total_consommation', 'taux_surcons', 'date_debut_coupe', 'date_fin_coupe', 'temps_coupe',
+                    'duree_totale_pause', 'statut_coupe')},
+                'nom_coupeur': employe.get('nom'), 'prenom_coupeur': employe.get('prenom'),
+                'observation_coupe': coupe['observation'],
+            })
+        data.sort(key=lambda row: row['sur_consommation'], reverse=True)
+        return data[:int(limit)] if limit else data
+
+    def iter_surconsommation_data(self, matiere: str = None, modele: str = None, coupeur: str = None,
+                                  taux_min: float = None, historique: bool = False) -> Iterator[Dict]:
+        return iter(self.get_surconsommation_data(matiere, modele, coupeur, taux_min))
+
+    def get_surconsommation_summary(self, matiere: str = None, modele: str = None, coupeur: str = None,
+                                    taux_min: float = None, historique: bool = False) -> Dict:
+        rows = [coupe for coupe, _ in self._surcons_rows(matiere, modele, coupeur, taux_min)]
+        total_surcons = float(sum(c['sur_consommation'] for c in rows))
+        total_consommation = float(sum(c['consommation'] or 0 for c in rows))
+        return {
+            'nombre_of': len(rows),
+            'total_surcons': total_surcons,
+            'total_consommation': total_consommation,
+            'taux_moyen': total_surcons / total_consommation * 100 if total_consommation > 0 else 0.0,
+        }
+
+    def get_surconsommation_by_matiere(self, matiere: str = None, modele: str = None, coupeur: str = None,
+                                       taux_min: float = None, historique: bool = False) -> List[Dict]:
+        totals: Dict[str, float] = {}
+        for coupe, _ in self._surcons_rows(matiere, modele, coupeur, taux_min):
+            key = coupe['matiere'] or 'Non spécifié'
+            totals[key] = totals.get(key, 0) + coupe['sur_consommation']
+        return [{'matiere': key, 'total_surcons': total}
+                for key, total in sorted(totals.items(), key=lambda item: item[1], reverse=True)]
+
+    def get_surconsommation_by_coupeur(self, matiere: str = None, modele: str = None, coupeur: str = None,
+                                       taux_min: float = None, historique: bool = False) -> List[Dict]:
+        taux: Dict[str, List[float]] = {}
+        for coupe, _ in self._surcons_rows(matiere, modele, coupeur, taux_min):
+            if (coupe['consommation'] or 0) > 0 and coupe['matricule_coupeur']:
+                taux.setdefault(coupe['matricule_coupeur'], []).append(coupe['taux_surcons'])
+        rows = [{'matricule_coupeur': key, 'taux_moyen': sum(values) / len(values), 'nombre_of': len(values)}
+                for key, values in taux.items()]
+        return sorted(rows, key=lambda row: row['taux_moyen'], reverse=True)
+
+    def get_surconsommation_filter_options(self, historique: bool = False) -> Dict:
+        rows = list(self._surcons_rows())
+        coupeurs = sorted({coupe['matricule_coupeur'] for coupe, _ in rows if coupe['matricule_coupeur']})
+        return {
+            'matieres': sorted({coupe['matiere'] for coupe, _ in rows if coupe['matiere']}),
+            'modeles': sorted({ordre['modele'] for _, ordre in rows if ordre['modele']}),
+            'coupeurs': [{'matricule_coupeur': matricule,
+                          'nom': (self.employes.get(matricule) or {}).get('nom'),
+                          'prenom': (self.employes.get(matricule) or {}).get('prenom')}
+                         for matricule in coupeurs],
+        }
+
+
+class SQLBenchManager(DatabaseManager):
+    """Chargement du jeu de données et vieillissement des chronos sur un vrai moteur SQL"""
+
+    def load(self, dataset: FactoryDataset, batch_size: int = 1000) -> bool:
+        """Vide les tables puis insère le jeu de données par lots (executemany)"""
+        if not self.run_migrations():
+            return False
+
+        conn = self.get_connection()
+        if conn is None:
+            return False
+
+        try:
+            with conn.cursor() as cursor:
+                for ddl in CATALOG_DDL:
+                    for statement in self.backend.ddl(ddl):
+                        cursor.execute(statement)
+                if self.backend.name == 'sqlite':
+                    # Pas de TRUNCATE : DELETE dans l'ordre inverse respecte les clés étrangères
+                    for table in reversed(_LOAD_ORDER):
+                        cursor.execute(f"DELETE FROM {table}")
+                else:
+                    cursor.execute("SET FOREIGN_KEY_CHECKS = 0")
+                    for table in reversed(_LOAD_ORDER):
+                        cursor.execute(f"TRUNCATE TABLE {table}")
+                    cursor.execute("SET FOREIGN_KEY_CHECKS = 1")
+
+                tables = dataset.tables()
+                for table in _LOAD_ORDER:
+                    rows = tables[table]
+                    if not rows:
+                        continue
+                    columns = list(rows[0])
+                    query = (f"INSERT INTO {table} ({', '.join(columns)}) "
+                             f"VALUES ({', '.join(['%s'] * len(columns))})")
+                    for start in range(0, len(rows), batch_size):
+                        cursor.executemany(query, [tuple(row[c] for c in columns)
+                                                   for row in rows[start:start + batch_size]])
+                    conn.commit()
+            return True
+        except Exception as e:
+            print(f"❌ Erreur chargement benchmark: {e}")
+            return False
+        finally:
+            conn.close()
+
+    def age_timers(self, seconds: int):
+        """Recule les chronos en cours pour que le prochain update_all_timers ait du travail"""
+        conn = self.get_connection()
+        if conn is None:
+            return
+        try:
+            with conn.cursor() as cursor:
+                for table, statut, last_update in _TIMER_TABLES:
+                    if self.backend.name == 'sqlite':
+                        shifted = f"datetime({last_update}, '-' || %s || ' seconds')"
+                    else:
+                        shifted = f"{last_update} - INTERVAL %s SECOND"
+                    cursor.execute(f'''
+                                   UPDATE {table}
+                                   SET {last_update} = {shifted}
+                                   WHERE {statut} = 'En cours' AND {last_update} IS NOT NULL
+                                   ''', (seconds,))
+            conn.commit()
+        finally:
+            conn.close()
+
+
+class MySQLBenchManager(SQLBenchManager):
+    """DatabaseManager pointé sur la base de benchmark MySQL (REPETTO_BENCH_DB)"""
+
+    def __init__(self):
+        super().__init__()
+        self.database_name = os.environ.get('REPETTO_BENCH_DB', 'repetto_bench')
+        if self.database_name == Config.DATABASE_NAME:
+            raise ValueError(f"REPETTO_BENCH_DB ne doit pas désigner la base de production ({Config.DATABASE_NAME})")
+        for key, env in (('host', 'REPETTO_BENCH_HOST'), ('user', 'REPETTO_BENCH_USER'),
+                         ('password', 'REPETTO_BENCH_PASSWORD')):
+            if os.environ.get(env):
+                self.config[key] = os.environ[env]
+        if os.environ.get('REPETTO_BENCH_PORT'):
+            self.config['port'] = int(os.environ['REPETTO_BENCH_PORT'])
+        self.backend = MySQLBackend(self.config, self.database_name)
+        self.replica = None  # jamais la réplique de production
+
+
+class SQLiteBenchManager(SQLBenchManager):
+    """DatabaseManager pointé sur le fichier SQLite de benchmark (REPETTO_BENCH_SQLITE)"""
+
+    def __init__(self):
+        super().__init__()
+        path = os.environ.get('REPETTO_BENCH_SQLITE', os.path.join(BASE_DIR, 'results', 'bench.db'))
+        self.backend = SQLiteBackend(path, Config.SQLITE_BUSY_TIMEOUT)
+        self.replica = None
+        self.database_name = self.backend.path
+
+
+def logged_in_state(role: str) -> Dict:
+    """session_state d'un utilisateur déjà connecté avec le rôle role"""
+    return {
+        'logged_in': True,
+        'user_role': role,
+        'user_name': 'Benchmark',
+        'db_initialized': True,
+        'last_activity': datetime.now(),
+        'selected_period': "Aujourd'hui",
+        'selected_status': "Tous",
+        'selected_model': "Tous les Modèles",
+    }
+
+
+# Bases déjà préparées dans le processus : (backend, taille, graine) -> DatabaseManager
+_opened: Dict[tuple, DatabaseManager] = {}
+
+
+def open_backend(backend: str, size: int, seed: int = 42, load: bool = True) -> DatabaseManager:
+    """DatabaseManager prêt à l'emploi (le chargement SQL n'est fait qu'une fois par processus ;
+    load=False réutilise la base de benchmark telle quelle)"""
+    key = (backend, size, seed)
+    if key not in _opened:
+        if backend == 'memory':
+            _opened[key] = MemoryDatabaseManager(generate(size, seed))
+        elif backend in ('mysql', 'sqlite'):
+            # Une seule base de benchmark par moteur : les autres tailles chargées deviennent obsolètes
+            for other in [k for k in _opened if k[0] == backend]:
+                del _opened[other]
+            manager = MySQLBenchManager() if backend == 'mysql' else SQLiteBenchManager()
+            if load and not manager.load(generate(size, seed)):
+                raise RuntimeError(f"Chargement de {size} OF dans {manager.database_name} impossible")
+            _opened[key] = manager
+        else:
+            raise ValueError(f"Backend inconnu : {backend} (choix : {', '.join(BACKENDS)})")
+    return _opened[key]
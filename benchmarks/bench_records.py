@@ -0,0 +1,98 @@
+# benchmarks/bench_records.py - Lignes d'OF : dicts de DictCursor vs OrderRecord (order_record.py)
+#
+# Usage : python -m benchmarks.bench_records [--sizes 10000 100000] [--repeat 5]
+#
+# Mémoire : lignes construites depuis le résultat brut du pilote (listes de valeurs), comme le
+# ferait le curseur, puis mesurées avec tracemalloc une fois le résultat brut libéré.
+# Temps : filtres de la barre latérale, KPI et DataFrame analytique sur les mêmes lignes.
+import argparse
+import gc
+import time
+import tracemalloc
+from typing import Callable, Dict, List
+
+from analytics import build_orders_frame
+from benchmarks.datagen import generate, joined_orders
+from database import KPIManager
+from order_record import OrderRecord
+from sidebar_manager import SidebarManager
+
+FILTERS = [("En cours", "Tous les Modèles"), ("En pause", "Tous les Modèles"), ("À problème", "Tous les Modèles")]
+
+
+def wire_rows(orders: List[Dict]) -> List[List]:
+    """Résultat brut du pilote : une liste de valeurs par ligne"""
+    return [list(order.values()) for order in orders]
+
+
+def as_dicts(names: List[str], rows: List[List]) -> List[Dict]:
+    return [dict(zip(names, row)) for row in rows]
+
+
+def as_records(names: List[str], rows: List[List]) -> List[OrderRecord]:
+    index = {name: position for position, name in enumerate(names)}
+    return [OrderRecord(index, tuple(row)) for row in rows]
+
+
+def retained_bytes(build: Callable[[], List], names: List[str], orders: List[Dict]) -> int:
+    """Mémoire conservée par les lignes construites (résultat brut libéré)"""
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    rows = wire_rows(orders)
+    built = build(names, rows)
+    del rows
+    gc.collect()
+    retained = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    del built
+    return retained
+
+
+def filter_pass(orders: List) -> int:
+    models = {o['modele'] for o in orders[:50]}
+    count = 0
+    for status, model in FILTERS + [("Tous", m) for m in models]:
+        count += len(SidebarManager.filter_orders(orders, status, model))
+    return count
+
+
+def best_of(func: Callable, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark des lignes d'OF compactes")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10_000])
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'OF':>8} | {'lignes':>7} | {'Mo dict':>8} | {'Mo record':>9} | {'filtres dict/record (ms)':>24} | "
+          f"{'KPI dict/record (ms)':>20} | {'DataFrame dict/record (ms)':>26}")
+    for size in args.sizes:
+        orders = joined_orders(generate(size))
+        names = list(orders[0])
+        dict_bytes = retained_bytes(as_dicts, names, orders)
+        record_bytes = retained_bytes(as_records, names, orders)
+
+        timings = {}
+        for label, rows in (('dict', as_dicts(names, wire_rows(orders))),
+                            ('record', as_records(names, wire_rows(orders)))):
+            timings[label] = (
+                best_of(lambda: filter_pass(rows), args.repeat),
+                best_of(lambda: KPIManager(rows).calculate_kpis(), args.repeat),
+                best_of(lambda: build_orders_frame(rows), args.repeat),
+            )
+
+        cells = [f"{timings['dict'][i] * 1000:.1f} / {timings['record'][i] * 1000:.1f}" for i in range(3)]
+        print(f"{size:>8} | {len(orders):>7} | {dict_bytes / 1e6:>8.1f} | {record_bytes / 1e6:>9.1f} | "
+              f"{cells[0]:>24} | {cells[1]:>20} | {cells[2]:>26}")
+
+
+if __name__ == '__main__':
+    main()
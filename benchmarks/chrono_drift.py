@@ -0,0 +1,124 @@
+# benchmarks/chrono_drift.py - Dérive des chronomètres : totaux cumulés vs temps réellement écoulé
+#
+# Fait tourner update_all_timers() à la fréquence choisie sur les chronos en cours du jeu de
+# référence (avec, en option, des bascules pause/reprise du contrôle), puis compare pour chaque
+# OF et étape la progression du total cumulé (actif + pause) au temps écoulé mesuré entre la
+# première et la dernière passe. Avec report du reste (clock.split_elapsed), l'écart reste
+# sous 1 s quelle que soit la fréquence ; --troncature rejoue l'ancien calcul (secondes
+# tronquées puis référence remise à l'heure courante), dont le déficit croît à chaque passe.
+#
+# Usage :
+#   python -m benchmarks.chrono_drift                                  # SQLite, 20 s, une passe / 0,7 s
+#   python -m benchmarks.chrono_drift --backend mysql --duree 60 --intervalle 0.3 --bascules 5
+#   python -m benchmarks.chrono_drift --troncature                     # comparaison avec l'ancien calcul
+import argparse
+import sys
+import time
+from typing import Dict, Tuple
+
+import database
+from benchmarks.bench_db import open_backend
+
+# Étape -> (table, statut, référence, colonnes cumulées)
+STAGES = {
+    'coupe': ('details_coupe', 'statut_coupe', 'date_derniere_maj_coupe', ('temps_coupe', 'duree_totale_pause')),
+    'controle': ('details_controle', 'statut_controle', 'date_derniere_maj',
+                 ('temps_actif_total', 'temps_pause_total')),
+    'piqure': ('details_piqure', 'statut_piqure', 'date_derniere_maj_piqure',
+               ('temps_piqure', 'duree_totale_pause_piqure')),
+}
+
+# Reste reporté (< 1 s) + latence d'une passe
+TOLERANCE_S = 1.05
+
+
+def _truncating_split(since, now):
+    """Ancien calcul : secondes tronquées, référence remise à l'heure courante"""
+    seconds = int((now - since).total_seconds())
+    return (seconds, now) if seconds > 0 else (0, since)
+
+
+def running_totals(db) -> Dict[Tuple[str, str], int]:
+    """Total cumulé (actif + pause) de chaque chrono que update_all_timers() fait avancer"""
+    totals = {}
+    conn = db.get_connection()
+    try:
+        with conn.cursor() as cursor:
+            for stage, (table, statut, reference, columns) in STAGES.items():
+                total = ' + '.join(f"COALESCE({column}, 0)" for column in columns)
+                cursor.execute(f"SELECT of_id, {total} AS total FROM {table} "
+                               f"WHERE {statut} = 'En cours' AND {reference} IS NOT NULL")
+                for row in cursor.fetchall():
+                    totals[(row['of_id'], stage)] = row['total']
+    finally:
+        conn.close()
+    return totals
+
+
+def toggle_controles(db, ofs, pause: bool):
+    for of in ofs:
+        db.toggle_controle_pause(of, pause)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Dérive des chronomètres (totaux cumulés vs temps réel)")
+    parser.add_argument('--backend', choices=['sqlite', 'mysql'], default='sqlite')
+    parser.add_argument('--size', type=int, default=200)
+    parser.add_argument('--duree', type=float, default=20.0, help="durée de la mesure (s)")
+    parser.add_argument('--intervalle', type=float, default=0.7, help="délai entre deux passes (s)")
+    parser.add_argument('--bascules', type=int, default=0,
+                        help="bascule pause/reprise des contrôles en cours toutes les N passes (0 : jamais)")
+    parser.add_argument('--troncature', action='store_true', help="ancien calcul, pour comparaison")
+    args = parser.parse_args()
+
+    if args.troncature:
+        database.split_elapsed = _truncating_split
+
+    db = open_backend(args.backend, args.size)
+    db.age_timers(5)
+
+    # Première passe : rattrape le retard du jeu de données, sert de point de départ
+    start = time.monotonic()
+    db.update_all_timers()
+    before = running_totals(db)
+    controles = [of for of, stage in before if stage == 'controle']
+
+    passes, paused = 0, False
+    deadline = start + args.duree
+    while True:
+        time.sleep(args.intervalle)
+        passes += 1
+        if args.bascules and passes % args.bascules == 0:
+            paused = not paused
+            toggle_controles(db, controles, paused)
+        last = time.monotonic()
+        db.update_all_timers()
+        if last >= deadline:
+            break
+    if paused:
+        toggle_controles(db, controles, False)
+    elapsed = last - start
+    after = running_totals(db)
+
+    print(f"{passes} passes en {elapsed:.2f} s ({args.backend}, "
+          f"{'troncature' if args.troncature else 'report du reste'}, bascules : {args.bascules or 'non'})")
+    print(f"{'étape':<10} | {'chronos':>7} | {'écart moyen (s)':>15} | {'écart max (s)':>13}")
+    failed = False
+    for stage in STAGES:
+        gaps = [after[key] - before[key] - elapsed for key in before if key[1] == stage and key in after]
+        if not gaps:
+            print(f"{stage:<10} | {0:>7} | {'-':>15} | {'-':>13}")
+            continue
+        worst = max(gaps, key=abs)
+        failed = failed or abs(worst) > TOLERANCE_S
+        print(f"{stage:<10} | {len(gaps):>7} | {sum(gaps) / len(gaps):>15.2f} | {worst:>13.2f}")
+
+    if failed:
+        print(f"ÉCHEC : écart supérieur à {TOLERANCE_S} s entre totaux cumulés et temps écoulé")
+        return 1
+    print(f"OK : écarts sous {TOLERANCE_S} s")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,291 @@
+# benchmarks/datagen.py - Générateur déterministe de données d'usine (catalogues, OF, sur-consommation)
+#
+# Même taille + même graine = mêmes données, pour comparer deux versions du code.
+import random
+from datetime import datetime, timedelta
+from functools import lru_cache
+from typing import Dict, List, Optional
+
+# Date de référence fixe (les chronos en cours ont démarré peu avant)
+REFERENCE_DATE = datetime(2025, 6, 2, 10, 0, 0)
+
+MATIERES = ['Cuir agneau', 'Cuir veau velours', 'Cuir verni', 'Chevreau', 'Satin', 'Toile', 'Nubuck', 'Cuir métallisé']
+NOMS_MODELES = ['Cendrillon', 'Zizi', 'Michael', 'Brigitte', 'Camille', 'Lilouh', 'Sophia', 'Juliette', 'Olivia',
+                'Rose', 'Manon', 'Gaby', 'Beryl', 'Lou', 'Mary Jane', 'Ballerine BB', 'Richelieu', 'Derby',
+                'Mocassin', 'Boots', 'Sandale', 'Escarpin', 'Demi-pointe', 'Pointe']
+COULEURS = ['Noir', 'Blanc', 'Rose', 'Rouge', 'Nude', 'Beige', 'Marine', 'Bordeaux', 'Or', 'Argent', 'Camel',
+            'Taupe', 'Vert', 'Bleu ciel', 'Lilas', 'Léopard']
+NOMS = ['Martin', 'Bernard', 'Dubois', 'Thomas', 'Robert', 'Richard', 'Petit', 'Durand', 'Leroy', 'Moreau',
+        'Simon', 'Laurent', 'Lefebvre', 'Michel', 'Garcia', 'David', 'Bertrand', 'Roux', 'Vincent', 'Fournier']
+PRENOMS = ['Marie', 'Nathalie', 'Isabelle', 'Sylvie', 'Catherine', 'Jean', 'Philippe', 'Michel', 'Alain',
+           'Sandrine', 'Céline', 'Pascal', 'Éric', 'Sophie', 'Laurence', 'Patrick', 'Valérie', 'Karine']
+OBSERVATIONS = ['', '', '', 'Peau à trier', 'Défaut de teinte', 'Urgent', 'Recoupe semelle', 'Matière tendue']
+
+# Répartition des OF dans le cycle coupe → contrôle → piqûre (la plupart sont terminés)
+STAGE_WEIGHTS = {
+    'attente': 0.08,            # coupe et contrôle en attente
+    'coupe': 0.03,              # coupe en cours
+    'controle': 0.03,           # coupe terminée, contrôle en cours
+    'controle_termine': 0.06,   # contrôle terminé, pas encore de piqûre
+    'piqure': 0.03,             # piqûre en cours
+    'termine': 0.77,            # piqûre terminée
+}
+PAUSE_RATIO = 0.2               # part des opérations en cours qui sont en pause
+SURCONS_RATIO = 0.3             # part des coupes terminées avec sur-consommation
+
+STATUTS_CONTROLE_FINAUX = ['Approuvé ✅', 'Approuvé ✅', 'Approuvé ✅', 'Approuvé avec recoupe ✅',
+                           'À retravailler 🔧', 'Contrôle complet avec retours 🔄']
+
+# Tables externes à l'application (pas dans migrations.py) : à créer dans la base de benchmark
+CATALOG_DDL = [
+    '''
+    CREATE TABLE IF NOT EXISTS employes (
+        id_employe INT PRIMARY KEY AUTO_INCREMENT,
+        matricule VARCHAR(50) UNIQUE NOT NULL,
+        nom VARCHAR(100) NOT NULL,
+        prenom VARCHAR(100) NOT NULL
+    )
+    ''',
+    '''
+    CREATE TABLE IF NOT EXISTS modeles (
+        id INT PRIMARY KEY AUTO_INCREMENT,
+        nom_modele VARCHAR(100) NOT NULL,
+        code_modele VARCHAR(50) UNIQUE NOT NULL,
+        matiere VARCHAR(50),
+        consignes_de_coupe TEXT,
+        emport_de_piece VARCHAR(100),
+        INDEX idx_nom_modele (nom_modele)
+    )
+    ''',
+    '''
+    CREATE TABLE IF NOT EXISTS code_couleur (
+        code_couleur VARCHAR(20) PRIMARY KEY,
+        nom_couleur VARCHAR(100) NOT NULL
+    )
+    ''',
+]
+
+# Colonnes renvoyées par DatabaseManager.get_all_orders() : alias -> (table, colonne)
+ORDER_COLUMNS = {
+    'id': ('of', 'id'), 'of': ('of', 'of'), 'modele': ('of', 'modele'),
+    'couleur_modele': ('of', 'couleur_modele'), 'quantite': ('of', 'quantite'),
+    'observation_of': ('of', 'observation'), 'date_creation': ('of', 'date_creation'),
+    'statut_global': ('of', 'statut'),
+    'maj_of': ('of', 'derniere_mise_a_jour'), 'maj_coupe': ('coupe', 'derniere_mise_a_jour'),
+    'maj_controle': ('controle', 'derniere_mise_a_jour'), 'maj_piqure': ('piqure', 'derniere_mise_a_jour'),
+    'maj_donnees_coupe': ('coupe', 'maj_donnees'), 'maj_donnees_controle': ('controle', 'maj_donnees'),
+    **{column: ('coupe', column) for column in (
+        'coloris', 'matiere', 'matricule_coupeur', 'consommation', 'sur_consommation')},
+    'observation_coupe': ('coupe', 'observation'),
+    **{column: ('coupe', column) for column in (
+        'statut_coupe', 'date_debut_coupe', 'date_fin_coupe', 'temps_coupe', 'temps_recoupe',
+        'date_debut_recoupe', 'nombre_recoupe', 'coupe_en_pause', 'temps_coupe_avant_pause')},
+    'date_pause_coupe': ('coupe', 'date_derniere_pause'),
+    'duree_totale_pause': ('coupe', 'duree_totale_pause'),
+    'date_derniere_maj_coupe': ('coupe', 'date_derniere_maj_coupe'),
+    **{column: ('controle', column) for column in (
+        'statut_controle', 'date_debut_controle', 'date_fin_controle', 'temps_actif_total', 'temps_pause_total',
+        'controle_en_pause', 'date_derniere_maj', 'temps_controle', 'quantite_a_controler', 'quantite_controlee',
+        'quantite_acceptee', 'quantite_rejetee', 'quantite_retravailler', 'observation_controle',
+        'temps_controle_avant_pause', 'duree_pause_controle')},
+    'date_pause_controle': ('controle', 'date_derniere_pause'),
+    **{column: ('piqure', column) for column in (
+        'statut_piqure', 'matricule_piqueur', 'date_debut_piqure', 'date_fin_piqure', 'temps_piqure',
+        'piqure_en_pause', 'temps_piqure_avant_pause', 'date_derniere_pause_piqure', 'duree_totale_pause_piqure',
+        'observation_piqure', 'date_derniere_maj_piqure')},
+}
+
+
+class FactoryDataset:
+    """Jeu de données synthétique : lignes des tables, clés = noms des colonnes MySQL"""
+
+    def __init__(self, size: int, seed: int):
+        self.size = size
+        self.seed = seed
+        self.employes: List[Dict] = []
+        self.modeles: List[Dict] = []
+        self.couleurs: List[Dict] = []
+        self.ordres: List[Dict] = []
+        self.coupes: List[Dict] = []
+        self.controles: List[Dict] = []
+        self.piqures: List[Dict] = []
+
+    def tables(self) -> Dict[str, List[Dict]]:
+        """Lignes par table, dans l'ordre d'insertion (clés étrangères)"""
+        return {
+            'employes': self.employes,
+            'modeles': self.modeles,
+            'code_couleur': self.couleurs,
+            'ordres_fabrication': self.ordres,
+            'details_coupe': self.coupes,
+            'details_controle': self.controles,
+            'details_piqure': self.piqures,
+        }
+
+    def surcons_count(self) -> int:
+        return sum(1 for c in self.coupes if c['sur_consommation'] > 0)
+
+    def counts(self) -> Dict[str, int]:
+        return {name: len(rows) for name, rows in self.tables().items()}
+
+
+def _generate_catalogs(rng: random.Random, dataset: FactoryDataset):
+    for i in range(120):
+        dataset.employes.append({
+            'id_employe': i + 1,
+            'matricule': str(1000 + i),
+            'nom': rng.choice(NOMS),
+            'prenom': rng.choice(PRENOMS),
+        })
+
+    for i, nom in enumerate(NOMS_MODELES):
+        # Plusieurs codes (variantes de matière) par nom de modèle
+        for variante in range(rng.randint(2, 4)):
+            dataset.modeles.append({
+                'nom_modele': nom,
+                'code_modele': f"M{i:03d}{variante:02d}",
+                'matiere': rng.choice(MATIERES),
+                'consignes_de_coupe': rng.choice(['Sens du cuir', 'Couper en miroir', 'Éviter les flancs', '']),
+                'emport_de_piece': rng.choice(['Emporte-pièce A', 'Emporte-pièce B', 'Coupe main']),
+            })
+
+    for i, nom in enumerate(COULEURS):
+        dataset.couleurs.append({'code_couleur': f"{100 + i * 7:03d}", 'nom_couleur': nom})
+
+
+def _chrono(rng: random.Random, start: datetime, running: bool, paused: bool, now: datetime) -> Dict:
+    """Temps actif / pause d'une opération (terminée si running est faux)"""
+    actif = rng.randint(600, 4 * 3600)
+    pause = rng.randint(0, 1800) if rng.random() < 0.4 else 0
+    end = start + timedelta(seconds=actif + pause)
+    last_update = now - timedelta(seconds=rng.randint(1, 30)) if running else end
+    return {'actif': actif, 'pause': pause, 'end': None if running else end,
+            'last_update': last_update, 'paused': running and paused}
+
+
+def _generate_order(rng: random.Random, dataset: FactoryDataset, index: int, now: datetime):
+    stage = rng.choices(list(STAGE_WEIGHTS), weights=list(STAGE_WEIGHTS.values()))[0]
+    modele = rng.choice(dataset.modeles)
+    couleur = rng.choice(dataset.couleurs)
+    coupeur = rng.choice(dataset.employes)['matricule']
+    of = f"OF{index + 1:07d}"
+    quantite = rng.randint(20, 600)
+    created = now - timedelta(days=rng.randint(0, 365), seconds=rng.randint(0, 86400))
+
+    dataset.ordres.append({
+        'id': index + 1, 'of': of, 'modele': modele['nom_modele'], 'code_modele': modele['code_modele'],
+        'couleur_modele': couleur['nom_couleur'], 'quantite': quantite, 'observation': rng.choice(OBSERVATIONS),
+        'date_creation': created, 'statut': 'En attente', 'derniere_mise_a_jour': created,
+    })
+
+    # ===== COUPE =====
+    consommation = round(quantite * rng.uniform(0.06, 0.14), 2)
+    coupe_started = stage != 'attente'
+    coupe_running = stage == 'coupe'
+    coupe = _chrono(rng, created + timedelta(hours=rng.randint(1, 48)), coupe_running,
+                    rng.random() < PAUSE_RATIO, now)
+    sur_consommation = 0.0
+    if coupe_started and not coupe_running and rng.random() < SURCONS_RATIO:
+        sur_consommation = round(consommation * rng.uniform(0.01, 0.25), 2)
+    recoupes = rng.randint(1, 2) if coupe_started and rng.random() < 0.05 else 0
+    coupe_start = coupe['last_update'] - timedelta(seconds=coupe['actif'] + coupe['pause']) \
+        if coupe_running else coupe['end'] - timedelta(seconds=coupe['actif'] + coupe['pause'])
+    dataset.coupes.append({
+        'of_id': of, 'coloris': couleur['code_couleur'], 'matiere': modele['matiere'],
+        'matricule_coupeur': coupeur, 'consommation': consommation, 'sur_consommation': sur_consommation,
+        'observation': rng.choice(OBSERVATIONS),
+        'statut_coupe': 'En attente' if not coupe_started else ('En cours' if coupe_running else 'Terminée'),
+        'date_debut_coupe': coupe_start if coupe_started else None,
+        'date_fin_coupe': coupe['end'] if coupe_started else None,
+        'temps_coupe': coupe['actif'] if coupe_started else 0,
+        'temps_recoupe': rng.randint(300, 1800) if recoupes else 0,
+        'date_debut_recoupe': coupe['end'] if recoupes else None,
+        'nombre_recoupe': recoupes,
+        'coupe_en_pause': coupe['paused'],
+        'temps_coupe_avant_pause': coupe['actif'] if coupe['paused'] else 0,
+        'date_derniere_pause': coupe['last_update'] if coupe['paused'] else None,
+        'duree_totale_pause': coupe['pause'] if coupe_started else 0,
+        'date_derniere_maj_coupe': coupe['last_update'] if coupe_started else created,
+        'derniere_mise_a_jour': coupe['last_update'] if coupe_started else created,
+        'maj_donnees': (coupe['end'] or coupe_start) if coupe_started else created,
+    })
+
+    # ===== CONTRÔLE =====
+    controle_started = stage in ('controle', 'controle_termine', 'piqure', 'termine')
+    controle_running = stage == 'controle'
+    controle_start = (coupe['end'] or now) + timedelta(minutes=rng.randint(10, 600))
+    controle = _chrono(rng, controle_start, controle_running, rng.random() < PAUSE_RATIO, now)
+    controlee = quantite if controle_started and not controle_running else \
+        (rng.randint(0, quantite) if controle_running else 0)
+    rejetee = rng.randint(0, controlee // 12) if controlee else 0
+    retravailler = rng.randint(0, controlee // 15) if controlee else 0
+    dataset.controles.append({
+        'of_id': of,
+        'statut_controle': 'En attente' if not controle_started else
+        ('En cours' if controle_running else rng.choice(STATUTS_CONTROLE_FINAUX)),
+        'date_debut_controle': controle_start if controle_started else None,
+        'date_fin_controle': controle['end'] if controle_started else None,
+        'temps_actif_total': controle['actif'] if controle_started else 0,
+        'temps_pause_total': controle['pause'] if controle_started else 0,
+        'temps_controle': controle['actif'] + controle['pause'] if controle_started else 0,
+        'quantite_a_controler': quantite if controle_started else 0,
+        'quantite_controlee': controlee,
+        'quantite_acceptee': controlee - rejetee - retravailler,
+        'quantite_rejetee': rejetee,
+        'quantite_retravailler': retravailler,
+        'observation_controle': rng.choice(OBSERVATIONS) if controle_started else None,
+        'controle_en_pause': controle['paused'],
+        'date_derniere_maj': controle['last_update'] if controle_started else created,
+        'temps_controle_avant_pause': controle['actif'] if controle['paused'] else 0,
+        'duree_pause_controle': controle['pause'] if controle_started else 0,
+        'date_derniere_pause': controle['last_update'] if controle['paused'] else None,
+        'derniere_mise_a_jour': controle['last_update'] if controle_started else created,
+        'maj_donnees': (controle['end'] or controle_start) if controle_started else created,
+    })
+
+    # ===== PIQÛRE =====
+    if stage in ('piqure', 'termine'):
+        piqure_running = stage == 'piqure'
+        piqure_start = (controle['end'] or now) + timedelta(minutes=rng.randint(10, 600))
+        piqure = _chrono(rng, piqure_start, piqure_running, rng.random() < PAUSE_RATIO, now)
+        dataset.piqures.append({
+            'of_id': of, 'matricule_piqueur': rng.choice(dataset.employes)['matricule'],
+            'observation_piqure': rng.choice(OBSERVATIONS),
+            'statut_piqure': 'En cours' if piqure_running else 'Terminée',
+            'date_debut_piqure': piqure_start, 'date_fin_piqure': piqure['end'],
+            'temps_piqure': piqure['actif'],
+            'piqure_en_pause': piqure['paused'],
+            'temps_piqure_avant_pause': piqure['actif'] if piqure['paused'] else 0,
+            'date_derniere_pause_piqure': piqure['last_update'] if piqure['paused'] else None,
+            'duree_totale_pause_piqure': piqure['pause'],
+            'date_derniere_maj_piqure': piqure['last_update'],
+            'derniere_mise_a_jour': piqure['last_update'],
+        })
+
+
+@lru_cache(maxsize=4)
+def generate(size: int, seed: int = 42, now: Optional[datetime] = None) -> FactoryDataset:
+    """Génère size OF (résultat mis en cache : ne pas modifier les lignes en place)"""
+    rng = random.Random(seed)
+    now = now or REFERENCE_DATE
+    dataset = FactoryDataset(size, seed)
+    _generate_catalogs(rng, dataset)
+    for index in range(size):
+        _generate_order(rng, dataset, index, now)
+    return dataset
+
+
+def joined_row(ordre: Dict, coupe: Optional[Dict], controle: Optional[Dict], piqure: Optional[Dict]) -> Dict:
+    """Une ligne au format de get_all_orders() (jointures gauches)"""
+    sources = {'of': ordre, 'coupe': coupe or {}, 'controle': controle or {}, 'piqure': piqure or {}}
+    return {alias: sources[table].get(column) for alias, (table, column) in ORDER_COLUMNS.items()}
+
+
+def joined_orders(dataset: FactoryDataset, coupes: Dict = None, controles: Dict = None,
+                  piqures: Dict = None) -> List[Dict]:
+    """Lignes au format de get_all_orders() (plus récents d'abord)"""
+    coupes = coupes if coupes is not None else {c['of_id']: c for c in dataset.coupes}
+    controles = controles if controles is not None else {c['of_id']: c for c in dataset.controles}
+    piqures = piqures if piqures is not None else {p['of_id']: p for p in dataset.piqures}
+    return [joined_row(ordre, coupes.get(ordre['of']), controles.get(ordre['of']), piqures.get(ordre['of']))
+            for ordre in sorted(dataset.ordres, key=lambda o: o['date_creation'], reverse=True)]
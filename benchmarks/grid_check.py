@@ -0,0 +1,68 @@
+# benchmarks/grid_check.py - Rendu du tableau de suivi directeur sur un grand volume d'OF
+#
+# Rend la page directeur (AppTest) sur --size OF synthétiques et échoue (code de sortie 1)
+# si le rendu lève une exception ou si la grille ne contient pas toutes les lignes. Au-delà
+# de ~18 700 OF, un Styler sur les 14 colonnes dépassait styler.render.max_elements
+# (262 144 cellules) et Streamlit refusait le tableau : le volume par défaut est au-dessus.
+#
+# Usage :
+#   python -m benchmarks.grid_check                        # 25 000 OF, substitut en mémoire
+#   python -m benchmarks.grid_check --size 50000 --backend sqlite
+import argparse
+import os
+import sys
+import time
+
+from benchmarks.bench_db import BACKENDS, open_backend
+from production_grid import GRID_COLUMNS
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+PAGE_SCRIPT = os.path.join(BASE_DIR, 'page_app.py')
+
+ROLE = "Chef de Production"
+
+
+def render_grid(backend: str, size: int, seed: int, timeout: float) -> int:
+    """Rend la page directeur et retourne le nombre de lignes de la grille"""
+    from streamlit.testing.v1 import AppTest
+
+    os.environ.update({'REPETTO_BENCH_ROLE': ROLE, 'REPETTO_BENCH_BACKEND': backend,
+                       'REPETTO_BENCH_SIZE': str(size), 'REPETTO_BENCH_SEED': str(seed)})
+    at = AppTest.from_file(PAGE_SCRIPT, default_timeout=timeout)
+    at.run()
+    if at.exception:
+        raise RuntimeError(at.exception[0].message)
+
+    grids = [df.value for df in at.dataframe if list(df.value.columns) == GRID_COLUMNS]
+    if not grids:
+        raise RuntimeError("grille de suivi introuvable dans le rendu")
+    return len(grids[0])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rendu du tableau de suivi sur un grand volume d'OF")
+    parser.add_argument('--size', type=int, default=25_000)
+    parser.add_argument('--backend', choices=BACKENDS, default='memory')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--timeout', type=float, default=600.0)
+    args = parser.parse_args()
+
+    # Jeu de données préparé hors chronométrage (page_app.py le retrouve dans le même processus)
+    open_backend(args.backend, args.size, args.seed)
+
+    start = time.perf_counter()
+    try:
+        rows = render_grid(args.backend, args.size, args.seed, args.timeout)
+    except Exception as e:
+        print(f"❌ Rendu directeur ({args.size} OF, {args.backend}) : {e}")
+        sys.exit(1)
+    elapsed = time.perf_counter() - start
+
+    if rows != args.size:
+        print(f"❌ Grille incomplète : {rows} lignes sur {args.size} OF")
+        sys.exit(1)
+    print(f"✅ Grille de {rows} OF ({len(GRID_COLUMNS) * rows} cellules) rendue en {elapsed:.1f} s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,428 @@
+# benchmarks/load_simulator.py - Simulation de sessions concurrentes (relève d'équipe, tablettes)
+#
+# M sessions par rôle se connectent (toutes en même temps par défaut, comme à la relève),
+# puis enchaînent le cycle d'autorefresh de leur page et les clics courants (démarrer,
+# pause, reprise, fin, session de contrôle) sur la base de benchmark MySQL/MariaDB locale.
+#
+# Usage :
+#   python -m benchmarks.load_simulator --sessions 5 --duration 120 --size 10000
+#   python -m benchmarks.load_simulator --sessions 20 --ramp-up 0 --mode apptest --no-load
+import argparse
+import json
+import os
+import random
+import threading
+import time
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+from benchmarks.bench_db import MySQLBenchManager, logged_in_state, open_backend
+from database import KPIManager, Utils
+from query_stats import QueryStats
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+PAGE_SCRIPT = os.path.join(BASE_DIR, 'page_app.py')
+
+
+# ===== RECHARGEMENTS (requêtes d'un rerun de chaque page) =====
+
+def _rerun_coupe(db) -> List[Dict]:
+    db.update_all_timers()
+    orders = db.get_all_orders()
+    db.get_all_employees()
+    db.get_all_modeles()
+    db.get_all_coloris()
+    return orders
+
+
+def _rerun_controle(db) -> List[Dict]:
+    db.update_all_timers()
+    return db.get_all_orders()
+
+
+def _rerun_piqure(db) -> List[Dict]:
+    db.update_all_timers()
+    orders = db.get_all_orders()
+    db.get_all_employees()
+    return orders
+
+
+def _rerun_directeur(db) -> List[Dict]:
+    db.update_all_timers()
+    orders = db.get_all_orders()
+    db.get_all_orders()  # barre latérale
+    KPIManager(orders).calculate_kpis()
+    db.get_surconsommation_summary()
+    db.get_surconsommation_filter_options()
+    db.get_surconsommation_data(limit=500)
+    db.get_surconsommation_by_matiere()
+    db.get_surconsommation_by_coupeur()
+    return orders
+
+
+# ===== CLICS (mêmes appels que les boutons des pages) =====
+
+def _pick(orders: List[Dict], rng: random.Random, predicate: Callable) -> Optional[Dict]:
+    candidates = [o for o in orders if predicate(o)]
+    return rng.choice(candidates) if candidates else None
+
+
+def _coupe_start(db, order, rng):
+    return db.update_order(order['of'], statut_coupe='En cours', date_debut_coupe=datetime.now(),
+                           date_derniere_maj_coupe=datetime.now())
+
+
+def _coupe_pause(db, order, rng):
+    return db.update_order(order['of'], coupe_en_pause=True, temps_coupe_avant_pause=order.get('temps_coupe', 0),
+                           date_derniere_pause=datetime.now(), date_derniere_maj_coupe=datetime.now())
+
+
+def _coupe_resume(db, order, rng):
+    return db.update_order(order['of'], coupe_en_pause=False,
+                           duree_totale_pause=Utils.calculate_pause_duration(order, 'coupe'),
+                           date_derniere_pause=None, date_derniere_maj_coupe=datetime.now())
+
+
+def _coupe_finish(db, order, rng):
+    return db.update_order(order['of'], statut_coupe='Terminée', date_fin_coupe=datetime.now(),
+                           quantite_a_controler=order['quantite'], date_derniere_maj_coupe=datetime.now())
+
+
+def _controle_start(db, order, rng):
+    return db.start_controle(order['of'], order['quantite'])
+
+
+def _controle_pause(db, order, rng):
+    return db.toggle_controle_pause(order['of'], True)
+
+
+def _controle_resume(db, order, rng):
+    return db.toggle_controle_pause(order['of'], False)
+
+
+def _controle_session(db, order, rng):
+    """Session de contrôle : un lot de paires, finale si tout l'OF est contrôlé"""
+    restant = max(order['quantite'] - (order.get('quantite_controlee') or 0), 0)
+    lot = min(restant, rng.randint(10, 120))
+    rejetee = rng.randint(0, lot // 20)
+    retravailler = rng.randint(0, lot // 25)
+    nouvelle_quantite = (order.get('quantite_controlee') or 0) + lot
+    update_data = {
+        'quantite_controlee': nouvelle_quantite,
+        'quantite_acceptee': (order.get('quantite_acceptee') or 0) + lot - rejetee - retravailler,
+        'quantite_rejetee': (order.get('quantite_rejetee') or 0) + rejetee,
+        'quantite_retravailler': (order.get('quantite_retravailler') or 0) + retravailler,
+        'observation_controle': '',
+        'statut_controle': 'Contrôle partiel',
+    }
+    if nouvelle_quantite >= order['quantite']:
+        update_data['statut_controle'] = 'Approuvé ✅'
+        update_data['date_fin_controle'] = datetime.now()
+    return db.update_order(order['of'], **update_data)
+
+
+def _piqure_start(db, order, rng):
+    if order.get('statut_piqure') is None:
+        return db.start_piqure(order['of'], str(rng.randint(1000, 1119)), '')
+    return db.update_order(order['of'], statut_piqure='En cours', date_debut_piqure=datetime.now(),
+                           date_derniere_maj_piqure=datetime.now())
+
+
+def _piqure_pause(db, order, rng):
+    return db.update_order(order['of'], piqure_en_pause=True, temps_piqure_avant_pause=order.get('temps_piqure', 0),
+                           date_derniere_pause_piqure=datetime.now(), date_derniere_maj_piqure=datetime.now())
+
+
+def _piqure_resume(db, order, rng):
+    return db.update_order(order['of'], piqure_en_pause=False,
+                           duree_totale_pause_piqure=order.get('duree_totale_pause_piqure') or 0,
+                           date_derniere_pause_piqure=None, date_derniere_maj_piqure=datetime.now())
+
+
+def _piqure_finish(db, order, rng):
+    return db.update_order(order['of'], statut_piqure='Terminée', date_fin_piqure=datetime.now(),
+                           date_derniere_maj_piqure=datetime.now())
+
+
+def _directeur_filter(db, order, rng):
+    matiere = order.get('matiere') or None
+    db.get_surconsommation_summary(matiere=matiere)
+    db.get_surconsommation_data(matiere=matiere, limit=500)
+    return True
+
+
+def _is_running(statut: str, en_pause: str, paused: bool) -> Callable:
+    return lambda o: o.get(statut) == 'En cours' and bool(o.get(en_pause)) == paused
+
+
+# rôle -> page, intervalle d'autorefresh (s), rerun, clics (nom -> (poids, sélection de l'OF, action))
+ROLES = {
+    'coupe': {
+        'page': 'Chef de Coupe', 'refresh_s': 5.0, 'rerun': _rerun_coupe,
+        'actions': {
+            'start': (3, lambda o: o.get('statut_coupe') == 'En attente', _coupe_start),
+            'pause': (2, _is_running('statut_coupe', 'coupe_en_pause', False), _coupe_pause),
+            'resume': (2, _is_running('statut_coupe', 'coupe_en_pause', True), _coupe_resume),
+            'finish': (3, _is_running('statut_coupe', 'coupe_en_pause', False), _coupe_finish),
+        },
+    },
+    'controle': {
+        'page': 'Contrôle Qualité', 'refresh_s': 5.0, 'rerun': _rerun_controle,
+        'actions': {
+            'start': (2, lambda o: o.get('statut_coupe') == 'Terminée' and o.get('statut_controle') == 'En attente',
+                      _controle_start),
+            'pause': (1, _is_running('statut_controle', 'controle_en_pause', False), _controle_pause),
+            'resume': (1, _is_running('statut_controle', 'controle_en_pause', True), _controle_resume),
+            'control_session': (4, lambda o: o.get('statut_controle') in ('En cours', 'Contrôle partiel'),
+                                _controle_session),
+        },
+    },
+    'piqure': {
+        'page': 'Chef de Piqûre', 'refresh_s': 5.0, 'rerun': _rerun_piqure,
+        'actions': {
+            'start': (3, lambda o: str(o.get('statut_controle') or '').startswith('Approuvé')
+                      and o.get('statut_piqure') in (None, 'En attente'), _piqure_start),
+            'pause': (2, _is_running('statut_piqure', 'piqure_en_pause', False), _piqure_pause),
+            'resume': (2, _is_running('statut_piqure', 'piqure_en_pause', True), _piqure_resume),
+            'finish': (3, _is_running('statut_piqure', 'piqure_en_pause', False), _piqure_finish),
+        },
+    },
+    'directeur': {
+        'page': 'Chef de Production', 'refresh_s': 10.0, 'rerun': _rerun_directeur,
+        'actions': {
+            'filter': (1, lambda o: (o.get('sur_consommation') or 0) > 0, _directeur_filter),
+        },
+    },
+}
+
+
+class LatencyRecorder:
+    """Latences et erreurs par (rôle, opération), partagées par les threads de session"""
+
+    MAX_ERROR_SAMPLES = 5
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._latencies: Dict[tuple, List[float]] = {}
+        self._errors: Dict[tuple, int] = {}
+        self._skipped: Dict[tuple, int] = {}
+        self.error_samples: List[str] = []
+
+    def record(self, role: str, operation: str, duration_ms: float, ok: bool, error: str = None):
+        key = (role, operation)
+        with self._lock:
+            self._latencies.setdefault(key, []).append(duration_ms)
+            if not ok:
+                self._errors[key] = self._errors.get(key, 0) + 1
+                if error and len(self.error_samples) < self.MAX_ERROR_SAMPLES:
+                    self.error_samples.append(f"{role}/{operation}: {error}")
+
+    def skip(self, role: str, operation: str):
+        """Clic impossible faute d'OF dans l'état voulu"""
+        with self._lock:
+            self._skipped[(role, operation)] = self._skipped.get((role, operation), 0) + 1
+
+    @staticmethod
+    def _percentile(ordered: List[float], p: float) -> float:
+        return ordered[min(len(ordered) - 1, int(len(ordered) * p))] if ordered else 0.0
+
+    def summary(self) -> List[Dict]:
+        with self._lock:
+            keys = sorted(set(self._latencies) | set(self._skipped))
+            rows = []
+            for key in keys:
+                ordered = sorted(self._latencies.get(key, []))
+                rows.append({
+                    'role': key[0],
+                    'operation': key[1],
+                    'appels': len(ordered),
+                    'erreurs': self._errors.get(key, 0),
+                    'ignores': self._skipped.get(key, 0),
+                    'p50_ms': round(self._percentile(ordered, 0.50), 1),
+                    'p95_ms': round(self._percentile(ordered, 0.95), 1),
+                    'p99_ms': round(self._percentile(ordered, 0.99), 1),
+                    'max_ms': round(ordered[-1], 1) if ordered else 0.0,
+                })
+            return rows
+
+
+class SimulatedSession(threading.Thread):
+    """Une tablette : connexion, autorefresh périodique et clics aléatoires (processus de Poisson)"""
+
+    def __init__(self, role: str, index: int, args, recorder: LatencyRecorder, stop: threading.Event):
+        super().__init__(name=f"session-{role}-{index}", daemon=True)
+        self.role = role
+        self.spec = ROLES[role]
+        self.args = args
+        self.recorder = recorder
+        self.stop_event = stop
+        self.rng = random.Random(f"{args.seed}-{role}-{index}")
+        self.db = MySQLBenchManager()
+        self.app_test = None
+        self.orders: List[Dict] = []
+
+    def _timed(self, operation: str, func: Callable):
+        start = time.perf_counter()
+        try:
+            result = func()
+            ok, error = result is not False, None
+        except Exception as e:
+            result, ok, error = None, False, str(e)
+        self.recorder.record(self.role, operation, (time.perf_counter() - start) * 1000, ok, error)
+        return result
+
+    def _connect(self):
+        """Reconnexion de la tablette : ouverture de session puis premier rendu"""
+        if self.args.mode == 'apptest':
+            from streamlit.testing.v1 import AppTest
+            self.app_test = AppTest.from_file(PAGE_SCRIPT, default_timeout=self.args.page_timeout)
+            for key, value in logged_in_state(self.spec['page']).items():
+                self.app_test.session_state[key] = value
+        else:
+            self._timed('login', lambda: self.db.verify_user('benchmark', 'benchmark') or True)
+        self._rerun()
+
+    def _rerun(self):
+        if self.app_test is not None:
+            def render():
+                self.app_test.run()
+                if self.app_test.exception:
+                    raise RuntimeError(self.app_test.exception[0].message)
+            self._timed('rerun', render)
+            # Les clics s'appuient sur l'état de la base, comme les boutons de la page
+            self.orders = self.db.get_all_orders()
+        else:
+            self.orders = self._timed('rerun', lambda: self.spec['rerun'](self.db)) or self.orders
+
+    def _click(self):
+        actions = self.spec['actions']
+        name = self.rng.choices(list(actions), weights=[a[0] for a in actions.values()])[0]
+        _, predicate, action = actions[name]
+        order = _pick(self.orders, self.rng, predicate)
+        if order is None:
+            self.recorder.skip(self.role, name)
+            return
+        self._timed(name, lambda: action(self.db, order, self.rng))
+        # Chaque bouton se termine par st.rerun()
+        self._rerun()
+
+    def run(self):
+        with QueryStats.page(self.spec['page']):
+            if self.args.ramp_up > 0:
+                if self.stop_event.wait(self.rng.uniform(0, self.args.ramp_up)):
+                    return
+            self._connect()
+
+            refresh_s = self.spec['refresh_s'] * self.args.refresh_scale
+            next_refresh = time.monotonic() + refresh_s
+            click_rate = self.args.click_rate / 60.0
+            next_click = time.monotonic() + (self.rng.expovariate(click_rate) if click_rate > 0 else float('inf'))
+
+            while not self.stop_event.is_set():
+                now = time.monotonic()
+                if now >= next_click:
+                    self._click()
+                    next_click = now + self.rng.expovariate(click_rate)
+                if now >= next_refresh:
+                    self._rerun()
+                    next_refresh = now + refresh_s
+                self.stop_event.wait(max(0.0, min(next_refresh, next_click) - time.monotonic()))
+
+
+def _query_totals() -> Dict:
+    offenders = QueryStats.top_offenders(limit=10_000)
+    return {
+        'requetes': sum(o['appels'] for o in offenders),
+        'erreurs_sql': sum(o['erreurs'] for o in offenders),
+        'par_page': {page: sum(o['pages'].get(page, 0) for o in offenders)
+                     for page in {p for o in offenders for p in o['pages']}},
+    }
+
+
+def simulate(args) -> Dict:
+    open_backend('mysql', args.size, args.seed, load=not args.no_load)
+    for key, value in {'REPETTO_BENCH_BACKEND': 'mysql', 'REPETTO_BENCH_SIZE': str(args.size),
+                       'REPETTO_BENCH_SEED': str(args.seed)}.items():
+        os.environ[key] = value
+
+    QueryStats.reset()
+    recorder = LatencyRecorder()
+    stop = threading.Event()
+    sessions = [SimulatedSession(role, i, args, recorder, stop)
+                for role in args.roles for i in range(args.sessions)]
+
+    print(f"▶️ {len(sessions)} sessions ({args.sessions} × {', '.join(args.roles)}), "
+          f"{args.duration:.0f} s, mode {args.mode}")
+    start = time.perf_counter()
+    for session in sessions:
+        session.start()
+    stop.wait(args.duration)
+    stop.set()
+    for session in sessions:
+        session.join(timeout=args.page_timeout)
+    elapsed = time.perf_counter() - start
+
+    totals = _query_totals()
+    return {
+        'meta': {
+            'date': datetime.now().isoformat(timespec='seconds'),
+            'sessions_par_role': args.sessions,
+            'roles': args.roles,
+            'duree_s': round(elapsed, 1),
+            'mode': args.mode,
+            'taille': args.size,
+            'clics_par_minute': args.click_rate,
+            'facteur_refresh': args.refresh_scale,
+            'montee_en_charge_s': args.ramp_up,
+        },
+        'operations': recorder.summary(),
+        'requetes': totals['requetes'],
+        'requetes_par_seconde': round(totals['requetes'] / elapsed, 1) if elapsed else 0.0,
+        'requetes_par_page': totals['par_page'],
+        'erreurs_sql': totals['erreurs_sql'],
+        'requetes_lentes': QueryStats.top_offenders(limit=5, sort_by='p95_ms'),
+        'exemples_erreurs': recorder.error_samples,
+    }
+
+
+def print_report(report: Dict):
+    print(f"\n{'rôle':<10} {'opération':<16} {'appels':>7} {'erreurs':>8} {'ignorés':>8} "
+          f"{'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'max ms':>9}")
+    for row in report['operations']:
+        print(f"{row['role']:<10} {row['operation']:<16} {row['appels']:>7} {row['erreurs']:>8} {row['ignores']:>8} "
+              f"{row['p50_ms']:>9.1f} {row['p95_ms']:>9.1f} {row['p99_ms']:>9.1f} {row['max_ms']:>9.1f}")
+    print(f"\nRequêtes SQL : {report['requetes']} ({report['requetes_par_seconde']} /s), "
+          f"erreurs SQL : {report['erreurs_sql']}")
+    for sample in report['exemples_erreurs']:
+        print(f"  ❌ {sample}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulation de sessions concurrentes sur la base de benchmark")
+    parser.add_argument('--sessions', type=int, default=5, help="sessions simulées par rôle")
+    parser.add_argument('--roles', nargs='+', choices=list(ROLES), default=list(ROLES))
+    parser.add_argument('--duration', type=float, default=60.0, help="durée de la simulation (s)")
+    parser.add_argument('--ramp-up', type=float, default=0.0,
+                        help="étalement des connexions (s) ; 0 = toutes en même temps (relève)")
+    parser.add_argument('--click-rate', type=float, default=2.0, help="clics par minute et par session")
+    parser.add_argument('--refresh-scale', type=float, default=1.0,
+                        help="multiplie les intervalles d'autorefresh des pages (0.5 = deux fois plus souvent)")
+    parser.add_argument('--mode', choices=['db', 'apptest'], default='db',
+                        help="db : requêtes d'un rerun ; apptest : rendu complet des pages (CPU, GIL partagé)")
+    parser.add_argument('--size', type=int, default=10_000, help="nombre d'OF chargés dans la base")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--no-load', action='store_true', help="réutiliser la base de benchmark sans la recharger")
+    parser.add_argument('--page-timeout', type=float, default=120.0)
+    parser.add_argument('--output', help="fichier JSON du rapport")
+    args = parser.parse_args()
+
+    report = simulate(args)
+    print_report(report)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2, default=str)
+        print(f"Rapport : {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,28 @@
+# benchmarks/page_app.py - Script rendu par AppTest : une page de rôle sur les données synthétiques
+#
+# Paramètres lus dans l'environnement (fixés par benchmarks/run.py avant chaque rendu) :
+# REPETTO_BENCH_ROLE, REPETTO_BENCH_BACKEND, REPETTO_BENCH_SIZE, REPETTO_BENCH_SEED
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+import streamlit as st
+from app import App
+from benchmarks.bench_db import logged_in_state, open_backend
+
+role = os.environ.get('REPETTO_BENCH_ROLE', 'Chef de Production')
+
+# Session déjà connectée (AppTest peut aussi la fournir via at.session_state)
+if 'logged_in' not in st.session_state:
+    for key, value in logged_in_state(role).items():
+        st.session_state[key] = value
+
+app = App()
+# Base préparée une seule fois par processus (le module bench_db reste importé entre les rendus)
+app.db_manager = open_backend(os.environ.get('REPETTO_BENCH_BACKEND', 'memory'),
+                              int(os.environ.get('REPETTO_BENCH_SIZE', '1000')),
+                              int(os.environ.get('REPETTO_BENCH_SEED', '42')))
+app.run()
@@ -0,0 +1,165 @@
+# benchmarks/query_budget.py - Budget d'allers-retours SQL par rendu de page
+#
+# Rend chaque page une fois (AppTest) sur le jeu de données de référence chargé dans la
+# base de benchmark, compte les requêtes et connexions de sa section de profil et échoue
+# (code de sortie 1) en listant les sites d'appel quand un budget est dépassé.
+#
+# Usage :
+#   python -m benchmarks.query_budget                   # vérifie les budgets (SQLite, sans serveur)
+#   python -m benchmarks.query_budget --backend mysql   # même vérification sur MySQL/MariaDB local
+#   python -m benchmarks.query_budget --record          # affiche les mesures au format PAGE_BUDGETS
+#
+# Les budgets sont les mesures de --record sur le jeu de référence, sans marge : le rendu
+# est déterministe (mêmes comptes d'une exécution à l'autre), toute requête en plus échoue.
+import argparse
+import os
+import sys
+from typing import Dict, List
+
+from benchmarks.bench_db import logged_in_state, open_backend
+from database import Config
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+PAGE_SCRIPT = os.path.join(BASE_DIR, 'page_app.py')
+
+# Jeu de données de référence : les budgets ne valent que pour lui
+REFERENCE_SIZE = 200
+REFERENCE_SEED = 42
+
+# Budgets par composant (section 'rôle/Composant' du profil de rendu, voir app.py).
+# Tous les chronos en cours sont reculés avant chaque rendu : update_all_timers() les met
+# tous à jour (17 lignes en cours dans le jeu de référence, un UPDATE chacune ; l'écart est
+# calculé avec l'horloge de clock.py, plus une mesure de l'heure serveur par intervalle).
+# Les N+1 connus (KNOWN_OFFENDERS) sont exclus des budgets.
+PAGE_BUDGETS = {
+    'ChefCoupePage': {'role': "Chef de Coupe", 'requetes': 27, 'connexions': 7},
+    'ControleQualitePage': {'role': "Contrôle Qualité", 'requetes': 22, 'connexions': 3},
+    'ChefPiqurePage': {'role': "Chef de Piqûre", 'requetes': 23, 'connexions': 4},
+    'DirecteurPage': {'role': "Chef de Production", 'requetes': 30, 'connexions': 9},
+    'SidebarManager': {'role': "Chef de Production", 'requetes': 1, 'connexions': 1},
+}
+
+# N+1 connus à corriger, par composant : sous-section du profil -> cause. Leur coût, qui
+# croît avec le nombre de cartes, est retiré du composant et affiché à part, hors budget.
+KNOWN_OFFENDERS = {
+    'ChefCoupePage': {
+        'gestion_of/get_modele_by_nom': "un get_modele_by_nom par carte OF, une connexion et une requête chacun",
+    },
+}
+
+# Sites d'appel affichés pour un composant hors budget
+MAX_SITES = 15
+
+
+def render_profile(role: str, db_manager, timeout: float) -> Dict:
+    """Rend la page du rôle une fois, profilage actif, et retourne le profil du rendu"""
+    from streamlit.testing.v1 import AppTest
+
+    # Tous les chronos en cours ont du temps à rattraper : même travail à chaque rendu
+    db_manager.age_timers(5)
+
+    at = AppTest.from_file(PAGE_SCRIPT, default_timeout=timeout)
+    for key, value in logged_in_state(role).items():
+        at.session_state[key] = value
+    at.run()
+    if at.exception:
+        raise RuntimeError(f"Rendu {role} : {at.exception[0].message}")
+    return list(at.session_state['render_profiles'])[-1]
+
+
+def component_usage(profile: Dict, component: str) -> Dict:
+    """Requêtes, connexions et sites d'appel de la section du composant (sous-sections comprises)"""
+    path = f"{profile['page']}/{component}"
+    offenders = {f"{path}/{section}": section for section in KNOWN_OFFENDERS.get(component, {})}
+    usage = {'requetes': 0, 'connexions': 0, 'sites': {}, 'trouve': False, 'connus': []}
+    for stats in profile['sections']:
+        if stats['section'] == path:
+            usage.update(requetes=usage['requetes'] + stats['requetes'],
+                         connexions=usage['connexions'] + stats['connexions'], trouve=True)
+        elif stats['section'] in offenders:
+            # Déjà compté dans la section du composant : retiré du total budgété
+            usage['requetes'] -= stats['requetes']
+            usage['connexions'] -= stats['connexions']
+            usage['connus'].append({'section': offenders[stats['section']],
+                                    'requetes': stats['requetes'], 'connexions': stats['connexions']})
+            continue
+        if stats['section'] == path or stats['section'].startswith(path + '/'):
+            for site, count in stats['sites'].items():
+                usage['sites'][site] = usage['sites'].get(site, 0) + count
+    return usage
+
+
+def check_budgets(components: List[str], db_manager, timeout: float) -> List[Dict]:
+    profiles: Dict[str, Dict] = {}
+    results = []
+    for component in components:
+        budget = PAGE_BUDGETS[component]
+        if budget['role'] not in profiles:
+            profiles[budget['role']] = render_profile(budget['role'], db_manager, timeout)
+        usage = component_usage(profiles[budget['role']], component)
+        results.append({
+            'composant': component,
+            **usage,
+            'budget_requetes': budget['requetes'],
+            'budget_connexions': budget['connexions'],
+            'depasse': not usage['trouve'] or usage['requetes'] > budget['requetes']
+            or usage['connexions'] > budget['connexions'],
+        })
+    return results
+
+
+def print_results(results: List[Dict]):
+    for result in results:
+        status = '❌' if result['depasse'] else '✅'
+        print(f"{status} {result['composant']:<22} requêtes {result['requetes']:>5} / {result['budget_requetes']:<5} "
+              f"connexions {result['connexions']:>4} / {result['budget_connexions']}")
+        for offender in result['connus']:
+            cause = KNOWN_OFFENDERS[result['composant']][offender['section']]
+            print(f"     ⚠️ N+1 connu, hors budget : {offender['section']} ({cause}) : "
+                  f"{offender['requetes']} requêtes, {offender['connexions']} connexions")
+        if not result['trouve']:
+            print("     section introuvable dans le profil du rendu")
+        elif result['depasse']:
+            for site, count in sorted(result['sites'].items(), key=lambda item: item[1], reverse=True)[:MAX_SITES]:
+                print(f"     {count:>5} × {site}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Budgets de requêtes SQL par rendu de page")
+    parser.add_argument('components', nargs='*', default=list(PAGE_BUDGETS),
+                        help=f"composants à vérifier ({', '.join(PAGE_BUDGETS)})")
+    parser.add_argument('--backend', choices=['sqlite', 'mysql'], default='sqlite',
+                        help="base de benchmark (même SQL et mêmes allers-retours sur les deux moteurs)")
+    parser.add_argument('--no-load', action='store_true', help="réutiliser la base de benchmark sans la recharger")
+    parser.add_argument('--record', action='store_true', help="afficher les mesures au format PAGE_BUDGETS")
+    parser.add_argument('--timeout', type=float, default=120.0)
+    args = parser.parse_args()
+
+    unknown = [c for c in args.components if c not in PAGE_BUDGETS]
+    if unknown:
+        parser.error(f"composants inconnus : {', '.join(unknown)}")
+
+    db_manager = open_backend(args.backend, REFERENCE_SIZE, REFERENCE_SEED, load=not args.no_load)
+    os.environ.update({'REPETTO_BENCH_BACKEND': args.backend, 'REPETTO_BENCH_SIZE': str(REFERENCE_SIZE),
+                       'REPETTO_BENCH_SEED': str(REFERENCE_SEED)})
+    # Le profil de rendu porte les compteurs par section (voir render_profiler.py)
+    Config.RENDER_PROFILER = True
+
+    results = check_budgets(args.components, db_manager, args.timeout)
+
+    if args.record:
+        print("PAGE_BUDGETS = {")
+        for result in results:
+            role = PAGE_BUDGETS[result['composant']]['role']
+            print(f"    '{result['composant']}': {{'role': \"{role}\", 'requetes': {result['requetes']}, "
+                  f"'connexions': {result['connexions']}}},")
+        print("}")
+        return
+
+    print_results(results)
+    if any(result['depasse'] for result in results):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
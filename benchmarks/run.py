@@ -0,0 +1,210 @@
+# benchmarks/run.py - Suite de benchmarks reproductible (données synthétiques, résultats JSON)
+#
+# Usage :
+#   python -m benchmarks.run                                   # 1k/10k/100k OF, substitut en mémoire
+#   python -m benchmarks.run --backend mysql --sizes 10000     # base REPETTO_BENCH_DB (MySQL/MariaDB local)
+#   python -m benchmarks.run --compare benchmarks/results/reference.json --tolerance 0.2
+#
+# Chaque mesure donne min / médiane / p95 (ms) sur --repeat exécutions après un tour de chauffe.
+import argparse
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from contextlib import redirect_stdout
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+from benchmarks.bench_db import BACKENDS, open_backend
+from benchmarks.datagen import generate
+from database import KPIManager
+from export_engine import SurconsommationExporter
+from page_registry import PageRegistry
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+RESULTS_DIR = os.path.join(BASE_DIR, 'results')
+PAGE_SCRIPT = os.path.join(BASE_DIR, 'page_app.py')
+
+DEFAULT_SIZES = [1_000, 10_000, 100_000]
+
+
+def measure(func: Callable, repeat: int, setup: Optional[Callable] = None) -> Dict:
+    """Durées (ms) de func() ; setup() est exécuté avant chaque appel, hors chronométrage"""
+    timings = []
+    for iteration in range(repeat + 1):
+        if setup is not None:
+            setup()
+        # La sortie console (journal des chronos) ne doit pas fausser ni noyer les mesures
+        with open(os.devnull, 'w') as devnull, redirect_stdout(devnull):
+            start = time.perf_counter()
+            func()
+            elapsed = (time.perf_counter() - start) * 1000
+        if iteration > 0:  # tour de chauffe ignoré
+            timings.append(elapsed)
+
+    ordered = sorted(timings)
+    return {
+        'min_ms': round(ordered[0], 3),
+        'median_ms': round(statistics.median(ordered), 3),
+        'p95_ms': round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))], 3),
+        'repeat': repeat,
+    }
+
+
+def core_benchmarks(db_manager) -> Dict[str, Dict]:
+    """Méthodes du DatabaseManager, KPI et export (fonction, préparation, informations)"""
+    orders = db_manager.get_all_orders()
+    surcons_rows = db_manager.get_surconsommation_data()
+
+    def export_excel():
+        SurconsommationExporter().export(iter(surcons_rows), io.BytesIO(), len(surcons_rows))
+
+    def export_excel_stream():
+        # Chemin de l'export en arrière-plan : lignes lues en flux jusqu'au classeur
+        SurconsommationExporter().export(db_manager.iter_surconsommation_data(), io.BytesIO(), len(surcons_rows))
+
+    return {
+        'update_all_timers': {
+            'func': db_manager.update_all_timers,
+            # Chronos reculés de 5 s : chaque passage met à jour toutes les lignes en cours
+            'setup': lambda: db_manager.age_timers(5),
+            'info': {'chronos_en_cours': sum(1 for o in orders if 'En cours' in (
+                o['statut_coupe'], o['statut_controle'], o['statut_piqure']))},
+        },
+        'get_all_orders': {'func': db_manager.get_all_orders, 'info': {'lignes': len(orders)}},
+        'calculate_kpis': {'func': lambda: KPIManager(orders).calculate_kpis(), 'info': {'lignes': len(orders)}},
+        'get_surconsommation_data': {'func': db_manager.get_surconsommation_data,
+                                     'info': {'lignes': len(surcons_rows)}},
+        'get_surconsommation_data_limit': {'func': lambda: db_manager.get_surconsommation_data(limit=500)},
+        'export_excel': {'func': export_excel, 'info': {'lignes': len(surcons_rows)}},
+        'export_excel_stream': {'func': export_excel_stream, 'info': {'lignes': len(surcons_rows)}},
+    }
+
+
+def page_benchmarks(backend: str, size: int, seed: int, timeout: float) -> Dict[str, Dict]:
+    """Rendu complet de chaque page de rôle via AppTest (nouvelle session à chaque rendu)"""
+    from streamlit.testing.v1 import AppTest
+
+    benchmarks = {}
+    for role in PageRegistry.PAGES:
+        def render(role=role):
+            os.environ.update({'REPETTO_BENCH_ROLE': role, 'REPETTO_BENCH_BACKEND': backend,
+                               'REPETTO_BENCH_SIZE': str(size), 'REPETTO_BENCH_SEED': str(seed)})
+            at = AppTest.from_file(PAGE_SCRIPT, default_timeout=timeout)
+            at.run()
+            if at.exception:
+                raise RuntimeError(f"Rendu {role} : {at.exception[0].message}")
+
+        slug = ''.join(c if c.isalnum() else '_' for c in role.lower())
+        benchmarks[f"page_{slug}"] = {'func': render, 'info': {'role': role}}
+    return benchmarks
+
+
+def run_suite(args) -> Dict:
+    results = []
+    for size in args.sizes:
+        start = time.perf_counter()
+        dataset = generate(size, args.seed)
+        db_manager = open_backend(args.backend, size, args.seed)
+        print(f"== {size} OF ({args.backend}) : préparation {time.perf_counter() - start:.1f} s, "
+              f"{dataset.surcons_count()} lignes de sur-consommation")
+
+        benchmarks = core_benchmarks(db_manager)
+        if not args.skip_pages:
+            benchmarks.update(page_benchmarks(args.backend, size, args.seed, args.page_timeout))
+
+        for name, bench in benchmarks.items():
+            if args.only and not any(pattern in name for pattern in args.only):
+                continue
+            try:
+                stats = measure(bench['func'], args.repeat, bench.get('setup'))
+            except Exception as e:
+                print(f"  ❌ {name:<36} {e}")
+                results.append({'benchmark': name, 'size': size, 'erreur': str(e)})
+                continue
+            results.append({'benchmark': name, 'size': size, **stats, **bench.get('info', {})})
+            print(f"  {name:<38} min {stats['min_ms']:>10.1f} ms   médiane {stats['median_ms']:>10.1f} ms   "
+                  f"p95 {stats['p95_ms']:>10.1f} ms")
+
+    return {'meta': _meta(args), 'results': results}
+
+
+def _meta(args) -> Dict:
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                                cwd=BASE_DIR, timeout=10).stdout.strip() or None
+    except Exception:
+        commit = None
+    return {
+        'date': datetime.now().isoformat(timespec='seconds'),
+        'commit': commit,
+        'backend': args.backend,
+        'seed': args.seed,
+        'repeat': args.repeat,
+        'sizes': args.sizes,
+        'python': platform.python_version(),
+        'plateforme': platform.platform(),
+    }
+
+
+def compare(baseline: Dict, current: Dict, tolerance: float, min_delta_ms: float = 1.0) -> List[Dict]:
+    """Mesures dont la médiane dépasse celle de référence de plus de tolerance (ex. 0.2 = +20 %)"""
+    reference = {(r['benchmark'], r['size']): r for r in baseline['results'] if 'median_ms' in r}
+    regressions = []
+    for result in current['results']:
+        before = reference.get((result['benchmark'], result['size']))
+        if before is None or 'median_ms' not in result:
+            continue
+        delta = result['median_ms'] - before['median_ms']
+        if delta > min_delta_ms and result['median_ms'] > before['median_ms'] * (1 + tolerance):
+            regressions.append({
+                'benchmark': result['benchmark'],
+                'size': result['size'],
+                'reference_ms': before['median_ms'],
+                'actuel_ms': result['median_ms'],
+                'ecart': round(delta / before['median_ms'], 3) if before['median_ms'] else None,
+            })
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks Repetto sur données d'usine synthétiques")
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES)
+    parser.add_argument('--backend', choices=BACKENDS, default='memory')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--only', nargs='+', help="ne lancer que les benchmarks dont le nom contient ces motifs")
+    parser.add_argument('--skip-pages', action='store_true', help="ne pas rendre les pages via AppTest")
+    parser.add_argument('--page-timeout', type=float, default=300.0)
+    parser.add_argument('--output', help="fichier JSON des résultats (défaut : benchmarks/results/)")
+    parser.add_argument('--compare', help="fichier JSON de référence pour détecter les régressions")
+    parser.add_argument('--tolerance', type=float, default=0.2)
+    args = parser.parse_args()
+
+    report = run_suite(args)
+
+    output = args.output or os.path.join(
+        RESULTS_DIR, f"bench_{args.backend}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"Résultats : {output}")
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare(baseline, report, args.tolerance)
+        for reg in regressions:
+            print(f"  ⚠️ RÉGRESSION {reg['benchmark']} ({reg['size']} OF) : "
+                  f"{reg['reference_ms']:.1f} ms → {reg['actuel_ms']:.1f} ms")
+        if regressions:
+            sys.exit(1)
+        print("Aucune régression")
+
+
+if __name__ == '__main__':
+    main()
@@ -3,13 +3,19 @@ import streamlit as st
 from streamlit_autorefresh import st_autorefresh
 import time
 from datetime import datetime, timedelta
+from clock import ServerClock
 from database import DatabaseManager, Utils
+from render_profiler import section
+from fragment_cache import FragmentCache, business_version
 from typing import List, Dict, Optional
 
 
 class ChefCoupePage:
     """Page chef de coupe"""
 
+    # Incrémenter si le HTML des cartes change
+    CARD_TEMPLATE_VERSION = 2
+
     def __init__(self, db_manager: DatabaseManager):
         self.db_manager = db_manager
         self.utils = Utils()
@@ -24,7 +30,8 @@ class ChefCoupePage:
         st.markdown('<div class="sub-header">Gestion des Ordres de Fabrication • Suivi en temps réel</div>',
                     unsafe_allow_html=True)
 
-        self.db_manager.update_all_timers()
+        with section("update_all_timers"):
+            self.db_manager.update_all_timers()
 
         if 'last_activity' in st.session_state:
             if datetime.now() - st.session_state.last_activity > timedelta(minutes=30):
@@ -35,7 +42,8 @@ class ChefCoupePage:
                 st.session_state.last_activity = datetime.now()
 
         # Vérifier les retours qualité
-        orders = self.db_manager.get_all_orders()
+        with section("get_all_orders"):
+            orders = self.db_manager.get_all_orders()
         retour_coupe = [o for o in orders if o['statut_controle'] == 'À retravailler 🔧']
 
         # Afficher une alerte s'il y a des retours
@@ -71,10 +79,12 @@ class ChefCoupePage:
         tab1, tab2 = st.tabs(["📊 Créer OF", "⏱️ Gestion en cours"])
 
         with tab1:
-            self._render_create_of()
+            with section("creer_of"):
+                self._render_create_of()
 
         with tab2:
-            self._render_manage_of()
+            with section("gestion_of"):
+                self._render_manage_of()
 
     # ===== MODIFICATION 1: Dans chef_coupe_page.py - _render_create_of() =====
 
@@ -288,8 +298,13 @@ class ChefCoupePage:
 
             st.markdown("---")
 
+            # Pauses des seuls chronos en direct (coupes en cours), avec une même heure de référence
+            chronos = self.utils.chrono_fields([o for o in of_disponibles if o['statut_coupe'] == 'En cours'
+                                                and o['statut_controle'] != 'À retravailler 🔧'])
+
             # Puis afficher les OF
             for order in of_disponibles:
+                chrono = chronos.get(order['of'])
                 with st.container():
                     # Déterminer si c'est un retour à la coupe
                     is_retour_coupe = order['statut_controle'] == 'À retravailler 🔧'
@@ -301,98 +316,39 @@ class ChefCoupePage:
                     col_info, col_timer, col_actions = st.columns([2.5, 2.5, 1.5])
 
                     # RÉCUPÉRER LES DONNÉES DU MODÈLE
-                    modele_info = self.db_manager.get_modele_by_nom(order.get('modele', ''))
+                    with section("get_modele_by_nom"):
+                        modele_info = self.db_manager.get_modele_by_nom(order.get('modele', ''))
                     consignes_coupe = modele_info.get('consignes_de_coupe', '') if modele_info else ''
                     emport_piece = modele_info.get('emport_de_piece', '') if modele_info else ''
 
-                    with col_info:
-                        # Header avec signal pour les retours
-                        if is_retour_coupe:
-                            st.markdown(f"**🔧 RETOUR À LA COUPE - OF:** `{order['of']}`")
-                        else:
-                            st.markdown(f"**OF:** `{order['of']}`")
+                    # Corps de carte hors chronomètre, mémorisé par version métier de l'OF et consignes
+                    # du modèle : les passages des chronomètres ne le reconstruisent pas
+                    body = FragmentCache.get(
+                        'coupe_card', order, self.CARD_TEMPLATE_VERSION,
+                        lambda: self._build_card_body(order, is_retour_coupe, consignes_coupe, emport_piece),
+                        version=business_version(order) + (consignes_coupe, emport_piece))
 
-                        st.markdown(f"**Modèle:** {order['modele']} - {order['couleur_modele']}")
+                    with col_info:
+                        st.markdown(body['header'], unsafe_allow_html=True)
 
                         # Afficher les détails qualité si c'est un retour
                         if is_retour_coupe:
-                            quality_details = self.utils.get_quality_details(order)
-                            quantite_retravailler = quality_details['retravailler']
-
-                            st.markdown(f"""
-                            <div style="background: linear-gradient(135deg, #FEF3C7 0%, #FDE68A 100%); 
-                                        padding: 10px; 
-                                        border-radius: 8px; 
-                                        border-left: 4px solid #F59E0B;
-                                        margin: 10px 0;">
-                                <div style="display: flex; align-items: center; gap: 8px;">
-                                    <span style="font-size: 1.2rem;">🔧</span>
-                                    <span style="font-weight: 700; color: #92400E;">
-                                        QUANTITÉ À RETRAVAILLER: {quantite_retravailler} paires
-                                    </span>
-                                </div>
-                                <div style="color: #92400E; font-size: 0.85rem; margin-top: 5px;">
-                                    ⏸️ Compteur en pause
-                                </div>
-                            </div>
-                            """, unsafe_allow_html=True)
-
-                            # Détails complets du retour
                             with st.expander("📊 Détails du retour qualité", expanded=False):
-                                st.markdown(f"""
-                                **Analyse qualité précédente:**
-                                - Total contrôlé: {order.get('quantite_controlee', 0)}/{order['quantite']} paires
-                                - ✅ Acceptées: {quality_details['acceptee']} paires ({quality_details['acceptee_pourcentage']:.1f}%)
-                                - ❌ Rejetées: {quality_details['rejetee']} paires (définitives - {quality_details['rejetee_pourcentage']:.1f}%)
-                                - 🔧 À retravailler: {quantite_retravailler} paires ({quality_details['retravailler_pourcentage']:.1f}%)
-
-                                **Temps précédent:** {self.utils.format_time(order.get('temps_coupe', 0))}
-                                **Nouvelle production:** {quantite_retravailler} paires à reproduire
-                                """)
+                                st.markdown(body['retour_details'])
+                                st.markdown(f"**Temps précédent:** {self.utils.format_time(order.get('temps_coupe', 0))}  \n"
+                                            f"{body['nouvelle_production']}")
 
                                 if order.get('observation_controle'):
                                     st.markdown("**📝 Observations qualité:**")
                                     st.info(order['observation_controle'])
 
                         # Informations standard
-                        st.markdown(
-                            f"**Quantité:** {order['quantite']} | **Coloris:** {order['coloris']} | **Matière:** {order['matiere']}")
+                        st.markdown(body['infos'])
 
                         # AFFICHAGE DES CONSIGNES ET IMPORT DE PIÈCE - DANS COL_INFO
-                        if consignes_coupe or emport_piece:
+                        if body['consignes']:
                             st.markdown("---")
-
-                            if consignes_coupe:
-                                st.markdown(f"""
-                                <div style="border: 2px solid #3B82F6; 
-                                            border-radius: 6px; 
-                                            padding: 10px; 
-                                            background: linear-gradient(135deg, #EFF6FF 0%, #DBEAFE 100%);
-                                            margin: 8px 0;">
-                                    <div style="font-weight: 700; color: #0C3B82; font-size: 0.95rem; margin-bottom: 8px;">
-                                        📋 CONSIGNES DE COUPE
-                                    </div>
-                                    <div style="color: #1E40AF; font-size: 0.85rem; line-height: 1.5;">
-                                        {consignes_coupe}
-                                    </div>
-                                </div>
-                                """, unsafe_allow_html=True)
-
-                            if emport_piece:
-                                st.markdown(f"""
-                                <div style="border: 2px solid #3B82F6; 
-                                            border-radius: 6px; 
-                                            padding: 10px; 
-                                            background: linear-gradient(135deg, #EFF6FF 0%, #DBEAFE 100%);
-                                            margin: 8px 0;">
-                                    <div style="font-weight: 700; color: #0C3B82; font-size: 0.95rem; margin-bottom: 8px;">
-                                        📦 IMPORT DE PIÈCE
-                                    </div>
-                                    <div style="color: #1E40AF; font-size: 0.85rem; line-height: 1.5;">
-                                        {emport_piece}
-                                    </div>
-                                </div>
-                                """, unsafe_allow_html=True)
+                            st.markdown(body['consignes'], unsafe_allow_html=True)
 
                         if order.get('observation') and not is_retour_coupe:
                             with st.expander("📝 Observations"):
@@ -416,12 +372,10 @@ class ChefCoupePage:
                                 st.markdown(f"**EN ATTENTE**")
 
                             # Afficher le temps total précédent
-                            st.markdown(f"""
-                            <div style="background: #F3F4F6; padding: 8px; border-radius: 6px; margin-top: 10px; text-align: center;">
-                                <div style="font-size: 0.85rem; color: #6B7280;">Temps coupe initial</div>
-                                <div style="font-weight: 700; color: #1F2937;">{self.utils.format_time(order.get('temps_coupe', 0))}</div>
-                            </div>
-                            """, unsafe_allow_html=True)
+                            st.markdown(
+                                FragmentCache.get('coupe_temps_initial', order, self.CARD_TEMPLATE_VERSION,
+                                                  lambda: self._build_temps_initial_html(order)),
+                                unsafe_allow_html=True)
 
                         elif order['statut_coupe'] == 'En cours':
                             # COUPE EN COURS - afficher le chrono EN DIRECT
@@ -441,7 +395,7 @@ class ChefCoupePage:
                             st.markdown(f"**{status_text}**")
 
                             # Afficher les pauses
-                            pause_info = self.utils.get_pause_info(order)
+                            pause_info = self.utils.get_pause_info(order, chrono['pause_coupe'])
                             if pause_info:
                                 st.markdown(f'<div class="pause-info">{pause_info}</div>', unsafe_allow_html=True)
 
@@ -452,8 +406,7 @@ class ChefCoupePage:
                     with col_actions:
                         # Si c'est un retour à la coupe
                         if is_retour_coupe:
-                            quality_details = self.utils.get_quality_details(order)
-                            quantite_a_reproduire = quality_details['retravailler']
+                            quantite_a_reproduire = body['a_reproduire']
 
                             # Afficher les temps précédents
                             col_temps1, col_temps2 = st.columns(2)
@@ -491,11 +444,11 @@ class ChefCoupePage:
                                                                     statut_controle='Contrôle partiel',
                                                                     coupe_en_pause=False,
                                                                     temps_recoupe=0,
-                                                                    date_debut_recoupe=datetime.now(),
+                                                                    date_debut_recoupe=ServerClock.now(),
                                                                     date_derniere_pause=None,
                                                                     nombre_recoupe=nouveau_nombre,
                                                                     quantite=quantite_a_reproduire,
-                                                                    date_derniere_maj_coupe=datetime.now()):
+                                                                    date_derniere_maj_coupe=ServerClock.now()):
                                         st.success(
                                             f"▶️ Recoupe #{nouveau_nombre} démarrée!")
                                         time.sleep(1.5)
@@ -509,8 +462,8 @@ class ChefCoupePage:
                                          type="primary"):
                                 if self.db_manager.update_order(order['of'],
                                                                 statut_coupe='En cours',
-                                                                date_debut_coupe=datetime.now(),
-                                                                date_derniere_maj_coupe=datetime.now()):
+                                                                date_debut_coupe=ServerClock.now(),
+                                                                date_derniere_maj_coupe=ServerClock.now()):
                                     st.rerun()
 
                         elif order['statut_coupe'] == 'En cours':
@@ -519,12 +472,12 @@ class ChefCoupePage:
                                 if order.get('coupe_en_pause'):
                                     if st.button("▶️ Reprendre", key=f"resume_{order['of']}", use_container_width=True,
                                                  type="primary"):
-                                        total_pause = self.utils.calculate_pause_duration(order, 'coupe')
+                                        total_pause = chrono['pause_coupe']
                                         if self.db_manager.update_order(order['of'],
                                                                         coupe_en_pause=False,
                                                                         duree_totale_pause=total_pause,
                                                                         date_derniere_pause=None,
-                                                                        date_derniere_maj_coupe=datetime.now()):
+                                                                        date_derniere_maj_coupe=ServerClock.now()):
                                             st.rerun()
                                 else:
                                     if st.button("⏸️ Pause", key=f"pause_{order['of']}", use_container_width=True):
@@ -532,8 +485,8 @@ class ChefCoupePage:
                                                                         coupe_en_pause=True,
                                                                         temps_coupe_avant_pause=order.get('temps_coupe',
                                                                                                           0),
-                                                                        date_derniere_pause=datetime.now(),
-                                                                        date_derniere_maj_coupe=datetime.now()):
+                                                                        date_derniere_pause=ServerClock.now(),
+                                                                        date_derniere_maj_coupe=ServerClock.now()):
                                             st.rerun()
                             with col_btn2:
                                 if not order.get('coupe_en_pause'):
@@ -541,9 +494,9 @@ class ChefCoupePage:
                                                  type="primary"):
                                         if self.db_manager.update_order(order['of'],
                                                                         statut_coupe='Terminée',
-                                                                        date_fin_coupe=datetime.now(),
+                                                                        date_fin_coupe=ServerClock.now(),
                                                                         quantite_a_controler=order['quantite'],
-                                                                        date_derniere_maj_coupe=datetime.now()):
+                                                                        date_derniere_maj_coupe=ServerClock.now()):
                                             st.success(f"✅ Coupe terminée!")
                                             time.sleep(1.5)
                                             st.rerun()
@@ -579,6 +532,93 @@ class ChefCoupePage:
                     else:
                         st.metric("🔧 Retours", "0")
 
+    def _build_card_body(self, order: Dict, is_retour_coupe: bool, consignes_coupe: str,
+                         emport_piece: str) -> Dict:
+        """Parties d'une carte OF qui ne dépendent pas des chronomètres"""
+        quality_details = self.utils.get_quality_details(order)
+        quantite_retravailler = quality_details['retravailler']
+
+        body = {
+            'header': self._build_card_header_html(order, is_retour_coupe, quantite_retravailler),
+            'infos': f"**Quantité:** {order['quantite']} | **Coloris:** {order['coloris']} | **Matière:** {order['matiere']}",
+            'consignes': ''.join(self._build_consigne_html(title, text) for title, text in
+                                 (("📋 CONSIGNES DE COUPE", consignes_coupe), ("📦 IMPORT DE PIÈCE", emport_piece))
+                                 if text),
+            'a_reproduire': quantite_retravailler,
+        }
+
+        if is_retour_coupe:
+            body['retour_details'] = f"""
+            **Analyse qualité précédente:**
+            - Total contrôlé: {order.get('quantite_controlee', 0)}/{order['quantite']} paires
+            - ✅ Acceptées: {quality_details['acceptee']} paires ({quality_details['acceptee_pourcentage']:.1f}%)
+            - ❌ Rejetées: {quality_details['rejetee']} paires (définitives - {quality_details['rejetee_pourcentage']:.1f}%)
+            - 🔧 À retravailler: {quantite_retravailler} paires ({quality_details['retravailler_pourcentage']:.1f}%)
+            """
+            body['nouvelle_production'] = f"**Nouvelle production:** {quantite_retravailler} paires à reproduire"
+        return body
+
+    @staticmethod
+    def _build_consigne_html(title: str, text: str) -> str:
+        """Encadré d'une consigne du modèle (coupe ou import de pièce)"""
+        return f"""
+        <div style="border: 2px solid #3B82F6; 
+                    border-radius: 6px; 
+                    padding: 10px; 
+                    background: linear-gradient(135deg, #EFF6FF 0%, #DBEAFE 100%);
+                    margin: 8px 0;">
+            <div style="font-weight: 700; color: #0C3B82; font-size: 0.95rem; margin-bottom: 8px;">
+                {title}
+            </div>
+            <div style="color: #1E40AF; font-size: 0.85rem; line-height: 1.5;">
+                {text}
+            </div>
+        </div>
+        """
+
+    def _build_card_header_html(self, order: Dict, is_retour_coupe: bool, quantite_retravailler: int) -> str:
+        """En-tête HTML d'une carte OF (hors chronomètre)"""
+        if is_retour_coupe:
+            title = f"<strong>🔧 RETOUR À LA COUPE - OF:</strong> <code>{order['of']}</code>"
+        else:
+            title = f"<strong>OF:</strong> <code>{order['of']}</code>"
+
+        html = f"""
+        <div style="margin-bottom: 8px;">
+            <div style="margin-bottom: 6px;">{title}</div>
+            <div><strong>Modèle:</strong> {order['modele']} - {order['couleur_modele']}</div>
+        </div>
+        """
+
+        if is_retour_coupe:
+            html += f"""
+            <div style="background: linear-gradient(135deg, #FEF3C7 0%, #FDE68A 100%); 
+                        padding: 10px; 
+                        border-radius: 8px; 
+                        border-left: 4px solid #F59E0B;
+                        margin: 10px 0;">
+                <div style="display: flex; align-items: center; gap: 8px;">
+                    <span style="font-size: 1.2rem;">🔧</span>
+                    <span style="font-weight: 700; color: #92400E;">
+                        QUANTITÉ À RETRAVAILLER: {quantite_retravailler} paires
+                    </span>
+                </div>
+                <div style="color: #92400E; font-size: 0.85rem; margin-top: 5px;">
+                    ⏸️ Compteur en pause
+                </div>
+            </div>
+            """
+        return html
+
+    def _build_temps_initial_html(self, order: Dict) -> str:
+        """Encadré du temps de coupe initial (retours qualité)"""
+        return f"""
+        <div style="background: #F3F4F6; padding: 8px; border-radius: 6px; margin-top: 10px; text-align: center;">
+            <div style="font-size: 0.85rem; color: #6B7280;">Temps coupe initial</div>
+            <div style="font-weight: 700; color: #1F2937;">{self.utils.format_time(order.get('temps_coupe', 0))}</div>
+        </div>
+        """
+
     def _render_sur_consommation_section(self, orders: List[Dict]):
         """Affiche une section séparée pour gérer la sur-consommation"""
         st.markdown('<div class="section-header">📦 Gestion de la Sur-consommation</div>', unsafe_allow_html=True)
@@ -3,13 +3,19 @@ import streamlit as st
 from streamlit_autorefresh import st_autorefresh
 import time
 from datetime import datetime, timedelta
+from clock import ServerClock
 from database import DatabaseManager, Utils
+from render_profiler import section
+from fragment_cache import FragmentCache, business_version
 from typing import List, Dict, Optional
 
 
 class ChefPiqurePage:
     """Page chef piqûre - Gestion des opérations de piqûre"""
 
+    # Incrémenter si l'en-tête des cartes change
+    CARD_TEMPLATE_VERSION = 1
+
     def __init__(self, db_manager: DatabaseManager):
         self.db_manager = db_manager
         self.utils = Utils()
@@ -24,7 +30,8 @@ class ChefPiqurePage:
         st.markdown('<div class="sub-header">Gestion des Opérations de Piqûre • Suivi en temps réel</div>',
                     unsafe_allow_html=True)
 
-        self.db_manager.update_all_timers()
+        with section("update_all_timers"):
+            self.db_manager.update_all_timers()
 
         if 'last_activity' in st.session_state:
             if datetime.now() - st.session_state.last_activity > timedelta(minutes=30):
@@ -35,7 +42,8 @@ class ChefPiqurePage:
                 st.session_state.last_activity = datetime.now()
 
         # Récupérer TOUS les ordres
-        orders = self.db_manager.get_all_orders()
+        with section("get_all_orders"):
+            orders = self.db_manager.get_all_orders()
 
         # Filtrer les OF éligibles pour la piqûre
         of_prets_piqure = []
@@ -116,10 +124,12 @@ class ChefPiqurePage:
         tab1, tab2 = st.tabs(["🪡 Démarrer Piqûre", "⏱️ Gestion en cours"])
 
         with tab1:
-            self._render_start_piqure(of_prets_piqure)
+            with section("demarrer_piqure"):
+                self._render_start_piqure(of_prets_piqure)
 
         with tab2:
-            self._render_manage_piqure(of_en_piqure)
+            with section("gestion_piqure"):
+                self._render_manage_piqure(of_en_piqure)
 
     # MODIFICATION dans chef_piqure_page.py - Méthode _render_start_piqure
 
@@ -328,17 +338,21 @@ class ChefPiqurePage:
             st.info("🎉 Aucune piqûre en cours!")
             return
 
+        # Pauses des seuls chronos en direct (piqûres en cours), avec une même heure de référence
+        chronos = self.utils.chrono_fields([o for o in of_en_piqure if o.get('statut_piqure') == 'En cours'])
+
         for order in of_en_piqure:
+            chrono = chronos.get(order['of'])
             with st.container():
                 st.markdown('<div class="info-card">', unsafe_allow_html=True)
 
                 col_info, col_timer, col_actions = st.columns([2.5, 2.5, 1.5])
 
                 with col_info:
-                    st.markdown(f"**OF:** `{order['of']}`")
-                    st.markdown(f"**Modèle:** {order['modele']} - {order['couleur_modele']}")
-                    st.markdown(
-                        f"**Quantité:** {order['quantite']} | **Piqueur:** {order.get('matricule_piqueur', 'N/A')}")
+                    # En-tête de carte (mémorisé par version métier : les chronomètres ne le reconstruisent pas)
+                    st.markdown(FragmentCache.get('piqure_card_header', order, self.CARD_TEMPLATE_VERSION,
+                                                  lambda: self._build_card_header(order),
+                                                  version=business_version(order)))
 
                     if order.get('observation_piqure'):
                         with st.expander("📝 Observations"):
@@ -363,7 +377,7 @@ class ChefPiqurePage:
                         st.markdown(f"**{status_text}**")
 
                         # Afficher les pauses
-                        pause_info = self.utils.get_pause_info_piqure(order)
+                        pause_info = self.utils.get_pause_info_piqure(order, chrono['pause_piqure'])
                         if pause_info:
                             st.markdown(f'<div class="pause-info">{pause_info}</div>', unsafe_allow_html=True)
 
@@ -377,8 +391,8 @@ class ChefPiqurePage:
                                      type="primary"):
                             if self.db_manager.update_order(order['of'],
                                                             statut_piqure='En cours',
-                                                            date_debut_piqure=datetime.now(),
-                                                            date_derniere_maj_piqure=datetime.now()):
+                                                            date_debut_piqure=ServerClock.now(),
+                                                            date_derniere_maj_piqure=ServerClock.now()):
                                 st.rerun()
 
                     elif order.get('statut_piqure') == 'En cours':
@@ -388,12 +402,12 @@ class ChefPiqurePage:
                                 if st.button("▶️ Reprendre", key=f"resume_piqure_{order['of']}",
                                              use_container_width=True,
                                              type="primary"):
-                                    total_pause = self.utils.calculate_pause_duration(order, 'piqure')
+                                    total_pause = chrono['pause_piqure']
                                     if self.db_manager.update_order(order['of'],
                                                                     piqure_en_pause=False,
                                                                     duree_totale_pause_piqure=total_pause,
                                                                     date_derniere_pause_piqure=None,
-                                                                    date_derniere_maj_piqure=datetime.now()):
+                                                                    date_derniere_maj_piqure=ServerClock.now()):
                                         st.rerun()
                             else:
                                 if st.button("⏸️ Pause", key=f"pause_piqure_{order['of']}", use_container_width=True):
@@ -401,8 +415,8 @@ class ChefPiqurePage:
                                                                     piqure_en_pause=True,
                                                                     temps_piqure_avant_pause=order.get('temps_piqure',
                                                                                                        0),
-                                                                    date_derniere_pause_piqure=datetime.now(),
-                                                                    date_derniere_maj_piqure=datetime.now()):
+                                                                    date_derniere_pause_piqure=ServerClock.now(),
+                                                                    date_derniere_maj_piqure=ServerClock.now()):
                                         st.rerun()
                         with col_btn2:
                             if not order.get('piqure_en_pause'):
@@ -410,11 +424,17 @@ class ChefPiqurePage:
                                              type="primary"):
                                     if self.db_manager.update_order(order['of'],
                                                                     statut_piqure='Terminée',
-                                                                    date_fin_piqure=datetime.now(),
-                                                                    date_derniere_maj_piqure=datetime.now()):
+                                                                    date_fin_piqure=ServerClock.now(),
+                                                                    date_derniere_maj_piqure=ServerClock.now()):
                                         st.success(f"✅ Piqûre terminée!")
                                         time.sleep(1.5)
                                         st.rerun()
 
                 st.markdown('</div>', unsafe_allow_html=True)
-                st.divider()
\ No newline at end of file
+                st.divider()
+
+    def _build_card_header(self, order: Dict) -> str:
+        """En-tête Markdown d'une carte piqûre (hors chronomètre)"""
+        return (f"**OF:** `{order['of']}`  \n"
+                f"**Modèle:** {order['modele']} - {order['couleur_modele']}  \n"
+                f"**Quantité:** {order['quantite']} | **Piqueur:** {order.get('matricule_piqueur', 'N/A')}")
\ No newline at end of file
@@ -0,0 +1,86 @@
+# clock.py - Horloge de référence : heure du serveur de base de données vue de l'application
+#
+# Les chronomètres (update_all_timers, pause/reprise du contrôle) et les durées affichées
+# (Utils, DualChronoUtils) calculent tous leurs écarts avec ServerClock.now() : l'heure
+# locale corrigée du décalage avec NOW() du serveur. Plus de SELECT TIMESTAMPDIFF(..., NOW())
+# par ligne, et plus de saut d'affichage quand l'horloge du poste et celle du serveur
+# divergent. Le décalage est mesuré au plus une fois par Config.CLOCK_SYNC_INTERVAL_S pour
+# tout le processus, sur une connexion au primaire (jamais sur la réplique).
+#
+# Heures au millième, comme les colonnes de référence des chronomètres (DATETIME(3),
+# migration 5). Un passage crédite les secondes entières écoulées et n'avance la référence
+# que d'autant (split_elapsed) : le reste fractionnaire est reporté au passage suivant, les
+# totaux ne dérivent donc pas quelle que soit la fréquence des passages
+# (vérification : python -m benchmarks.chrono_drift).
+import logging
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Tuple
+
+from app_logging import get_logger, log_event
+
+logger = get_logger('clock')
+
+
+class ServerClock:
+    """Décalage serveur - application partagé par toutes les sessions du processus"""
+
+    _lock = threading.Lock()
+    _synced_at = float('-inf')
+    _offset = timedelta(0)  # NOW() du serveur - datetime.now() local
+
+    # Renseigné depuis Config par DatabaseManager
+    sync_interval_s = 300.0
+
+    @classmethod
+    def configure(cls, sync_interval_s: float):
+        cls.sync_interval_s = sync_interval_s
+
+    @classmethod
+    def now(cls) -> datetime:
+        """Heure courante du serveur au millième (heure locale tant qu'aucune mesure n'a abouti)"""
+        now = datetime.now() + cls._offset
+        return now.replace(microsecond=now.microsecond // 1000 * 1000)
+
+    @classmethod
+    def sync(cls, cursor):
+        """Mesure le décalage sur ce curseur si la dernière mesure a expiré"""
+        if time.monotonic() - cls._synced_at < cls.sync_interval_s:
+            return
+
+        with cls._lock:
+            # Une seule session mesure ; les autres gardent le décalage précédent
+            if time.monotonic() - cls._synced_at < cls.sync_interval_s:
+                return
+            try:
+                before = datetime.now()
+                cursor.execute('SELECT NOW(3) AS maintenant')
+                server = cursor.fetchone()['maintenant']
+                after = datetime.now()
+            except Exception as e:
+                log_event(logger, logging.WARNING, "Mesure de l'heure serveur impossible", erreur=str(e))
+                return
+            if isinstance(server, str):
+                server = datetime.fromisoformat(server)
+
+            # NOW(3) est tronqué au millième : milieu du millième, rapporté au milieu de l'aller-retour
+            offset = server + timedelta(microseconds=500) - (before + (after - before) / 2)
+            if abs((offset - cls._offset).total_seconds()) >= 1:
+                log_event(logger, logging.INFO, "Décalage d'horloge serveur",
+                          decalage_s=round(offset.total_seconds(), 3),
+                          aller_retour_ms=round((after - before).total_seconds() * 1000, 1))
+            cls._offset, cls._synced_at = offset, time.monotonic()
+
+    @classmethod
+    def offset_s(cls) -> float:
+        return cls._offset.total_seconds()
+
+
+def split_elapsed(since: datetime, now: datetime) -> Tuple[int, datetime]:
+    """Secondes entières écoulées depuis since et nouvelle référence (since avancée d'autant :
+    le reste fractionnaire n'est pas perdu)"""
+    seconds = int((now - since).total_seconds())
+    if seconds <= 0:
+        return 0, since
+    return seconds, since + timedelta(seconds=seconds)
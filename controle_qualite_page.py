@@ -1,11 +1,17 @@
 # pages/controle_qualite_page.py - Page contrôle qualité
+import logging
 import streamlit as st
 from streamlit_autorefresh import st_autorefresh
 import time
 from datetime import datetime, timedelta
+from app_logging import get_logger, log_event
+from clock import ServerClock
 from database import DatabaseManager, Utils
+from render_profiler import section
 from typing import Dict, List
 
+logger = get_logger('controle_qualite')
+
 
 class ControleQualitePage:
     """Page contrôle qualité"""
@@ -21,7 +27,8 @@ class ControleQualitePage:
         st.markdown('<div class="main-header">👌 Interface Contrôle Qualité</div>', unsafe_allow_html=True)
         st.markdown('<div class="sub-header">Gestion Qualité • Inspection et Validation</div>', unsafe_allow_html=True)
 
-        self.db_manager.update_all_timers()
+        with section("update_all_timers"):
+            self.db_manager.update_all_timers()
 
         if 'last_activity' in st.session_state:
             if datetime.now() - st.session_state.last_activity > timedelta(minutes=30):
@@ -31,7 +38,8 @@ class ControleQualitePage:
             else:
                 st.session_state.last_activity = datetime.now()
 
-        orders = self.db_manager.get_all_orders()
+        with section("get_all_orders"):
+            orders = self.db_manager.get_all_orders()
         of_a_controler = [o for o in orders if o['statut_coupe'] in ['En cours', 'Terminée']]
 
         if not of_a_controler:
@@ -78,19 +86,23 @@ class ControleQualitePage:
             current_order = self.db_manager.get_order_by_of(of_number)
 
             if current_order:
-                self._render_order_control(current_order)
+                with section("controle_of"):
+                    self._render_order_control(current_order)
 
     def _render_order_control(self, order: Dict):
         """Affiche le contrôle d'un ordre spécifique"""
-        # DEBUG amélioré
-        print(f"\n🎯 DEBUG CONTROLE PAGE pour OF: {order['of']}")
-        print(f"   Statut contrôle: {order['statut_controle']}")
-        print(f"   En pause: {order.get('controle_en_pause', 0)}")
-        print(f"   Temps actif total: {order.get('temps_actif_total', 0)}s")
-        print(f"   Temps pause total: {order.get('temps_pause_total', 0)}s")
-        print(f"   Ancien temps contrôle: {order.get('temps_controle', 0)}s")
-        print(f"   Date début: {order.get('date_debut_controle')}")
-        print(f"   Date dernière maj: {order.get('date_derniere_maj')}")
+        # Détail du chronomètre (niveau DEBUG, une seule ligne structurée)
+        log_event(logger, logging.DEBUG, "Contrôle affiché", of=order['of'],
+                  statut=order['statut_controle'],
+                  en_pause=order.get('controle_en_pause', 0),
+                  temps_actif_total_s=order.get('temps_actif_total', 0),
+                  temps_pause_total_s=order.get('temps_pause_total', 0),
+                  temps_controle_s=order.get('temps_controle', 0),
+                  date_debut=order.get('date_debut_controle'),
+                  date_derniere_maj=order.get('date_derniere_maj'))
+
+        # Chronomètres de contrôle (pause en cours comprise), une seule heure de référence
+        chrono = self.utils.chrono_fields([order])[order['of']]
 
         # Info OF
         col_info1, col_info2 = st.columns(2)
@@ -102,8 +114,8 @@ class ControleQualitePage:
 
         with col_info2:
             # Afficher les DEUX chronomètres dans la carte
-            temps_actif = order.get('temps_actif_total', 0) or 0
-            temps_pause = order.get('temps_pause_total', 0) or 0
+            temps_actif = chrono['actif_controle']
+            temps_pause = chrono['pause_controle']
 
             st.markdown(
                 f"<div class='info-card'><h4>⏱️ Chronomètres</h4>"
@@ -153,7 +165,7 @@ class ControleQualitePage:
         if statut_controle == 'En attente':
             self._render_start_control(order)
         elif statut_controle == 'En cours':
-            self._render_ongoing_control(order)
+            self._render_ongoing_control(order, chrono)
         else:
             self._render_finished_control(order)
 
@@ -186,20 +198,16 @@ class ControleQualitePage:
                     time.sleep(1)
                     st.rerun()
 
-    def _render_ongoing_control(self, order: Dict):
-        """Affiche le contrôle en cours avec DEUX chronomètres indépendants"""
+    def _render_ongoing_control(self, order: Dict, chrono: Dict):
+        """Affiche le contrôle en cours avec DEUX chronomètres indépendants (chrono : Utils.chrono_fields)"""
         st.markdown('<div class="quality-control-section"><h4>🔄 Contrôle en Cours</h4></div>',
                     unsafe_allow_html=True)
 
         # Afficher les DEUX chronomètres
-        temps_actif = order.get('temps_actif_total', 0) or 0
-        temps_pause = order.get('temps_pause_total', 0) or 0
+        temps_actif = chrono['actif_controle']
+        temps_pause = chrono['pause_controle']
         en_pause = order.get('controle_en_pause', False)
 
-        # Convertir en int
-        temps_actif = int(temps_actif) if temps_actif is not None else 0
-        temps_pause = int(temps_pause) if temps_pause is not None else 0
-
         col_chrono1, col_chrono2 = st.columns(2)
 
         with col_chrono1:
@@ -425,7 +433,7 @@ class ControleQualitePage:
                              key=f"continue_{order['of']}"):
                     if self.db_manager.update_order(order['of'],
                                                     statut_controle='En cours',
-                                                    date_debut_controle=datetime.now(),
+                                                    date_debut_controle=ServerClock.now(),
                                                     quantite_a_controler=quantite_controlee + quantite_a_ajouter):
                         st.success(f"✅ Contrôle repris pour {quantite_a_ajouter} paires!")
                         time.sleep(1)
@@ -508,7 +516,7 @@ class ControleQualitePage:
                             update_data['statut_controle'] = 'Approuvé avec recoupe ✅'
                         else:
                             update_data['statut_controle'] = 'Approuvé ✅'
-                        update_data['date_fin_controle'] = datetime.now()
+                        update_data['date_fin_controle'] = ServerClock.now()
                         st.success("✅ Contrôle COMPLET terminé avec SUCCÈS!")
                 else:
                     update_data['statut_controle'] = 'Contrôle partiel'
@@ -1,10 +1,23 @@
 # database.py - Classes liées à la base de données
 from datetime import datetime, timedelta
 import hashlib
-from typing import Optional, List, Dict, Any
-import pymysql
-from pymysql.cursors import DictCursor
+import threading
+from typing import Optional, List, Dict, Any, Iterator, Tuple
+import time
+import logging
 import streamlit as st
+from app_logging import AppLogging, TickSummary, get_logger, log_event
+from archive import archive_query, history_query, move_orders
+from backends import create_backend, create_replica
+from clock import ServerClock, split_elapsed
+from fragment_cache import CHRONO_COLUMNS
+from migrations import MIGRATIONS
+from order_record import OrderRecord, column_index, to_records
+from query_stats import InstrumentedDictCursor, QueryStats
+from replica import ReplicaMonitor
+from write_queue import WriteQueue
+
+logger = get_logger('database')
 
 class Config:
     """Configuration de l'application"""
@@ -26,11 +39,62 @@ class Config:
         'password': '1234',
         'port': 3306,
         'charset': 'utf8mb4',
-        'cursorclass': DictCursor
+        'cursorclass': InstrumentedDictCursor
     }
 
     DATABASE_NAME = 'usine_chaussures'
 
+    # Moteur de stockage (voir backends.py ; REPETTO_BACKEND / REPETTO_SQLITE_PATH prioritaires) :
+    # 'mysql' (serveur DB_CONFIG) ou 'sqlite' (fichier local en mode WAL, poste unique)
+    STORAGE_BACKEND = 'mysql'
+    SQLITE_PATH = 'data/usine_chaussures.db'
+    SQLITE_BUSY_TIMEOUT = 10  # secondes d'attente quand un autre rédacteur tient la base
+
+    # Thème servi par Streamlit depuis static/ (voir .streamlit/config.toml)
+    THEME_STATIC_SERVING = True
+
+    # Attente maximale (s) du verrou consultatif pendant les migrations
+    SCHEMA_LOCK_TIMEOUT = 30
+
+    # Réplique MySQL en lecture (voir replica.py) : paramètres remplaçant ceux de DB_CONFIG,
+    # ex. {'host': '192.168.1.211'} ; None = tout sur le primaire (REPETTO_REPLICA_HOST prioritaire)
+    READ_REPLICA = None
+    REPLICA_MAX_LAG_S = 5  # au-delà, les lectures repartent sur le primaire
+    REPLICA_LAG_CHECK_S = 10  # intervalle de mesure du retard
+    READ_YOUR_WRITES_S = 10  # la session qui vient d'écrire lit le primaire pendant ce délai
+
+    # File d'écriture hors ligne des actions d'atelier (voir write_queue.py)
+    WRITE_QUEUE_PATH = 'data/write_queue.jsonl'
+    WRITE_QUEUE_RETRY_S = 5  # délai avant de retenter le serveur après un échec
+    WRITE_QUEUE_BATCH_SIZE = 200  # actions rejouées par transaction
+    WRITE_QUEUE_KEY_RETENTION_DAYS = 30  # conservation des clés d'idempotence (> durée d'une coupure)
+    WRITE_QUEUE_KEY_PURGE_S = 3600  # intervalle minimal entre deux purges des clés expirées
+
+    # Heure de référence des chronomètres (voir clock.py) : mesure du décalage avec le serveur
+    CLOCK_SYNC_INTERVAL_S = 300
+
+    # Archivage des OF terminés (voir archive.py)
+    ARCHIVE_AFTER_DAYS = 90  # ancienneté de la fin de piqûre avant archivage
+    ARCHIVE_BATCH_SIZE = 200  # OF déplacés par transaction
+
+    # Instrumentation des requêtes (voir query_stats.py)
+    QUERY_STATS_ENABLED = True
+    SLOW_QUERY_THRESHOLD_MS = 500
+    SLOW_QUERY_LOG = 'logs/slow_queries.log'
+
+    # Profilage des rendus (voir render_profiler.py, aussi activable par ?profile=1)
+    RENDER_PROFILER = False
+
+    # Journalisation (voir app_logging.py ; REPETTO_LOG_LEVEL / REPETTO_LOG_FORMAT prioritaires)
+    LOG_LEVEL = 'INFO'
+    LOG_FORMAT = 'text'  # 'json' pour l'expédition des journaux
+
+    # Exports en arrière-plan (voir export_jobs.py)
+    EXPORT_WORKERS = 2
+    EXPORT_CACHE_DIR = 'exports_cache'
+    EXPORT_CACHE_MAX_AGE = 7 * 24 * 3600  # secondes
+    STREAM_CHUNK_SIZE = 1000  # lignes lues par fetchmany() dans les parcours en flux (historiques, exports)
+
     @staticmethod
     def init_session_state():
         """Initialise l'état de la session"""
@@ -48,58 +112,89 @@ class Config:
 class DatabaseManager:
 
     """Gestionnaire de base de données"""
+
+    # Partagés par toutes les sessions du processus Streamlit
+    _schema_ready = False
+    _schema_lock = threading.Lock()
+
+    # Actions d'atelier tolérantes aux coupures : nom -> (méthode d'application, libellé, erreur affichée)
+    _WRITE_ACTIONS = {
+        'update_order': ('_apply_update_order', "mise à jour", True),
+        'toggle_controle_pause': ('_apply_toggle_controle_pause', "toggle pause", False),
+        'start_controle': ('_apply_start_controle', "démarrage contrôle", False),
+        'update_coupe_timestamp': ('_apply_update_coupe_timestamp', "update timestamp coupe", False),
+        'start_piqure': ('_apply_start_piqure', "démarrage piqûre", True),
+    }
+
     def __init__(self):
         self.config = Config.DB_CONFIG.copy()
         self.database_name = Config.DATABASE_NAME
+        self.backend = create_backend(Config.STORAGE_BACKEND, self.config, self.database_name,
+                                      Config.SQLITE_PATH, Config.SQLITE_BUSY_TIMEOUT)
+        self.replica = create_replica(self.backend, Config.READ_REPLICA)
+        ReplicaMonitor.configure(Config.REPLICA_MAX_LAG_S, Config.REPLICA_LAG_CHECK_S)
+        ServerClock.configure(Config.CLOCK_SYNC_INTERVAL_S)
+        # Lecture-après-écriture : échéance conservée dans la session (un DatabaseManager par rerun)
+        try:
+            self._primary_until = st.session_state.get('primary_reads_until', 0.0)
+        except Exception:
+            self._primary_until = 0.0
+        QueryStats.configure(Config.QUERY_STATS_ENABLED, Config.SLOW_QUERY_THRESHOLD_MS, Config.SLOW_QUERY_LOG)
+        AppLogging.configure(Config.LOG_LEVEL, Config.LOG_FORMAT)
+        WriteQueue.configure(Config.WRITE_QUEUE_PATH, Config.WRITE_QUEUE_RETRY_S, Config.WRITE_QUEUE_KEY_PURGE_S)
 
     def create_database_if_not_exists(self) -> bool:
         """Crée la base de données si elle n'existe pas"""
         try:
-            conn = pymysql.connect(
-                host=self.config['host'],
-                user=self.config['user'],
-                password=self.config['password'],
-                port=self.config['port'],
-                charset=self.config['charset']
-            )
-
-            with conn.cursor() as cursor:
-                cursor.execute(f"CREATE DATABASE IF NOT EXISTS {self.database_name}")
-                cursor.execute(f"USE {self.database_name}")
-
-            conn.commit()
-            conn.close()
+            self.backend.create_database()
             return True
         except Exception as e:
             import streamlit as st
             st.error(f"❌ Erreur création base: {e}")
             return False
 
-    def get_connection(self):
-        """Crée une connexion à la base de données MySQL"""
+    def _open_connection(self, read_only: bool = False):
+        """Ouvre une connexion sur le moteur configuré (lève l'erreur du pilote)"""
+        start = time.perf_counter()
+        conn = self._connect_for_read() if read_only else self.backend.connect()
+        # Attente de connexion, imputée à la première requête (voir query_stats.py)
+        conn.connect_wait_ms = (time.perf_counter() - start) * 1000
+        QueryStats.record_connection()
+        return conn
+
+    def _connect_for_read(self):
+        """Connexion de lecture : réplique si elle suit, sinon primaire"""
+        use_replica = (self.replica is not None and time.monotonic() >= self._primary_until
+                       and ReplicaMonitor.usable(self.replica))
+        if use_replica:
+            try:
+                conn = self.replica.connect()
+                ReplicaMonitor.record_read(True)
+                return conn
+            except Exception as e:
+                ReplicaMonitor.mark_unreachable(e)
+        if self.replica is not None:
+            ReplicaMonitor.record_read(False)
+        return self.backend.connect()
+
+    def _pin_primary(self):
+        """La session vient d'écrire : ses lectures vont au primaire pendant READ_YOUR_WRITES_S"""
+        if self.replica is None:
+            return
+        self._primary_until = time.monotonic() + Config.READ_YOUR_WRITES_S
         try:
-            config_with_db = self.config.copy()
-            config_with_db['database'] = self.database_name
-            conn = pymysql.connect(**config_with_db)
-            return conn
-        except pymysql.err.OperationalError as e:
-            import streamlit as st
-            if "Unknown database" in str(e):
-                if self.create_database_if_not_exists():
-                    try:
-                        config_with_db = self.config.copy()
-                        config_with_db['database'] = self.database_name
-                        conn = pymysql.connect(**config_with_db)
-                        return conn
-                    except Exception as e2:
-                        st.error(f"❌ Erreur après création: {e2}")
-                        return None
-            else:
-                st.error(f"❌ Erreur connexion: {e}")
-                return None
+            st.session_state['primary_reads_until'] = self._primary_until
+        except Exception:
+            pass  # hors session (thread d'export, benchmarks)
+
+    def get_connection(self, read_only: bool = False):
+        """Ouvre une connexion sur le moteur configuré (MySQL ou SQLite) ;
+        read_only : lecture pouvant être servie par la réplique"""
+        try:
+            return self._open_connection(read_only)
         except Exception as e:
             import streamlit as st
-            st.error(f"❌ Erreur inattendue: {e}")
+            st.error(f"❌ Erreur connexion ({self.backend.describe()}): {e}")
             return None
 
     def hash_password(self, password: str) -> str:
@@ -135,255 +230,82 @@ class DatabaseManager:
             conn.close()
 
     def init_database(self) -> bool:
-        """Initialise les tables MySQL avec une structure logique"""
-        if not self.create_database_if_not_exists():
-            return False
+        """Initialise les tables MySQL (applique les migrations en attente)"""
+        return self.run_migrations()
 
+    def ensure_schema(self) -> bool:
+        """Vérifie le schéma une seule fois par processus"""
+        if DatabaseManager._schema_ready:
+            return True
+
+        with DatabaseManager._schema_lock:
+            if not DatabaseManager._schema_ready:
+                DatabaseManager._schema_ready = self.run_migrations()
+        return DatabaseManager._schema_ready
+
+    def get_schema_version(self) -> int:
+        """Retourne la version du schéma appliquée (0 si aucune)"""
         conn = self.get_connection()
         if conn is None:
-            return False
+            return 0
 
         try:
             with conn.cursor() as cursor:
-                # ===== TABLE 1: UTILISATEURS =====
-                cursor.execute('''
-                        CREATE TABLE IF NOT EXISTS users (
-                            id INT PRIMARY KEY AUTO_INCREMENT,
-                            username VARCHAR(50) UNIQUE NOT NULL,
-                            password VARCHAR(100) NOT NULL,
-                            role VARCHAR(50) NOT NULL,
-                            name VARCHAR(100) NOT NULL,
-                            active BOOLEAN DEFAULT TRUE,
-                            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                        )
-                    ''')
-
-                # ===== TABLE 2: ORDRES DE FABRICATION (Header) =====
-                cursor.execute('''
-                               CREATE TABLE IF NOT EXISTS ordres_fabrication
-                               (
-                                   id
-                                   INT
-                                   PRIMARY
-                                   KEY
-                                   AUTO_INCREMENT,
-                                   of
-                                   VARCHAR
-                               (
-                                   50
-                               ) UNIQUE NOT NULL,
-                                   modele VARCHAR
-                               (
-                                   100
-                               ) NOT NULL,
-                                   code_modele VARCHAR
-                               (
-                                   50
-                               ),
-                                   couleur_modele VARCHAR
-                               (
-                                   50
-                               ) NOT NULL,
-                                   quantite INT NOT NULL,
-                                   observation TEXT,
-                                   date_creation DATETIME DEFAULT CURRENT_TIMESTAMP,
-                                   date_fin_prevue DATETIME,
-                                   statut VARCHAR
-                               (
-                                   50
-                               ) DEFAULT 'En attente',
-                                   derniere_mise_a_jour TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
-                                   )
-                               ''')
-                # ===== TABLE 3: DETAILS DE COUPE =====
-                cursor.execute('''
-                    CREATE TABLE IF NOT EXISTS details_coupe (
-                        id INT PRIMARY KEY AUTO_INCREMENT,
-                        of_id VARCHAR(50) NOT NULL,
-                        coloris VARCHAR(50) NOT NULL,
-                        matiere VARCHAR(50) NOT NULL,
-                        matricule_coupeur VARCHAR(50) NOT NULL,
-                        consommation DECIMAL(10,2) DEFAULT 0,
-                        sur_consommation DECIMAL(10,2) DEFAULT 0,
-                        observation TEXT,
-                        statut_coupe VARCHAR(50) DEFAULT 'En attente',
-                        date_debut_coupe DATETIME,
-                        date_fin_coupe DATETIME,
-                        temps_coupe INT DEFAULT 0,
-
-                        # ===== NOUVELLES COLONNES POUR RECOUPE =====
-                        temps_recoupe INT DEFAULT 0,
-                        date_debut_recoupe DATETIME,
-                        nombre_recoupe INT DEFAULT 0,
-
-                        coupe_en_pause BOOLEAN DEFAULT FALSE,
-                        temps_coupe_avant_pause INT DEFAULT 0,
-                        date_derniere_pause DATETIME,
-                        duree_totale_pause INT DEFAULT 0,
-
-                        # ===== NOUVELLE COLONNE POUR SUIVI TEMPS =====
-                        date_derniere_maj_coupe DATETIME DEFAULT CURRENT_TIMESTAMP,
-
-                        FOREIGN KEY (of_id) REFERENCES ordres_fabrication(of) ON DELETE CASCADE,
-                        UNIQUE KEY unique_of_coupe (of_id),
-                        derniere_mise_a_jour TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
-                    )
-                ''')
-                # ===== TABLE 4: DETAILS DE CONTROLE =====
-                cursor.execute('''
-                    CREATE TABLE IF NOT EXISTS details_controle (
-                        id INT PRIMARY KEY AUTO_INCREMENT,
-                        of_id VARCHAR(50) NOT NULL,
-                        statut_controle VARCHAR(50) DEFAULT 'En attente',
-                        date_debut_controle DATETIME,
-                        date_fin_controle DATETIME,
-
-                        # ===== DEUX CHRONOMÈTRES INDÉPENDANTS =====
-                        temps_actif_total INT DEFAULT 0,          # Chrono 1: Temps actif de production (s'arrête en pause)
-                        temps_pause_total INT DEFAULT 0,          # Chrono 2: Temps de pause (s'incrémente seulement en pause)
-
-                        # Pour maintenir la compatibilité temporairement
-                        temps_controle INT DEFAULT 0,             # Ancien temps total (déprécié)
-
-                        # Informations de contrôle
-                        quantite_a_controler INT DEFAULT 0,
-                        quantite_controlee INT DEFAULT 0,
-                        quantite_acceptee INT DEFAULT 0,
-                        quantite_rejetee INT DEFAULT 0,
-                        quantite_retravailler INT DEFAULT 0,
-                        observation_controle TEXT,
-
-                        # État du contrôle
-                        controle_en_pause BOOLEAN DEFAULT FALSE,
-                        date_derniere_maj DATETIME DEFAULT CURRENT_TIMESTAMP,  # Pour calculer l'intervalle
+                cursor.execute("SELECT COALESCE(MAX(version), 0) AS version FROM schema_version")
+                return int(cursor.fetchone()['version'])
+        except Exception:
+            return 0
+        finally:
+            conn.close()
 
-                        # Anciennes colonnes pour compatibilité
-                        temps_controle_avant_pause INT DEFAULT 0,
-                        duree_pause_controle INT DEFAULT 0,
-                        date_derniere_pause DATETIME,
-
-                        FOREIGN KEY (of_id) REFERENCES ordres_fabrication(of) ON DELETE CASCADE,
-                        UNIQUE KEY unique_of_controle (of_id),
-                        derniere_mise_a_jour TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
-                    )
-                ''')
+    def run_migrations(self) -> bool:
+        """Applique les migrations en attente sous verrou de migration du moteur"""
+        if not self.create_database_if_not_exists():
+            return False
 
-                cursor.execute('''
-                               CREATE TABLE IF NOT EXISTS details_piqure
-                               (
-                                   id
-                                   INT
-                                   PRIMARY
-                                   KEY
-                                   AUTO_INCREMENT,
-                                   of_id
-                                   VARCHAR
-                               (
-                                   50
-                               ) NOT NULL,
-                                   matricule_piqueur VARCHAR
-                               (
-                                   50
-                               ) NOT NULL,
-                                   observation_piqure TEXT,
-                                   statut_piqure VARCHAR
-                               (
-                                   50
-                               ) DEFAULT 'En attente',
-                                   date_debut_piqure DATETIME,
-                                   date_fin_piqure DATETIME,
-                                   temps_piqure INT DEFAULT 0,
-
-                                   piqure_en_pause BOOLEAN DEFAULT FALSE,
-                                   temps_piqure_avant_pause INT DEFAULT 0,
-                                   date_derniere_pause_piqure DATETIME,
-                                   duree_totale_pause_piqure INT DEFAULT 0,
-
-                                   date_derniere_maj_piqure DATETIME DEFAULT CURRENT_TIMESTAMP,
-                                   FOREIGN KEY
-                               (
-                                   of_id
-                               ) REFERENCES ordres_fabrication
-                               (
-                                   of
-                               ) ON DELETE CASCADE,
-                                   UNIQUE KEY unique_of_piqure
-                               (
-                                   of_id
-                               ),
-                                   derniere_mise_a_jour TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                                 ON UPDATE CURRENT_TIMESTAMP
-                                   )
-                               ''')
-                # ===== TABLE 5: HISTORIQUE DES CHANGEMENTS =====
-                cursor.execute('''
-                        CREATE TABLE IF NOT EXISTS historique_changements (
-                            id INT PRIMARY KEY AUTO_INCREMENT,
-                            of_id VARCHAR(50) NOT NULL,
-                            type_operation VARCHAR(50) NOT NULL,
-                            ancien_statut VARCHAR(50),
-                            nouveau_statut VARCHAR(50),
-                            description TEXT,
-                            utilisateur_id INT,
-                            date_changement DATETIME DEFAULT CURRENT_TIMESTAMP,
-                            FOREIGN KEY (of_id) REFERENCES ordres_fabrication(of) ON DELETE CASCADE,
-                            FOREIGN KEY (utilisateur_id) REFERENCES users(id) ON DELETE SET NULL,
-                            INDEX idx_of_date (of_id, date_changement)
-                        )
-                    ''')
+        conn = self.get_connection()
+        if conn is None:
+            return False
 
-                # ===== TABLE 6: SESSIONS PAUSE =====
-                cursor.execute('''
-                        CREATE TABLE IF NOT EXISTS sessions_pause (
-                            id INT PRIMARY KEY AUTO_INCREMENT,
-                            of_id VARCHAR(50) NOT NULL,
-                            type_pause VARCHAR(50) NOT NULL,
-                            date_debut DATETIME DEFAULT CURRENT_TIMESTAMP,
-                            date_fin DATETIME,
-                            duree_secondes INT,
-                            raison TEXT,
-                            FOREIGN KEY (of_id) REFERENCES ordres_fabrication(of) ON DELETE CASCADE,
-                            INDEX idx_of_type (of_id, type_pause)
+        try:
+            with conn.cursor() as cursor:
+                # Un seul processus migre à la fois, les autres attendent puis constatent la version
+                with self.backend.migration_lock(cursor, Config.SCHEMA_LOCK_TIMEOUT) as acquired:
+                    if not acquired:
+                        import streamlit as st
+                        st.error("❌ Verrou de migration indisponible (migration en cours ailleurs ?)")
+                        return False
+
+                    for statement in self.backend.ddl('''
+                        CREATE TABLE IF NOT EXISTS schema_version (
+                            version INT PRIMARY KEY,
+                            description VARCHAR(255) NOT NULL,
+                            date_application DATETIME DEFAULT CURRENT_TIMESTAMP
                         )
-                    ''')
-
-                # ===== TABLE 7: QUALITE DETAILS PAR SESSION =====
-                cursor.execute('''
-                        CREATE TABLE IF NOT EXISTS qualite_sessions (
-                            id INT PRIMARY KEY AUTO_INCREMENT,
-                            of_id VARCHAR(50) NOT NULL,
-                            num_session INT DEFAULT 1,
-                            quantite_controle INT DEFAULT 0,
-                            quantite_acceptee INT DEFAULT 0,
-                            quantite_rejetee INT DEFAULT 0,
-                            quantite_retravailler INT DEFAULT 0,
-                            observation TEXT,
-                            date_session DATETIME DEFAULT CURRENT_TIMESTAMP,
-                            FOREIGN KEY (of_id) REFERENCES ordres_fabrication(of) ON DELETE CASCADE,
-                            INDEX idx_of_session (of_id, num_session)
+                    '''):
+                        cursor.execute(statement)
+                    cursor.execute("SELECT COALESCE(MAX(version), 0) AS version FROM schema_version")
+                    current_version = int(cursor.fetchone()['version'])
+
+                    for migration in MIGRATIONS:
+                        if migration['version'] <= current_version:
+                            continue
+
+                        for step in migration['steps']:
+                            if callable(step):
+                                step(self, cursor)
+                            else:
+                                for statement in self.backend.ddl(step):
+                                    cursor.execute(statement)
+
+                        cursor.execute(
+                            "INSERT INTO schema_version (version, description) VALUES (%s, %s)",
+                            (migration['version'], migration['description'])
                         )
-                    ''')
-
-                # ===== INSÉRER LES UTILISATEURS PAR DÉFAUT =====
-                cursor.execute("SELECT COUNT(*) FROM users")
-                if cursor.fetchone()['COUNT(*)'] == 0:
-                    default_users = [
-                        ('chef_coupe', 'coupe123', 'Chef de Coupe', 'coupe_repetto'),
-                        ('controle', 'controle123', 'Contrôle Qualité', 'controle_repetto'),
-                        ('chef_prod', 'prod123', 'Chef de Production', 'groupe_repetto'),
-                        ('chef_piqure', 'piqure123', 'Chef de Piqûre', 'piqure_repetto')  # ← NOUVEAU
-                    ]
-                    for user in default_users:
-                        try:
-                            cursor.execute(
-                                "INSERT INTO users (username, password, role, name) VALUES (%s, %s, %s, %s)",
-                                (user[0], self.hash_password(user[1]), user[2], user[3])
-                            )
-                        except pymysql.err.IntegrityError:
-                            pass
+                        conn.commit()
+                        log_event(logger, logging.INFO, "Migration appliquée", moteur=self.backend.name,
+                                  version=migration['version'], description=migration['description'])
 
-            conn.commit()
-            print("✅ Base de données initialisée avec succès!")
             return True
         except Exception as e:
             import streamlit as st
@@ -392,82 +314,89 @@ class DatabaseManager:
         finally:
             conn.close()
 
-    def get_all_orders(self) -> List[Dict]:
-        """Récupère tous les ordres avec les données de piqûre"""
-        conn = self.get_connection()
+    # Tous les OF avec coupe, contrôle et piqûre, sans tri (get_all_orders, iter_all_orders, iter_order_history)
+    _ALL_ORDERS_QUERY = '''
+        SELECT o.id,
+               o.of,
+               o.modele,
+               o.couleur_modele,
+               o.quantite,
+               o.observation            as observation_of,
+               o.date_creation,
+               o.statut                 as statut_global,
+               o.derniere_mise_a_jour   as maj_of,
+               c.derniere_mise_a_jour   as maj_coupe,
+               ctrl.derniere_mise_a_jour as maj_controle,
+               p.derniere_mise_a_jour   as maj_piqure,
+               c.maj_donnees            as maj_donnees_coupe,
+               ctrl.maj_donnees         as maj_donnees_controle,
+
+               c.coloris,
+               c.matiere,
+               c.matricule_coupeur,
+               c.consommation,
+               c.sur_consommation,
+               c.observation            as observation_coupe,
+               c.statut_coupe,
+               c.date_debut_coupe,
+               c.date_fin_coupe,
+               c.temps_coupe,
+               c.temps_recoupe,
+               c.date_debut_recoupe,
+               c.nombre_recoupe,
+               c.coupe_en_pause,
+               c.temps_coupe_avant_pause,
+               c.date_derniere_pause    as date_pause_coupe,
+               c.duree_totale_pause,
+               c.date_derniere_maj_coupe,
+
+               ctrl.statut_controle,
+               ctrl.date_debut_controle,
+               ctrl.date_fin_controle,
+               ctrl.temps_actif_total,
+               ctrl.temps_pause_total,
+               ctrl.controle_en_pause,
+               ctrl.date_derniere_maj,
+               ctrl.temps_controle,
+               ctrl.quantite_a_controler,
+               ctrl.quantite_controlee,
+               ctrl.quantite_acceptee,
+               ctrl.quantite_rejetee,
+               ctrl.quantite_retravailler,
+               ctrl.observation_controle,
+               ctrl.temps_controle_avant_pause,
+               ctrl.duree_pause_controle,
+               ctrl.date_derniere_pause as date_pause_controle,
+
+               -- ===== NOUVELLES COLONNES PIQÛRE =====
+               p.statut_piqure,
+               p.matricule_piqueur,
+               p.date_debut_piqure,
+               p.date_fin_piqure,
+               p.temps_piqure,
+               p.piqure_en_pause,
+               p.temps_piqure_avant_pause,
+               p.date_derniere_pause_piqure,
+               p.duree_totale_pause_piqure,
+               p.observation_piqure,
+               p.date_derniere_maj_piqure
+
+        FROM ordres_fabrication o
+                 LEFT JOIN details_coupe c ON o.of = c.of_id
+                 LEFT JOIN details_controle ctrl ON o.of = ctrl.of_id
+                 LEFT JOIN details_piqure p ON o.of = p.of_id
+        '''
+
+    def get_all_orders(self) -> List[OrderRecord]:
+        """Récupère tous les ordres avec les données de piqûre (lignes compactes, voir order_record.py)"""
+        conn = self.get_connection(read_only=True)
         if conn is None:
             return []
 
         try:
-            with conn.cursor() as cursor:
-                cursor.execute('''
-                               SELECT o.id,
-                                      o.of,
-                                      o.modele,
-                                      o.couleur_modele,
-                                      o.quantite,
-                                      o.observation            as observation_of,
-                                      o.date_creation,
-                                      o.statut                 as statut_global,
-
-                                      c.coloris,
-                                      c.matiere,
-                                      c.matricule_coupeur,
-                                      c.consommation,
-                                      c.sur_consommation,
-                                      c.observation            as observation_coupe,
-                                      c.statut_coupe,
-                                      c.date_debut_coupe,
-                                      c.date_fin_coupe,
-                                      c.temps_coupe,
-                                      c.temps_recoupe,
-                                      c.date_debut_recoupe,
-                                      c.nombre_recoupe,
-                                      c.coupe_en_pause,
-                                      c.temps_coupe_avant_pause,
-                                      c.date_derniere_pause    as date_pause_coupe,
-                                      c.duree_totale_pause,
-
-                                      ctrl.statut_controle,
-                                      ctrl.date_debut_controle,
-                                      ctrl.date_fin_controle,
-                                      ctrl.temps_actif_total,
-                                      ctrl.temps_pause_total,
-                                      ctrl.controle_en_pause,
-                                      ctrl.date_derniere_maj,
-                                      ctrl.temps_controle,
-                                      ctrl.quantite_a_controler,
-                                      ctrl.quantite_controlee,
-                                      ctrl.quantite_acceptee,
-                                      ctrl.quantite_rejetee,
-                                      ctrl.quantite_retravailler,
-                                      ctrl.observation_controle,
-                                      ctrl.temps_controle_avant_pause,
-                                      ctrl.duree_pause_controle,
-                                      ctrl.date_derniere_pause as date_pause_controle,
-
-                                      -- ===== NOUVELLES COLONNES PIQÛRE =====
-                                      p.statut_piqure,
-                                      p.matricule_piqueur,
-                                      p.date_debut_piqure,
-                                      p.date_fin_piqure,
-                                      p.temps_piqure,
-                                      p.piqure_en_pause,
-                                      p.temps_piqure_avant_pause,
-                                      p.date_derniere_pause_piqure,
-                                      p.duree_totale_pause_piqure,
-                                      p.observation_piqure,
-                                      p.date_derniere_maj_piqure
-
-                               FROM ordres_fabrication o
-                                        LEFT JOIN details_coupe c ON o.of = c.of_id
-                                        LEFT JOIN details_controle ctrl ON o.of = ctrl.of_id
-                                        LEFT JOIN details_piqure p ON o.of = p.of_id
-                               ORDER BY o.date_creation DESC
-                               ''')
-
-                orders = cursor.fetchall()
-            return orders if orders else []
+            with self.backend.tuple_cursor(conn) as cursor:
+                cursor.execute(self._ALL_ORDERS_QUERY + "\nORDER BY o.date_creation DESC")
+                return to_records(cursor.description, cursor.fetchall())
         except Exception as e:
             import streamlit as st
             st.error(f"❌ Erreur lecture ordres: {e}")
@@ -475,6 +404,112 @@ class DatabaseManager:
         finally:
             conn.close()
 
+    def _iter_query(self, query: str, params=None, chunk_size: int = None, records: bool = False) -> Iterator[Dict]:
+        """Parcourt le résultat d'une lecture au fil de l'eau (curseur non bufferisé, blocs de
+        chunk_size lignes) : la mémoire reste bornée quel que soit le volume. records : lignes
+        OrderRecord au lieu de dicts.
+
+        Générateur : la connexion s'ouvre à la première ligne demandée et se ferme à la fin du
+        parcours ou à l'abandon du générateur. Les erreurs remontent à l'appelant (un export
+        interrompu doit échouer, pas produire un fichier tronqué).
+        """
+        chunk_size = chunk_size or Config.STREAM_CHUNK_SIZE
+        conn = self._open_connection(read_only=True)
+        try:
+            cursor = self.backend.stream_cursor(conn, tuples=records)
+            cursor.execute(query, params)
+            index = column_index(cursor.description) if records else None
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                if not rows:
+                    break
+                if records:
+                    yield from (OrderRecord(index, row) for row in rows)
+                else:
+                    yield from rows
+        finally:
+            # Pas de cursor.close() : sur un SSDictCursor abandonné, il lirait toutes les lignes restantes
+            conn.close()
+
+    def iter_all_orders(self) -> Iterator[OrderRecord]:
+        """Comme get_all_orders, ligne par ligne (historiques complets, analyses hors page)"""
+        return self._iter_query(self._ALL_ORDERS_QUERY + "\nORDER BY o.date_creation DESC", records=True)
+
+    def iter_order_history(self) -> Iterator[OrderRecord]:
+        """OF actifs et archivés, plus récents d'abord (historique complet, ligne par ligne)"""
+        query, params = history_query(self._ALL_ORDERS_QUERY)
+        return self._iter_query(query + "\nORDER BY date_creation DESC", params, records=True)
+
+    def archive_completed_orders(self, older_than_days: int = None) -> int:
+        """Déplace vers les archives les OF dont la piqûre est terminée depuis older_than_days jours
+        (Config.ARCHIVE_AFTER_DAYS par défaut), par lots de Config.ARCHIVE_BATCH_SIZE ; retourne le nombre d'OF"""
+        days = Config.ARCHIVE_AFTER_DAYS if older_than_days is None else older_than_days
+        conn = self.get_connection()
+        if conn is None:
+            return 0
+
+        archived, cutoff = 0, None
+        try:
+            with conn.cursor() as cursor:
+                # Limite en heure serveur (clock.py), comme date_fin_piqure
+                ServerClock.sync(cursor)
+                cutoff = ServerClock.now() - timedelta(days=days)
+                while True:
+                    cursor.execute('''
+                                   SELECT of_id
+                                   FROM details_piqure
+                                   WHERE statut_piqure = 'Terminée'
+                                     AND date_fin_piqure < %s
+                                   ORDER BY date_fin_piqure
+                                   LIMIT %s
+                                   ''', (cutoff, Config.ARCHIVE_BATCH_SIZE))
+                    ofs = [row['of_id'] for row in cursor.fetchall()]
+                    if not ofs:
+                        break
+                    move_orders(self.backend, cursor, ofs)
+                    conn.commit()
+                    archived += len(ofs)
+        except Exception:
+            conn.rollback()
+            logger.exception("Erreur archivage des OF")
+        finally:
+            conn.close()
+
+        if archived:
+            self._pin_primary()
+        log_event(logger, logging.INFO, "OF archivés", nombre=archived, fin_piqure_avant=cutoff)
+        return archived
+
+    def restore_archived_orders(self, ofs: List[str]) -> int:
+        """Remet des OF archivés dans les tables vivantes ; retourne le nombre d'OF restaurés"""
+        conn = self.get_connection()
+        if conn is None or not ofs:
+            return 0
+
+        try:
+            with conn.cursor() as cursor:
+                placeholders = ", ".join(["%s"] * len(ofs))
+                cursor.execute(f"SELECT of FROM ordres_fabrication_archive WHERE of IN ({placeholders})", list(ofs))
+                found = [row['of'] for row in cursor.fetchall()]
+                if found:
+                    move_orders(self.backend, cursor, found, restore=True)
+            conn.commit()
+        except self.backend.IntegrityError as e:
+            conn.rollback()
+            log_event(logger, logging.ERROR, "Restauration impossible (numéro d'OF réutilisé depuis l'archivage ?)",
+                      ofs=','.join(ofs), erreur=str(e))
+            return 0
+        except Exception:
+            conn.rollback()
+            logger.exception("Erreur restauration des OF archivés")
+            return 0
+        finally:
+            conn.close()
+
+        self._pin_primary()
+        log_event(logger, logging.INFO, "OF restaurés", nombre=len(found), demandes=len(ofs))
+        return len(found)
+
     def get_order_by_of(self, of: str) -> Optional[Dict]:
         """Récupère un ordre spécifique avec TOUTES ses données"""
         conn = self.get_connection()
@@ -556,6 +591,14 @@ class DatabaseManager:
 
         try:
             with conn.cursor() as cursor:
+                # Un numéro d'OF archivé reste pris (restauration possible)
+                cursor.execute("SELECT COUNT(*) AS n FROM ordres_fabrication_archive WHERE of = %s",
+                               (kwargs.get('of'),))
+                if cursor.fetchone()['n']:
+                    import streamlit as st
+                    st.error(f"❌ L'OF {kwargs.get('of')} existe déjà (archivé) !")
+                    return False
+
                 # Insérer dans ordres_fabrication avec code_modele
                 cursor.execute('''
                                INSERT INTO ordres_fabrication
@@ -575,8 +618,8 @@ class DatabaseManager:
                                INSERT INTO details_coupe
                                (of_id, coloris, matiere, matricule_coupeur, consommation,
                                 sur_consommation, observation, date_debut_coupe, temps_coupe,
-                                temps_recoupe, nombre_recoupe)
-                               VALUES (%s, %s, %s, %s, %s, %s, %s, NULL, 0, 0, 0)
+                                temps_recoupe, nombre_recoupe, maj_donnees)
+                               VALUES (%s, %s, %s, %s, %s, %s, %s, NULL, 0, 0, 0, NOW(3))
                                ''', (kwargs.get('of'), kwargs.get('coloris'), kwargs.get('matiere'),
                                      kwargs.get('matricule_coupeur'), kwargs.get('consommation'),
                                      kwargs.get('sur_consommation'), kwargs.get('observation', '')))
@@ -584,13 +627,14 @@ class DatabaseManager:
                 # Insérer dans details_controle (vide au départ)
                 cursor.execute('''
                                INSERT INTO details_controle
-                                   (of_id, statut_controle, date_debut_controle, temps_controle)
-                               VALUES (%s, 'En attente', NULL, 0)
+                                   (of_id, statut_controle, date_debut_controle, temps_controle, maj_donnees)
+                               VALUES (%s, 'En attente', NULL, 0, NOW(3))
                                ''', (kwargs.get('of'),))
 
             conn.commit()
+            self._pin_primary()
             return True
-        except pymysql.err.IntegrityError:
+        except self.backend.IntegrityError:
             import streamlit as st
             st.error(f"❌ L'OF {kwargs.get('of')} existe déjà !")
             return False
@@ -601,88 +645,263 @@ class DatabaseManager:
         finally:
             conn.close()
 
-    def update_order(self, of: str, **kwargs) -> bool:
-        """Met à jour un ordre (distribue les colonnes aux bonnes tables)"""
-        conn = self.get_connection()
-        if conn is None:
+    # ===== FILE D'ÉCRITURE HORS LIGNE (voir write_queue.py) =====
+
+    def _write(self, action: str, **params) -> bool:
+        """Exécute une action d'atelier, ou la dépose dans la file si le serveur est injoignable"""
+        method, label, show_error = self._WRITE_ACTIONS[action]
+        entry = WriteQueue.new_entry(action, params)
+
+        # Les actions déjà en file passent d'abord, dans l'ordre
+        if WriteQueue.is_offline() or not self.sync_write_queue():
+            return self._enqueue(entry)
+
+        try:
+            conn = self._open_connection()
+        except Exception as e:
+            if self.backend.is_connection_error(e):
+                return self._enqueue(entry, e)
+            import streamlit as st
+            st.error(f"❌ Erreur connexion ({self.backend.describe()}): {e}")
             return False
 
         try:
             with conn.cursor() as cursor:
-                # Colonnes de ordres_fabrication
-                ordres_columns = ['observation', 'statut']
-                ordres_updates = {k: v for k, v in kwargs.items() if k in ordres_columns}
-
-                # Colonnes de details_coupe
-                coupe_columns = [
-                    'coloris', 'matiere', 'matricule_coupeur', 'consommation', 'sur_consommation',
-                    'observation_coupe', 'statut_coupe', 'date_debut_coupe', 'date_fin_coupe',
-                    'temps_coupe', 'temps_recoupe', 'date_debut_recoupe', 'nombre_recoupe',
-                    'coupe_en_pause', 'temps_coupe_avant_pause',
-                    'date_derniere_pause', 'duree_totale_pause', 'date_derniere_maj_coupe'
-                ]
-                coupe_updates = {k: v for k, v in kwargs.items() if k in coupe_columns}
-
-                # Colonnes de details_controle
-                controle_columns = [
-                    'statut_controle', 'date_debut_controle', 'date_fin_controle',
-                    'temps_controle', 'quantite_a_controler', 'quantite_controlee',
-                    'quantite_acceptee', 'quantite_rejetee', 'quantite_retravailler',
-                    'observation_controle', 'controle_en_pause', 'temps_controle_avant_pause',
-                    'duree_pause_controle'
-                ]
-                controle_updates = {k: v for k, v in kwargs.items() if k in controle_columns}
-
-                # ===== NOUVELLES COLONNES DE PIQÛRE =====
-                piqure_columns = [
-                    'statut_piqure', 'matricule_piqueur', 'date_debut_piqure', 'date_fin_piqure',
-                    'temps_piqure', 'piqure_en_pause', 'temps_piqure_avant_pause',
-                    'date_derniere_pause_piqure', 'duree_totale_pause_piqure',
-                    'observation_piqure', 'date_derniere_maj_piqure'
-                ]
-                piqure_updates = {k: v for k, v in kwargs.items() if k in piqure_columns}
-
-                # Mettre à jour ordres_fabrication
-                if ordres_updates:
-                    set_clause = ", ".join([f"{key} = %s" for key in ordres_updates.keys()])
-                    values = list(ordres_updates.values()) + [of]
-                    cursor.execute(f"UPDATE ordres_fabrication SET {set_clause} WHERE of = %s", values)
-
-                # Mettre à jour details_coupe
-                if coupe_updates:
-                    set_clause = ", ".join([f"{key} = %s" for key in coupe_updates.keys()])
-                    values = list(coupe_updates.values()) + [of]
-                    cursor.execute(f"UPDATE details_coupe SET {set_clause} WHERE of_id = %s", values)
-
-                # Mettre à jour details_controle
-                if controle_updates:
-                    set_clause = ", ".join([f"{key} = %s" for key in controle_updates.keys()])
-                    values = list(controle_updates.values()) + [of]
-                    cursor.execute(f"UPDATE details_controle SET {set_clause} WHERE of_id = %s", values)
-
-                # ===== METTRE À JOUR details_piqure =====
-                if piqure_updates:
-                    set_clause = ", ".join([f"{key} = %s" for key in piqure_updates.keys()])
-                    values = list(piqure_updates.values()) + [of]
-                    cursor.execute(f"UPDATE details_piqure SET {set_clause} WHERE of_id = %s", values)
-
+                self._record_action(cursor, entry)
+                result = getattr(self, method)(cursor, None, **params)
             conn.commit()
-            return True
+            self._pin_primary()
+            self._purge_action_keys(conn)
+            return result
         except Exception as e:
-            import streamlit as st
-            st.error(f"❌ Erreur mise à jour: {e}")
+            if self.backend.is_connection_error(e):
+                # Le COMMIT a pu passer : la clé d'idempotence écarte le doublon au rejeu
+                return self._enqueue(entry, e)
+            logger.error("Erreur %s: %s", label, e)
+            if show_error:
+                import streamlit as st
+                st.error(f"❌ Erreur {label}: {e}")
             return False
         finally:
             conn.close()
 
+    def _enqueue(self, entry: Dict, error: Exception = None) -> bool:
+        """Dépose l'action dans le journal local (durable au retour de la fonction)"""
+        if error is not None:
+            WriteQueue.mark_offline()
+        try:
+            WriteQueue.append(entry)
+        except Exception as e:
+            logger.exception("Action perdue : écriture du journal local impossible")
+            import streamlit as st
+            st.error(f"❌ Serveur injoignable et journal local indisponible : {e}")
+            return False
+
+        pending = WriteQueue.pending_count()
+        log_event(logger, logging.WARNING, "Action mise en file", cle=entry['cle'], action=entry['action'],
+                  of=self._action_of(entry), en_attente=pending, erreur=str(error) if error else None)
+        import streamlit as st
+        if WriteQueue.is_offline():
+            st.warning(f"📴 Serveur injoignable : action enregistrée sur ce poste ({pending} en attente), "
+                       f"synchronisée automatiquement au retour du réseau")
+        else:
+            # Serveur joignable mais actions plus anciennes pas encore rejouées : l'ordre est conservé
+            st.warning(f"⏳ Actions précédentes en cours de synchronisation : action enregistrée sur ce poste "
+                       f"({pending} en attente), appliquée à leur suite")
+        return True
+
+    @staticmethod
+    def _action_of(entry: Dict) -> Optional[str]:
+        return entry['params'].get('of') or entry['params'].get('of_number')
+
+    def _record_action(self, cursor, entry: Dict):
+        """Clé d'idempotence, dans la transaction de l'action (IntegrityError si déjà appliquée)"""
+        cursor.execute('''
+                       INSERT INTO actions_appliquees (cle, action, of_id, date_action)
+                       VALUES (%s, %s, %s, %s)
+                       ''', (entry['cle'], entry['action'], self._action_of(entry), entry['date']))
+
+    def _purge_action_keys(self, conn):
+        """Supprime les clés d'idempotence expirées, au plus une fois par Config.WRITE_QUEUE_KEY_PURGE_S"""
+        if not WriteQueue.claim_key_purge():
+            return
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute("DELETE FROM actions_appliquees WHERE date_application < %s",
+                               (ServerClock.now() - timedelta(days=Config.WRITE_QUEUE_KEY_RETENTION_DAYS),))
+                purged = cursor.rowcount
+            conn.commit()
+            if purged:
+                log_event(logger, logging.INFO, "Clés d'idempotence expirées supprimées", cles=purged)
+        except Exception as e:
+            # Sans conséquence pour l'action : nouvel essai à la prochaine échéance
+            logger.warning("Purge des clés d'idempotence impossible: %s", e)
+
+    def sync_write_queue(self) -> bool:
+        """Rejoue les actions en file par lots transactionnels ; True si la file est vide"""
+        if not WriteQueue.pending_count():
+            return True
+        if WriteQueue.is_offline():
+            return False
+
+        with WriteQueue.syncing() as acquired:
+            if not acquired:
+                return False  # rejeu en cours dans une autre session
+
+            entries = WriteQueue.pending()
+            try:
+                conn = self._open_connection()
+            except Exception as e:
+                if not self.backend.is_connection_error(e):
+                    logger.exception("Erreur connexion pour le rejeu de la file d'écriture")
+                    return False
+                WriteQueue.mark_offline()
+                log_event(logger, logging.DEBUG, "Serveur toujours injoignable", en_attente=len(entries), erreur=str(e))
+                return False
+
+            counts = {'rejouees': 0, 'doublons': 0, 'rejetees': 0}
+            try:
+                with conn.cursor() as cursor:
+                    batch_size = Config.WRITE_QUEUE_BATCH_SIZE
+                    for start in range(0, len(entries), batch_size):
+                        batch = entries[start:start + batch_size]
+                        rejected = self._replay_batch(cursor, batch, counts)
+                        conn.commit()
+                        WriteQueue.acknowledge([entry['cle'] for entry in batch], rejected)
+                self._purge_action_keys(conn)
+            except Exception as e:
+                if self.backend.is_connection_error(e):
+                    WriteQueue.mark_offline()
+                    log_event(logger, logging.WARNING, "Rejeu interrompu (connexion perdue)",
+                              en_attente=WriteQueue.pending_count(), **counts)
+                else:
+                    logger.exception("Erreur rejeu de la file d'écriture")
+                return False
+            finally:
+                conn.close()
+
+        WriteQueue.mark_online()
+        self._pin_primary()
+        log_event(logger, logging.INFO, "File d'écriture synchronisée", **counts)
+        return WriteQueue.pending_count() == 0
+
+    def _replay_batch(self, cursor, batch: List[Dict], counts: Dict) -> List[Tuple[Dict, str]]:
+        """Applique un lot (sans COMMIT) ; chaque action est isolée par un point de sauvegarde"""
+        rejected = []
+        for entry in batch:
+            cursor.execute("SAVEPOINT rejeu_action")
+            try:
+                self._record_action(cursor, entry)
+            except self.backend.IntegrityError:
+                # Déjà appliquée : le COMMIT d'origine est passé avant la coupure
+                cursor.execute("ROLLBACK TO SAVEPOINT rejeu_action")
+                counts['doublons'] += 1
+                continue
+
+            try:
+                method = self._WRITE_ACTIONS[entry['action']][0]
+                getattr(self, method)(cursor, entry['date'], **entry['params'])
+            except Exception as e:
+                if self.backend.is_connection_error(e):
+                    raise
+                # Action inapplicable (OF supprimé...) : mise de côté pour ne pas bloquer les suivantes
+                cursor.execute("ROLLBACK TO SAVEPOINT rejeu_action")
+                rejected.append((entry, str(e)))
+                counts['rejetees'] += 1
+                log_event(logger, logging.ERROR, "Action rejetée au rejeu", cle=entry['cle'],
+                          action=entry['action'], of=self._action_of(entry), erreur=str(e))
+                continue
+
+            cursor.execute("RELEASE SAVEPOINT rejeu_action")
+            counts['rejouees'] += 1
+        return rejected
+
+    def update_order(self, of: str, **kwargs) -> bool:
+        """Met à jour un ordre (distribue les colonnes aux bonnes tables)"""
+        return self._write('update_order', of=of, **kwargs)
+
+    def _apply_update_order(self, cursor, at: Optional[datetime], of: str, **kwargs) -> bool:
+        """Mise à jour d'un ordre (les dates de l'action sont déjà dans kwargs)"""
+        # Colonnes de ordres_fabrication
+        ordres_columns = ['observation', 'statut']
+        ordres_updates = {k: v for k, v in kwargs.items() if k in ordres_columns}
+
+        # Colonnes de details_coupe
+        coupe_columns = [
+            'coloris', 'matiere', 'matricule_coupeur', 'consommation', 'sur_consommation',
+            'observation_coupe', 'statut_coupe', 'date_debut_coupe', 'date_fin_coupe',
+            'temps_coupe', 'temps_recoupe', 'date_debut_recoupe', 'nombre_recoupe',
+            'coupe_en_pause', 'temps_coupe_avant_pause',
+            'date_derniere_pause', 'duree_totale_pause', 'date_derniere_maj_coupe'
+        ]
+        coupe_updates = {k: v for k, v in kwargs.items() if k in coupe_columns}
+
+        # Colonnes de details_controle
+        controle_columns = [
+            'statut_controle', 'date_debut_controle', 'date_fin_controle',
+            'temps_controle', 'quantite_a_controler', 'quantite_controlee',
+            'quantite_acceptee', 'quantite_rejetee', 'quantite_retravailler',
+            'observation_controle', 'controle_en_pause', 'temps_controle_avant_pause',
+            'duree_pause_controle'
+        ]
+        controle_updates = {k: v for k, v in kwargs.items() if k in controle_columns}
+
+        # ===== NOUVELLES COLONNES DE PIQÛRE =====
+        piqure_columns = [
+            'statut_piqure', 'matricule_piqueur', 'date_debut_piqure', 'date_fin_piqure',
+            'temps_piqure', 'piqure_en_pause', 'temps_piqure_avant_pause',
+            'date_derniere_pause_piqure', 'duree_totale_pause_piqure',
+            'observation_piqure', 'date_derniere_maj_piqure'
+        ]
+        piqure_updates = {k: v for k, v in kwargs.items() if k in piqure_columns}
+
+        # Mettre à jour ordres_fabrication
+        if ordres_updates:
+            set_clause = ", ".join([f"{key} = %s" for key in ordres_updates.keys()])
+            values = list(ordres_updates.values()) + [of]
+            cursor.execute(f"UPDATE ordres_fabrication SET {set_clause} WHERE of = %s", values)
+
+        # Mettre à jour details_coupe
+        if coupe_updates:
+            set_clause = ", ".join([f"{key} = %s" for key in coupe_updates.keys()])
+            if set(coupe_updates) - CHRONO_COLUMNS:
+                # Modification métier (pas seulement des chronomètres) : nouvelle version des données
+                set_clause += ", maj_donnees = NOW(3)"
+            values = list(coupe_updates.values()) + [of]
+            cursor.execute(f"UPDATE details_coupe SET {set_clause} WHERE of_id = %s", values)
+
+        # Mettre à jour details_controle
+        if controle_updates:
+            set_clause = ", ".join([f"{key} = %s" for key in controle_updates.keys()])
+            if set(controle_updates) - CHRONO_COLUMNS:
+                set_clause += ", maj_donnees = NOW(3)"
+            values = list(controle_updates.values()) + [of]
+            cursor.execute(f"UPDATE details_controle SET {set_clause} WHERE of_id = %s", values)
+
+        # ===== METTRE À JOUR details_piqure =====
+        if piqure_updates:
+            set_clause = ", ".join([f"{key} = %s" for key in piqure_updates.keys()])
+            values = list(piqure_updates.values()) + [of]
+            cursor.execute(f"UPDATE details_piqure SET {set_clause} WHERE of_id = %s", values)
+
+        return True
+
     def update_all_timers(self):
         """Met à jour les DEUX chronomètres indépendants"""
         conn = self.get_connection()
         if conn is None:
             return
 
+        # Une synthèse par passage au lieu d'une ligne par OF (voir app_logging.TickSummary)
+        tick = TickSummary(logger)
         try:
             with conn.cursor() as cursor:
+                # Heure de référence du passage (clock.py) : écarts calculés ici, sans requête
+                # d'heure par ligne ; seules les secondes entières sont créditées, la référence
+                # n'avance que d'autant (reste reporté au passage suivant)
+                ServerClock.sync(cursor)
+                now = ServerClock.now()
+
                 # ===== 1. CHRONOMÈTRES DE COUPE =====
                 cursor.execute('''
                                SELECT of_id,
@@ -696,15 +915,13 @@ class DatabaseManager:
                                ''')
                 coupes = cursor.fetchall()
 
-                updated_coupe_count = 0
                 for coupe in coupes:
                     of_id = coupe['of_id']
                     is_paused = coupe['coupe_en_pause']
                     last_update = coupe['date_derniere_maj_coupe']
 
                     # Calculer le temps écoulé depuis la dernière mise à jour
-                    cursor.execute('SELECT TIMESTAMPDIFF(SECOND, %s, NOW()) as ecoule', (last_update,))
-                    time_elapsed = cursor.fetchone()['ecoule']
+                    time_elapsed, reference = split_elapsed(Utils.parse_datetime(last_update), now)
 
                     if time_elapsed > 0:
                         if is_paused:
@@ -713,22 +930,21 @@ class DatabaseManager:
                             cursor.execute('''
                                            UPDATE details_coupe
                                            SET duree_totale_pause      = %s,
-                                               date_derniere_maj_coupe = NOW()
+                                               date_derniere_maj_coupe = %s
                                            WHERE of_id = %s
-                                           ''', (new_pause, of_id))
-                            print(f"  ⏸️ COUPE OF {of_id}: +{time_elapsed}s au chrono PAUSE → {new_pause}s")
+                                           ''', (new_pause, reference, of_id))
+                            tick.add('coupe', 'pause', of_id, time_elapsed, new_pause)
                         else:
                             # ACTIF : ajouter au chrono coupe
                             new_coupe = (coupe['temps_coupe'] or 0) + time_elapsed
                             cursor.execute('''
                                            UPDATE details_coupe
                                            SET temps_coupe             = %s,
-                                               date_derniere_maj_coupe = NOW()
+                                               date_derniere_maj_coupe = %s
                                            WHERE of_id = %s
-                                           ''', (new_coupe, of_id))
-                            print(f"  ✂️ COUPE OF {of_id}: +{time_elapsed}s au chrono ACTIF → {new_coupe}s")
+                                           ''', (new_coupe, reference, of_id))
+                            tick.add('coupe', 'actif', of_id, time_elapsed, new_coupe)
 
-                        updated_coupe_count += 1
 
                 # ===== 2. CHRONOMÈTRES DE CONTRÔLE =====
                 cursor.execute('''
@@ -744,15 +960,13 @@ class DatabaseManager:
 
                 controles = cursor.fetchall()
 
-                updated_controle_count = 0
                 for ctrl in controles:
                     of_id = ctrl['of_id']
                     is_paused = ctrl['controle_en_pause']
                     last_update = ctrl['date_derniere_maj']
 
                     # Calculer le temps écoulé depuis la dernière mise à jour
-                    cursor.execute('SELECT TIMESTAMPDIFF(SECOND, %s, NOW()) as ecoule', (last_update,))
-                    time_elapsed = cursor.fetchone()['ecoule']
+                    time_elapsed, reference = split_elapsed(Utils.parse_datetime(last_update), now)
 
                     if time_elapsed > 0:
                         if is_paused:
@@ -761,22 +975,21 @@ class DatabaseManager:
                             cursor.execute('''
                                            UPDATE details_controle
                                            SET temps_pause_total = %s,
-                                               date_derniere_maj = NOW()
+                                               date_derniere_maj = %s
                                            WHERE of_id = %s
-                                           ''', (new_pause, of_id))
-                            print(f"  ⏸️ CONTRÔLE OF {of_id}: +{time_elapsed}s au chrono PAUSE → {new_pause}s")
+                                           ''', (new_pause, reference, of_id))
+                            tick.add('controle', 'pause', of_id, time_elapsed, new_pause)
                         else:
                             # ACTIF : ajouter au chrono actif
                             new_actif = (ctrl['temps_actif_total'] or 0) + time_elapsed
                             cursor.execute('''
                                            UPDATE details_controle
                                            SET temps_actif_total = %s,
-                                               date_derniere_maj = NOW()
+                                               date_derniere_maj = %s
                                            WHERE of_id = %s
-                                           ''', (new_actif, of_id))
-                            print(f"  🔄 CONTRÔLE OF {of_id}: +{time_elapsed}s au chrono ACTIF → {new_actif}s")
+                                           ''', (new_actif, reference, of_id))
+                            tick.add('controle', 'actif', of_id, time_elapsed, new_actif)
 
-                        updated_controle_count += 1
 
                 # ===== 3. CHRONOMÈTRES DE PIQÛRE =====
                 cursor.execute('''
@@ -797,8 +1010,7 @@ class DatabaseManager:
                     last_update = piqure['date_derniere_maj_piqure']
 
                     # Calculer le temps écoulé depuis la dernière mise à jour
-                    cursor.execute('SELECT TIMESTAMPDIFF(SECOND, %s, NOW()) as ecoule', (last_update,))
-                    time_elapsed = cursor.fetchone()['ecoule']
+                    time_elapsed, reference = split_elapsed(Utils.parse_datetime(last_update), now)
 
                     if time_elapsed > 0:
                         if is_paused:
@@ -807,26 +1019,25 @@ class DatabaseManager:
                             cursor.execute('''
                                            UPDATE details_piqure
                                            SET duree_totale_pause_piqure = %s,
-                                               date_derniere_maj_piqure  = NOW()
+                                               date_derniere_maj_piqure  = %s
                                            WHERE of_id = %s
-                                           ''', (new_pause, of_id))
-                            print(f"  ⏸️ PIQÛRE OF {of_id}: +{time_elapsed}s au chrono PAUSE → {new_pause}s")
+                                           ''', (new_pause, reference, of_id))
+                            tick.add('piqure', 'pause', of_id, time_elapsed, new_pause)
                         else:
                             # ACTIF : ajouter au chrono piqûre
                             new_piqure = (piqure['temps_piqure'] or 0) + time_elapsed
                             cursor.execute('''
                                            UPDATE details_piqure
                                            SET temps_piqure             = %s,
-                                               date_derniere_maj_piqure = NOW()
+                                               date_derniere_maj_piqure = %s
                                            WHERE of_id = %s
-                                           ''', (new_piqure, of_id))
-                            print(f"  🪡 PIQÛRE OF {of_id}: +{time_elapsed}s au chrono ACTIF → {new_piqure}s")
+                                           ''', (new_piqure, reference, of_id))
+                            tick.add('piqure', 'actif', of_id, time_elapsed, new_piqure)
 
                 conn.commit()
-        except Exception as e:
-            print(f"❌ Erreur chronomètres doubles: {e}")
-            import traceback
-            traceback.print_exc()
+            tick.emit()
+        except Exception:
+            logger.exception("Erreur chronomètres doubles")
         finally:
             conn.close()
 
@@ -853,166 +1064,135 @@ class DatabaseManager:
 
                 controles = cursor.fetchall()
 
-                print(f"\n{'=' * 70}")
-                print(f"🐛 DEBUG DÉTAILLÉ CHRONOMÈTRE CONTRÔLE")
-                print(f"{'=' * 70}")
+                log_event(logger, logging.DEBUG, "Debug chronomètre contrôle", controles=len(controles))
 
                 for ctrl in controles:
-                    print(f"\n📋 OF: {ctrl['of_id']}")
-                    print(f"   Statut: {ctrl['statut_controle']}")
-                    print(f"   En pause: {ctrl.get('controle_en_pause', 0)}")
-                    print(f"   Temps contrôle: {ctrl['temps_controle']}s")
-                    print(f"   Temps avant pause: {ctrl.get('temps_controle_avant_pause', 0)}s")
-                    print(f"   Durée pause: {ctrl.get('duree_pause_controle', 0)}s")
-                    print(f"   Date début: {ctrl.get('date_debut_controle')}")
-                    print(f"   Date dernière pause: {ctrl.get('date_derniere_pause')}")
+                    champs = {
+                        'of': ctrl['of_id'],
+                        'statut': ctrl['statut_controle'],
+                        'en_pause': ctrl.get('controle_en_pause', 0),
+                        'temps_controle_s': ctrl['temps_controle'],
+                        'temps_avant_pause_s': ctrl.get('temps_controle_avant_pause', 0),
+                        'duree_pause_s': ctrl.get('duree_pause_controle', 0),
+                        'date_debut': ctrl.get('date_debut_controle'),
+                        'date_derniere_pause': ctrl.get('date_derniere_pause'),
+                    }
 
                     # Calcul manuel
                     if ctrl['date_debut_controle']:
-                        cursor.execute('SELECT TIMESTAMPDIFF(SECOND, %s, NOW()) as total_seconds',
-                                       (ctrl['date_debut_controle'],))
-                        total = cursor.fetchone()['total_seconds']
+                        total = Utils.seconds_since(ctrl['date_debut_controle'], ServerClock.now())
                         pause_totale = ctrl.get('duree_pause_controle', 0)
                         temps_actif = total - pause_totale
+                        champs.update(total_depuis_debut_s=total, temps_actif_calcule_s=temps_actif,
+                                      difference_db_s=temps_actif - ctrl['temps_controle'])
 
-                        print(f"\n   🔧 CALCULS MANUELS:")
-                        print(f"      Total depuis début: {total}s ({total / 3600:.2f}h)")
-                        print(f"      Pause totale: {pause_totale}s")
-                        print(f"      Temps actif calculé: {temps_actif}s")
-                        print(f"      Différence avec DB: {temps_actif - ctrl['temps_controle']}s")
-
-                print(f"\n{'=' * 70}")
-                print(f"Fin debug - {len(controles)} contrôles analysés")
-                print(f"{'=' * 70}\n")
+                    log_event(logger, logging.DEBUG, "Chronomètre contrôle", **champs)
 
         except Exception as e:
-            print(f"❌ Erreur debug: {e}")
+            logger.error("Erreur debug: %s", e)
         finally:
             conn.close()
 
     def toggle_controle_pause(self, of_number: str, mettre_en_pause: bool) -> bool:
         """Active/désactive la pause pour le contrôle"""
-        conn = self.get_connection()
-        if conn is None:
+        return self._write('toggle_controle_pause', of_number=of_number, mettre_en_pause=mettre_en_pause)
+
+    def _apply_toggle_controle_pause(self, cursor, at: Optional[datetime], of_number: str,
+                                     mettre_en_pause: bool) -> bool:
+        """Bascule pause/reprise ; at : date d'origine de l'action rejouée (heure serveur sinon)"""
+        # D'abord, mettre à jour les chronomètres avant de changer l'état
+        cursor.execute('''
+            SELECT controle_en_pause, date_derniere_maj, 
+                   temps_actif_total, temps_pause_total
+            FROM details_controle 
+            WHERE of_id = %s
+        ''', (of_number,))
+
+        current_state = cursor.fetchone()
+        if not current_state:
             return False
 
-        try:
-            with conn.cursor() as cursor:
-                # D'abord, mettre à jour les chronomètres avant de changer l'état
-                cursor.execute('''
-                    SELECT controle_en_pause, date_derniere_maj, 
-                           temps_actif_total, temps_pause_total
-                    FROM details_controle 
-                    WHERE of_id = %s
-                ''', (of_number,))
-
-                current_state = cursor.fetchone()
-                if not current_state:
-                    return False
-
-                # Mettre à jour les chronos avec le temps écoulé
-                time_elapsed = 0
-                if current_state['date_derniere_maj']:
-                    cursor.execute('SELECT TIMESTAMPDIFF(SECOND, %s, NOW()) as ecoule',
-                                   (current_state['date_derniere_maj'],))
-                    time_elapsed = cursor.fetchone()['ecoule']
-
-                    if time_elapsed > 0:
-                        if current_state['controle_en_pause']:
-                            # Était en pause, ajouter au chrono pause
-                            new_pause = (current_state['temps_pause_total'] or 0) + time_elapsed
-                            cursor.execute('''
-                                UPDATE details_controle 
-                                SET temps_pause_total = %s,
-                                    date_derniere_maj = NOW()
-                                WHERE of_id = %s
-                            ''', (new_pause, of_number))
-                        else:
-                            # Était actif, ajouter au chrono actif
-                            new_actif = (current_state['temps_actif_total'] or 0) + time_elapsed
-                            cursor.execute('''
-                                UPDATE details_controle 
-                                SET temps_actif_total = %s,
-                                    date_derniere_maj = NOW()
-                                WHERE of_id = %s
-                            ''', (new_actif, of_number))
-
-                # Maintenant changer l'état de pause
-                cursor.execute('''
-                    UPDATE details_controle 
-                    SET controle_en_pause = %s,
-                        date_derniere_maj = NOW()
-                    WHERE of_id = %s
-                ''', (mettre_en_pause, of_number))
+        # Heure de la bascule (clock.py)
+        if at is None:
+            ServerClock.sync(cursor)
+            at = ServerClock.now()
+
+        # Mettre à jour les chronos avec le temps écoulé (secondes entières, reste reporté
+        # sur l'état suivant : actif + pause reste égal au temps écoulé)
+        time_elapsed, reference = 0, at
+        if current_state['date_derniere_maj']:
+            time_elapsed, reference = split_elapsed(Utils.parse_datetime(current_state['date_derniere_maj']), at)
+
+            if time_elapsed > 0:
+                if current_state['controle_en_pause']:
+                    # Était en pause, ajouter au chrono pause
+                    new_pause = (current_state['temps_pause_total'] or 0) + time_elapsed
+                    cursor.execute('''
+                        UPDATE details_controle 
+                        SET temps_pause_total = %s,
+                            date_derniere_maj = %s
+                        WHERE of_id = %s
+                    ''', (new_pause, reference, of_number))
+                else:
+                    # Était actif, ajouter au chrono actif
+                    new_actif = (current_state['temps_actif_total'] or 0) + time_elapsed
+                    cursor.execute('''
+                        UPDATE details_controle 
+                        SET temps_actif_total = %s,
+                            date_derniere_maj = %s
+                        WHERE of_id = %s
+                    ''', (new_actif, reference, of_number))
 
-                conn.commit()
+        # Maintenant changer l'état de pause
+        cursor.execute('''
+            UPDATE details_controle 
+            SET controle_en_pause = %s,
+                date_derniere_maj = %s,
+                maj_donnees = NOW(3)
+            WHERE of_id = %s
+        ''', (mettre_en_pause, reference, of_number))
 
-                # Log
-                action = "PAUSE" if mettre_en_pause else "REPRISE"
-                print(f"\n🔧 {action} pour OF {of_number}")
-                print(f"   Temps écoulé: {time_elapsed}s")
-                print(f"   État précédent: {'En pause' if current_state['controle_en_pause'] else 'Actif'}")
-                print(f"   Nouvel état: {'En pause' if mettre_en_pause else 'Actif'}")
+        log_event(logger, logging.INFO, "Pause contrôle" if mettre_en_pause else "Reprise contrôle",
+                  of=of_number, ecoule_s=time_elapsed,
+                  etat_precedent='En pause' if current_state['controle_en_pause'] else 'Actif')
 
-                return True
-        except Exception as e:
-            print(f"❌ Erreur toggle pause: {e}")
-            return False
-        finally:
-            conn.close()
+        return True
 
     def start_controle(self, of_number: str, quantite_a_controler: int) -> bool:
         """Démarre le contrôle pour un OF"""
-        conn = self.get_connection()
-        if conn is None:
-            return False
-
-        try:
-            with conn.cursor() as cursor:
-                cursor.execute('''
-                    UPDATE details_controle 
-                    SET statut_controle = 'En cours',
-                        date_debut_controle = NOW(),
-                        date_derniere_maj = NOW(),
-                        quantite_a_controler = %s,
-                        temps_actif_total = 0,
-                        temps_pause_total = 0,
-                        controle_en_pause = FALSE
-                    WHERE of_id = %s
-                ''', (quantite_a_controler, of_number))
-
-                conn.commit()
-
-                print(f"\n🚀 DÉMARRAGE CONTRÔLE pour OF {of_number}")
-                print(f"   Quantité à contrôler: {quantite_a_controler}")
-
-                return True
-        except Exception as e:
-            print(f"❌ Erreur démarrage contrôle: {e}")
-            return False
-        finally:
-            conn.close()
+        return self._write('start_controle', of_number=of_number, quantite_a_controler=quantite_a_controler)
+
+    def _apply_start_controle(self, cursor, at: Optional[datetime], of_number: str,
+                              quantite_a_controler: int) -> bool:
+        cursor.execute('''
+            UPDATE details_controle 
+            SET statut_controle = 'En cours',
+                date_debut_controle = COALESCE(%s, NOW(3)),
+                date_derniere_maj = COALESCE(%s, NOW(3)),
+                quantite_a_controler = %s,
+                temps_actif_total = 0,
+                temps_pause_total = 0,
+                controle_en_pause = FALSE,
+                maj_donnees = NOW(3)
+            WHERE of_id = %s
+        ''', (at, at, quantite_a_controler, of_number))
+
+        log_event(logger, logging.INFO, "Démarrage contrôle", of=of_number,
+                  quantite_a_controler=quantite_a_controler)
+
+        return True
 
     def update_coupe_timestamp(self, of_number: str) -> bool:
         """Met à jour le timestamp de dernière mise à jour de la coupe"""
-        conn = self.get_connection()
-        if conn is None:
-            return False
+        return self._write('update_coupe_timestamp', of_number=of_number)
 
-        try:
-            with conn.cursor() as cursor:
-                cursor.execute('''
-                    UPDATE details_coupe 
-                    SET date_derniere_maj_coupe = NOW()
-                    WHERE of_id = %s
-                ''', (of_number,))
-                conn.commit()
-                return True
-        except Exception as e:
-            print(f"❌ Erreur update timestamp coupe: {e}")
-            return False
-        finally:
-            conn.close()
+    def _apply_update_coupe_timestamp(self, cursor, at: Optional[datetime], of_number: str) -> bool:
+        cursor.execute('''
+            UPDATE details_coupe 
+            SET date_derniere_maj_coupe = COALESCE(%s, NOW(3))
+            WHERE of_id = %s
+        ''', (at, of_number))
+        return True
 
     def get_retour_recoupe_paires(self, of_number: str) -> Dict:
         """Récupère les informations des paires issues de recoupe à re-contrôler"""
@@ -1041,7 +1221,7 @@ class DatabaseManager:
                     }
                 return {'retravailler': 0, 'rejetee': 0, 'total': 0}
         except Exception as e:
-            print(f"❌ Erreur récupération retours recoupe: {e}")
+            logger.error("Erreur récupération retours recoupe: %s", e)
             return {'retravailler': 0, 'rejetee': 0, 'total': 0}
         finally:
             conn.close()
@@ -1243,99 +1423,329 @@ class DatabaseManager:
         finally:
             conn.close()
 
-    def get_surconsommation_data(self) -> List[Dict]:
-        """Récupère les données de sur-consommation"""
-        conn = self.get_connection()
+    @staticmethod
+    def _surcons_filters(matiere: str = None, modele: str = None, coupeur: str = None,
+                         taux_min: float = None) -> tuple:
+        """Clause WHERE (et paramètres) commune aux requêtes de sur-consommation"""
+        clauses = ["c.sur_consommation > 0"]
+        params = []
+        if matiere:
+            clauses.append("c.matiere = %s")
+            params.append(matiere)
+        if modele:
+            clauses.append("o.modele = %s")
+            params.append(modele)
+        if coupeur:
+            clauses.append("c.matricule_coupeur = %s")
+            params.append(coupeur)
+        if taux_min:
+            clauses.append("c.taux_surcons >= %s")
+            params.append(taux_min)
+        return " AND ".join(clauses), params
+
+    @staticmethod
+    def _surcons_query(where: str, params: List, historique: bool = False,
+                       limit: int = None) -> Tuple[str, List]:
+        """Lignes de sur-consommation filtrées par where, triées par sur-consommation décroissante.
+
+        Sans historique, une seule requête sur les tables vivantes (tri et limite servis par
+        idx_surcons). Avec historique, tri et limite sont aussi appliqués dans chaque branche
+        (vivantes et archives) avant la fusion.
+        """
+        query = f'''
+            SELECT o.of,
+                   o.modele,
+                   c.coloris,
+                   c.matiere,
+                   c.matricule_coupeur,
+                   c.consommation,
+                   c.sur_consommation,
+                   c.total_consommation,
+                   c.taux_surcons,
+                   c.date_debut_coupe,
+                   c.date_fin_coupe,
+                   c.temps_coupe,
+                   c.duree_totale_pause,
+                   c.statut_coupe,
+                   u.nom         as nom_coupeur,
+                   u.prenom      as prenom_coupeur,
+                   c.observation as observation_coupe
+            FROM details_coupe c
+                     JOIN ordres_fabrication o ON c.of_id = o.of
+                     LEFT JOIN employes u ON c.matricule_coupeur = u.matricule
+            WHERE {where}
+            '''
+        params = list(params)
+        if not historique:
+            query += "ORDER BY c.sur_consommation DESC"
+            if limit:
+                query += " LIMIT %s"
+                params.append(int(limit))
+            return query, params
+
+        if not limit:
+            query, params = history_query(query, params)
+            return query + "\nORDER BY sur_consommation DESC", params
+
+        # Les limit premières lignes de chaque branche suffisent au classement global
+        branch = query + "ORDER BY c.sur_consommation DESC LIMIT %s"
+        branch_params = params + [int(limit)]
+        return (f"SELECT * FROM ({branch}) live\n"
+                f"UNION ALL\n"
+                f"SELECT * FROM ({archive_query(branch)}) arch\n"
+                f"ORDER BY sur_consommation DESC LIMIT %s", branch_params * 2 + [int(limit)])
+
+    def get_surconsommation_data(self, matiere: str = None, modele: str = None, coupeur: str = None,
+                                 taux_min: float = None, limit: int = None,
+                                 historique: bool = False) -> List[Dict]:
+        """Récupère les données de sur-consommation (filtrées et triées par MySQL ; historique :
+        OF archivés compris)"""
+        conn = self.get_connection(read_only=True)
         if conn is None:
             return []
 
+        try:
+            where, params = self._surcons_filters(matiere, modele, coupeur, taux_min)
+            query, params = self._surcons_query(where, params, historique, limit)
+
+            with conn.cursor() as cursor:
+                cursor.execute(query, params)
+                data = cursor.fetchall()
+
+            return data if data else []
+        except Exception:
+            logger.exception("Erreur récupération surconsommation")
+            return []
+        finally:
+            conn.close()
+
+    def iter_surconsommation_data(self, matiere: str = None, modele: str = None, coupeur: str = None,
+                                  taux_min: float = None, historique: bool = False) -> Iterator[Dict]:
+        """Comme get_surconsommation_data, sans limite et ligne par ligne (exports)"""
+        where, params = self._surcons_filters(matiere, modele, coupeur, taux_min)
+        return self._iter_query(*self._surcons_query(where, params, historique))
+
+    def get_surconsommation_version(self) -> str:
+        """Empreinte des données du rapport de sur-consommation (OF actifs et archivés) : colonnes
+        métier seulement, les passages des chronomètres ne la changent pas"""
+        conn = self.get_connection(read_only=True)
+        if conn is None:
+            return ''
+
         try:
             with conn.cursor() as cursor:
                 cursor.execute('''
-                               SELECT o.of,
-                                      o.modele,
-                                      c.coloris,
-                                      c.matiere,
-                                      c.matricule_coupeur,
-                                      c.consommation,
-                                      c.sur_consommation,
-                                      c.date_debut_coupe,
-                                      c.date_fin_coupe,
-                                      c.temps_coupe,
-                                      c.duree_totale_pause,
-                                      c.statut_coupe,
-                                      u.nom         as nom_coupeur,
-                                      u.prenom      as prenom_coupeur,
-                                      c.observation as observation_coupe
-                               FROM details_coupe c
-                                        JOIN ordres_fabrication o ON c.of_id = o.of
-                                        LEFT JOIN employes u ON c.matricule_coupeur = u.matricule
-                               WHERE c.sur_consommation > 0
-                               ORDER BY c.sur_consommation DESC
+                               SELECT (SELECT MAX(derniere_mise_a_jour) FROM ordres_fabrication)  AS maj_of,
+                                      (SELECT COUNT(*) FROM ordres_fabrication)                   AS nb_of,
+                                      (SELECT MAX(maj_donnees) FROM details_coupe)                AS maj_coupe,
+                                      (SELECT COUNT(*) FROM details_coupe)                        AS nb_coupe,
+                                      (SELECT MAX(maj_donnees) FROM details_coupe_archive)        AS maj_archive,
+                                      (SELECT COUNT(*) FROM details_coupe_archive)                AS nb_archive
                                ''')
-                data = cursor.fetchall()
+                row = cursor.fetchone()
+                return '|'.join(str(row[key]) for key in
+                                ('maj_of', 'nb_of', 'maj_coupe', 'nb_coupe', 'maj_archive', 'nb_archive'))
+        except Exception as e:
+            logger.error("Erreur version des données: %s", e)
+            return ''
+        finally:
+            conn.close()
 
-            # Calculer les indicateurs additionnels
-            for item in data:
-                if item['consommation'] is not None and item['sur_consommation'] is not None:
-                    consommation = float(item['consommation'])
-                    surcons = float(item['sur_consommation'])
-                    item['total_consommation'] = consommation + surcons
-                    item['taux_surcons'] = (surcons / consommation * 100) if consommation > 0 else 0
-                else:
-                    item['total_consommation'] = 0
-                    item['taux_surcons'] = 0
+    def get_surconsommation_summary(self, matiere: str = None, modele: str = None, coupeur: str = None,
+                                    taux_min: float = None, historique: bool = False) -> Dict:
+        """Totaux de sur-consommation (nombre d'OF, m², taux moyen pondéré)"""
+        summary = {'nombre_of': 0, 'total_surcons': 0.0, 'total_consommation': 0.0, 'taux_moyen': 0.0}
+        conn = self.get_connection(read_only=True)
+        if conn is None:
+            return summary
 
-            return data if data else []
+        try:
+            where, params = self._surcons_filters(matiere, modele, coupeur, taux_min)
+            query = f'''
+                    SELECT COUNT(*)                             AS nombre_of,
+                           COALESCE(SUM(c.sur_consommation), 0) AS total_surcons,
+                           COALESCE(SUM(c.consommation), 0)     AS total_consommation
+                    FROM details_coupe c
+                             JOIN ordres_fabrication o ON c.of_id = o.of
+                    WHERE {where}
+                    '''
+            # Historique : un agrégat par branche (une ligne chacune), additionnés ici
+            if historique:
+                query, params = history_query(query, params)
+            with conn.cursor() as cursor:
+                cursor.execute(query, params)
+                rows = cursor.fetchall()
+
+            summary['nombre_of'] = sum(int(row['nombre_of']) for row in rows)
+            summary['total_surcons'] = sum(float(row['total_surcons']) for row in rows)
+            summary['total_consommation'] = sum(float(row['total_consommation']) for row in rows)
+            if summary['total_consommation'] > 0:
+                summary['taux_moyen'] = summary['total_surcons'] / summary['total_consommation'] * 100
+            return summary
+        except Exception as e:
+            logger.error("Erreur synthèse surconsommation: %s", e)
+            return summary
+        finally:
+            conn.close()
+
+    def get_surconsommation_by_matiere(self, matiere: str = None, modele: str = None, coupeur: str = None,
+                                       taux_min: float = None, historique: bool = False) -> List[Dict]:
+        """Sur-consommation totale par matière"""
+        conn = self.get_connection(read_only=True)
+        if conn is None:
+            return []
+
+        try:
+            where, params = self._surcons_filters(matiere, modele, coupeur, taux_min)
+            query = f'''
+                    SELECT COALESCE(NULLIF(c.matiere, ''), 'Non spécifié') AS matiere,
+                           SUM(c.sur_consommation)                         AS total_surcons
+                    FROM details_coupe c
+                             JOIN ordres_fabrication o ON c.of_id = o.of
+                    WHERE {where}
+                    GROUP BY 1
+                    '''
+            # Historique : regroupement dans chaque branche, puis fusion des seuls totaux par matière
+            if historique:
+                rows, params = history_query(query, params)
+                query = f'''
+                        SELECT h.matiere, SUM(h.total_surcons) AS total_surcons
+                        FROM ({rows}) h
+                        GROUP BY h.matiere
+                        '''
+            with conn.cursor() as cursor:
+                cursor.execute(query + "ORDER BY total_surcons DESC", params)
+                return cursor.fetchall() or []
         except Exception as e:
-            print(f"❌ Erreur récupération surconsommation: {e}")
-            import traceback
-            traceback.print_exc()
+            logger.error("Erreur surconsommation par matière: %s", e)
             return []
         finally:
             conn.close()
-    # ===== 3. NOUVELLE MÉTHODE start_piqure() =====
 
-    def start_piqure(self, of_number: str, matricule_piqueur: str, observation: str = "") -> bool:
-        """Démarre l'opération de piqûre pour un OF"""
-        conn = self.get_connection()
+    def get_surconsommation_by_coupeur(self, matiere: str = None, modele: str = None, coupeur: str = None,
+                                       taux_min: float = None, historique: bool = False) -> List[Dict]:
+        """Taux moyen de sur-consommation par coupeur (trié par taux décroissant)"""
+        conn = self.get_connection(read_only=True)
         if conn is None:
-            return False
+            return []
 
         try:
+            where, params = self._surcons_filters(matiere, modele, coupeur, taux_min)
+            query = f'''
+                    SELECT c.matricule_coupeur,
+                           AVG(c.taux_surcons) AS taux_moyen,
+                           COUNT(*)            AS nombre_of
+                    FROM details_coupe c
+                             JOIN ordres_fabrication o ON c.of_id = o.of
+                    WHERE {where}
+                      AND c.consommation > 0
+                      AND c.matricule_coupeur IS NOT NULL
+                      AND c.matricule_coupeur <> ''
+                    GROUP BY c.matricule_coupeur
+                    '''
+            # Historique : moyenne de chaque branche, pondérée par son nombre d'OF à la fusion
+            if historique:
+                rows, params = history_query(query, params)
+                query = f'''
+                        SELECT h.matricule_coupeur,
+                               SUM(h.taux_moyen * h.nombre_of) / SUM(h.nombre_of) AS taux_moyen,
+                               SUM(h.nombre_of)                                   AS nombre_of
+                        FROM ({rows}) h
+                        GROUP BY h.matricule_coupeur
+                        '''
             with conn.cursor() as cursor:
-                # Vérifier si l'enregistrement existe déjà
-                cursor.execute('SELECT id FROM details_piqure WHERE of_id = %s', (of_number,))
-                exists = cursor.fetchone()
+                cursor.execute(query + "ORDER BY taux_moyen DESC", params)
+                return cursor.fetchall() or []
+        except Exception as e:
+            logger.error("Erreur surconsommation par coupeur: %s", e)
+            return []
+        finally:
+            conn.close()
 
-                if exists:
-                    # Mettre à jour
-                    cursor.execute('''
-                                   UPDATE details_piqure
-                                   SET statut_piqure            = 'En attente',
-                                       matricule_piqueur        = %s,
-                                       observation_piqure       = %s,
-                                       date_derniere_maj_piqure = NOW()
-                                   WHERE of_id = %s
-                                   ''', (matricule_piqueur, observation, of_number))
-                else:
-                    # Insérer
-                    cursor.execute('''
-                                   INSERT INTO details_piqure
-                                   (of_id, matricule_piqueur, observation_piqure, statut_piqure,
-                                    temps_piqure, date_derniere_maj_piqure)
-                                   VALUES (%s, %s, %s, 'En attente', 0, NOW())
-                                   ''', (of_number, matricule_piqueur, observation))
+    def get_surconsommation_filter_options(self, historique: bool = False) -> Dict:
+        """Valeurs distinctes proposées dans les filtres (matières, modèles, coupeurs)"""
+        options = {'matieres': [], 'modeles': [], 'coupeurs': []}
+        conn = self.get_connection(read_only=True)
+        if conn is None:
+            return options
 
-            conn.commit()
-            return True
+        try:
+            matieres = '''
+                       SELECT DISTINCT c.matiere
+                       FROM details_coupe c
+                       WHERE c.sur_consommation > 0 AND c.matiere IS NOT NULL AND c.matiere <> ''
+                       '''
+            modeles = '''
+                      SELECT DISTINCT o.modele
+                      FROM details_coupe c
+                               JOIN ordres_fabrication o ON c.of_id = o.of
+                      WHERE c.sur_consommation > 0 AND o.modele IS NOT NULL AND o.modele <> ''
+                      '''
+            coupeurs = '''
+                       SELECT DISTINCT c.matricule_coupeur
+                       FROM details_coupe c
+                       WHERE c.sur_consommation > 0
+                         AND c.matricule_coupeur IS NOT NULL
+                         AND c.matricule_coupeur <> ''
+                       '''
+            # Historique : valeurs des OF actifs et archivés
+            if historique:
+                matieres, modeles, coupeurs = (history_query(query)[0] for query in (matieres, modeles, coupeurs))
+            with conn.cursor() as cursor:
+                cursor.execute(f"SELECT DISTINCT h.matiere FROM ({matieres}) h ORDER BY h.matiere")
+                options['matieres'] = [row['matiere'] for row in cursor.fetchall()]
+
+                cursor.execute(f"SELECT DISTINCT h.modele FROM ({modeles}) h ORDER BY h.modele")
+                options['modeles'] = [row['modele'] for row in cursor.fetchall()]
+
+                cursor.execute(f'''
+                               SELECT DISTINCT h.matricule_coupeur, u.nom, u.prenom
+                               FROM ({coupeurs}) h
+                                        LEFT JOIN employes u ON h.matricule_coupeur = u.matricule
+                               ORDER BY h.matricule_coupeur
+                               ''')
+                options['coupeurs'] = cursor.fetchall()
+            return options
         except Exception as e:
-            import streamlit as st
-            st.error(f"❌ Erreur démarrage piqûre: {e}")
-            return False
+            logger.error("Erreur options des filtres surconsommation: %s", e)
+            return options
         finally:
             conn.close()
 
+    # ===== 3. NOUVELLE MÉTHODE start_piqure() =====
+
+    def start_piqure(self, of_number: str, matricule_piqueur: str, observation: str = "") -> bool:
+        """Démarre l'opération de piqûre pour un OF"""
+        return self._write('start_piqure', of_number=of_number, matricule_piqueur=matricule_piqueur,
+                           observation=observation)
+
+    def _apply_start_piqure(self, cursor, at: Optional[datetime], of_number: str, matricule_piqueur: str,
+                            observation: str = "") -> bool:
+        # Vérifier si l'enregistrement existe déjà
+        cursor.execute('SELECT id FROM details_piqure WHERE of_id = %s', (of_number,))
+        exists = cursor.fetchone()
+
+        if exists:
+            # Mettre à jour
+            cursor.execute('''
+                           UPDATE details_piqure
+                           SET statut_piqure            = 'En attente',
+                               matricule_piqueur        = %s,
+                               observation_piqure       = %s,
+                               date_derniere_maj_piqure = COALESCE(%s, NOW(3))
+                           WHERE of_id = %s
+                           ''', (matricule_piqueur, observation, at, of_number))
+        else:
+            # Insérer
+            cursor.execute('''
+                           INSERT INTO details_piqure
+                           (of_id, matricule_piqueur, observation_piqure, statut_piqure,
+                            temps_piqure, date_derniere_maj_piqure)
+                           VALUES (%s, %s, %s, 'En attente', 0, COALESCE(%s, NOW(3)))
+                           ''', (of_number, matricule_piqueur, observation, at))
+
+        return True
+
 
 class Utils:
     """Classe d'utilitaires"""
@@ -1370,74 +1780,95 @@ class Utils:
         else:
             return f'<span class="status-badge status-attente">❓ {status}</span>'
 
-    @staticmethod
-    def calculate_pause_duration(order: Dict, pause_type: str = 'coupe') -> int:
-        """Calcule la durée totale de pause"""
-        try:
-            if pause_type == 'coupe':
-                duree_totale = order.get('duree_totale_pause', 0) or 0
-                duree_totale = int(duree_totale) if duree_totale is not None else 0
-
-                # Si en pause, ajouter le temps écoulé depuis la dernière pause
-                if order.get('coupe_en_pause') and order.get('date_derniere_pause'):
-                    try:
-                        if isinstance(order['date_derniere_pause'], str):
-                            last_pause = datetime.fromisoformat(order['date_derniere_pause'].replace('Z', '+00:00'))
-                        else:
-                            last_pause = order['date_derniere_pause']
+    # Étape -> (cumul des pauses, indicateur de pause, début de la pause en cours)
+    PAUSE_FIELDS = {
+        'coupe': ('duree_totale_pause', 'coupe_en_pause', 'date_derniere_pause'),
+        'controle': ('temps_pause_total', 'controle_en_pause', 'date_derniere_maj'),
+        'piqure': ('duree_totale_pause_piqure', 'piqure_en_pause', 'date_derniere_pause_piqure'),
+    }
 
-                        current_pause_duration = int((datetime.now() - last_pause).total_seconds())
-                        return duree_totale + current_pause_duration
-                    except:
-                        return duree_totale
+    @staticmethod
+    def parse_datetime(value):
+        """DATETIME du pilote ou chaîne ISO -> datetime"""
+        if isinstance(value, str):
+            return datetime.fromisoformat(value.replace('Z', '+00:00'))
+        return value
 
-                return duree_totale
+    @staticmethod
+    def seconds_since(value, now: datetime) -> int:
+        """Secondes entières écoulées entre value et now"""
+        return int((now - Utils.parse_datetime(value)).total_seconds())
 
-            elif pause_type == 'controle':
-                # Pour contrôle, utiliser temps_pause_total
-                duree_totale = order.get('temps_pause_total', 0) or 0
-                duree_totale = int(duree_totale) if duree_totale is not None else 0
+    @staticmethod
+    def calculate_pause_duration(order: Dict, pause_type: str = 'coupe', now: Optional[datetime] = None) -> int:
+        """Calcule la durée totale de pause (now : heure de référence, par défaut l'heure courante)"""
+        fields = Utils.PAUSE_FIELDS.get(pause_type)
+        if fields is None:
+            return 0
+        total_field, flag_field, since_field = fields
+        try:
+            duree_totale = order.get(total_field, 0) or 0
+            duree_totale = int(duree_totale) if duree_totale is not None else 0
 
-                # Si en pause, ajouter le temps écoulé depuis la dernière maj
-                if order.get('controle_en_pause') and order.get('date_derniere_maj'):
-                    try:
-                        if isinstance(order['date_derniere_maj'], str):
-                            last_update = datetime.fromisoformat(order['date_derniere_maj'].replace('Z', '+00:00'))
-                        else:
-                            last_update = order['date_derniere_maj']
+            # Si en pause, ajouter le temps écoulé depuis le début de la pause en cours
+            if order.get(flag_field) and order.get(since_field):
+                try:
+                    return duree_totale + Utils.seconds_since(order[since_field], now or ServerClock.now())
+                except:
+                    return duree_totale
 
-                        current_pause_duration = int((datetime.now() - last_update).total_seconds())
-                        return duree_totale + current_pause_duration
-                    except:
-                        return duree_totale
+            return duree_totale
+        except Exception as e:
+            logger.error("Erreur calculate_pause_duration: %s", e)
+            return 0
 
-                return duree_totale
+    # Étape -> (temps actif, début de l'étape, dernière mise à jour du chronomètre)
+    CHRONO_FIELDS = {
+        'coupe': ('temps_coupe', 'date_debut_coupe', 'date_derniere_maj_coupe'),
+        'controle': ('temps_actif_total', 'date_debut_controle', 'date_derniere_maj'),
+        'piqure': ('temps_piqure', 'date_debut_piqure', 'date_derniere_maj_piqure'),
+    }
 
-            elif pause_type == 'piqure':
-                duree_totale = order.get('duree_totale_pause_piqure', 0) or 0
-                duree_totale = int(duree_totale) if duree_totale is not None else 0
+    @staticmethod
+    def chrono_fields(orders: List[Dict], now: Optional[datetime] = None) -> Dict[str, Dict]:
+        """Champs dérivés des chronomètres de toutes les étapes pour un lot d'OF, par numéro d'OF.
 
-                # Si en pause, ajouter le temps écoulé depuis la dernière pause
-                if order.get('piqure_en_pause') and order.get('date_derniere_pause_piqure'):
+        Une seule heure de référence pour le lot et une seule analyse de chaque date d'une ligne.
+        Par étape (suffixe _coupe, _controle, _piqure) : actif, pause (cumul + pause en cours,
+        voir calculate_pause_duration), ecoule (depuis le début de l'étape), pct_actif, pct_pause
+        et depuis_maj (depuis la dernière mise à jour du chronomètre).
+        """
+        now = now or ServerClock.now()
+        result = {}
+        for order in orders:
+            elapsed = {}  # colonne date -> secondes jusqu'à now (None si absente ou illisible)
+
+            def since(field):
+                if field not in elapsed:
+                    value = order.get(field)
                     try:
-                        if isinstance(order['date_derniere_pause_piqure'], str):
-                            last_pause = datetime.fromisoformat(
-                                order['date_derniere_pause_piqure'].replace('Z', '+00:00'))
-                        else:
-                            last_pause = order['date_derniere_pause_piqure']
-
-                        current_pause_duration = int((datetime.now() - last_pause).total_seconds())
-                        return duree_totale + current_pause_duration
-                    except:
-                        return duree_totale
+                        elapsed[field] = Utils.seconds_since(value, now) if value else None
+                    except (TypeError, ValueError):
+                        elapsed[field] = None
+                return elapsed[field]
+
+            fields = {}
+            for stage, (actif_field, debut_field, maj_field) in Utils.CHRONO_FIELDS.items():
+                total_field, flag_field, pause_field = Utils.PAUSE_FIELDS[stage]
+                actif = int(order.get(actif_field) or 0)
+                pause = int(order.get(total_field) or 0)
+                if order.get(flag_field):
+                    pause += since(pause_field) or 0
+                ecoule = since(debut_field) or 0
+                fields['actif_' + stage] = actif
+                fields['pause_' + stage] = pause
+                fields['ecoule_' + stage] = ecoule
+                fields['pct_actif_' + stage] = actif / ecoule * 100 if ecoule > 0 else 0
+                fields['pct_pause_' + stage] = pause / ecoule * 100 if ecoule > 0 else 0
+                fields['depuis_maj_' + stage] = since(maj_field) or 0
+            result[order['of']] = fields
+        return result
 
-                return duree_totale
-
-            else:
-                return 0
-        except Exception as e:
-            print(f"❌ Erreur calculate_pause_duration: {e}")
-            return 0
     @staticmethod
     def get_quality_details(order: Dict) -> Dict:
         """Retourne les détails qualité"""
@@ -1462,88 +1893,75 @@ class Utils:
         }
 
     @staticmethod
-    def get_pause_info(order: Dict) -> str:
-        """Retourne infos sur les pauses de coupe"""
-        try:
-            duree_pause = Utils.calculate_pause_duration(order, 'coupe')
-            duree_pause = int(duree_pause) if duree_pause is not None else 0
+    def _pause_info(en_pause, duree_pause, total_label: str) -> str:
+        duree_pause = int(duree_pause) if duree_pause is not None else 0
+        if en_pause:
+            return f"⏸️ EN PAUSE: {Utils.format_time(duree_pause)}"
+        elif duree_pause > 0:
+            return f"⏸️ {total_label}: {Utils.format_time(duree_pause)}"
+        return ""
 
-            if order.get('coupe_en_pause'):
-                return f"⏸️ EN PAUSE: {Utils.format_time(duree_pause)}"
-            elif duree_pause > 0:
-                return f"⏸️ Total pauses: {Utils.format_time(duree_pause)}"
-            return ""
+    @staticmethod
+    def get_pause_info(order: Dict, duree_pause: Optional[int] = None) -> str:
+        """Retourne infos sur les pauses de coupe (duree_pause : valeur déjà calculée, ex. chrono_fields)"""
+        try:
+            if duree_pause is None:
+                duree_pause = Utils.calculate_pause_duration(order, 'coupe')
+            return Utils._pause_info(order.get('coupe_en_pause'), duree_pause, "Total pauses")
         except Exception:
             return ""
 
     @staticmethod
-    def get_controle_pause_info(order: Dict) -> str:
+    def get_controle_pause_info(order: Dict, duree_pause: Optional[int] = None) -> str:
         """Retourne infos sur les pauses de contrôle"""
         try:
-            duree_pause = Utils.calculate_pause_duration(order, 'controle')
-            duree_pause = int(duree_pause) if duree_pause is not None else 0
-
-            if order.get('controle_en_pause'):
-                return f"⏸️ EN PAUSE: {Utils.format_time(duree_pause)}"
-            elif duree_pause > 0:
-                return f"⏸️ Total pauses contrôle: {Utils.format_time(duree_pause)}"
-            return ""
+            if duree_pause is None:
+                duree_pause = Utils.calculate_pause_duration(order, 'controle')
+            return Utils._pause_info(order.get('controle_en_pause'), duree_pause, "Total pauses contrôle")
         except Exception:
             return ""
+
     @staticmethod
-    def get_pause_info_piqure(order: Dict) -> str:
+    def get_pause_info_piqure(order: Dict, duree_pause: Optional[int] = None) -> str:
         """Retourne infos sur les pauses de piqûre"""
         try:
-            duree_pause = Utils.calculate_pause_duration(order, 'piqure')
-            duree_pause = int(duree_pause) if duree_pause is not None else 0
-
-            if order.get('piqure_en_pause'):
-                return f"⏸️ EN PAUSE: {Utils.format_time(duree_pause)}"
-            elif duree_pause > 0:
-                return f"⏸️ Total pauses: {Utils.format_time(duree_pause)}"
-            return ""
+            if duree_pause is None:
+                duree_pause = Utils.calculate_pause_duration(order, 'piqure')
+            return Utils._pause_info(order.get('piqure_en_pause'), duree_pause, "Total pauses")
         except Exception:
             return ""
 
+
 class DualChronoUtils:
     """Utilitaires pour les deux chronomètres"""
 
     @staticmethod
-    def get_dual_chrono_info(order: Dict) -> Dict:
-        """Retourne les informations des deux chronomètres"""
-        temps_actif = order.get('temps_actif_total', 0) or 0
-        temps_pause = order.get('temps_pause_total', 0) or 0
-
-        # Conversion en int
-        temps_actif = int(temps_actif) if temps_actif is not None else 0
-        temps_pause = int(temps_pause) if temps_pause is not None else 0
-
-        # Calcul du temps total écoulé
-        total_ecoule = 0
-        if order.get('date_debut_controle'):
-            try:
-                total_ecoule = int((datetime.now() - order['date_debut_controle']).total_seconds())
-            except:
-                total_ecoule = 0
-
-        # Calcul des pourcentages
-        if total_ecoule > 0:
-            pourcentage_actif = (temps_actif / total_ecoule * 100)
-            pourcentage_pause = (temps_pause / total_ecoule * 100)
-        else:
-            pourcentage_actif = pourcentage_pause = 0
+    def get_dual_chrono_infos(orders: List[Dict], now: Optional[datetime] = None) -> Dict[str, Dict]:
+        """Informations des deux chronomètres de contrôle pour un lot d'OF (voir Utils.chrono_fields)"""
+        chronos = Utils.chrono_fields(orders, now)
+        return {
+            order['of']: DualChronoUtils._dual_chrono_info(order, chronos[order['of']])
+            for order in orders
+        }
 
+    @staticmethod
+    def _dual_chrono_info(order: Dict, chrono: Dict) -> Dict:
         return {
-            'temps_actif': temps_actif,
-            'temps_pause': temps_pause,
-            'total_ecoule': total_ecoule,
-            'pourcentage_actif': pourcentage_actif,
-            'pourcentage_pause': pourcentage_pause,
+            'temps_actif': chrono['actif_controle'],
+            'temps_pause': chrono['pause_controle'],
+            'total_ecoule': chrono['ecoule_controle'],
+            'pourcentage_actif': chrono['pct_actif_controle'],
+            'pourcentage_pause': chrono['pct_pause_controle'],
             'en_pause': bool(order.get('controle_en_pause')),
             'date_debut': order.get('date_debut_controle'),
             'date_derniere_maj': order.get('date_derniere_maj')
         }
 
+    @staticmethod
+    def get_dual_chrono_info(order: Dict, now: Optional[datetime] = None) -> Dict:
+        """Retourne les informations des deux chronomètres (now : heure de référence)"""
+        return DualChronoUtils.get_dual_chrono_infos([order], now)[order['of']]
+
     @staticmethod
     def format_dual_display_html(order: Dict) -> str:
         """Retourne le HTML pour afficher les deux chronomètres"""
@@ -1586,19 +2004,9 @@ class DualChronoUtils:
         return html
 
     @staticmethod
-    def calculate_time_since_last_update(order: Dict) -> int:
+    def calculate_time_since_last_update(order: Dict, now: Optional[datetime] = None) -> int:
         """Calcule le temps écoulé depuis la dernière mise à jour"""
-        if not order.get('date_derniere_maj'):
-            return 0
-
-        try:
-            last_update = order['date_derniere_maj']
-            if isinstance(last_update, str):
-                last_update = datetime.fromisoformat(last_update.replace('Z', '+00:00'))
-
-            return int((datetime.now() - last_update).total_seconds())
-        except:
-            return 0
+        return Utils.chrono_fields([order], now)[order['of']]['depuis_maj_controle']
 
 
 class KPIManager:
@@ -1611,32 +2019,43 @@ class KPIManager:
     def calculate_kpis(self) -> Dict:
         """Calcule tous les KPIs"""
         total_of = len(self.orders)
-        of_en_coupe = len([o for o in self.orders if o['statut_coupe'] == 'En cours'])
-        of_en_pause_coupe = len([o for o in self.orders if o.get('coupe_en_pause')])
-        of_termines_coupe = len([o for o in self.orders if o['statut_coupe'] == 'Terminée'])
-        of_en_controle = len([o for o in self.orders if o['statut_controle'] == 'En cours'])
-        of_en_pause_controle = len([o for o in self.orders if o.get('controle_en_pause')])
-
-        # Temps de pause totaux
-        total_pause_coupe = sum(self.utils.calculate_pause_duration(o, 'coupe')
-                                for o in self.orders if o.get('coupe_en_pause') or o.get('duree_totale_pause', 0) > 0)
-        total_pause_controle = sum(self.utils.calculate_pause_duration(o, 'controle')
-                                   for o in self.orders if
-                                   o.get('controle_en_pause') or o.get('duree_pause_controle', 0) > 0)
-
-        # Quantités
-        total_quantite = sum(o['quantite'] for o in self.orders)
-        total_controlees = sum(o.get('quantite_controlee', 0) or 0 for o in self.orders)
-        total_rejetees = sum(o.get('quantite_rejetee', 0) or 0 for o in self.orders)
-        total_retravailler = sum(o.get('quantite_retravailler', 0) or 0 for o in self.orders)
-
-        # Calculer les acceptées
-        total_acceptees = 0
+        of_en_coupe = of_en_pause_coupe = of_termines_coupe = of_en_controle = of_en_pause_controle = 0
+        total_pause_coupe = total_pause_controle = 0
+        total_quantite = total_controlees = total_rejetees = total_retravailler = 0
+        calculate_pause_duration = self.utils.calculate_pause_duration
+        now = ServerClock.now()  # même heure de référence pour toutes les pauses en cours
+
+        # Un seul passage sur les OF (chaque accès à une ligne compte, voir order_record.py)
         for o in self.orders:
-            quantite_controlee = o.get('quantite_controlee', 0) or 0
-            quantite_rejetee = o.get('quantite_rejetee', 0) or 0
-            quantite_retravailler = o.get('quantite_retravailler', 0) or 0
-            total_acceptees += quantite_controlee - quantite_rejetee - quantite_retravailler
+            get = o.get
+            statut_coupe = o['statut_coupe']
+            coupe_en_pause = get('coupe_en_pause')
+            controle_en_pause = get('controle_en_pause')
+            if statut_coupe == 'En cours':
+                of_en_coupe += 1
+            elif statut_coupe == 'Terminée':
+                of_termines_coupe += 1
+            if coupe_en_pause:
+                of_en_pause_coupe += 1
+            if o['statut_controle'] == 'En cours':
+                of_en_controle += 1
+            if controle_en_pause:
+                of_en_pause_controle += 1
+
+            # Temps de pause totaux
+            if coupe_en_pause or get('duree_totale_pause', 0) > 0:
+                total_pause_coupe += calculate_pause_duration(o, 'coupe', now)
+            if controle_en_pause or get('duree_pause_controle', 0) > 0:
+                total_pause_controle += calculate_pause_duration(o, 'controle', now)
+
+            # Quantités
+            total_quantite += o['quantite']
+            total_controlees += get('quantite_controlee', 0) or 0
+            total_rejetees += get('quantite_rejetee', 0) or 0
+            total_retravailler += get('quantite_retravailler', 0) or 0
+
+        # Acceptées : contrôlées - rejetées - à retravailler
+        total_acceptees = total_controlees - total_rejetees - total_retravailler
 
         # Taux
         taux_problemes = ((total_rejetees + total_retravailler) / total_controlees * 100) if total_controlees > 0 else 0
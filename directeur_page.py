@@ -6,12 +6,21 @@ import plotly.graph_objects as go
 import plotly.express as px
 from datetime import datetime
 from database import DatabaseManager, Utils, KPIManager, DualChronoUtils
-from typing import List, Dict
+from render_profiler import section
+from production_grid import ProductionGrid
+from analytics import AnalyticsCache, orders_data_version, orders_live_version
+from figure_cache import FigureCache
+from export_engine import SurconsommationExporter
+from export_jobs import ExportJob, ExportJobManager
+from typing import List, Dict, Optional
 
 
 class DirecteurPage:
     """Page directeur avec tableau amélioré et modal de détails"""
 
+    # Lignes affichées dans le tableau de sur-consommation (l'export contient tout)
+    SURCONS_TABLE_LIMIT = 500
+
     def __init__(self, db_manager: DatabaseManager):
         self.db_manager = db_manager
         self.utils = Utils()
@@ -52,8 +61,10 @@ class DirecteurPage:
             </div>
             """, unsafe_allow_html=True)
 
-        self.db_manager.update_all_timers()
-        orders = self.db_manager.get_all_orders()
+        with section("update_all_timers"):
+            self.db_manager.update_all_timers()
+        with section("get_all_orders"):
+            orders = self.db_manager.get_all_orders()
 
         if not orders:
             st.info("🤷 Aucun OF créé")
@@ -61,21 +72,31 @@ class DirecteurPage:
 
         # KPIs
         st.markdown('<div class="section-header">📈 Indicateurs Clés de Performance</div>', unsafe_allow_html=True)
-        kpi_manager = KPIManager(orders)
-        kpi_manager.display_kpi_cards()
+        with section("kpis"):
+            kpi_manager = KPIManager(orders)
+            kpi_manager.display_kpi_cards()
 
         # Tableau détaillé avec modal
-        self._render_improved_table(orders)
+        with section("tableau_suivi"):
+            self._render_improved_table(orders)
 
         # Modal de détails (si activé)
         if st.session_state.show_modal and st.session_state.selected_of_detail:
-            self._render_detail_modal()
+            with section("detail_of"):
+                self._render_detail_modal()
+
+        # Versions des données, clés des caches d'analyse et de graphiques : métier (statuts,
+        # quantités) et en direct (changée aussi par les chronomètres, pour les graphiques de temps)
+        data_version = orders_data_version(orders)
+        live_version = orders_live_version(orders)
 
         # Visualisations
-        self._render_visualizations(orders)
+        with section("graphiques"):
+            self._render_visualizations(orders, data_version, live_version)
 
         # Nouvel onglet d'analyse de sur-consommation
-        self._render_surconsommation_analysis()
+        with section("sur_consommation"):
+            self._render_surconsommation_analysis()
 
         # Footer
         st.markdown("---")
@@ -90,97 +111,82 @@ class DirecteurPage:
         """Affiche l'analyse de sur-consommation"""
         st.markdown('<div class="section-header">📦 Analyse de la Sur-consommation</div>', unsafe_allow_html=True)
 
-        # Récupérer les données
-        surcons_data = self.db_manager.get_surconsommation_data()
+        # OF archivés seulement sur demande : sans eux, tri et agrégats servis par les index des tables vivantes
+        historique = st.checkbox("Inclure les OF archivés", value=False, key="surcons_historique")
+
+        # KPIs principaux (agrégés par MySQL)
+        summary = self.db_manager.get_surconsommation_summary(historique=historique)
 
-        if not surcons_data:
+        if summary['nombre_of'] == 0:
             st.info("✅ Aucune sur-consommation enregistrée pour le moment")
             return
 
-        # KPIs principaux
-        total_surcons = sum(float(item['sur_consommation']) for item in surcons_data)
-        total_consommation = sum(float(item['consommation']) for item in surcons_data)
-        taux_moyen_surcons = (total_surcons / total_consommation * 100) if total_consommation > 0 else 0
-        nombre_of = len(surcons_data)
-
         col1, col2, col3, col4 = st.columns(4)
 
         with col1:
-            st.metric("📊 OF avec surcons", nombre_of)
+            st.metric("📊 OF avec surcons", summary['nombre_of'])
         with col2:
-            st.metric("📦 Sur-consommation totale", f"{total_surcons:.2f} m²")
+            st.metric("📦 Sur-consommation totale", f"{summary['total_surcons']:.2f} m²")
         with col3:
-            st.metric("📈 Taux moyen", f"{taux_moyen_surcons:.1f}%")
+            st.metric("📈 Taux moyen", f"{summary['taux_moyen']:.1f}%")
 
 
         st.markdown("---")
 
         # Filtres
-        col_f1, col_f2, col_f3 = st.columns(3)
+        options = self.db_manager.get_surconsommation_filter_options(historique=historique)
+        col_f1, col_f2, col_f3, col_f4 = st.columns(4)
 
         with col_f1:
             # Filtrer par matière
-            matieres = ["Toutes"] + sorted(list(set([item['matiere'] for item in surcons_data if item['matiere']])))
-            filtre_matiere = st.selectbox("Matière", matieres, key="surcons_matiere")
+            filtre_matiere = st.selectbox("Matière", ["Toutes"] + options['matieres'], key="surcons_matiere")
 
         with col_f2:
             # Filtrer par coupeur
-            coupeurs_info = []
-            for item in surcons_data:
-                if item.get('matricule_coupeur'):
-                    nom_complet = f"{item.get('matricule_coupeur', '')}"
-                    if item.get('prenom_coupeur') or item.get('nom_coupeur'):
-                        nom_complet += f" - {item.get('prenom_coupeur', '')} {item.get('nom_coupeur', '')}"
-                    coupeurs_info.append(nom_complet)
+            coupeurs_labels = {}
+            for coupeur in options['coupeurs']:
+                nom_complet = f"{coupeur['matricule_coupeur']}"
+                if coupeur.get('prenom') or coupeur.get('nom'):
+                    nom_complet += f" - {coupeur.get('prenom') or ''} {coupeur.get('nom') or ''}"
+                coupeurs_labels[coupeur['matricule_coupeur']] = nom_complet.strip()
 
-            coupeurs = ["Tous"] + sorted(list(set(coupeurs_info)))
-            filtre_coupeur = st.selectbox("Coupeur", coupeurs, key="surcons_coupeur")
+            filtre_coupeur = st.selectbox("Coupeur", ["Tous"] + list(coupeurs_labels.keys()),
+                                          format_func=lambda m: coupeurs_labels.get(m, m), key="surcons_coupeur")
 
         with col_f3:
             # Filtrer par modèle
-            modeles = ["Tous"] + sorted(list(set([item['modele'] for item in surcons_data if item['modele']])))
-            filtre_modele = st.selectbox("Modèle", modeles, key="surcons_modele")
+            filtre_modele = st.selectbox("Modèle", ["Tous"] + options['modeles'], key="surcons_modele")
 
-        # Appliquer les filtres
-        filtered_data = surcons_data
-        if filtre_matiere != "Toutes":
-            filtered_data = [item for item in filtered_data if item['matiere'] == filtre_matiere]
-        if filtre_coupeur != "Tous":
-            filtered_data = [item for item in filtered_data if
-                             f"{item.get('matricule_coupeur', '')} - {item.get('prenom_coupeur', '')} {item.get('nom_coupeur', '')}".strip() == filtre_coupeur.strip()]
-        if filtre_modele != "Tous":
-            filtered_data = [item for item in filtered_data if item['modele'] == filtre_modele]
+        with col_f4:
+            # Seuil de taux
+            filtre_taux = st.number_input("Taux minimum (%)", min_value=0.0, max_value=1000.0, value=0.0,
+                                          step=5.0, key="surcons_taux_min")
+
+        # Filtres appliqués par MySQL
+        filters = {
+            'matiere': filtre_matiere if filtre_matiere != "Toutes" else None,
+            'coupeur': filtre_coupeur if filtre_coupeur != "Tous" else None,
+            'modele': filtre_modele if filtre_modele != "Tous" else None,
+            'taux_min': filtre_taux or None,
+            'historique': historique,
+        }
+        filtered_summary = self.db_manager.get_surconsommation_summary(**filters)
+        # Clé des graphiques et des exports : ignore les passages des chronomètres
+        surcons_version = self.db_manager.get_surconsommation_version() or None
 
         # Tableau détaillé
         st.markdown("### 📋 Détails par OF")
 
-        if filtered_data:
-            # Créer un DataFrame pour affichage
-            df = pd.DataFrame(filtered_data)
-
-            # Formater les colonnes
-            df['sur_consommation'] = df['sur_consommation'].apply(lambda x: f"{float(x):.2f} m²")
-            df['consommation'] = df['consommation'].apply(lambda x: f"{float(x):.2f} m²")
-
-            # Calculer le total et le taux
-            df['total_consommation'] = df.apply(
-                lambda
-                    row: f"{float(row['consommation'].replace(' m²', '')) + float(row['sur_consommation'].replace(' m²', '')):.2f} m²",
-                axis=1
-            )
-
-            df['taux_surcons'] = df.apply(
-                lambda row: float(row['sur_consommation'].replace(' m²', '')) / float(
-                    row['consommation'].replace(' m²', '')) * 100
-                if float(row['consommation'].replace(' m²', '')) > 0 else 0,
-                axis=1
-            )
+        if filtered_summary['nombre_of'] > 0:
+            filtered_data = self.db_manager.get_surconsommation_data(**filters, limit=self.SURCONS_TABLE_LIMIT)
 
-            # Sélectionner et renommer les colonnes
-            display_df = df[[
+            # Créer un DataFrame pour affichage (colonnes calculées par MySQL)
+            display_df = pd.DataFrame(filtered_data, columns=[
                 'of', 'modele', 'matiere', 'coloris', 'matricule_coupeur',
                 'consommation', 'sur_consommation', 'total_consommation', 'taux_surcons'
-            ]].copy()
+            ])
+            numeric_cols = ['consommation', 'sur_consommation', 'total_consommation', 'taux_surcons']
+            display_df[numeric_cols] = display_df[numeric_cols].astype(float)
 
             display_df.columns = [
                 'OF', 'Modèle', 'Matière', 'Coloris', 'Coupeur',
@@ -196,6 +202,9 @@ class DirecteurPage:
                     "OF": st.column_config.TextColumn("OF", width="small"),
                     "Modèle": st.column_config.TextColumn("Modèle", width="medium"),
                     "Matière": st.column_config.TextColumn("Matière", width="small"),
+                    "Cons. Std (m²)": st.column_config.NumberColumn("Cons. Std (m²)", format="%.2f m²"),
+                    "Sur-cons (m²)": st.column_config.NumberColumn("Sur-cons (m²)", format="%.2f m²"),
+                    "Total (m²)": st.column_config.NumberColumn("Total (m²)", format="%.2f m²"),
                     "Taux (%)": st.column_config.ProgressColumn(
                         "Taux (%)",
                         format="%.1f%%",
@@ -204,6 +213,9 @@ class DirecteurPage:
                     )
                 }
             )
+            if filtered_summary['nombre_of'] > len(filtered_data):
+                st.caption(f"{len(filtered_data)} plus fortes sur-consommations affichées sur "
+                           f"{filtered_summary['nombre_of']} • l'export contient toutes les lignes")
 
             # Graphiques d'analyse
             st.markdown("### 📊 Visualisations")
@@ -211,126 +223,99 @@ class DirecteurPage:
 
             with col_chart1:
                 # Sur-consommation par matière
-                if len(filtered_data) > 0:
-                    surcons_by_matiere = {}
-                    for item in filtered_data:
-                        matiere = item['matiere'] or 'Non spécifié'
-                        surcons = float(item['sur_consommation'])
-                        if matiere not in surcons_by_matiere:
-                            surcons_by_matiere[matiere] = 0
-                        surcons_by_matiere[matiere] += surcons
-
-                    if surcons_by_matiere:
-                        fig1 = go.Figure(data=[
-                            go.Bar(
-                                x=list(surcons_by_matiere.keys()),
-                                y=list(surcons_by_matiere.values()),
-                                marker_color='#F59E0B',
-                                text=[f"{v:.1f}m²" for v in surcons_by_matiere.values()],
-                                textposition='auto'
-                            )
-                        ])
-                        fig1.update_layout(
-                            title="Sur-consommation par Matière (m²)",
-                            height=400,
-                            xaxis_title="Matière",
-                            yaxis_title="Sur-consommation (m²)"
+                def build_surcons_by_matiere():
+                    surcons_by_matiere = self.db_manager.get_surconsommation_by_matiere(**filters)
+                    if not surcons_by_matiere:
+                        return None
+
+                    matieres = [row['matiere'] for row in surcons_by_matiere]
+                    totaux = [float(row['total_surcons']) for row in surcons_by_matiere]
+                    fig1 = go.Figure(data=[
+                        go.Bar(
+                            x=matieres,
+                            y=totaux,
+                            marker_color='#F59E0B',
+                            text=[f"{v:.1f}m²" for v in totaux],
+                            textposition='auto'
                         )
-                        st.plotly_chart(fig1, use_container_width=True, config={'displayModeBar': False})
+                    ])
+                    fig1.update_layout(
+                        title="Sur-consommation par Matière (m²)",
+                        height=400,
+                        xaxis_title="Matière",
+                        yaxis_title="Sur-consommation (m²)"
+                    )
+                    return fig1
+
+                FigureCache.plot('surcons_by_matiere', surcons_version, filters, build_surcons_by_matiere,
+                                 {'displayModeBar': False})
 
             with col_chart2:
-                # Taux de sur-consommation par coupeur
-                if len(filtered_data) > 0:
-                    taux_by_coupeur = {}
-                    for item in filtered_data:
-                        # Récupérer le matricule - FORCER LE TYPE TEXTE
-                        coupeur = str(item.get('matricule_coupeur', 'Inconnu')).strip()
-                        if coupeur and coupeur != 'Inconnu' and item.get('consommation'):
-                            try:
-                                surcons = float(item['sur_consommation'])
-                                consommation = float(item['consommation'])
-                                if consommation > 0:
-                                    taux = (surcons / consommation * 100)
-                                    if coupeur not in taux_by_coupeur:
-                                        taux_by_coupeur[coupeur] = []
-                                    taux_by_coupeur[coupeur].append(taux)
-                            except (ValueError, TypeError):
-                                continue
-
-                    # Calculer la moyenne par coupeur
-                    if taux_by_coupeur:
-                        avg_taux_by_coupeur = {}
-                        for coupeur, taux_list in taux_by_coupeur.items():
-                            if taux_list:
-                                avg_taux_by_coupeur[coupeur] = sum(taux_list) / len(taux_list)
-
-                        if avg_taux_by_coupeur:
-                            # Trier par taux décroissant
-                            sorted_items = sorted(avg_taux_by_coupeur.items(), key=lambda x: x[1], reverse=True)
-                            coupeurs = [str(item[0]) for item in sorted_items]  # S'assurer que c'est du texte
-                            taux_values = [item[1] for item in sorted_items]
-
-                            # Créer le graphique avec traitement spécial pour l'axe X
-                            fig2 = go.Figure(data=[
-                                go.Bar(
-                                    x=coupeurs,
-                                    y=taux_values,
-                                    marker_color='#EF4444',
-                                    text=[f"{v:.1f}%" for v in taux_values],
-                                    textposition='auto',
-                                    hovertemplate="<b>Matricule: %{x}</b><br>Taux: %{y:.1f}%<extra></extra>",
-                                    textfont=dict(size=10)
-                                )
-                            ])
-
-                            # CORRECTION CRITIQUE : Forcer l'axe X à être traité comme catégorie textuelle
-                            fig2.update_layout(
-                                title="Taux moyen de Sur-consommation par Coupeur",
-                                height=400,
-                                xaxis_title="Matricule Coupeur",
-                                yaxis_title="Taux moyen (%)",
-                                xaxis={
-                                    'type': 'category',  # Forcer le type catégoriel
-                                    'tickmode': 'array',
-                                    'tickvals': coupeurs,  # Valeurs exactes
-                                    'ticktext': coupeurs,  # Texte exact (mêmes valeurs)
-                                    'tickangle': -45,
-                                    'tickfont': dict(size=10),
-                                    # Empêcher le formatage automatique des nombres
-                                    'tickformat': '',
-                                    'showticklabels': True,
-                                },
-                                yaxis={
-                                    'tickformat': '.1f',
-                                    'title': 'Taux (%)'
-                                },
-                                margin=dict(l=50, r=50, t=80, b=150)  # Ajuster les marges
-                            )
-
-                            # Ajouter cette option pour désactiver le formatage automatique
-                            fig2.update_xaxes(automargin=True)
-
-                            st.plotly_chart(fig2, use_container_width=True, config={'displayModeBar': False})
-
-                            # DEBUG: Afficher les données brutes
-                            # st.write("DEBUG - Matricules:", coupeurs)
-                            # st.write("DEBUG - Taux:", taux_values)
+                # Taux moyen de sur-consommation par coupeur (déjà trié par MySQL)
+                def build_surcons_by_coupeur():
+                    taux_by_coupeur = self.db_manager.get_surconsommation_by_coupeur(**filters)
+                    if not taux_by_coupeur:
+                        return None
 
-                        else:
-                            st.info("⚠️ Données insuffisantes pour calculer les taux par coupeur")
-                            # Analyse détaillée
+                    coupeurs = [str(row['matricule_coupeur']).strip() for row in taux_by_coupeur]  # Texte
+                    taux_values = [float(row['taux_moyen']) for row in taux_by_coupeur]
+
+                    # Créer le graphique avec traitement spécial pour l'axe X
+                    fig2 = go.Figure(data=[
+                        go.Bar(
+                            x=coupeurs,
+                            y=taux_values,
+                            marker_color='#EF4444',
+                            text=[f"{v:.1f}%" for v in taux_values],
+                            textposition='auto',
+                            hovertemplate="<b>Matricule: %{x}</b><br>Taux: %{y:.1f}%<extra></extra>",
+                            textfont=dict(size=10)
+                        )
+                    ])
+
+                    # CORRECTION CRITIQUE : Forcer l'axe X à être traité comme catégorie textuelle
+                    fig2.update_layout(
+                        title="Taux moyen de Sur-consommation par Coupeur",
+                        height=400,
+                        xaxis_title="Matricule Coupeur",
+                        yaxis_title="Taux moyen (%)",
+                        xaxis={
+                            'type': 'category',  # Forcer le type catégoriel
+                            'tickmode': 'array',
+                            'tickvals': coupeurs,  # Valeurs exactes
+                            'ticktext': coupeurs,  # Texte exact (mêmes valeurs)
+                            'tickangle': -45,
+                            'tickfont': dict(size=10),
+                            # Empêcher le formatage automatique des nombres
+                            'tickformat': '',
+                            'showticklabels': True,
+                        },
+                        yaxis={
+                            'tickformat': '.1f',
+                            'title': 'Taux (%)'
+                        },
+                        margin=dict(l=50, r=50, t=80, b=150)  # Ajuster les marges
+                    )
+
+                    # Ajouter cette option pour désactiver le formatage automatique
+                    fig2.update_xaxes(automargin=True)
+
+                    return fig2
+
+                if not FigureCache.plot('surcons_by_coupeur', surcons_version, filters, build_surcons_by_coupeur,
+                                        {'displayModeBar': False}):
+                    st.info("⚠️ Données insuffisantes pour calculer les taux par coupeur")
+
+            # Analyse détaillée
             st.markdown("### 🔍 Analyse détaillée")
 
-            # Top 5 des plus grosses sur-consommations
+            # Top 5 des plus grosses sur-consommations (ORDER BY ... LIMIT 5)
             st.markdown("**🏆 Top 5 des plus grosses sur-consommations :**")
-            top5 = sorted(filtered_data,
-                          key=lambda x: float(x['sur_consommation']),
-                          reverse=True)[:5]
+            top5 = filtered_data[:5]
 
             for idx, item in enumerate(top5, 1):
                 surcons = float(item['sur_consommation'])
-                consommation = float(item['consommation'])
-                taux = (surcons / consommation * 100) if consommation > 0 else 0
+                taux = float(item['taux_surcons'] or 0)
 
                 st.markdown(f"""
                 <div style="background: {'#FEF3C7' if idx == 1 else '#F3F4F6'}; 
@@ -357,128 +342,12 @@ class DirecteurPage:
             col_exp1, col_exp2, col_exp3 = st.columns([1, 1, 2])
 
             with col_exp1:
-                # Bouton pour exporter en Excel
-                if st.button("📊 Exporter Excel", use_container_width=True, type="primary", key="export_excel"):
-                    try:
-                        # Créer un DataFrame
-                        export_df = pd.DataFrame(filtered_data)
-
-                        # Formater les colonnes numériques
-                        numeric_cols = ['consommation', 'sur_consommation', 'total_consommation', 'taux_surcons']
-                        for col in numeric_cols:
-                            if col in export_df.columns:
-                                export_df[col] = pd.to_numeric(export_df[col], errors='coerce')
-
-                        # Sélectionner et organiser les colonnes
-                        columns_to_export = [
-                            'of', 'modele', 'matiere', 'coloris', 'matricule_coupeur',
-                            'consommation', 'sur_consommation', 'total_consommation', 'taux_surcons',
-                            'date_debut_coupe', 'date_fin_coupe', 'statut_coupe',
-                            'nom_coupeur', 'prenom_coupeur', 'observation_coupe'
-                        ]
-
-                        # Garder seulement les colonnes existantes
-                        available_columns = [col for col in columns_to_export if col in export_df.columns]
-                        export_df = export_df[available_columns]
-
-                        # Renommer les colonnes pour un meilleur affichage
-                        column_names_fr = {
-                            'of': 'OF',
-                            'modele': 'Modèle',
-                            'matiere': 'Matière',
-                            'coloris': 'Coloris',
-                            'matricule_coupeur': 'Matricule Coupeur',
-                            'consommation': 'Consommation Std (m²)',
-                            'sur_consommation': 'Sur-consommation (m²)',
-                            'total_consommation': 'Total Consommation (m²)',
-                            'taux_surcons': 'Taux Sur-cons (%)',
-                            'date_debut_coupe': 'Date Début Coupe',
-                            'date_fin_coupe': 'Date Fin Coupe',
-                            'statut_coupe': 'Statut Coupe',
-                            'nom_coupeur': 'Nom Coupeur',
-                            'prenom_coupeur': 'Prénom Coupeur',
-                            'observation_coupe': 'Observation'
-                        }
-
-                        export_df = export_df.rename(columns=column_names_fr)
-
-                        # Créer un fichier Excel en mémoire
-                        from io import BytesIO
-                        output = BytesIO()
-
-                        # Créer un writer Excel avec openpyxl
-                        with pd.ExcelWriter(output, engine='openpyxl') as writer:
-                            # Feuille principale
-                            export_df.to_excel(writer, sheet_name='Sur-consommation', index=False)
-
-                            # Ajuster la largeur des colonnes
-                            worksheet = writer.sheets['Sur-consommation']
-                            for column in worksheet.columns:
-                                max_length = 0
-                                column_letter = column[0].column_letter
-                                for cell in column:
-                                    try:
-                                        if len(str(cell.value)) > max_length:
-                                            max_length = len(str(cell.value))
-                                    except:
-                                        pass
-                                adjusted_width = min(max_length + 2, 50)
-                                worksheet.column_dimensions[column_letter].width = adjusted_width
-
-                            # Ajouter une feuille de synthèse
-                            summary_data = {
-                                'Métrique': ['Total OF', 'Sur-consommation totale (m²)', 'Taux moyen (%)',
-                                             'Coût estimé (€)'],
-                                'Valeur': [
-                                    len(filtered_data),
-                                    total_surcons,
-                                    taux_moyen_surcons,
-                                    total_surcons * 15
-                                ]
-                            }
-                            summary_df = pd.DataFrame(summary_data)
-                            summary_df.to_excel(writer, sheet_name='Synthèse', index=False)
-
-                            # Ajouter une feuille par matière
-                            if len(filtered_data) > 0:
-                                matieres = list(set([item['matiere'] for item in filtered_data if item['matiere']]))
-                                for matiere in matieres:
-                                    matiere_data = [item for item in filtered_data if item['matiere'] == matiere]
-                                    matiere_df = pd.DataFrame(matiere_data)
-                                    if not matiere_df.empty:
-                                        matiere_df = matiere_df[
-                                            ['of', 'modele', 'consommation', 'sur_consommation', 'taux_surcons']]
-                                        matiere_df = matiere_df.rename(columns={
-                                            'of': 'OF',
-                                            'modele': 'Modèle',
-                                            'consommation': 'Consommation (m²)',
-                                            'sur_consommation': 'Sur-cons (m²)',
-                                            'taux_surcons': 'Taux (%)'
-                                        })
-                                        sheet_name = matiere[:31]  # Excel limite à 31 caractères
-                                        matiere_df.to_excel(writer, sheet_name=sheet_name, index=False)
-
-                        output.seek(0)
-
-                        # Téléchargement
-                        filename = f"surconsommation_{datetime.now().strftime('%Y%m%d_%H%M')}.xlsx"
-                        st.download_button(
-                            label="💾 Télécharger Excel",
-                            data=output,
-                            file_name=filename,
-                            mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-                            use_container_width=True,
-                            key="download_excel"
-                        )
-
-                        st.success(f"✅ Fichier Excel prêt: {filename}")
-
-                    except Exception as e:
-                        st.error(f"❌ Erreur création Excel: {e}")
-                        import traceback
-                        traceback.print_exc()
+                # Export Excel en arrière-plan (fichier réutilisé si rien n'a changé)
+                self._render_export_controls('xlsx', "📊 Exporter Excel", filters, surcons_version)
 
             with col_exp2:
+                self._render_export_controls('csv', "🧾 Exporter CSV", filters, surcons_version)
+
                 # Option pour exporter en PDF (optionnel)
                 if st.button("📄 Exporter PDF", use_container_width=True, key="export_pdf"):
                     st.info("🚧 Fonction PDF en développement")
@@ -494,8 +363,53 @@ class DirecteurPage:
         else:
             st.warning("⚠️ Aucune donnée ne correspond aux filtres sélectionnés")
 
+    def _render_export_controls(self, fmt: str, label: str, filters: Dict, data_version: Optional[str]):
+        """Bouton d'export, suivi de la tâche et téléchargement du fichier"""
+        if 'export_jobs' not in st.session_state:
+            st.session_state.export_jobs = {}
+
+        if st.button(label, use_container_width=True, type="primary" if fmt == 'xlsx' else "secondary",
+                     key=f"export_{fmt}"):
+            db_manager = self.db_manager
+
+            def producer(path, on_progress):
+                # Exécuté dans le thread d'export : toutes les lignes filtrées, sans limite,
+                # lues en flux du serveur jusqu'au fichier (mémoire bornée)
+                total = db_manager.get_surconsommation_summary(**filters)['nombre_of']
+                rows = db_manager.iter_surconsommation_data(**filters)
+                exporter = SurconsommationExporter(progress_callback=on_progress)
+                if fmt == 'csv':
+                    exporter.export_csv(rows, path, total)
+                else:
+                    exporter.export(rows, path, total)
+
+            st.session_state.export_jobs[fmt] = ExportJobManager.submit(
+                'surconsommation', filters, data_version or '', fmt, producer)
+
+        job = ExportJobManager.get(st.session_state.export_jobs.get(fmt))
+        if job is None:
+            return
+
+        if not job.is_finished:
+            # Rafraîchissement rapproché tant que l'export tourne
+            st_autorefresh(interval=1000, limit=600, key=f"export_poll_{fmt}")
+            st.progress(job.progress, text=f"{job.status} : {job.done_rows}/{job.total_rows or '?'} lignes")
+        elif job.status == ExportJob.FAILED:
+            st.error(f"❌ Erreur création {fmt.upper()}: {job.error}")
+        else:
+            filename = f"surconsommation_{datetime.now().strftime('%Y%m%d_%H%M')}.{fmt}"
+            st.download_button(
+                label=f"💾 Télécharger {fmt.upper()}",
+                data=job.read_bytes(),
+                file_name=filename,
+                mime=ExportJobManager.MIME_TYPES[fmt],
+                use_container_width=True,
+                key=f"download_{fmt}"
+            )
+            st.caption("♻️ Fichier déjà généré (données inchangées)" if job.cached else f"✅ Fichier prêt: {filename}")
+
     def _render_improved_table(self, orders: List[Dict]):
-        """Affiche le tableau amélioré avec double chronomètre"""
+        """Affiche le tableau de suivi (grille virtualisée) avec double chronomètre"""
         st.markdown('<div class="section-header">📊 Tableau de Suivi Production</div>', unsafe_allow_html=True)
 
         # Filtres compacts en ligne
@@ -526,58 +440,12 @@ class DirecteurPage:
             if self._apply_filters(order, filter_status, filter_model, filter_qualite, filter_pause):
                 filtered_orders.append(order)
 
-        # Construction des données du tableau
-        # Construction des données du tableau
-        table_data = []
-        for order in filtered_orders:
-            # ===== CALCULS POUR LA COUPE =====
-            temps_coupe = order.get('temps_coupe', 0) or 0
-            pause_coupe_duration = self.utils.calculate_pause_duration(order, 'coupe')
-            total_coupe_avec_pause = temps_coupe + pause_coupe_duration
-
-            # ===== CALCULS POUR LE CONTRÔLE =====
-            pause_controle_duration = order.get('temps_pause_total', 0) or 0
-            if pause_controle_duration == 0:
-                pause_controle_duration = self.utils.calculate_pause_duration(order, 'controle')
-            temps_controle_valeur = order.get('temps_actif_total', 0) or 0
-            if temps_controle_valeur == 0:
-                temps_controle_valeur = order.get('temps_controle', 0) or 0
-
-            # Pourcentage de contrôle
-            quantite_controlee = order.get('quantite_controlee', 0) or 0
-            quantite_totale = order['quantite']
-            pourcentage = (quantite_controlee / quantite_totale * 100) if quantite_totale > 0 else 0
-
-            # ===== NOUVELLES DONNÉES PIQÛRE =====
-            temps_piqure = order.get('temps_piqure', 0) or 0
-            pause_piqure_duration = self.utils.calculate_pause_duration(order, 'piqure')
-            statut_piqure = order.get('statut_piqure', 'En attente')
-
-            table_data.append({
-                'OF': order['of'],
-                'Modèle': order['modele'],
-                'Couleur': order['couleur_modele'],
-                'Quantité': quantite_totale,
-                'Statut Coupe': order['statut_coupe'],
-                'Temps Coupe': self.utils.format_time(temps_coupe),
-                'Statut Contrôle': order['statut_controle'],
-                'Temps Contrôle': self.utils.format_time(temps_controle_valeur),
-                'Pourcentage': pourcentage,
-
-                # Nouvelles données piqûre
-                'Statut Piqûre': statut_piqure,
-                'Temps Piqûre': self.utils.format_time(temps_piqure),
-                'Pause Piqûre': pause_piqure_duration,
-
-                '_order_data': order
-            })
-
-        if not table_data:
+        if not filtered_orders:
             st.info("Aucun OF ne correspond aux filtres sélectionnés.")
             return
 
-        # Affichage du tableau HTML
-        self._render_html_table(table_data)
+        # Grille virtualisée (seules les lignes modifiées sont recalculées)
+        ProductionGrid().render(filtered_orders)
 
         # Sélecteur d'OF pour voir les détails
         st.markdown("---")
@@ -586,7 +454,7 @@ class DirecteurPage:
         col_select1, col_select2 = st.columns([4, 1])
 
         with col_select1:
-            of_list = [row['OF'] for row in table_data]
+            of_list = [o['of'] for o in filtered_orders]
             selected_of = st.selectbox(
                 "Sélectionner un OF pour voir tous les détails",
                 ["Choisir un OF..."] + of_list,
@@ -602,159 +470,6 @@ class DirecteurPage:
                     st.session_state.selected_of_detail = selected_of
                     st.session_state.show_modal = True
 
-    def _render_html_table(self, table_data: List[Dict]):
-        """Génère et affiche le tableau HTML avec couleurs - AVEC PIQÛRE ET PAUSES"""
-        table_html = """
-        <div class="dataframe-container">
-            <table class="data-table">
-                <thead>
-                    <tr>
-                        <th>OF</th>
-                        <th>Modèle</th>
-                        <th>Couleur</th>
-                        <th>Quantité</th>
-                        <th>Statut Coupe</th>
-                        <th>⏱️ Coupe</th>
-                        <th>⏸️ Pause Coupe</th>  <!-- NOUVEAU -->
-                        <th>Statut Ctrl</th>
-                        <th>⏱️ Ctrl</th>
-                        <th>⏸️ Pause Ctrl</th>   <!-- NOUVEAU -->
-                        <th>% Ctrl</th>
-                        <th>Statut Piqûre</th>
-                        <th>⏱️ Piqûre</th>
-                        <th>⏸️ Pause Piqûre</th>
-                    </tr>
-                </thead>
-                <tbody>
-        """
-
-        for idx, row in enumerate(table_data):
-            row_class = "table-row-even" if idx % 2 == 0 else "table-row-odd"
-            table_html += f'<tr class="{row_class}">'
-
-            # OF
-            table_html += f'<td class="of-cell"><strong>{row["OF"]}</strong></td>'
-            table_html += f'<td>{row["Modèle"]}</td>'
-            table_html += f'<td>{row["Couleur"]}</td>'
-            table_html += f'<td><strong>{row["Quantité"]}</strong></td>'
-
-            # Statut Coupe
-            status_coupe_class = self._get_status_class(row['Statut Coupe'])
-            status_coupe_icon = self._get_status_icon(row['Statut Coupe'])
-            table_html += f'<td><span class="status-cell {status_coupe_class}">{status_coupe_icon} {row["Statut Coupe"]}</span></td>'
-
-            # Temps Coupe
-            table_html += f'<td><span class="time-cell">⏱️ {row["Temps Coupe"]}</span></td>'
-
-            # ===== PAUSE COUPE =====
-            order_data = row.get('_order_data', {})
-            pause_coupe_value = self.utils.calculate_pause_duration(order_data, 'coupe')
-            if pause_coupe_value > 0:
-                pause_coupe_display = self.utils.format_time(pause_coupe_value)
-                if order_data.get('coupe_en_pause'):
-                    table_html += f'<td><span class="pause-cell-active" title="EN PAUSE ACTUELLEMENT">⏸️ {pause_coupe_display}</span></td>'
-                else:
-                    table_html += f'<td><span class="pause-cell" title="Pause historique">⏸️ {pause_coupe_display}</span></td>'
-            else:
-                table_html += f'<td><span class="pause-cell-zero">-</span></td>'
-
-            # Statut Contrôle
-            status_ctrl_class = self._get_status_class(row['Statut Contrôle'])
-            status_ctrl_icon = self._get_status_icon(row['Statut Contrôle'])
-            table_html += f'<td><span class="status-cell {status_ctrl_class}">{status_ctrl_icon} {row["Statut Contrôle"]}</span></td>'
-
-            # Temps Contrôle
-            table_html += f'<td><span class="time-cell">⏱️ {row["Temps Contrôle"]}</span></td>'
-
-            # ===== PAUSE CONTRÔLE =====
-            pause_controle_value = order_data.get('temps_pause_total', 0) or 0
-            if pause_controle_value == 0:
-                pause_controle_value = self.utils.calculate_pause_duration(order_data, 'controle')
-
-            if pause_controle_value > 0:
-                pause_controle_display = self.utils.format_time(pause_controle_value)
-                if order_data.get('controle_en_pause'):
-                    table_html += f'<td><span class="pause-cell-active" title="EN PAUSE ACTUELLEMENT">⏸️ {pause_controle_display}</span></td>'
-                else:
-                    table_html += f'<td><span class="pause-cell" title="Pause historique">⏸️ {pause_controle_display}</span></td>'
-            else:
-                table_html += f'<td><span class="pause-cell-zero">-</span></td>'
-
-            # % Contrôle
-            progress_class = self._get_progress_class(row["Pourcentage"])
-            table_html += f'<td><span class="progress-cell {progress_class}">{row["Pourcentage"]:.1f}%</span></td>'
-
-            # ===== COLONNES PIQÛRE =====
-            # Statut Piqûre
-            statut_piqure = row.get('Statut Piqûre', 'En attente')
-            status_piqure_class = self._get_status_class(statut_piqure)
-            status_piqure_icon = self._get_status_icon(statut_piqure)
-            table_html += f'<td><span class="status-cell {status_piqure_class}">{status_piqure_icon} {statut_piqure}</span></td>'
-
-            # Temps Piqûre
-            temps_piqure = row.get('Temps Piqûre', '00:00:00')
-            table_html += f'<td><span class="time-cell">🪡 {temps_piqure}</span></td>'
-
-            # Pause Piqûre
-            pause_piqure_value = row.get('Pause Piqûre', 0)
-            if pause_piqure_value > 0:
-                pause_piqure_display = self.utils.format_time(pause_piqure_value)
-                if order_data.get('piqure_en_pause'):
-                    table_html += f'<td><span class="pause-cell-active" title="EN PAUSE ACTUELLEMENT">⏸️ {pause_piqure_display}</span></td>'
-                else:
-                    table_html += f'<td><span class="pause-cell" title="Pause historique">⏸️ {pause_piqure_display}</span></td>'
-            else:
-                table_html += f'<td><span class="pause-cell-zero">-</span></td>'
-
-            table_html += '</tr>'
-
-        table_html += """
-                </tbody>
-            </table>
-        </div>
-        """
-
-        st.markdown(table_html, unsafe_allow_html=True)
-
-    def _get_status_class(self, status: str) -> str:
-        """Retourne la classe CSS pour le statut"""
-        status_map = {
-            'En attente': 'status-attente',
-            'En cours': 'status-en-cours',
-            'Terminée': 'status-terminee',
-            'En pause': 'status-pause',
-            'Approuvé ✅': 'status-approuve',
-            'Rejeté ❌': 'status-rejete',
-            'À retravailler 🔧': 'status-retravailler',
-            'Contrôle partiel': 'status-partiel'
-        }
-        return status_map.get(status, 'status-attente')
-
-    def _get_status_icon(self, status: str) -> str:
-        """Retourne l'icône pour le statut"""
-        icon_map = {
-            'En attente': '⏳',
-            'En cours': '🔄',
-            'Terminée': '✅',
-            'En pause': '⏸️',
-            'Approuvé ✅': '✅',
-            'Rejeté ❌': '❌',
-            'À retravailler 🔧': '🔧',
-            'Contrôle partiel': '🔄'
-        }
-        return icon_map.get(status, '❓')
-
-    def _get_progress_class(self, percentage: float) -> str:
-        """Retourne la classe CSS selon le pourcentage"""
-        if percentage >= 100:
-            return 'progress-complete'
-        elif percentage >= 75:
-            return 'progress-high'
-        elif percentage >= 40:
-            return 'progress-medium'
-        else:
-            return 'progress-low'
-
     def _apply_filters(self, order, filter_status, filter_model, filter_qualite, filter_pause):
         """Applique les filtres à un ordre"""
         if filter_status != "Tous":
@@ -794,6 +509,8 @@ class DirecteurPage:
             st.rerun()
             return
 
+        chrono = self.utils.chrono_fields([order])[order['of']]
+
         st.markdown('<div class="modal-backdrop"></div>', unsafe_allow_html=True)
 
         with st.container():
@@ -857,10 +574,10 @@ class DirecteurPage:
                     st.metric("Statut", order['statut_coupe'])
 
                 with col_coupe2:
-                    st.metric("Temps Total", self.utils.format_time(order.get('temps_coupe', 0)))
+                    st.metric("Temps Total", self.utils.format_time(chrono['actif_coupe']))
 
                 with col_coupe3:
-                    temps_pause = self.utils.calculate_pause_duration(order, 'coupe')
+                    temps_pause = chrono['pause_coupe']
                     st.metric("Temps Pause", self.utils.format_time(temps_pause))
 
                 st.markdown("---")
@@ -909,7 +626,7 @@ class DirecteurPage:
                     st.metric("Temps Contrôle", self.utils.format_time(order.get('temps_controle', 0)))
 
                 with col_time2:
-                    temps_pause_ctrl = self.utils.calculate_pause_duration(order, 'controle')
+                    temps_pause_ctrl = chrono['pause_controle']
                     st.metric("Pause Contrôle", self.utils.format_time(temps_pause_ctrl))
 
                 if order.get('observation_controle'):
@@ -926,10 +643,10 @@ class DirecteurPage:
                         st.metric("Statut", order.get('statut_piqure', 'Non démarré'))
 
                     with col_piqure2:
-                        st.metric("Temps Total", self.utils.format_time(order.get('temps_piqure', 0)))
+                        st.metric("Temps Total", self.utils.format_time(chrono['actif_piqure']))
 
                     with col_piqure3:
-                        temps_pause = self.utils.calculate_pause_duration(order, 'piqure')
+                        temps_pause = chrono['pause_piqure']
                         st.metric("Temps Pause", self.utils.format_time(temps_pause))
 
                     st.markdown("---")
@@ -958,80 +675,75 @@ class DirecteurPage:
                 else:
                     st.info("⏳ Opération de piqûre non encore initiée")
 
-    def _render_visualizations(self, orders: List[Dict]):
+    def _render_visualizations(self, orders: List[Dict], data_version=None, live_version=None):
         """Affiche les visualisations avec configuration corrigée"""
         st.markdown('<div class="section-header">📊 Tableaux de Bord Visuels</div>', unsafe_allow_html=True)
 
+        # Agrégations vectorisées sur un DataFrame typé (reconstruit seulement si les données changent)
+        def analytics():
+            return AnalyticsCache.get(orders, data_version)
+
         tab1, tab2, tab3 = st.tabs(["📈 Aperçu Production", "👌 Analyse Qualité", "⏱️ Performance Temps"])
 
         plotly_config = {'displayModeBar': False, 'displaylogo': False}
 
+        # Figures en cache : recalculées seulement si les données changent
         with tab1:
             col_chart1, col_chart2 = st.columns(2)
 
             with col_chart1:
-                status_counts = {
-                    'En attente': len([o for o in orders if o['statut_coupe'] == 'En attente']),
-                    'En cours': len(
-                        [o for o in orders if o['statut_coupe'] == 'En cours' and not o.get('coupe_en_pause')]),
-                    'En pause': len([o for o in orders if o.get('coupe_en_pause')]),
-                    'Terminée': len([o for o in orders if o['statut_coupe'] == 'Terminée'])
-                }
-
-                fig_pie = go.Figure(data=[go.Pie(
-                    labels=list(status_counts.keys()),
-                    values=list(status_counts.values()),
-                    hole=.4,
-                    marker_colors=['#FBBF24', '#3B82F6', '#EF4444', '#10B981']
-                )])
+                def build_status_pie():
+                    status_counts = analytics().status_counts()
+
+                    fig_pie = go.Figure(data=[go.Pie(
+                        labels=status_counts.index.tolist(),
+                        values=status_counts.tolist(),
+                        hole=.4,
+                        marker_colors=['#FBBF24', '#3B82F6', '#EF4444', '#10B981']
+                    )])
+
+                    fig_pie.update_layout(
+                        title="Distribution des Statuts de Coupe",
+                        height=400,
+                        showlegend=True
+                    )
+                    return fig_pie
 
-                fig_pie.update_layout(
-                    title="Distribution des Statuts de Coupe",
-                    height=400,
-                    showlegend=True
-                )
-                st.plotly_chart(fig_pie, use_container_width=True, config=plotly_config)
+                FigureCache.plot('status_pie', data_version, None, build_status_pie, plotly_config)
 
             with col_chart2:
-                of_list = [o['of'] for o in orders[:8]]
-                quantite_list = [o['quantite'] for o in orders[:8]]
-                controle_list = [o.get('quantite_controlee', 0) or 0 for o in orders[:8]]
-
-                fig_bar = go.Figure(data=[
-                    go.Bar(name='Total', x=of_list, y=quantite_list, marker_color='#3B82F6'),
-                    go.Bar(name='Contrôlées', x=of_list, y=controle_list, marker_color='#10B981')
-                ])
-
-                fig_bar.update_layout(
-                    title="Progression Contrôle - Top 8 OF",
-                    barmode='group',
-                    height=400,
-                    xaxis_tickangle=-45,
-                    xaxis={
-                        'type': 'category',  # Forcer le traitement comme catégorie
-                        'tickmode': 'array'
-                    }
-                )
-                st.plotly_chart(fig_bar, use_container_width=True, config=plotly_config)
+                def build_control_progress():
+                    progress_df = analytics().control_progress(8)
+
+                    fig_bar = go.Figure(data=[
+                        go.Bar(name='Total', x=progress_df['of'], y=progress_df['quantite'], marker_color='#3B82F6'),
+                        go.Bar(name='Contrôlées', x=progress_df['of'], y=progress_df['quantite_controlee'],
+                               marker_color='#10B981')
+                    ])
+
+                    fig_bar.update_layout(
+                        title="Progression Contrôle - Top 8 OF",
+                        barmode='group',
+                        height=400,
+                        xaxis_tickangle=-45,
+                        xaxis={
+                            'type': 'category',  # Forcer le traitement comme catégorie
+                            'tickmode': 'array'
+                        }
+                    )
+                    return fig_bar
+
+                FigureCache.plot('control_progress', data_version, None, build_control_progress, plotly_config)
 
         with tab2:
             col_qual1, col_qual2 = st.columns(2)
 
             with col_qual1:
-                quality_data = []
-                for order in orders[:10]:
-                    quantite_controlee = order.get('quantite_controlee', 0) or 0
-                    if quantite_controlee > 0:
-                        quantite_rejetee = order.get('quantite_rejetee', 0) or 0
-                        taux_rejet = (quantite_rejetee / quantite_controlee * 100)
-                        quality_data.append({
-                            'OF': order['of'],
-                            'Taux Rejet': taux_rejet,
-                            'Quantité': quantite_controlee
-                        })
-
-                if quality_data:
-                    df_quality = pd.DataFrame(quality_data)
+                def build_rejection_rate():
+                    df_quality = analytics().rejection_rate(10)
+                    if df_quality.empty:
+                        return None
+
                     fig_quality = px.bar(
                         df_quality,
                         x='OF',
@@ -1041,34 +753,18 @@ class DirecteurPage:
                         color_continuous_scale=['#10B981', '#F59E0B', '#EF4444']
                     )
                     fig_quality.update_layout(height=400, xaxis_tickangle=-45)
-                    st.plotly_chart(fig_quality, use_container_width=True, config=plotly_config)
+                    return fig_quality
+
+                FigureCache.plot('rejection_rate', data_version, None, build_rejection_rate, plotly_config)
 
             with col_qual2:
-                model_data = {}
-                for order in orders:
-                    model = order['modele']
-                    if model not in model_data:
-                        model_data[model] = {'total': 0, 'problems': 0}
-
-                    quantite_controlee = order.get('quantite_controlee', 0) or 0
-                    quantite_rejetee = order.get('quantite_rejetee', 0) or 0
-                    quantite_retravailler = order.get('quantite_retravailler', 0) or 0
-
-                    model_data[model]['total'] += quantite_controlee
-                    model_data[model]['problems'] += quantite_rejetee + quantite_retravailler
-
-                if model_data:
-                    models = list(model_data.keys())[:8]
-                    problem_rates = []
-                    for model in models:
-                        if model_data[model]['total'] > 0:
-                            rate = (model_data[model]['problems'] / model_data[model]['total'] * 100)
-                        else:
-                            rate = 0
-                        problem_rates.append(rate)
+                def build_problem_rate():
+                    problem_rates = analytics().problem_rate_by_model(8)
+                    if problem_rates.empty:
+                        return None
 
                     fig_model = go.Figure(data=[
-                        go.Bar(x=models, y=problem_rates, marker_color='#F59E0B')
+                        go.Bar(x=problem_rates.index.tolist(), y=problem_rates.tolist(), marker_color='#F59E0B')
                     ])
                     fig_model.update_layout(
                         title="Taux Problèmes par Modèle",
@@ -1076,26 +772,18 @@ class DirecteurPage:
                         height=400,
                         xaxis_tickangle=-45
                     )
-                    st.plotly_chart(fig_model, use_container_width=True, config=plotly_config)
+                    return fig_model
+
+                FigureCache.plot('problem_rate_by_model', data_version, None, build_problem_rate, plotly_config)
 
         with tab3:
             col_time1, col_time2 = st.columns(2)
 
             with col_time1:
-                times_data = []
-                for order in orders[:10]:
-                    if order.get('temps_coupe', 0) > 0:
-                        # Récupérer le matricule et forcer en texte
-                        matricule = str(order.get('matricule_coupeur', 'N/A')).strip()
-                        times_data.append({
-                            'Matricule': matricule,  # Utiliser le matricule comme axe X
-                            'Temps Coupe (h)': order.get('temps_coupe', 0) / 3600,
-                            'Temps Contrôle (h)': order.get('temps_controle', 0) / 3600,
-                            'OF': order['of']  # Garder pour info
-                        })
-
-                if times_data:
-                    df_times = pd.DataFrame(times_data)
+                def build_times_by_coupeur():
+                    df_times = analytics().times(orders, 10)
+                    if df_times.empty:
+                        return None
 
                     # Option 1: Graphique avec matricules
                     fig_time = go.Figure(data=[
@@ -1129,35 +817,35 @@ class DirecteurPage:
                         },
                         yaxis={'title': 'Heures'}
                     )
-                    st.plotly_chart(fig_time, use_container_width=True, config=plotly_config)
+                    return fig_time
+
+                FigureCache.plot('times_by_coupeur', live_version, None, build_times_by_coupeur, plotly_config)
 
             with col_time2:
                 # Graphique des temps par OF (plus simple)
-                of_list = [o['of'] for o in orders[:10] if o.get('temps_coupe', 0) > 0]
-                coupe_times = [o.get('temps_coupe', 0) / 3600 for o in orders[:10] if o.get('temps_coupe', 0) > 0]
-                controle_times = [o.get('temps_controle', 0) / 3600 for o in orders[:10] if
-                                  o.get('temps_controle', 0) > 0]
+                def build_times_by_of():
+                    df_times = analytics().times(orders, 10)
+                    if df_times.empty:
+                        return None
 
-                if coupe_times:
                     fig_dist = go.Figure()
 
-                    if of_list and coupe_times:
-                        fig_dist.add_trace(go.Bar(
-                            x=of_list,
-                            y=coupe_times,
-                            name='Temps Coupe (h)',
-                            marker_color='#3B82F6',
-                            text=[f"{t:.1f}h" for t in coupe_times],
-                            textposition='auto'
-                        ))
+                    fig_dist.add_trace(go.Bar(
+                        x=df_times['OF'],
+                        y=df_times['Temps Coupe (h)'],
+                        name='Temps Coupe (h)',
+                        marker_color='#3B82F6',
+                        text=[f"{t:.1f}h" for t in df_times['Temps Coupe (h)']],
+                        textposition='auto'
+                    ))
 
-                    if of_list and controle_times:
+                    if (df_times['Temps Contrôle (h)'] > 0).any():
                         fig_dist.add_trace(go.Bar(
-                            x=of_list,
-                            y=controle_times,
+                            x=df_times['OF'],
+                            y=df_times['Temps Contrôle (h)'],
                             name='Temps Contrôle (h)',
                             marker_color='#10B981',
-                            text=[f"{t:.1f}h" for t in controle_times],
+                            text=[f"{t:.1f}h" for t in df_times['Temps Contrôle (h)']],
                             textposition='auto'
                         ))
 
@@ -1169,5 +857,6 @@ class DirecteurPage:
                         xaxis={'type': 'category', 'tickangle': -45},
                         barmode='group'
                     )
-                    st.plotly_chart(fig_dist, use_container_width=True, config=plotly_config)
+                    return fig_dist
 
+                FigureCache.plot('times_by_of', live_version, None, build_times_by_of, plotly_config)
@@ -0,0 +1,244 @@
+# export_engine.py - Export Excel en flux (mémoire constante) du rapport de sur-consommation
+import csv
+import re
+from datetime import datetime
+from decimal import Decimal
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+from openpyxl import Workbook
+from openpyxl.utils import get_column_letter
+
+# (clé de la ligne, en-tête Excel)
+SURCONS_COLUMNS = [
+    ('of', 'OF'),
+    ('modele', 'Modèle'),
+    ('matiere', 'Matière'),
+    ('coloris', 'Coloris'),
+    ('matricule_coupeur', 'Matricule Coupeur'),
+    ('consommation', 'Consommation Std (m²)'),
+    ('sur_consommation', 'Sur-consommation (m²)'),
+    ('total_consommation', 'Total Consommation (m²)'),
+    ('taux_surcons', 'Taux Sur-cons (%)'),
+    ('date_debut_coupe', 'Date Début Coupe'),
+    ('date_fin_coupe', 'Date Fin Coupe'),
+    ('statut_coupe', 'Statut Coupe'),
+    ('nom_coupeur', 'Nom Coupeur'),
+    ('prenom_coupeur', 'Prénom Coupeur'),
+    ('observation_coupe', 'Observation'),
+]
+
+MATIERE_COLUMNS = [
+    ('of', 'OF'),
+    ('modele', 'Modèle'),
+    ('consommation', 'Consommation (m²)'),
+    ('sur_consommation', 'Sur-cons (m²)'),
+    ('taux_surcons', 'Taux (%)'),
+]
+
+NUMERIC_KEYS = {'consommation', 'sur_consommation', 'total_consommation', 'taux_surcons'}
+MAIN_SHEET = 'Sur-consommation'
+SUMMARY_SHEET = 'Synthèse'
+COUT_M2 = 15  # Coût estimé par m² de sur-consommation (€)
+
+# Caractères interdits dans un nom de feuille Excel
+_INVALID_SHEET_CHARS = re.compile(r'[\[\]:*?/\\]')
+
+
+class ColumnWidthStats:
+    """Largeurs de colonnes estimées à partir des longueurs de texte d'un échantillon"""
+
+    MIN_WIDTH = 8
+    MAX_WIDTH = 50
+    PERCENTILE = 0.95
+
+    def __init__(self, headers: List[str]):
+        self.headers = headers
+        self.lengths: List[List[int]] = [[] for _ in headers]
+
+    def add(self, values: Tuple):
+        for index, value in enumerate(values):
+            self.lengths[index].append(len(str(value)) if value is not None else 0)
+
+    def widths(self) -> List[int]:
+        """Percentile des longueurs (les valeurs aberrantes n'élargissent pas la colonne)"""
+        widths = []
+        for header, lengths in zip(self.headers, self.lengths):
+            if lengths:
+                ordered = sorted(lengths)
+                length = ordered[min(len(ordered) - 1, int(len(ordered) * self.PERCENTILE))]
+            else:
+                length = 0
+            width = max(length, len(header)) + 2
+            widths.append(min(max(width, self.MIN_WIDTH), self.MAX_WIDTH))
+        return widths
+
+
+class SurconsommationExporter:
+    """Écrit le rapport en un seul passage (classeur openpyxl en mode write_only)"""
+
+    # Lignes gardées en mémoire pour estimer les largeurs avant d'écrire
+    SAMPLE_SIZE = 1000
+    PROGRESS_EVERY = 500
+
+    def __init__(self, progress_callback: Optional[Callable[[int, Optional[int]], None]] = None):
+        self.progress_callback = progress_callback
+
+    @staticmethod
+    def _to_float(value) -> float:
+        if value is None:
+            return 0.0
+        try:
+            return float(value)
+        except (TypeError, ValueError):
+            return 0.0
+
+    def _prepare(self, item: Dict) -> Dict:
+        """Normalise une ligne (Decimal -> float, indicateurs calculés si absents)"""
+        row = dict(item)
+        consommation = self._to_float(row.get('consommation'))
+        surcons = self._to_float(row.get('sur_consommation'))
+        row['consommation'] = consommation
+        row['sur_consommation'] = surcons
+        if row.get('total_consommation') is None:
+            row['total_consommation'] = consommation + surcons
+        if row.get('taux_surcons') is None:
+            row['taux_surcons'] = (surcons / consommation * 100) if consommation > 0 else 0
+        for key in NUMERIC_KEYS:
+            if isinstance(row.get(key), Decimal):
+                row[key] = float(row[key])
+        return row
+
+    @staticmethod
+    def _values(row: Dict, columns: List[Tuple[str, str]]) -> Tuple:
+        return tuple(row.get(key) for key, _ in columns)
+
+    @staticmethod
+    def _sheet_name(matiere: str, used: set) -> str:
+        """Nom de feuille valide et unique (31 caractères maximum)"""
+        base = _INVALID_SHEET_CHARS.sub('_', str(matiere)).strip() or 'Non spécifié'
+        name = base[:31]
+        suffix = 2
+        while name.lower() in used:
+            tag = f" ({suffix})"
+            name = f"{base[:31 - len(tag)]}{tag}"
+            suffix += 1
+        used.add(name.lower())
+        return name
+
+    @staticmethod
+    def _set_widths(worksheet, widths: List[int]):
+        # En mode write_only, les largeurs doivent être fixées avant la première ligne
+        for index, width in enumerate(widths, 1):
+            worksheet.column_dimensions[get_column_letter(index)].width = width
+
+    def export(self, rows: Iterable[Dict], output, total: Optional[int] = None) -> Dict:
+        """Écrit le classeur dans output (chemin ou fichier binaire) et retourne la synthèse"""
+        if total is None and hasattr(rows, '__len__'):
+            total = len(rows)
+        iterator = iter(rows)
+
+        # 1. Échantillon pour les statistiques de largeur
+        main_headers = [header for _, header in SURCONS_COLUMNS]
+        matiere_headers = [header for _, header in MATIERE_COLUMNS]
+        main_stats = ColumnWidthStats(main_headers)
+        matiere_stats = ColumnWidthStats(matiere_headers)
+        sample = []
+        for item in iterator:
+            row = self._prepare(item)
+            sample.append(row)
+            main_stats.add(self._values(row, SURCONS_COLUMNS))
+            matiere_stats.add(self._values(row, MATIERE_COLUMNS))
+            if len(sample) >= self.SAMPLE_SIZE:
+                break
+        matiere_widths = matiere_stats.widths()
+
+        workbook = Workbook(write_only=True)
+        main_sheet = workbook.create_sheet(MAIN_SHEET)
+        self._set_widths(main_sheet, main_stats.widths())
+        main_sheet.append(main_headers)
+
+        # La synthèse est créée maintenant (ordre des feuilles) mais remplie à la fin
+        summary_sheet = workbook.create_sheet(SUMMARY_SHEET)
+        self._set_widths(summary_sheet, [32, 16])
+
+        used_names = {MAIN_SHEET.lower(), SUMMARY_SHEET.lower()}
+        matiere_sheets = {}
+        count = 0
+        total_surcons = 0.0
+        total_consommation = 0.0
+
+        # 2. Passage unique : feuille principale + feuille de la matière
+        def write(row: Dict):
+            nonlocal count, total_surcons, total_consommation
+            main_sheet.append(self._values(row, SURCONS_COLUMNS))
+
+            matiere = row.get('matiere')
+            if matiere:
+                sheet = matiere_sheets.get(matiere)
+                if sheet is None:
+                    sheet = workbook.create_sheet(self._sheet_name(matiere, used_names))
+                    self._set_widths(sheet, matiere_widths)
+                    sheet.append(matiere_headers)
+                    matiere_sheets[matiere] = sheet
+                sheet.append(self._values(row, MATIERE_COLUMNS))
+
+            count += 1
+            total_surcons += row['sur_consommation']
+            total_consommation += row['consommation']
+            if self.progress_callback and count % self.PROGRESS_EVERY == 0:
+                self.progress_callback(count, total)
+
+        for row in sample:
+            write(row)
+        sample = None
+        for item in iterator:
+            write(self._prepare(item))
+
+        # 3. Synthèse
+        taux_moyen = (total_surcons / total_consommation * 100) if total_consommation > 0 else 0
+        summary = {
+            'nombre_of': count,
+            'total_surcons': total_surcons,
+            'taux_moyen': taux_moyen,
+            'cout_estime': total_surcons * COUT_M2,
+            'matieres': len(matiere_sheets),
+        }
+        summary_sheet.append(['Métrique', 'Valeur'])
+        summary_sheet.append(['Total OF', count])
+        summary_sheet.append(['Sur-consommation totale (m²)', round(total_surcons, 2)])
+        summary_sheet.append(['Taux moyen (%)', round(taux_moyen, 2)])
+        summary_sheet.append(['Coût estimé (€)', round(total_surcons * COUT_M2, 2)])
+        summary_sheet.append(['Généré le', datetime.now()])
+
+        workbook.save(output)
+        if self.progress_callback:
+            self.progress_callback(count, total if total is not None else count)
+        return summary
+
+    def export_csv(self, rows: Iterable[Dict], output, total: Optional[int] = None) -> Dict:
+        """Écrit la feuille principale en CSV (séparateur ';', UTF-8 avec BOM pour Excel)"""
+        if total is None and hasattr(rows, '__len__'):
+            total = len(rows)
+
+        count = 0
+        total_surcons = 0.0
+        total_consommation = 0.0
+        with open(output, 'w', newline='', encoding='utf-8-sig') as f:
+            writer = csv.writer(f, delimiter=';')
+            writer.writerow([header for _, header in SURCONS_COLUMNS])
+            for item in rows:
+                row = self._prepare(item)
+                writer.writerow(self._values(row, SURCONS_COLUMNS))
+                count += 1
+                total_surcons += row['sur_consommation']
+                total_consommation += row['consommation']
+                if self.progress_callback and count % self.PROGRESS_EVERY == 0:
+                    self.progress_callback(count, total)
+
+        if self.progress_callback:
+            self.progress_callback(count, total if total is not None else count)
+        return {
+            'nombre_of': count,
+            'total_surcons': total_surcons,
+            'taux_moyen': (total_surcons / total_consommation * 100) if total_consommation > 0 else 0,
+            'cout_estime': total_surcons * COUT_M2,
+        }
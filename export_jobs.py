@@ -0,0 +1,171 @@
+# export_jobs.py - File d'exports en arrière-plan avec cache des fichiers générés
+import hashlib
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Optional
+from app_logging import get_logger
+from database import Config
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+logger = get_logger('export_jobs')
+
+
+class ExportJob:
+    """État d'un export (partagé entre le thread de travail et les sessions)"""
+
+    PENDING = 'En attente'
+    RUNNING = 'En cours'
+    DONE = 'Terminé'
+    FAILED = 'Erreur'
+
+    def __init__(self, job_id: str, report_type: str, fmt: str, path: str):
+        self.job_id = job_id
+        self.report_type = report_type
+        self.fmt = fmt
+        self.path = path
+        self.status = self.PENDING
+        self.done_rows = 0
+        self.total_rows: Optional[int] = None
+        self.error: Optional[str] = None
+        self.cached = False
+        self.created_at = time.time()
+        self.finished_at: Optional[float] = None
+
+    @property
+    def progress(self) -> float:
+        if self.status == self.DONE:
+            return 1.0
+        if not self.total_rows:
+            return 0.0
+        return min(self.done_rows / self.total_rows, 1.0)
+
+    @property
+    def is_finished(self) -> bool:
+        return self.status in (self.DONE, self.FAILED)
+
+    def read_bytes(self) -> bytes:
+        with open(self.path, 'rb') as f:
+            return f.read()
+
+
+class ExportJobManager:
+    """Exports exécutés par un petit pool de threads, fichiers mis en cache par
+    (type de rapport, empreinte des filtres, version des données)"""
+
+    MIME_TYPES = {
+        'xlsx': "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+        'csv': "text/csv",
+    }
+
+    # Partagés par toutes les sessions du processus
+    _executor: Optional[ThreadPoolExecutor] = None
+    _jobs: Dict[str, ExportJob] = {}
+    _lock = threading.Lock()
+
+    @classmethod
+    def _get_executor(cls) -> ThreadPoolExecutor:
+        if cls._executor is None:
+            with cls._lock:
+                if cls._executor is None:
+                    cls._executor = ThreadPoolExecutor(max_workers=Config.EXPORT_WORKERS,
+                                                       thread_name_prefix='export')
+        return cls._executor
+
+    @staticmethod
+    def cache_dir() -> str:
+        path = os.path.join(BASE_DIR, Config.EXPORT_CACHE_DIR)
+        os.makedirs(path, exist_ok=True)
+        return path
+
+    @staticmethod
+    def job_key(report_type: str, filters: Dict, data_version: str, fmt: str) -> str:
+        """Clé du fichier : type de rapport + empreinte des filtres et de la version des données"""
+        payload = json.dumps({'filters': filters, 'data_version': data_version, 'format': fmt},
+                             sort_keys=True, default=str)
+        digest = hashlib.sha256(payload.encode('utf-8')).hexdigest()[:20]
+        return f"{report_type}_{digest}"
+
+    @classmethod
+    def submit(cls, report_type: str, filters: Dict, data_version: str, fmt: str,
+               producer: Callable[[str, Callable[[int, Optional[int]], None]], None]) -> str:
+        """Planifie un export et retourne son identifiant.
+
+        producer(chemin, progression) écrit le fichier ; il n'est pas appelé si un
+        fichier identique (mêmes filtres, mêmes données) existe déjà.
+        """
+        job_id = cls.job_key(report_type, filters, data_version, fmt)
+        path = os.path.join(cls.cache_dir(), f"{job_id}.{fmt}")
+
+        with cls._lock:
+            job = cls._jobs.get(job_id)
+            if job is not None and not (job.status == ExportJob.FAILED or
+                                        (job.status == ExportJob.DONE and not os.path.exists(path))):
+                return job_id
+
+            job = ExportJob(job_id, report_type, fmt, path)
+            cls._jobs[job_id] = job
+
+            # Sans version des données, impossible de savoir si le fichier est à jour
+            if data_version and os.path.exists(path):
+                job.status = ExportJob.DONE
+                job.cached = True
+                job.finished_at = time.time()
+                return job_id
+
+        cls._get_executor().submit(cls._run, job, producer)
+        return job_id
+
+    @classmethod
+    def _run(cls, job: ExportJob, producer: Callable):
+        job.status = ExportJob.RUNNING
+
+        def on_progress(done: int, total: Optional[int]):
+            job.done_rows = done
+            job.total_rows = total
+
+        tmp_path = f"{job.path}.{threading.get_ident()}.tmp"
+        try:
+            producer(tmp_path, on_progress)
+            os.replace(tmp_path, job.path)
+            job.status = ExportJob.DONE
+        except Exception as e:
+            logger.exception("Erreur export %s", job.report_type)
+            job.error = str(e)
+            job.status = ExportJob.FAILED
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        finally:
+            job.finished_at = time.time()
+
+        cls.purge()
+
+    @classmethod
+    def get(cls, job_id: Optional[str]) -> Optional[ExportJob]:
+        if job_id is None:
+            return None
+        with cls._lock:
+            return cls._jobs.get(job_id)
+
+    @classmethod
+    def purge(cls, max_age: Optional[int] = None):
+        """Supprime les fichiers et les exports terminés plus anciens que max_age secondes"""
+        max_age = Config.EXPORT_CACHE_MAX_AGE if max_age is None else max_age
+        limit = time.time() - max_age
+        directory = cls.cache_dir()
+
+        for name in os.listdir(directory):
+            path = os.path.join(directory, name)
+            try:
+                if os.path.getmtime(path) < limit:
+                    os.remove(path)
+            except OSError:
+                pass
+
+        with cls._lock:
+            for job_id in [job_id for job_id, job in cls._jobs.items()
+                           if job.is_finished and job.finished_at < limit]:
+                del cls._jobs[job_id]
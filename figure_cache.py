@@ -0,0 +1,74 @@
+# figure_cache.py - Cache des graphiques Plotly sérialisés par version des données
+import json
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Optional, Tuple
+import plotly.io as pio
+import streamlit as st
+
+
+class FigureCache:
+    """Spécifications JSON des figures, clé (graphique, version des données, état des filtres).
+
+    Les agrégations et la construction de la figure ne sont refaites que si
+    l'une de ces trois composantes change.
+    """
+
+    MAX_ENTRIES = 256
+
+    # Partagés par toutes les sessions du processus
+    _entries: "OrderedDict[Tuple, Optional[str]]" = OrderedDict()
+    _lock = threading.Lock()
+    _hits = 0
+    _misses = 0
+
+    @staticmethod
+    def _freeze(filter_state) -> str:
+        return json.dumps(filter_state, sort_keys=True, default=str)
+
+    @classmethod
+    def get(cls, chart_id: str, data_version, filter_state, builder: Callable) -> Optional[str]:
+        """JSON de la figure (None si builder() n'a rien à afficher)"""
+        if data_version is None:
+            # Version inconnue : pas de mise en cache possible
+            figure = builder()
+            return figure.to_json() if figure is not None else None
+
+        key = (chart_id, data_version, cls._freeze(filter_state))
+        with cls._lock:
+            if key in cls._entries:
+                cls._entries.move_to_end(key)
+                cls._hits += 1
+                return cls._entries[key]
+
+        figure = builder()
+        spec = figure.to_json() if figure is not None else None
+
+        with cls._lock:
+            cls._misses += 1
+            cls._entries[key] = spec
+            while len(cls._entries) > cls.MAX_ENTRIES:
+                cls._entries.popitem(last=False)
+        return spec
+
+    @classmethod
+    def plot(cls, chart_id: str, data_version, filter_state, builder: Callable, config: Dict = None) -> bool:
+        """Affiche la figure en cache (construite au besoin) ; False si rien à afficher"""
+        spec = cls.get(chart_id, data_version, filter_state, builder)
+        if spec is None:
+            return False
+        st.plotly_chart(pio.from_json(spec, skip_invalid=True), use_container_width=True, config=config)
+        return True
+
+    @classmethod
+    def clear(cls):
+        """Vide le cache"""
+        with cls._lock:
+            cls._entries.clear()
+            cls._hits = cls._misses = 0
+
+    @classmethod
+    def stats(cls) -> Dict:
+        """Statistiques du cache (entrées, succès, échecs)"""
+        with cls._lock:
+            return {'entries': len(cls._entries), 'hits': cls._hits, 'misses': cls._misses}
@@ -0,0 +1,92 @@
+# fragment_cache.py - Cache des fragments HTML par OF et version de ligne
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+# Colonnes derniere_mise_a_jour des tables jointes par get_all_orders()
+VERSION_COLUMNS = ('maj_of', 'maj_coupe', 'maj_controle', 'maj_piqure')
+
+# derniere_mise_a_jour est à la seconde : une pause, une reprise ou une fin dans la même
+# seconde qu'un passage des chronomètres ne la change pas. Statuts, indicateurs de pause et
+# références des chronomètres (DATETIME(3), migration 5) complètent donc la version.
+STATE_COLUMNS = (
+    'statut_coupe', 'coupe_en_pause', 'date_pause_coupe', 'duree_totale_pause', 'date_derniere_maj_coupe',
+    'statut_controle', 'controle_en_pause', 'date_derniere_maj',
+    'statut_piqure', 'piqure_en_pause', 'date_derniere_pause_piqure', 'date_derniere_maj_piqure',
+)
+
+
+# Colonnes réécrites par chaque passage des chronomètres (update_all_timers) : cumuls, références
+# et derniere_mise_a_jour (ON UPDATE) des tables d'étape
+CHRONO_COLUMNS = frozenset((
+    'maj_coupe', 'maj_controle', 'maj_piqure',
+    'temps_coupe', 'duree_totale_pause', 'date_derniere_maj_coupe',
+    'temps_actif_total', 'temps_pause_total', 'date_derniere_maj',
+    'temps_piqure', 'duree_totale_pause_piqure', 'date_derniere_maj_piqure',
+))
+
+
+def row_version(order: Dict) -> Optional[Tuple]:
+    """Version d'un OF : derniere_mise_a_jour de chaque table jointe et état des chronomètres
+    (None si inconnue)"""
+    version = tuple(order.get(column) for column in VERSION_COLUMNS)
+    if all(value is None for value in version):
+        return None
+    return version + tuple(order.get(column) for column in STATE_COLUMNS)
+
+
+def business_version(order: Dict) -> Tuple:
+    """Version métier d'un OF : toutes ses colonnes sauf celles des chronomètres (stable d'un
+    passage à l'autre tant que l'OF n'est ni modifié, ni mis en pause, ni repris)"""
+    return tuple(value for column, value in order.items() if column not in CHRONO_COLUMNS)
+
+
+class FragmentCache:
+    """Cache LRU partagé par les sessions : clé (espace, OF, version de ligne, version du gabarit)"""
+
+    MAX_ENTRIES = 20000
+
+    _entries: "OrderedDict[Tuple, Any]" = OrderedDict()
+    _lock = threading.Lock()
+    _hits = 0
+    _misses = 0
+
+    @classmethod
+    def get(cls, namespace: str, order: Dict, template_version: int, builder: Callable[[], Any],
+            version: Optional[Tuple] = None) -> Any:
+        """Retourne le fragment en cache ou le construit avec builder() (version : row_version(order)
+        par défaut ; business_version pour un fragment sans valeur de chronomètre)"""
+        if version is None:
+            version = row_version(order)
+        if version is None:
+            # Ligne sans colonnes de version : pas de mise en cache possible
+            return builder()
+
+        key = (namespace, order['of'], version, template_version)
+        with cls._lock:
+            if key in cls._entries:
+                cls._entries.move_to_end(key)
+                cls._hits += 1
+                return cls._entries[key]
+
+        fragment = builder()
+
+        with cls._lock:
+            cls._misses += 1
+            cls._entries[key] = fragment
+            while len(cls._entries) > cls.MAX_ENTRIES:
+                cls._entries.popitem(last=False)
+        return fragment
+
+    @classmethod
+    def clear(cls):
+        """Vide le cache"""
+        with cls._lock:
+            cls._entries.clear()
+            cls._hits = cls._misses = 0
+
+    @classmethod
+    def stats(cls) -> Dict:
+        """Statistiques du cache (entrées, succès, échecs)"""
+        with cls._lock:
+            return {'entries': len(cls._entries), 'hits': cls._hits, 'misses': cls._misses}
@@ -0,0 +1,337 @@
+# migrations.py - Migrations versionnées du schéma MySQL
+#
+# Chaque migration est appliquée une seule fois (table schema_version) par
+# DatabaseManager.run_migrations(). Ne jamais modifier une migration déjà
+# déployée : ajouter une nouvelle entrée avec la version suivante.
+#
+# Les DDL restent écrits en dialecte MySQL : le moteur SQLite les traduit
+# (voir backends.translate_ddl).
+#
+# Les tables de archive.ARCHIVED_TABLES ont une copie <table>_archive (migration 4) :
+# une migration qui modifie l'une doit aussi modifier l'autre.
+from archive import ARCHIVED_TABLES, archive_name
+
+
+def _seed_default_users(db_manager, cursor):
+    """Insère les utilisateurs par défaut si la table est vide"""
+    cursor.execute("SELECT COUNT(*) FROM users")
+    if cursor.fetchone()['COUNT(*)'] == 0:
+        default_users = [
+            ('chef_coupe', 'coupe123', 'Chef de Coupe', 'coupe_repetto'),
+            ('controle', 'controle123', 'Contrôle Qualité', 'controle_repetto'),
+            ('chef_prod', 'prod123', 'Chef de Production', 'groupe_repetto'),
+            ('chef_piqure', 'piqure123', 'Chef de Piqûre', 'piqure_repetto')
+        ]
+        for user in default_users:
+            try:
+                cursor.execute(
+                    "INSERT INTO users (username, password, role, name) VALUES (%s, %s, %s, %s)",
+                    (user[0], db_manager.hash_password(user[1]), user[2], user[3])
+                )
+            except db_manager.backend.IntegrityError:
+                pass
+
+
+def add_column(table: str, column: str, definition: str):
+    """Étape idempotente : ALTER TABLE ADD COLUMN (le DDL MySQL n'est pas transactionnel)"""
+    def step(db_manager, cursor):
+        if not db_manager.backend.column_exists(cursor, table, column):
+            for statement in db_manager.backend.ddl(f"ALTER TABLE {table} ADD COLUMN {column} {definition}"):
+                cursor.execute(statement)
+    return step
+
+
+def add_index(table: str, index: str, columns: str):
+    """Étape idempotente : CREATE INDEX"""
+    def step(db_manager, cursor):
+        if not db_manager.backend.index_exists(cursor, table, index):
+            cursor.execute(f"CREATE INDEX {index} ON {table} ({columns})")
+    return step
+
+
+def modify_column(table: str, column: str, definition: str):
+    """Étape : ALTER TABLE MODIFY COLUMN (sans effet en SQLite, voir backends.translate_ddl)"""
+    def step(db_manager, cursor):
+        for statement in db_manager.backend.ddl(f"ALTER TABLE {table} MODIFY COLUMN {column} {definition}"):
+            cursor.execute(statement)
+    return step
+
+
+def create_table_like(table: str, source: str):
+    """Étape idempotente : table de même structure que source (sans clés étrangères)"""
+    def step(db_manager, cursor):
+        db_manager.backend.create_table_like(cursor, table, source)
+    return step
+
+
+# Colonnes d'où partent les écarts des chronomètres (migration 5)
+CHRONO_REFERENCE_COLUMNS = [
+    ('details_coupe', 'date_derniere_maj_coupe', "DATETIME(3) DEFAULT CURRENT_TIMESTAMP(3)"),
+    ('details_coupe', 'date_derniere_pause', "DATETIME(3)"),
+    ('details_controle', 'date_debut_controle', "DATETIME(3)"),
+    ('details_controle', 'date_derniere_maj', "DATETIME(3) DEFAULT CURRENT_TIMESTAMP(3)"),
+    ('details_piqure', 'date_derniere_pause_piqure', "DATETIME(3)"),
+    ('details_piqure', 'date_derniere_maj_piqure', "DATETIME(3) DEFAULT CURRENT_TIMESTAMP(3)"),
+]
+
+
+# Les étapes sont soit des requêtes SQL, soit des fonctions (db_manager, cursor)
+MIGRATIONS = [
+    {
+        'version': 1,
+        'description': "Schéma initial (utilisateurs, OF, coupe, contrôle, piqûre, historique)",
+        'steps': [
+            # ===== TABLE 1: UTILISATEURS =====
+            '''
+            CREATE TABLE IF NOT EXISTS users (
+                id INT PRIMARY KEY AUTO_INCREMENT,
+                username VARCHAR(50) UNIQUE NOT NULL,
+                password VARCHAR(100) NOT NULL,
+                role VARCHAR(50) NOT NULL,
+                name VARCHAR(100) NOT NULL,
+                active BOOLEAN DEFAULT TRUE,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+            ''',
+
+            # ===== TABLE 2: ORDRES DE FABRICATION (Header) =====
+            '''
+            CREATE TABLE IF NOT EXISTS ordres_fabrication (
+                id INT PRIMARY KEY AUTO_INCREMENT,
+                of VARCHAR(50) UNIQUE NOT NULL,
+                modele VARCHAR(100) NOT NULL,
+                code_modele VARCHAR(50),
+                couleur_modele VARCHAR(50) NOT NULL,
+                quantite INT NOT NULL,
+                observation TEXT,
+                date_creation DATETIME DEFAULT CURRENT_TIMESTAMP,
+                date_fin_prevue DATETIME,
+                statut VARCHAR(50) DEFAULT 'En attente',
+                derniere_mise_a_jour TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+            )
+            ''',
+
+            # ===== TABLE 3: DETAILS DE COUPE =====
+            '''
+            CREATE TABLE IF NOT EXISTS details_coupe (
+                id INT PRIMARY KEY AUTO_INCREMENT,
+                of_id VARCHAR(50) NOT NULL,
+                coloris VARCHAR(50) NOT NULL,
+                matiere VARCHAR(50) NOT NULL,
+                matricule_coupeur VARCHAR(50) NOT NULL,
+                consommation DECIMAL(10,2) DEFAULT 0,
+                sur_consommation DECIMAL(10,2) DEFAULT 0,
+                observation TEXT,
+                statut_coupe VARCHAR(50) DEFAULT 'En attente',
+                date_debut_coupe DATETIME,
+                date_fin_coupe DATETIME,
+                temps_coupe INT DEFAULT 0,
+
+                # ===== COLONNES POUR RECOUPE =====
+                temps_recoupe INT DEFAULT 0,
+                date_debut_recoupe DATETIME,
+                nombre_recoupe INT DEFAULT 0,
+
+                coupe_en_pause BOOLEAN DEFAULT FALSE,
+                temps_coupe_avant_pause INT DEFAULT 0,
+                date_derniere_pause DATETIME,
+                duree_totale_pause INT DEFAULT 0,
+
+                # ===== SUIVI TEMPS =====
+                date_derniere_maj_coupe DATETIME DEFAULT CURRENT_TIMESTAMP,
+
+                FOREIGN KEY (of_id) REFERENCES ordres_fabrication(of) ON DELETE CASCADE,
+                UNIQUE KEY unique_of_coupe (of_id),
+                derniere_mise_a_jour TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+            )
+            ''',
+
+            # ===== TABLE 4: DETAILS DE CONTROLE =====
+            '''
+            CREATE TABLE IF NOT EXISTS details_controle (
+                id INT PRIMARY KEY AUTO_INCREMENT,
+                of_id VARCHAR(50) NOT NULL,
+                statut_controle VARCHAR(50) DEFAULT 'En attente',
+                date_debut_controle DATETIME,
+                date_fin_controle DATETIME,
+
+                # ===== DEUX CHRONOMÈTRES INDÉPENDANTS =====
+                temps_actif_total INT DEFAULT 0,          # Chrono 1: Temps actif de production (s'arrête en pause)
+                temps_pause_total INT DEFAULT 0,          # Chrono 2: Temps de pause (s'incrémente seulement en pause)
+
+                # Pour maintenir la compatibilité temporairement
+                temps_controle INT DEFAULT 0,             # Ancien temps total (déprécié)
+
+                # Informations de contrôle
+                quantite_a_controler INT DEFAULT 0,
+                quantite_controlee INT DEFAULT 0,
+                quantite_acceptee INT DEFAULT 0,
+                quantite_rejetee INT DEFAULT 0,
+                quantite_retravailler INT DEFAULT 0,
+                observation_controle TEXT,
+
+                # État du contrôle
+                controle_en_pause BOOLEAN DEFAULT FALSE,
+                date_derniere_maj DATETIME DEFAULT CURRENT_TIMESTAMP,  # Pour calculer l'intervalle
+
+                # Anciennes colonnes pour compatibilité
+                temps_controle_avant_pause INT DEFAULT 0,
+                duree_pause_controle INT DEFAULT 0,
+                date_derniere_pause DATETIME,
+
+                FOREIGN KEY (of_id) REFERENCES ordres_fabrication(of) ON DELETE CASCADE,
+                UNIQUE KEY unique_of_controle (of_id),
+                derniere_mise_a_jour TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+            )
+            ''',
+
+            # ===== TABLE 5: DETAILS DE PIQÛRE =====
+            '''
+            CREATE TABLE IF NOT EXISTS details_piqure (
+                id INT PRIMARY KEY AUTO_INCREMENT,
+                of_id VARCHAR(50) NOT NULL,
+                matricule_piqueur VARCHAR(50) NOT NULL,
+                observation_piqure TEXT,
+                statut_piqure VARCHAR(50) DEFAULT 'En attente',
+                date_debut_piqure DATETIME,
+                date_fin_piqure DATETIME,
+                temps_piqure INT DEFAULT 0,
+
+                piqure_en_pause BOOLEAN DEFAULT FALSE,
+                temps_piqure_avant_pause INT DEFAULT 0,
+                date_derniere_pause_piqure DATETIME,
+                duree_totale_pause_piqure INT DEFAULT 0,
+
+                date_derniere_maj_piqure DATETIME DEFAULT CURRENT_TIMESTAMP,
+                FOREIGN KEY (of_id) REFERENCES ordres_fabrication(of) ON DELETE CASCADE,
+                UNIQUE KEY unique_of_piqure (of_id),
+                derniere_mise_a_jour TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+            )
+            ''',
+
+            # ===== TABLE 6: HISTORIQUE DES CHANGEMENTS =====
+            '''
+            CREATE TABLE IF NOT EXISTS historique_changements (
+                id INT PRIMARY KEY AUTO_INCREMENT,
+                of_id VARCHAR(50) NOT NULL,
+                type_operation VARCHAR(50) NOT NULL,
+                ancien_statut VARCHAR(50),
+                nouveau_statut VARCHAR(50),
+                description TEXT,
+                utilisateur_id INT,
+                date_changement DATETIME DEFAULT CURRENT_TIMESTAMP,
+                FOREIGN KEY (of_id) REFERENCES ordres_fabrication(of) ON DELETE CASCADE,
+                FOREIGN KEY (utilisateur_id) REFERENCES users(id) ON DELETE SET NULL,
+                INDEX idx_of_date (of_id, date_changement)
+            )
+            ''',
+
+            # ===== TABLE 7: SESSIONS PAUSE =====
+            '''
+            CREATE TABLE IF NOT EXISTS sessions_pause (
+                id INT PRIMARY KEY AUTO_INCREMENT,
+                of_id VARCHAR(50) NOT NULL,
+                type_pause VARCHAR(50) NOT NULL,
+                date_debut DATETIME DEFAULT CURRENT_TIMESTAMP,
+                date_fin DATETIME,
+                duree_secondes INT,
+                raison TEXT,
+                FOREIGN KEY (of_id) REFERENCES ordres_fabrication(of) ON DELETE CASCADE,
+                INDEX idx_of_type (of_id, type_pause)
+            )
+            ''',
+
+            # ===== TABLE 8: QUALITE DETAILS PAR SESSION =====
+            '''
+            CREATE TABLE IF NOT EXISTS qualite_sessions (
+                id INT PRIMARY KEY AUTO_INCREMENT,
+                of_id VARCHAR(50) NOT NULL,
+                num_session INT DEFAULT 1,
+                quantite_controle INT DEFAULT 0,
+                quantite_acceptee INT DEFAULT 0,
+                quantite_rejetee INT DEFAULT 0,
+                quantite_retravailler INT DEFAULT 0,
+                observation TEXT,
+                date_session DATETIME DEFAULT CURRENT_TIMESTAMP,
+                FOREIGN KEY (of_id) REFERENCES ordres_fabrication(of) ON DELETE CASCADE,
+                INDEX idx_of_session (of_id, num_session)
+            )
+            ''',
+
+            # ===== UTILISATEURS PAR DÉFAUT =====
+            _seed_default_users,
+        ]
+    },
+    {
+        'version': 2,
+        'description': "Colonnes calculées et index de sur-consommation (details_coupe)",
+        'steps': [
+            add_column('details_coupe', 'total_consommation',
+                       "DECIMAL(10,2) AS (COALESCE(consommation, 0) + COALESCE(sur_consommation, 0)) STORED"),
+            add_column('details_coupe', 'taux_surcons',
+                       "DECIMAL(10,2) AS (CASE WHEN consommation > 0 "
+                       "THEN COALESCE(sur_consommation, 0) / consommation * 100 ELSE 0 END) STORED"),
+            add_index('details_coupe', 'idx_surcons', 'sur_consommation'),
+            add_index('details_coupe', 'idx_surcons_matiere', 'matiere, sur_consommation'),
+            add_index('details_coupe', 'idx_surcons_coupeur', 'matricule_coupeur, taux_surcons'),
+            add_index('details_coupe', 'idx_taux_surcons', 'taux_surcons'),
+        ]
+    },
+    {
+        'version': 3,
+        'description': "Clés d'idempotence des actions d'atelier (file d'écriture hors ligne)",
+        'steps': [
+            '''
+            CREATE TABLE IF NOT EXISTS actions_appliquees (
+                cle CHAR(32) PRIMARY KEY,
+                action VARCHAR(50) NOT NULL,
+                of_id VARCHAR(50),
+                date_action DATETIME NOT NULL,             # date d'origine (clic de l'opérateur)
+                date_application DATETIME DEFAULT CURRENT_TIMESTAMP,
+                INDEX idx_date_application (date_application)
+            )
+            ''',
+        ]
+    },
+    {
+        'version': 4,
+        'description': "Tables d'archive des OF terminés (voir archive.py)",
+        'steps': [
+            *(create_table_like(archive_name(table), table) for table, _ in ARCHIVED_TABLES),
+            # Sélection des OF à archiver
+            add_index('details_piqure', 'idx_piqure_fin', 'statut_piqure, date_fin_piqure'),
+        ]
+    },
+    {
+        'version': 5,
+        'description': "Références des chronomètres au millième (DATETIME(3), voir clock.py)",
+        'steps': [
+            *(modify_column(name, column, definition)
+              for table, column, definition in CHRONO_REFERENCE_COLUMNS
+              for name in (table, archive_name(table))),
+            modify_column('actions_appliquees', 'date_action', "DATETIME(3) NOT NULL"),
+        ]
+    },
+    {
+        'version': 6,
+        'description': "Date de dernière modification métier de la coupe (hors chronomètres)",
+        'steps': [
+            # derniere_mise_a_jour change à chaque passage des chronomètres : maj_donnees ne suit
+            # que les colonnes métier (renseignée par create_order et _apply_update_order)
+            *(add_column(name, 'maj_donnees', "DATETIME(3)")
+              for name in ('details_coupe', archive_name('details_coupe'))),
+        ]
+    },
+    {
+        'version': 7,
+        'description': "Date de dernière modification métier du contrôle (hors chronomètres)",
+        'steps': [
+            # Comme la migration 6 : renseignée par create_order, _apply_update_order, le
+            # démarrage et la pause/reprise du contrôle, jamais par update_all_timers
+            *(add_column(name, 'maj_donnees', "DATETIME(3)")
+              for name in ('details_controle', archive_name('details_controle'))),
+        ]
+    },
+]
+
+LATEST_SCHEMA_VERSION = max(m['version'] for m in MIGRATIONS)
@@ -0,0 +1,66 @@
+# order_record.py - Lignes d'OF compactes : tuple de valeurs et noms de colonnes partagés
+#
+# get_all_orders() et iter_all_orders() lisent les OF avec un curseur à lignes tuple et les
+# enveloppent dans des OrderRecord : les ~60 noms de colonnes et leur position sont stockés
+# une seule fois par résultat, chaque ligne ne garde que le tuple renvoyé par le pilote.
+# OrderRecord est un Mapping en lecture seule : o['of'], o.get(...), 'x' in o, keys(),
+# items(), dict(o) fonctionnent comme avec les dicts de DictCursor. Pour modifier une
+# ligne, travailler sur une copie (o.copy() retourne un dict).
+#
+# Mesure (mémoire par session, filtres, KPI) : python -m benchmarks.bench_records
+from collections.abc import Mapping
+from typing import Dict, Iterable, List, Sequence
+
+
+class OrderRecord(Mapping):
+    """Ligne d'OF : accès par nom de colonne sur un tuple de valeurs"""
+
+    __slots__ = ('_index', '_values')
+
+    def __init__(self, index: Dict[str, int], values: Sequence):
+        self._index = index  # partagé par toutes les lignes du résultat
+        self._values = values
+
+    def __getitem__(self, key):
+        return self._values[self._index[key]]
+
+    def get(self, key, default=None):
+        position = self._index.get(key)
+        return default if position is None else self._values[position]
+
+    def __contains__(self, key) -> bool:
+        return key in self._index
+
+    def __iter__(self):
+        return iter(self._index)
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def copy(self) -> Dict:
+        return dict(zip(self._index, self._values))
+
+    def __reduce__(self):
+        return OrderRecord, (self._index, self._values)
+
+    def __repr__(self) -> str:
+        return f"OrderRecord({self.copy()!r})"
+
+
+def column_index(description) -> Dict[str, int]:
+    """Position de chaque colonne d'après cursor.description"""
+    return {column[0]: position for position, column in enumerate(description)}
+
+
+def to_records(description, rows: Iterable[Sequence]) -> List[OrderRecord]:
+    """Lignes tuple d'un curseur -> OrderRecord partageant le même index de colonnes"""
+    index = column_index(description)
+    return [OrderRecord(index, row) for row in rows]
+
+
+def records_from_dicts(rows: List[Dict]) -> List[OrderRecord]:
+    """Dicts de mêmes clés (même ordre) -> OrderRecord (substituts en mémoire, benchmarks)"""
+    if not rows:
+        return []
+    index = {key: position for position, key in enumerate(rows[0])}
+    return [OrderRecord(index, tuple(row.values())) for row in rows]
@@ -0,0 +1,46 @@
+# page_registry.py - Chargement paresseux des pages par rôle
+import importlib
+import threading
+import time
+from typing import Dict, Optional, Type
+
+
+class PageRegistry:
+    """Registre des pages : le module d'un rôle n'est importé qu'à sa première connexion"""
+
+    # rôle -> (module, classe de page)
+    PAGES = {
+        "Chef de Coupe": ("chef_coupe_page", "ChefCoupePage"),
+        "Contrôle Qualité": ("controle_qualite_page", "ControleQualitePage"),
+        "Chef de Production": ("directeur_page", "DirecteurPage"),
+        "Chef de Piqûre": ("chef_piqure_page", "ChefPiqurePage"),
+    }
+
+    # Partagés par toutes les sessions du processus
+    _classes: Dict[str, Type] = {}
+    _import_times: Dict[str, float] = {}
+    _lock = threading.Lock()
+
+    @classmethod
+    def get_page_class(cls, role: str) -> Optional[Type]:
+        """Retourne la classe de page du rôle (None si rôle inconnu)"""
+        if role not in cls.PAGES:
+            return None
+
+        page_class = cls._classes.get(role)
+        if page_class is not None:
+            return page_class
+
+        module_name, class_name = cls.PAGES[role]
+        with cls._lock:
+            if role not in cls._classes:
+                start = time.perf_counter()
+                module = importlib.import_module(module_name)
+                cls._import_times[module_name] = time.perf_counter() - start
+                cls._classes[role] = getattr(module, class_name)
+        return cls._classes[role]
+
+    @classmethod
+    def get_import_times(cls) -> Dict[str, float]:
+        """Durées d'import (secondes) des modules de pages déjà chargés"""
+        return dict(cls._import_times)
@@ -0,0 +1,138 @@
+# production_grid.py - Tableau de suivi production virtualisé (vue directeur)
+import pandas as pd
+import streamlit as st
+from clock import ServerClock
+from database import Utils
+from fragment_cache import FragmentCache
+from typing import Dict, List, Tuple
+
+# Statut et état de pause portés par la valeur des cellules (icônes) : pas de Styler, que
+# Streamlit refuse au-delà de styler.render.max_elements cellules (262 144, ~18 700 OF ici)
+STATUS_ICONS = {
+    'En attente': '⏳',
+    'En cours': '🔄',
+    'Terminée': '✅',
+    'En pause': '⏸️',
+    'Approuvé ✅': '✅',
+    'Rejeté ❌': '❌',
+    'À retravailler 🔧': '🔧',
+    'Contrôle partiel': '🔄',
+}
+DEFAULT_STATUS_ICON = '❓'
+
+PAUSE_ACTIVE_ICON = '🔴'  # pause en cours
+PAUSE_HISTORIQUE_ICON = '⏸️'  # pauses terminées
+
+GRID_COLUMNS = [
+    'OF', 'Modèle', 'Couleur', 'Quantité',
+    'Statut Coupe', '⏱️ Coupe', '⏸️ Pause Coupe',
+    'Statut Ctrl', '⏱️ Ctrl', '⏸️ Pause Ctrl', '% Ctrl',
+    'Statut Piqûre', '⏱️ Piqûre', '⏸️ Pause Piqûre'
+]
+PAUSE_COLUMNS = ('⏸️ Pause Coupe', '⏸️ Pause Ctrl', '⏸️ Pause Piqûre')
+
+
+class ProductionGrid:
+    """Grille Arrow (st.dataframe) : seules les lignes visibles sont rendues par le navigateur.
+
+    Les lignes calculées sont mémorisées par OF et version de ligne (FragmentCache) :
+    seules les lignes modifiées (ou dont une pause est en cours) sont recalculées.
+    """
+
+    # Incrémenter si le contenu des lignes change
+    TEMPLATE_VERSION = 2
+    HEIGHT = 560
+
+    def __init__(self):
+        self.utils = Utils()
+
+    @staticmethod
+    def _is_live(order: Dict) -> bool:
+        """Une pause en cours dépend de l'heure courante : la ligne est toujours recalculée"""
+        return bool(order.get('coupe_en_pause') or order.get('controle_en_pause') or order.get('piqure_en_pause'))
+
+    @staticmethod
+    def _status_cell(status: str) -> str:
+        return f"{STATUS_ICONS.get(status, DEFAULT_STATUS_ICON)} {status}"
+
+    def _pause_cell(self, duration: int, en_pause) -> str:
+        if duration > 0:
+            icon = PAUSE_ACTIVE_ICON if en_pause else PAUSE_HISTORIQUE_ICON
+            return f"{icon} {self.utils.format_time(duration)}"
+        return "-"
+
+    def _build_row(self, order: Dict, chrono: Dict) -> Tuple:
+        """Calcule les valeurs d'une ligne (chrono : Utils.chrono_fields de l'OF)"""
+        # Coupe
+        temps_coupe = chrono['actif_coupe']
+        statut_coupe = self._status_cell(order['statut_coupe'])
+        pause_coupe = self._pause_cell(
+            chrono['pause_coupe'], order.get('coupe_en_pause'))
+
+        # Contrôle
+        temps_controle = chrono['actif_controle']
+        if temps_controle == 0:
+            temps_controle = order.get('temps_controle', 0) or 0
+        statut_ctrl = self._status_cell(order['statut_controle'])
+        pause_ctrl = self._pause_cell(chrono['pause_controle'], order.get('controle_en_pause'))
+
+        quantite_controlee = order.get('quantite_controlee', 0) or 0
+        quantite_totale = order['quantite']
+        pourcentage = (quantite_controlee / quantite_totale * 100) if quantite_totale > 0 else 0
+
+        # Piqûre
+        temps_piqure = chrono['actif_piqure']
+        statut_piqure = self._status_cell(order.get('statut_piqure') or 'En attente')
+        pause_piqure = self._pause_cell(
+            chrono['pause_piqure'], order.get('piqure_en_pause'))
+
+        return (
+            order['of'], order['modele'], order['couleur_modele'], quantite_totale,
+            statut_coupe, self.utils.format_time(temps_coupe), pause_coupe,
+            statut_ctrl, self.utils.format_time(temps_controle), pause_ctrl, pourcentage,
+            statut_piqure, self.utils.format_time(temps_piqure), pause_piqure
+        )
+
+    def update(self, orders: List[Dict]) -> pd.DataFrame:
+        """Recalcule uniquement les lignes modifiées et retourne le tableau"""
+        rows = []
+        # Une seule heure de référence (heure serveur, comme les débuts de pause) pour tout le tableau ;
+        # durées calculées en lot pour les lignes en pause, à la demande pour les lignes hors cache
+        now = ServerClock.now()
+        chronos = self.utils.chrono_fields([order for order in orders if self._is_live(order)], now)
+
+        for order in orders:
+            chrono = chronos.get(order['of'])
+            if chrono is not None:
+                rows.append(self._build_row(order, chrono))
+            else:
+                rows.append(FragmentCache.get(
+                    'grid_row', order, self.TEMPLATE_VERSION,
+                    lambda: self._build_row(order, self.utils.chrono_fields([order], now)[order['of']])))
+
+        return pd.DataFrame(rows, columns=GRID_COLUMNS)
+
+    def render(self, orders: List[Dict]):
+        """Affiche la grille virtualisée"""
+        df = self.update(orders)
+
+        st.dataframe(
+            df,
+            use_container_width=True,
+            hide_index=True,
+            height=self.HEIGHT,
+            column_config={
+                'OF': st.column_config.TextColumn('OF', width='small'),
+                'Quantité': st.column_config.NumberColumn('Quantité', format='%d'),
+                **{column: st.column_config.TextColumn(
+                    column, help=f"{PAUSE_ACTIVE_ICON} pause en cours • {PAUSE_HISTORIQUE_ICON} pauses terminées")
+                   for column in PAUSE_COLUMNS},
+                '% Ctrl': st.column_config.ProgressColumn(
+                    '% Ctrl',
+                    format='%.1f%%',
+                    min_value=0,
+                    max_value=100
+                ),
+            }
+        )
+        st.caption(f"{len(df)} OF • défilement virtualisé")
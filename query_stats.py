@@ -0,0 +1,288 @@
+# query_stats.py - Instrumentation des requêtes SQL et journal des requêtes lentes
+import bisect
+import contextvars
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, List, Optional
+from pymysql.cursors import Cursor, DictCursor, SSCursor, SSDictCursor
+from render_profiler import active_profiler
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Page (rôle) en cours de rendu dans le thread du script Streamlit
+current_page: contextvars.ContextVar = contextvars.ContextVar('current_page', default='background')
+
+# Limites des classes de l'histogramme (ms)
+HISTOGRAM_BOUNDS_MS = [1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000]
+
+# Lignes examinées pour estimer le volume d'un résultat
+BYTES_SAMPLE_ROWS = 100
+
+# Fichiers dont les fonctions donnent leur nom aux requêtes
+_QUERY_SOURCES = ('database.py', 'migrations.py')
+
+
+def _value_size(value) -> int:
+    if value is None:
+        return 1
+    if isinstance(value, (bytes, str)):
+        return len(value)
+    return 8
+
+
+def estimate_result_bytes(rows) -> int:
+    """Volume approximatif d'un résultat (extrapolé depuis les premières lignes)"""
+    if not rows:
+        return 0
+    sample = rows[:BYTES_SAMPLE_ROWS]
+    size = 0
+    for row in sample:
+        values = row.values() if isinstance(row, dict) else row
+        size += sum(_value_size(value) for value in values)
+    return size * len(rows) // len(sample)
+
+
+def _query_name() -> str:
+    """Nom de la méthode DatabaseManager appelante (première frame de database.py)"""
+    frame = sys._getframe(2)
+    while frame is not None:
+        if frame.f_code.co_filename.endswith(_QUERY_SOURCES):
+            return frame.f_code.co_name
+        frame = frame.f_back
+    return 'inconnu'
+
+
+class QueryHistogram:
+    """Statistiques glissantes d'une requête nommée"""
+
+    WINDOW = 500
+
+    def __init__(self):
+        self.count = 0
+        self.errors = 0
+        self.total_ms = 0.0
+        self.total_rows = 0
+        self.total_bytes = 0
+        self.total_wait_ms = 0.0
+        self.max_ms = 0.0
+        self.buckets = [0] * (len(HISTOGRAM_BOUNDS_MS) + 1)
+        self.recent = deque(maxlen=self.WINDOW)
+        self.pages: Dict[str, int] = {}
+
+    def add(self, duration_ms: float, rows: int, size: int, wait_ms: float, page: str, error: bool):
+        self.count += 1
+        self.errors += int(error)
+        self.total_ms += duration_ms
+        self.total_rows += rows
+        self.total_bytes += size
+        self.total_wait_ms += wait_ms
+        self.max_ms = max(self.max_ms, duration_ms)
+        self.buckets[bisect.bisect_left(HISTOGRAM_BOUNDS_MS, duration_ms)] += 1
+        self.recent.append(duration_ms)
+        self.pages[page] = self.pages.get(page, 0) + 1
+
+    def percentile(self, p: float) -> float:
+        if not self.recent:
+            return 0.0
+        ordered = sorted(self.recent)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * p))]
+
+    def summary(self, name: str) -> Dict:
+        return {
+            'requete': name,
+            'appels': self.count,
+            'erreurs': self.errors,
+            'total_ms': round(self.total_ms, 1),
+            'moyenne_ms': round(self.total_ms / self.count, 2) if self.count else 0.0,
+            'p50_ms': round(self.percentile(0.50), 2),
+            'p95_ms': round(self.percentile(0.95), 2),
+            'p99_ms': round(self.percentile(0.99), 2),
+            'max_ms': round(self.max_ms, 2),
+            'lignes': self.total_rows,
+            'octets': self.total_bytes,
+            'attente_connexion_ms': round(self.total_wait_ms, 1),
+            'pages': dict(self.pages),
+        }
+
+
+class QueryStats:
+    """Registre des mesures (partagé par toutes les sessions du processus)"""
+
+    _histograms: Dict[str, QueryHistogram] = {}
+    _lock = threading.Lock()
+    _slow_logger: Optional[logging.Logger] = None
+
+    # Renseignés depuis Config par DatabaseManager
+    enabled = True
+    slow_threshold_ms = 500.0
+    slow_log_path = os.path.join(BASE_DIR, 'logs', 'slow_queries.log')
+
+    @classmethod
+    def configure(cls, enabled: bool, slow_threshold_ms: float, slow_log_path: str):
+        cls.enabled = enabled
+        cls.slow_threshold_ms = slow_threshold_ms
+        cls.slow_log_path = slow_log_path if os.path.isabs(slow_log_path) else os.path.join(BASE_DIR, slow_log_path)
+
+    @classmethod
+    @contextmanager
+    def page(cls, name: str):
+        """Attribue les requêtes exécutées dans le bloc à la page name"""
+        token = current_page.set(name)
+        try:
+            yield
+        finally:
+            current_page.reset(token)
+
+    @classmethod
+    def _get_slow_logger(cls) -> logging.Logger:
+        if cls._slow_logger is None:
+            with cls._lock:
+                if cls._slow_logger is None:
+                    os.makedirs(os.path.dirname(cls.slow_log_path), exist_ok=True)
+                    logger = logging.getLogger('repetto.slow_queries')
+                    logger.setLevel(logging.INFO)
+                    logger.propagate = False
+                    handler = logging.FileHandler(cls.slow_log_path, encoding='utf-8')
+                    handler.setFormatter(logging.Formatter('%(message)s'))
+                    logger.addHandler(handler)
+                    cls._slow_logger = logger
+        return cls._slow_logger
+
+    @classmethod
+    def record(cls, name: str, sql: str, duration_ms: float, rows: int, size: int,
+               wait_ms: float = 0.0, error: bool = False):
+        page = current_page.get()
+        with cls._lock:
+            histogram = cls._histograms.get(name)
+            if histogram is None:
+                histogram = cls._histograms[name] = QueryHistogram()
+            histogram.add(duration_ms, rows, size, wait_ms, page, error)
+
+        profiler = active_profiler.get()
+        if profiler is not None:
+            profiler.on_query(duration_ms, rows, size)
+
+        if duration_ms >= cls.slow_threshold_ms:
+            cls._get_slow_logger().info(json.dumps({
+                'date': datetime.now().isoformat(timespec='milliseconds'),
+                'requete': name,
+                'page': page,
+                'duree_ms': round(duration_ms, 1),
+                'lignes': rows,
+                'octets': size,
+                'attente_connexion_ms': round(wait_ms, 1),
+                'erreur': error,
+                'sql': ' '.join(sql.split())[:500],
+            }, ensure_ascii=False))
+
+    @classmethod
+    def record_connection(cls):
+        """Connexion ouverte par DatabaseManager.get_connection() (comptée par le profileur de rendu)"""
+        profiler = active_profiler.get()
+        if profiler is not None:
+            profiler.on_connect()
+
+    @classmethod
+    def top_offenders(cls, limit: int = 10, sort_by: str = 'total_ms') -> List[Dict]:
+        """Requêtes les plus coûteuses (total_ms, p95_ms, max_ms, octets...)"""
+        with cls._lock:
+            summaries = [histogram.summary(name) for name, histogram in cls._histograms.items()]
+        return sorted(summaries, key=lambda s: s[sort_by], reverse=True)[:limit]
+
+    @classmethod
+    def histogram(cls, name: str) -> Dict:
+        """Répartition des durées d'une requête par classe (ms)"""
+        with cls._lock:
+            histogram = cls._histograms.get(name)
+            buckets = list(histogram.buckets) if histogram else [0] * (len(HISTOGRAM_BOUNDS_MS) + 1)
+        labels = [f"≤{b}" for b in HISTOGRAM_BOUNDS_MS] + [f">{HISTOGRAM_BOUNDS_MS[-1]}"]
+        return dict(zip(labels, buckets))
+
+    @classmethod
+    def reset(cls):
+        with cls._lock:
+            cls._histograms.clear()
+
+
+class MeasuredCursorMixin:
+    """Mesure de chaque requête (durée, lignes, octets, attente de connexion).
+
+    Le curseur expose connection, rowcount et _rows (lignes du dernier résultat).
+    Curseur en flux (streaming = True) : seule l'attente de la première ligne est mesurée,
+    lignes et octets restent à 0 (le résultat n'est pas encore lu).
+    """
+
+    _measuring = False
+    streaming = False
+
+    def _measure(self, method, query, args):
+        # executemany() repasse par execute() : ne mesurer que l'appel extérieur
+        if not QueryStats.enabled or self._measuring:
+            return method(query, args)
+
+        name = _query_name()
+        # L'attente de connexion est imputée à la première requête de la connexion
+        wait_ms = getattr(self.connection, 'connect_wait_ms', 0.0)
+        self.connection.connect_wait_ms = 0.0
+
+        start = time.perf_counter()
+        error = False
+        self._measuring = True
+        try:
+            return method(query, args)
+        except Exception:
+            error = True
+            raise
+        finally:
+            self._measuring = False
+            duration_ms = (time.perf_counter() - start) * 1000
+            if self.streaming:
+                size = row_count = 0
+            else:
+                rows = getattr(self, '_rows', None)
+                size = estimate_result_bytes(rows) if rows else 0
+                row_count = len(rows) if rows else max(self.rowcount, 0)
+            QueryStats.record(name, query if isinstance(query, str) else str(query),
+                              duration_ms, row_count, size, wait_ms, error)
+
+
+class InstrumentedDictCursor(MeasuredCursorMixin, DictCursor):
+    """DictCursor MySQL instrumenté"""
+
+    def execute(self, query, args=None):
+        return self._measure(super().execute, query, args)
+
+    def executemany(self, query, args):
+        return self._measure(super().executemany, query, args)
+
+
+class InstrumentedSSDictCursor(MeasuredCursorMixin, SSDictCursor):
+    """SSDictCursor MySQL instrumenté : lignes lues sur le réseau au fil de fetchmany()"""
+
+    streaming = True
+
+    def execute(self, query, args=None):
+        return self._measure(super().execute, query, args)
+
+
+class InstrumentedCursor(MeasuredCursorMixin, Cursor):
+    """Curseur MySQL instrumenté à lignes tuple (OrderRecord, voir order_record.py)"""
+
+    def execute(self, query, args=None):
+        return self._measure(super().execute, query, args)
+
+
+class InstrumentedSSCursor(MeasuredCursorMixin, SSCursor):
+    """SSCursor MySQL instrumenté : lignes tuple lues au fil de fetchmany()"""
+
+    streaming = True
+
+    def execute(self, query, args=None):
+        return self._measure(super().execute, query, args)
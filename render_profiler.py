@@ -0,0 +1,243 @@
+# render_profiler.py - Profilage des rendus de page (sections, allers-retours SQL)
+#
+# Activation : Config.RENDER_PROFILER = True ou ?profile=1 dans l'URL.
+# Comparaison hors ligne de deux exports : python -m render_profiler avant.json apres.json
+import contextvars
+import json
+import os
+import sys
+import time
+from collections import deque
+from contextlib import contextmanager, nullcontext
+from datetime import datetime
+from typing import Dict, List, Optional
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Profileur du rendu en cours dans le thread du script (None si inactif)
+active_profiler: contextvars.ContextVar = contextvars.ContextVar('active_profiler', default=None)
+
+# Sites d'appel conservés par section dans les exports
+SITES_PER_SECTION = 10
+
+_DB_SOURCE = 'database.py'
+_INFRA_SOURCES = ('render_profiler.py', 'query_stats.py', _DB_SOURCE)
+
+
+def _call_site() -> str:
+    """'fichier:ligne → méthode' : ligne de la page qui a appelé la méthode DatabaseManager"""
+    frame = sys._getframe(2)
+    method = None
+    while frame is not None:
+        filename = frame.f_code.co_filename
+        if filename.endswith(_DB_SOURCE):
+            method = frame.f_code.co_name
+        elif method is not None and not filename.endswith(_INFRA_SOURCES):
+            return f"{os.path.basename(filename)}:{frame.f_lineno} → {method}"
+        frame = frame.f_back
+    return method or 'inconnu'
+
+
+class SectionStats:
+    """Mesures cumulées d'une section (chemin 'page/section/sous-section')"""
+
+    __slots__ = ('path', 'depth', 'calls', 'total_ms', 'child_ms', 'queries', 'self_queries', 'bytes',
+                 'connections', 'sites')
+
+    def __init__(self, path: str, depth: int):
+        self.path = path
+        self.depth = depth
+        self.calls = 0
+        self.total_ms = 0.0
+        self.child_ms = 0.0
+        self.queries = 0
+        self.self_queries = 0
+        self.bytes = 0
+        self.connections = 0
+        # Requêtes et connexions émises directement dans la section, par site d'appel
+        self.sites: Dict[str, int] = {}
+
+    def to_dict(self) -> Dict:
+        return {
+            'section': self.path,
+            'profondeur': self.depth,
+            'appels': self.calls,
+            'total_ms': round(self.total_ms, 2),
+            'propre_ms': round(self.total_ms - self.child_ms, 2),
+            'requetes': self.queries,
+            'requetes_propres': self.self_queries,
+            'octets': self.bytes,
+            'connexions': self.connections,
+            'sites': dict(sorted(self.sites.items(), key=lambda item: item[1], reverse=True)[:SITES_PER_SECTION]),
+        }
+
+
+class RenderProfiler:
+    """Chronomètre les sections d'un rendu et compte les requêtes SQL de chacune"""
+
+    HISTORY_SIZE = 50
+
+    def __init__(self, page: str):
+        self.page = page
+        self.started_at = datetime.now()
+        self.sections: Dict[str, SectionStats] = {}
+        self._stack: List[SectionStats] = []
+        self.total_queries = 0
+        self.total_bytes = 0
+        self.total_db_ms = 0.0
+        self.total_connections = 0
+
+    @contextmanager
+    def section(self, name: str):
+        parent = self._stack[-1] if self._stack else None
+        path = f"{parent.path}/{name}" if parent else name
+        stats = self.sections.get(path)
+        if stats is None:
+            stats = self.sections[path] = SectionStats(path, len(self._stack))
+
+        self._stack.append(stats)
+        start = time.perf_counter()
+        try:
+            yield stats
+        finally:
+            elapsed = (time.perf_counter() - start) * 1000
+            self._stack.pop()
+            stats.calls += 1
+            stats.total_ms += elapsed
+            if parent is not None:
+                parent.child_ms += elapsed
+
+    def on_query(self, duration_ms: float, rows: int, size: int):
+        """Appelé par l'instrumentation SQL (query_stats) pour chaque requête"""
+        self.total_queries += 1
+        self.total_bytes += size
+        self.total_db_ms += duration_ms
+        for stats in self._stack:
+            stats.queries += 1
+            stats.bytes += size
+        if self._stack:
+            current = self._stack[-1]
+            current.self_queries += 1
+            site = _call_site()
+            current.sites[site] = current.sites.get(site, 0) + 1
+
+    def on_connect(self):
+        """Appelé par DatabaseManager.get_connection() pour chaque connexion ouverte"""
+        self.total_connections += 1
+        for stats in self._stack:
+            stats.connections += 1
+        if self._stack:
+            site = _call_site() + ' (connexion)'
+            self._stack[-1].sites[site] = self._stack[-1].sites.get(site, 0) + 1
+
+    def to_dict(self) -> Dict:
+        root = next(iter(self.sections.values()), None)
+        return {
+            'page': self.page,
+            'date': self.started_at.isoformat(timespec='seconds'),
+            'total_ms': round(root.total_ms, 2) if root else 0.0,
+            'requetes': self.total_queries,
+            'octets': self.total_bytes,
+            'sql_ms': round(self.total_db_ms, 2),
+            'connexions': self.total_connections,
+            'sections': [stats.to_dict() for stats in self.sections.values()],
+        }
+
+
+def section(name: str):
+    """Section chronométrée du rendu en cours (sans effet si le profilage est inactif)"""
+    profiler = active_profiler.get()
+    if profiler is None:
+        return nullcontext()
+    return profiler.section(name)
+
+
+@contextmanager
+def profile_rerun(page: str, enabled: bool, history: Optional[deque] = None):
+    """Profile tout le rendu d'une page ; le résultat est ajouté à history"""
+    if not enabled:
+        yield None
+        return
+
+    profiler = RenderProfiler(page)
+    token = active_profiler.set(profiler)
+    try:
+        with profiler.section(page):
+            yield profiler
+    finally:
+        active_profiler.reset(token)
+        if history is not None:
+            history.append(profiler.to_dict())
+
+
+def dump_json(profiles: List[Dict], directory: str = None) -> str:
+    """Écrit les rendus profilés dans un fichier JSON et retourne son chemin"""
+    directory = directory or os.path.join(BASE_DIR, 'logs', 'profiles')
+    os.makedirs(directory, exist_ok=True)
+    page = profiles[-1]['page'] if profiles else 'vide'
+    safe_page = ''.join(c if c.isalnum() else '_' for c in page)
+    path = os.path.join(directory, f"profile_{safe_page}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(profiles, f, ensure_ascii=False, indent=2)
+    return path
+
+
+def flame_html(profile: Dict) -> str:
+    """Résumé façon flame graph : une barre par section, largeur proportionnelle au temps"""
+    total = profile['total_ms'] or 1.0
+    rows = []
+    for stats in profile['sections']:
+        width = max(stats['total_ms'] / total * 100, 0.5)
+        label = stats['section'].rsplit('/', 1)[-1]
+        rows.append(f"""
+        <div style="margin-left: {stats['profondeur'] * 10}px; margin-bottom: 3px; font-size: 0.75rem;">
+            <div style="background: #FCE7F3; border-radius: 3px;">
+                <div style="width: {width:.1f}%; background: #E75480; height: 6px; border-radius: 3px;"></div>
+            </div>
+            <div style="color: #374151;">{label} • {stats['total_ms']:.1f} ms • {stats['requetes']} req
+                ({stats['octets'] / 1024:.1f} Ko) • {stats.get('connexions', 0)} cnx{f" • ×{stats['appels']}" if stats['appels'] > 1 else ''}</div>
+        </div>
+        """)
+    return ''.join(rows)
+
+
+def compare(before: List[Dict], after: List[Dict]) -> List[Dict]:
+    """Moyenne par section de deux séries de rendus (avant / après)"""
+    def averages(profiles):
+        sums: Dict[str, List[float]] = {}
+        for profile in profiles:
+            for stats in profile['sections']:
+                entry = sums.setdefault(stats['section'], [0.0, 0.0, 0])
+                entry[0] += stats['total_ms']
+                entry[1] += stats['requetes']
+                entry[2] += 1
+        return {path: (ms / n, queries / n) for path, (ms, queries, n) in sums.items()}
+
+    avg_before, avg_after = averages(before), averages(after)
+    result = []
+    for path in list(avg_before) + [p for p in avg_after if p not in avg_before]:
+        ms_before, q_before = avg_before.get(path, (0.0, 0.0))
+        ms_after, q_after = avg_after.get(path, (0.0, 0.0))
+        result.append({
+            'section': path,
+            'avant_ms': round(ms_before, 2),
+            'apres_ms': round(ms_after, 2),
+            'delta_ms': round(ms_after - ms_before, 2),
+            'avant_requetes': round(q_before, 1),
+            'apres_requetes': round(q_after, 1),
+        })
+    return result
+
+
+if __name__ == '__main__':
+    if len(sys.argv) != 3:
+        print("Usage : python -m render_profiler avant.json apres.json")
+        sys.exit(1)
+    with open(sys.argv[1], encoding='utf-8') as f:
+        profiles_before = json.load(f)
+    with open(sys.argv[2], encoding='utf-8') as f:
+        profiles_after = json.load(f)
+    print(f"{'section':<60} {'avant ms':>10} {'après ms':>10} {'delta':>10} {'req avant':>10} {'req après':>10}")
+    for row in compare(profiles_before, profiles_after):
+        print(f"{row['section']:<60} {row['avant_ms']:>10.1f} {row['apres_ms']:>10.1f} {row['delta_ms']:>+10.1f} "
+              f"{row['avant_requetes']:>10.1f} {row['apres_requetes']:>10.1f}")
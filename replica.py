@@ -0,0 +1,79 @@
+# replica.py - Réplique MySQL en lecture : contrôle du retard de réplication
+#
+# DatabaseManager envoie ses lectures lourdes (get_all_orders, sur-consommation, exports)
+# à Config.READ_REPLICA tant que son retard reste sous Config.REPLICA_MAX_LAG_S ; sinon,
+# ou si la réplique ne répond pas, elles repartent sur le primaire. Le retard est mesuré
+# (SHOW REPLICA STATUS) au plus une fois par REPLICA_LAG_CHECK_S pour tout le processus.
+import logging
+import threading
+import time
+from typing import Dict, Optional
+
+from app_logging import get_logger, log_event
+
+logger = get_logger('replica')
+
+
+class ReplicaMonitor:
+    """État de la réplique partagé par toutes les sessions du processus"""
+
+    _lock = threading.Lock()
+    _checked_at = float('-inf')
+    _lag_s: Optional[float] = None  # None : réplication arrêtée, réplique injoignable ou jamais mesurée
+    _usable = False
+    _reads = {'replique': 0, 'primaire': 0}
+
+    # Renseignés depuis Config par DatabaseManager
+    max_lag_s = 5.0
+    check_interval_s = 10.0
+
+    @classmethod
+    def configure(cls, max_lag_s: float, check_interval_s: float):
+        cls.max_lag_s = max_lag_s
+        cls.check_interval_s = check_interval_s
+
+    @classmethod
+    def usable(cls, replica) -> bool:
+        """Réplique utilisable pour les lectures (retard mesuré et sous le seuil)"""
+        if time.monotonic() - cls._checked_at < cls.check_interval_s:
+            return cls._usable
+
+        with cls._lock:
+            # Une seule session mesure ; les autres gardent l'état précédent en attendant
+            if time.monotonic() - cls._checked_at >= cls.check_interval_s:
+                try:
+                    lag = replica.replication_lag()
+                except Exception as e:
+                    log_event(logger, logging.WARNING, "Réplique injoignable", erreur=str(e))
+                    lag = None
+                cls._update(lag)
+        return cls._usable
+
+    @classmethod
+    def mark_unreachable(cls, error: Exception):
+        """Connexion à la réplique impossible : lectures sur le primaire jusqu'à la prochaine mesure"""
+        with cls._lock:
+            log_event(logger, logging.WARNING, "Réplique injoignable, lectures sur le primaire", erreur=str(error))
+            cls._update(None)
+
+    @classmethod
+    def _update(cls, lag: Optional[float]):
+        usable = lag is not None and lag <= cls.max_lag_s
+        if usable != cls._usable:
+            log_event(logger, logging.INFO if usable else logging.WARNING,
+                      "Lectures sur la réplique" if usable else "Lectures repliées sur le primaire",
+                      retard_s=lag, seuil_s=cls.max_lag_s)
+        cls._lag_s, cls._usable, cls._checked_at = lag, usable, time.monotonic()
+
+    @classmethod
+    def record_read(cls, on_replica: bool):
+        cls._reads['replique' if on_replica else 'primaire'] += 1
+
+    @classmethod
+    def stats(cls) -> Dict:
+        return {
+            'active': cls._usable,
+            'retard_s': cls._lag_s,
+            'lectures_replique': cls._reads['replique'],
+            'lectures_primaire': cls._reads['primaire'],
+        }
@@ -1,6 +1,13 @@
 # pages/sidebar_manager.py - Gestionnaire de la sidebar
+import json
+from datetime import datetime
 import streamlit as st
+from app_logging import AppLogging
 from database import DatabaseManager
+from page_registry import PageRegistry
+from query_stats import QueryStats
+from render_profiler import dump_json, flame_html, section
+from replica import ReplicaMonitor
 from typing import List, Dict
 
 
@@ -31,7 +38,8 @@ class SidebarManager:
             st.markdown("### 🔍 Filtres")
 
             # Récupérer les ordres pour les filtres
-            orders = self.db_manager.get_all_orders()
+            with section("sidebar_get_all_orders"):
+                orders = self.db_manager.get_all_orders()
 
             # Filtre par période
             period_options = ["Aujourd'hui", "Cette semaine", "Ce mois", "Trimestre", "Année"]
@@ -141,24 +149,114 @@ class SidebarManager:
             </div>
             """, unsafe_allow_html=True)
 
+    @staticmethod
+    def display_admin_panel():
+        """Panneau d'administration caché (?admin=1) : requêtes les plus coûteuses"""
+        with st.sidebar:
+            st.markdown("---")
+            st.markdown("### 🛠️ Requêtes SQL")
+
+            sort_labels = {
+                'total_ms': "Temps total",
+                'p95_ms': "p95",
+                'max_ms': "Maximum",
+                'appels': "Appels",
+                'octets': "Volume",
+            }
+            sort_by = st.selectbox("Trier par", list(sort_labels.keys()),
+                                   format_func=lambda k: sort_labels[k], key="admin_query_sort")
+            offenders = QueryStats.top_offenders(limit=15, sort_by=sort_by)
+
+            if not offenders:
+                st.caption("Aucune requête mesurée pour le moment")
+                return
+
+            st.dataframe(
+                [{k: v for k, v in row.items() if k != 'pages'} for row in offenders],
+                use_container_width=True,
+                hide_index=True
+            )
+
+            selected = st.selectbox("Histogramme", [row['requete'] for row in offenders], key="admin_query_hist")
+            st.bar_chart(QueryStats.histogram(selected))
+            pages = next(row['pages'] for row in offenders if row['requete'] == selected)
+            st.caption("Pages : " + ", ".join(f"{page} ({count})" for page, count in pages.items()))
+
+            st.caption(f"Requêtes lentes (≥ {QueryStats.slow_threshold_ms:.0f} ms) : {QueryStats.slow_log_path}")
+            log_stats = AppLogging.stats()
+            st.caption(f"Journal : {log_stats['en_attente']} en attente, {log_stats['abandonnes']} abandonnés "
+                       f"(niveau {AppLogging.level}, format {AppLogging.fmt})")
+            replica = ReplicaMonitor.stats()
+            if replica['lectures_replique'] or replica['lectures_primaire']:
+                st.caption(f"Réplique : {'active' if replica['active'] else 'écartée'} "
+                           f"(retard {replica['retard_s'] if replica['retard_s'] is not None else '?'} s), "
+                           f"lectures réplique {replica['lectures_replique']} / primaire {replica['lectures_primaire']}")
+            if st.button("♻️ Réinitialiser les mesures", use_container_width=True, key="admin_query_reset"):
+                QueryStats.reset()
+                st.rerun()
+
+    @staticmethod
+    def display_profiler_panel(profiles: List[Dict]):
+        """Panneau de profilage (?profile=1) : sections du dernier rendu"""
+        with st.sidebar:
+            st.markdown("---")
+            st.markdown("### ⏱️ Profil du rendu")
+
+            if not profiles:
+                st.caption("Aucun rendu profilé pour le moment")
+                return
+
+            last = profiles[-1]
+            col1, col2 = st.columns(2)
+            with col1:
+                st.metric("Rendu", f"{last['total_ms']:.0f} ms")
+            with col2:
+                st.metric("Requêtes", last['requetes'], help=f"{last['sql_ms']:.0f} ms SQL")
+
+            st.markdown(flame_html(last), unsafe_allow_html=True)
+
+            if len(profiles) > 1:
+                st.line_chart([p['total_ms'] for p in profiles])
+                st.caption(f"{len(profiles)} derniers rendus (ms)")
+
+            import_times = PageRegistry.get_import_times()
+            if import_times:
+                st.caption("Import des pages : " + ", ".join(
+                    f"{module} ({seconds * 1000:.0f} ms)" for module, seconds in import_times.items()))
+
+            st.download_button(
+                "💾 Télécharger JSON",
+                data=json.dumps(profiles, ensure_ascii=False, indent=2),
+                file_name=f"profile_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json",
+                mime="application/json",
+                use_container_width=True,
+                key="profiler_download"
+            )
+            if st.button("📁 Écrire dans logs/profiles", use_container_width=True, key="profiler_dump"):
+                st.caption(f"✅ {dump_json(profiles)}")
+
     def _filter_orders(self, orders: List[Dict]) -> List[Dict]:
         """Filtre les ordres selon les critères de la sidebar"""
-        filtered = orders.copy()
+        return self.filter_orders(orders, st.session_state.selected_status, st.session_state.selected_model)
+
+    @staticmethod
+    def filter_orders(orders: List[Dict], status: str, model: str) -> List[Dict]:
+        """Filtre par statut et par modèle (les lignes ne sont pas copiées)"""
+        filtered = orders
 
         # Filtre par statut
-        if st.session_state.selected_status != "Tous":
-            if st.session_state.selected_status == "En cours":
-                filtered = [o for o in filtered if o['statut_coupe'] == 'En cours']
-            elif st.session_state.selected_status == "Terminé":
-                filtered = [o for o in filtered if o['statut_coupe'] == 'Terminée']
-            elif st.session_state.selected_status == "En pause":
-                filtered = [o for o in filtered if o.get('coupe_en_pause') or o.get('controle_en_pause')]
-            elif st.session_state.selected_status == "À problème":
-                filtered = [o for o in filtered if
-                            (o.get('quantite_rejetee', 0) or 0) + (o.get('quantite_retravailler', 0) or 0) > 0]
+        if status == "En cours":
+            filtered = [o for o in filtered if o['statut_coupe'] == 'En cours']
+        elif status == "Terminé":
+            filtered = [o for o in filtered if o['statut_coupe'] == 'Terminée']
+        elif status == "En pause":
+            filtered = [o for o in filtered if o.get('coupe_en_pause') or o.get('controle_en_pause')]
+        elif status == "À problème":
+            filtered = [o for o in filtered if
+                        (o.get('quantite_rejetee', 0) or 0) + (o.get('quantite_retravailler', 0) or 0) > 0]
 
         # Filtre par modèle
-        if st.session_state.selected_model != "Tous les Modèles":
-            filtered = [o for o in filtered if o['modele'] == st.session_state.selected_model]
+        if model != "Tous les Modèles":
+            filtered = [o for o in filtered if o['modele'] == model]
 
         return filtered
\ No newline at end of file
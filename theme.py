@@ -0,0 +1,78 @@
+# theme.py - Compilation et service du thème CSS comme ressource statique
+import hashlib
+import os
+import re
+import threading
+import streamlit as st
+from database import Config
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+class ThemeAsset:
+    """Thème Repetto minifié une fois par processus et servi par Streamlit (dossier static/)"""
+
+    SOURCE_PATH = os.path.join(BASE_DIR, 'styles', 'theme.css')
+    STATIC_DIR = os.path.join(BASE_DIR, 'static')
+
+    # Partagés par toutes les sessions du processus
+    _css: str = None
+    _filename: str = None
+    _lock = threading.Lock()
+
+    @staticmethod
+    def minify(css: str) -> str:
+        """Supprime commentaires et espaces superflus"""
+        css = re.sub(r'/\*.*?\*/', '', css, flags=re.S)
+        css = re.sub(r'\s+', ' ', css)
+        css = re.sub(r'\s*([{};,>])\s*', r'\1', css)
+        css = css.replace(';}', '}')
+        return css.strip()
+
+    @classmethod
+    def compile(cls) -> str:
+        """Minifie le thème et écrit static/theme.<hash>.css (une seule fois)"""
+        if cls._filename is not None:
+            return cls._filename
+
+        with cls._lock:
+            if cls._filename is None:
+                with open(cls.SOURCE_PATH, encoding='utf-8') as f:
+                    css = cls.minify(f.read())
+                digest = hashlib.sha256(css.encode('utf-8')).hexdigest()[:12]
+                filename = f"theme.{digest}.css"
+
+                os.makedirs(cls.STATIC_DIR, exist_ok=True)
+                target = os.path.join(cls.STATIC_DIR, filename)
+                if not os.path.exists(target):
+                    tmp_path = f"{target}.{os.getpid()}.tmp"
+                    with open(tmp_path, 'w', encoding='utf-8') as f:
+                        f.write(css)
+                    os.replace(tmp_path, target)
+
+                # Nettoyer les anciennes versions du thème
+                for name in os.listdir(cls.STATIC_DIR):
+                    if name.startswith('theme.') and name.endswith('.css') and name != filename:
+                        try:
+                            os.remove(os.path.join(cls.STATIC_DIR, name))
+                        except OSError:
+                            pass
+
+                cls._css = css
+                cls._filename = filename
+        return cls._filename
+
+    @classmethod
+    def get_href(cls) -> str:
+        """URL servie par Streamlit (server.enableStaticServing)"""
+        return f"app/static/{cls.compile()}"
+
+    @classmethod
+    def inject(cls):
+        """Référence la feuille de style (quelques octets par rerun au lieu du CSS complet)"""
+        cls.compile()
+        if Config.THEME_STATIC_SERVING:
+            st.markdown(f'<link rel="stylesheet" href="{cls.get_href()}">', unsafe_allow_html=True)
+        else:
+            # Repli si le service statique est désactivé : CSS minifié en ligne
+            st.markdown(f"<style>{cls._css}</style>", unsafe_allow_html=True)
@@ -0,0 +1,174 @@
+# write_queue.py - File d'écriture durable des actions d'atelier (serveur MySQL injoignable)
+#
+# Quand le serveur ne répond pas, DatabaseManager dépose l'action (démarrage, pause, reprise,
+# fin, session qualité...) dans un journal local : une ligne JSON par action, écrite avec fsync
+# avant de rendre la main à l'opérateur, avec sa date d'origine et une clé d'idempotence.
+# DatabaseManager.sync_write_queue() rejoue le journal par lots transactionnels au retour du
+# réseau ; la clé, enregistrée dans actions_appliquees dans la même transaction que l'action,
+# garantit qu'un rejeu ne s'applique jamais deux fois.
+#
+# Le journal est propre au processus Streamlit (un seul serveur d'application par atelier).
+import json
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import datetime
+from decimal import Decimal
+from typing import Dict, List, Optional, Tuple
+
+from clock import ServerClock
+
+
+def _encode(value):
+    if isinstance(value, datetime):
+        return {'$datetime': value.isoformat()}
+    if isinstance(value, Decimal):
+        return float(value)
+    raise TypeError(f"Valeur non sérialisable dans la file d'écriture : {type(value).__name__}")
+
+
+def _decode(obj: Dict):
+    if set(obj) == {'$datetime'}:
+        return datetime.fromisoformat(obj['$datetime'])
+    return obj
+
+
+def _fsync_dir(path: str):
+    """Rend durable la création/le remplacement d'un fichier (entrée de répertoire)"""
+    if hasattr(os, 'O_DIRECTORY'):
+        fd = os.open(os.path.dirname(path), os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+
+class WriteQueue:
+    """Journal des actions en attente, partagé par toutes les sessions du processus"""
+
+    _lock = threading.Lock()
+    _sync_lock = threading.Lock()
+    _entries: Optional[List[Dict]] = None
+    _offline_until = 0.0
+    _keys_purged_at = float('-inf')
+
+    # Renseignés depuis Config par DatabaseManager
+    path = os.path.abspath('data/write_queue.jsonl')
+    retry_s = 5.0
+    key_purge_interval_s = 3600.0
+
+    @classmethod
+    def configure(cls, path: str, retry_s: float, key_purge_interval_s: float):
+        path = os.path.abspath(path)
+        with cls._lock:
+            if path != cls.path:
+                cls.path = path
+                cls._entries = None
+            cls.retry_s = retry_s
+            cls.key_purge_interval_s = key_purge_interval_s
+
+    @classmethod
+    def _load(cls) -> List[Dict]:
+        """Entrées du journal (relu une seule fois, puis tenu en mémoire)"""
+        if cls._entries is None:
+            entries = []
+            if os.path.exists(cls.path):
+                with open(cls.path, encoding='utf-8') as f:
+                    for line in f:
+                        try:
+                            entries.append(json.loads(line, object_hook=_decode))
+                        except ValueError:
+                            # Dernière ligne tronquée par un arrêt brutal : l'action n'a pas été confirmée
+                            continue
+            cls._entries = entries
+        return cls._entries
+
+    @staticmethod
+    def new_entry(action: str, params: Dict) -> Dict:
+        # Date d'origine en heure serveur (dernier décalage connu) : rejouée telle quelle
+        return {'cle': uuid.uuid4().hex, 'action': action, 'date': ServerClock.now(), 'params': params}
+
+    @classmethod
+    def append(cls, entry: Dict):
+        """Ajoute l'action au journal ; retourne une fois la ligne sur disque"""
+        line = json.dumps(entry, default=_encode, ensure_ascii=False) + '\n'
+        with cls._lock:
+            entries = cls._load()
+            os.makedirs(os.path.dirname(cls.path), exist_ok=True)
+            created = not os.path.exists(cls.path)
+            with open(cls.path, 'a', encoding='utf-8') as f:
+                f.write(line)
+                f.flush()
+                os.fsync(f.fileno())
+            if created:
+                _fsync_dir(cls.path)
+            entries.append(entry)
+
+    @classmethod
+    def pending(cls) -> List[Dict]:
+        with cls._lock:
+            return list(cls._load())
+
+    @classmethod
+    def pending_count(cls) -> int:
+        with cls._lock:
+            return len(cls._load())
+
+    @classmethod
+    def acknowledge(cls, keys: List[str], rejected: List[Tuple[Dict, str]]):
+        """Retire du journal les actions rejouées (ou rejetées, mises de côté avec leur erreur)"""
+        done = set(keys) | {entry['cle'] for entry, _ in rejected}
+        with cls._lock:
+            if rejected:
+                with open(cls.path + '.rejets', 'a', encoding='utf-8') as f:
+                    for entry, error in rejected:
+                        f.write(json.dumps({**entry, 'erreur': error}, default=_encode, ensure_ascii=False) + '\n')
+                    f.flush()
+                    os.fsync(f.fileno())
+
+            remaining = [entry for entry in cls._load() if entry['cle'] not in done]
+            # Réécriture atomique : fichier temporaire synchronisé puis remplacement
+            tmp_path = cls.path + '.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                for entry in remaining:
+                    f.write(json.dumps(entry, default=_encode, ensure_ascii=False) + '\n')
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, cls.path)
+            _fsync_dir(cls.path)
+            cls._entries = remaining
+
+    @classmethod
+    def mark_offline(cls):
+        """Serveur injoignable : pas de nouvelle tentative avant retry_s"""
+        cls._offline_until = time.monotonic() + cls.retry_s
+
+    @classmethod
+    def mark_online(cls):
+        cls._offline_until = 0.0
+
+    @classmethod
+    def is_offline(cls) -> bool:
+        return time.monotonic() < cls._offline_until
+
+    @classmethod
+    def claim_key_purge(cls) -> bool:
+        """True pour une seule session par key_purge_interval_s : purge des clés d'idempotence expirées"""
+        with cls._lock:
+            if time.monotonic() - cls._keys_purged_at < cls.key_purge_interval_s:
+                return False
+            cls._keys_purged_at = time.monotonic()
+            return True
+
+    @classmethod
+    @contextmanager
+    def syncing(cls):
+        """Un seul rejeu à la fois ; les autres sessions ne l'attendent pas"""
+        acquired = cls._sync_lock.acquire(blocking=False)
+        try:
+            yield acquired
+        finally:
+            if acquired:
+                cls._sync_lock.release()